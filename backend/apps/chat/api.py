@@ -4,7 +4,8 @@ from rest_framework import status
 from django.utils import timezone
 import uuid
 
-from .models.chat_models import Call, CallParticipant
+from .history import InvalidCursor, history_page
+from .models.chat_models import Call, CallParticipant, ConversationMessage
 from .serializers import ConversationListSerializer, ConversationDetailSerializer, ConversationMessageSerializer
 from apps.authentication.models import User
 from apps.community.models import Conversation, Profile
@@ -26,6 +27,31 @@ def conversations_detail(request, pk):
         'messages': messages_serializer.data
     }, safe=False)
 
+@api_view(['GET'])
+def conversation_history(request, conversation_id):
+    """Messages of a conversation, newest first, paged with ?before=<cursor>&limit=<n>"""
+    if not request.user.conversations.filter(pk=conversation_id).exists():
+        return JsonResponse({'success': False, 'error': 'Conversation not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    messages = ConversationMessage.objects.filter(conversation_id=conversation_id).select_related('created_by', 'sent_to')
+    try:
+        page = history_page(messages, 'created_at', request.GET.get('before'), request.GET.get('limit'))
+    except InvalidCursor:
+        return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return JsonResponse({
+        'success': True,
+        'messages': [{
+            'id': str(message.id),
+            'body': message.body,
+            'created_by': {'id': str(message.created_by.id), 'username': message.created_by.username},
+            'sent_to': {'id': str(message.sent_to.id), 'username': message.sent_to.username},
+            'created_at': message.created_at.isoformat()
+        } for message in page.messages],
+        'next_cursor': page.next_cursor,
+        'has_more': page.has_more
+    })
+
 @api_view(['GET'])
 def conversations_start(request, user_id):
     conversations = Conversation.objects.filter(users__in=[user_id]).filter(users__in=[request.user.id])
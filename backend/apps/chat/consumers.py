@@ -1,16 +1,26 @@
 # backend/chat/consumers.py
 import json
+import logging
 
-from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer # type: ignore
+from django.core.exceptions import ValidationError
 
-from .models.chat_models import ConversationMessage
+from .message_buffer import MessageWriteBuffer
+from .models.chat_models import Conversation, ConversationMessage
+
+logger = logging.getLogger(__name__)
+
+# Shared by every consumer of the process: one bulk insert per conversation and flush
+message_buffer = MessageWriteBuffer(ConversationMessage)
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.room_name = self.scope['url_route']['kwargs']['room_name']
         self.room_group_name = f'chat_{self.room_name}'
+        # Participant ids per conversation, checked before buffering a message
+        self.participants = {}
 
         # Join room
 
@@ -21,7 +31,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
-    async def disconnect(self):
+    async def disconnect(self, close_code):
         # Leave room
 
         await self.channel_layer.group_discard(
@@ -29,6 +39,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
+        # Write pending messages now rather than at the next interval
+        await message_buffer.flush()
+
     # Recieve message from web sockets
     async def receive(self, text_data):
         data = json.loads(text_data)
@@ -38,29 +51,59 @@ class ChatConsumer(AsyncWebsocketConsumer):
         name = data['data']['name']
         body = data['data']['body']
 
+        # Messages are buffered before being written: the ids coming from the
+        # client are checked now so that the insert cannot fail on them
+        participants = await self.get_participants(conversation_id)
+        user_id = self.scope['user'].id
+        if user_id not in participants or not any(str(pk) == str(sent_to_id) for pk in participants):
+            await self.send(text_data=json.dumps({'error': 'Invalid conversation or recipient'}))
+            return
+
+        message = ConversationMessage(
+            conversation_id=conversation_id,
+            body=body,
+            sent_to_id=sent_to_id,
+            created_by=self.scope['user']
+        )
+
+        # Journaled before being broadcast: an acknowledged message is never lost
+        try:
+            await message_buffer.add(message)
+        except Exception:
+            logger.error(f"Could not journal chat message for conversation {conversation_id}", exc_info=True)
+            await self.send(text_data=json.dumps({'error': 'Message could not be saved, please retry'}))
+            return
+
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 'type': 'chat_message',
+                'id': str(message.id),
                 'body': body,
                 'name': name
             }
         )
 
-        await self.save_message(conversation_id, body, sent_to_id)
-    
+    async def get_participants(self, conversation_id):
+        key = str(conversation_id)
+        if key not in self.participants:
+            self.participants[key] = await database_sync_to_async(self._load_participants)(conversation_id)
+        return self.participants[key]
+
+    @staticmethod
+    def _load_participants(conversation_id):
+        try:
+            return set(Conversation.objects.get(pk=conversation_id).users.values_list('pk', flat=True))
+        except (Conversation.DoesNotExist, ValidationError, ValueError):
+            return set()
+
     # Sending messages
     async def chat_message(self, event):
         body = event['body']
         name = event['name']
 
         await self.send(text_data=json.dumps({
+            'id': event.get('id'),
             'body': body,
             'name': name
         }))
-
-    @sync_to_async
-    def save_message(self, conversation_id, body, sent_to_id):
-        user = self.scope['user']
-
-        ConversationMessage.objects.create(conversation_id=conversation_id, body=body, sent_to_id=sent_to_id, created_by=user)
\ No newline at end of file
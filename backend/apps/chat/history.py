@@ -0,0 +1,86 @@
+# backend/chat/history.py
+"""
+Keyset pagination of chat history
+
+Pages are read newest first on ``(time_field, id)``, which matches the
+``(conversation, time_field, id)`` indexes of the message models. The cursor
+is the position of the last message returned, so fetching an older page costs
+the same whatever its depth in the history, and messages written meanwhile do
+not shift the pages.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from typing import List, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class HistoryPage:
+    messages: List
+    next_cursor: Optional[str]
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+
+def page_size(value=None) -> int:
+    """Requested page size, clamped to [1, MAX_PAGE_SIZE]"""
+    default = getattr(settings, 'CHAT_HISTORY_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    try:
+        size = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(timestamp, pk) -> str:
+    raw = json.dumps([timestamp.isoformat(), str(pk)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """(timestamp, pk) of a cursor; raises InvalidCursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, pk = json.loads(raw)
+        timestamp = parse_datetime(timestamp)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if timestamp is None:
+        raise InvalidCursor(cursor)
+    return timestamp, pk
+
+
+def history_page(queryset, time_field: str, cursor: Optional[str] = None, limit=None) -> HistoryPage:
+    """
+    One page of ``queryset``, newest first, starting after ``cursor``
+
+    Reads ``limit + 1`` rows to know whether an older page exists.
+    """
+    limit = page_size(limit)
+    queryset = queryset.order_by(f'-{time_field}', '-id')
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{time_field}__lt': timestamp}) | Q(**{time_field: timestamp, 'id__lt': pk})
+        )
+
+    messages = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        last = messages[-1]
+        next_cursor = encode_cursor(getattr(last, time_field), last.pk)
+    return HistoryPage(messages, next_cursor)
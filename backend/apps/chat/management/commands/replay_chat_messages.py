@@ -0,0 +1,18 @@
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from apps.chat.consumers import message_buffer
+
+
+class Command(BaseCommand):
+    help = 'Write journaled chat messages left unwritten by a stopped or crashed process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=float, default=None,
+                            help='Only replay entries journaled at least this many seconds ago')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Replaying chat message journal...')
+
+        written = async_to_sync(message_buffer.replay)(options['older_than'])
+
+        self.stdout.write(self.style.SUCCESS(f'Chat message journal replayed: {written} messages written'))
@@ -0,0 +1,280 @@
+# backend/chat/message_buffer.py
+"""
+Write-behind buffer for chat messages
+
+Consumers hand unsaved messages to the buffer instead of inserting them one
+by one. Messages are grouped per conversation and written with a single
+bulk_create when a conversation reaches CHAT_MESSAGE_BUFFER_SIZE pending
+messages, or CHAT_MESSAGE_FLUSH_INTERVAL seconds after its first pending
+message.
+
+Delivery is at-least-once: a message is first appended to a journal
+(CHAT_MESSAGE_JOURNAL_BACKEND, a Redis hash when Redis is available) and is
+only broadcast once the journal holds it. Journal entries are removed after
+the row is written; entries left behind by a process that died are replayed
+by the next flush of any process (and by the replay_chat_messages command).
+A batch that cannot be written (database unavailable) is kept and retried
+with a growing delay, never dropped. Only rows that can never be inserted
+(e.g. an unknown foreign key) are discarded and logged, so that they do not
+block the rest of their conversation. Primary keys are generated before
+buffering and conflicts are ignored, so retries and replays never duplicate
+messages.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_RETRY_MAX_DELAY = 60.0
+# Journal entries older than this belong to a process that is gone
+DEFAULT_REPLAY_AFTER = 300
+
+DEFAULT_JOURNAL_BACKEND = 'apps.chat.message_buffer.MemoryMessageJournal'
+
+
+class MessageJournal:
+    """Copies of the buffered messages, kept until they are written"""
+
+    # Network calls: run outside the event loop
+    blocking = False
+
+    def append(self, key: str, data: dict):
+        raise NotImplementedError
+
+    def remove(self, keys):
+        raise NotImplementedError
+
+    def entries(self, older_than: float):
+        """[(key, data)] of the entries appended more than ``older_than`` seconds ago"""
+        raise NotImplementedError
+
+
+class MemoryMessageJournal(MessageJournal):
+    """Journal in process memory: survives database outages, not restarts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def append(self, key, data):
+        with self._lock:
+            self._entries[key] = (time.time(), data)
+
+    def remove(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def entries(self, older_than):
+        limit = time.time() - older_than
+        with self._lock:
+            return [(key, data) for key, (at, data) in self._entries.items() if at <= limit]
+
+
+class RedisMessageJournal(MessageJournal):
+    """Journal in a Redis hash shared by every server"""
+
+    KEY = 'chat_message_journal'
+    blocking = True
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            url = getattr(settings, 'CHAT_MESSAGE_JOURNAL_REDIS_URL', None) or os.environ.get(
+                'REDIS_URL', 'redis://127.0.0.1:6379/0'
+            )
+            self._client = redis.Redis.from_url(url)
+        return self._client
+
+    def append(self, key, data):
+        self.client.hset(self.KEY, key, json.dumps({'at': time.time(), 'data': data}))
+
+    def remove(self, keys):
+        keys = list(keys)
+        if keys:
+            self.client.hdel(self.KEY, *keys)
+
+    def entries(self, older_than):
+        limit = time.time() - older_than
+        entries = []
+        for key, raw in self.client.hscan_iter(self.KEY):
+            entry = json.loads(raw)
+            if entry['at'] <= limit:
+                entries.append((key.decode() if isinstance(key, bytes) else key, entry['data']))
+        return entries
+
+
+_journals = {}
+
+
+def get_message_journal() -> MessageJournal:
+    """Journal configured by ``CHAT_MESSAGE_JOURNAL_BACKEND`` (process memory by default)"""
+    path = getattr(settings, 'CHAT_MESSAGE_JOURNAL_BACKEND', DEFAULT_JOURNAL_BACKEND)
+    if path not in _journals:
+        _journals[path] = import_string(path)()
+    return _journals[path]
+
+
+class MessageWriteBuffer:
+
+    def __init__(self, model, max_size=None, interval=None, journal=None):
+        self.model = model
+        self._max_size = max_size
+        self._interval = interval
+        self._journal = journal
+        self._pending = defaultdict(list)
+        self._failures = {}
+        self._timers = {}
+        self._replayed = False
+
+    @property
+    def max_size(self):
+        return self._max_size or getattr(settings, 'CHAT_MESSAGE_BUFFER_SIZE', DEFAULT_BUFFER_SIZE)
+
+    @property
+    def interval(self):
+        if self._interval is not None:
+            return self._interval
+        return getattr(settings, 'CHAT_MESSAGE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+    @property
+    def journal(self):
+        return self._journal or get_message_journal()
+
+    def pending(self, conversation_id=None):
+        """Number of messages not written yet"""
+        if conversation_id is not None:
+            return len(self._pending.get(conversation_id, []))
+        return sum(len(batch) for batch in self._pending.values())
+
+    async def add(self, message):
+        """
+        Journal and buffer an unsaved message (its primary key must already be set)
+
+        Raises if the journal cannot store the message: it must then not be
+        acknowledged to the sender.
+        """
+        await self._call_journal(self.journal.append, str(message.pk), self._serialize(message))
+        key = message.conversation_id
+        self._pending[key].append(message)
+        if len(self._pending[key]) >= self.max_size:
+            await self.flush(key)
+        else:
+            self._schedule(key)
+
+    async def flush(self, conversation_id=None) -> int:
+        """Write the pending messages of one conversation (or all); returns the number written"""
+        if not self._replayed:
+            self._replayed = True
+            await self.replay()
+
+        keys = [conversation_id] if conversation_id is not None else list(self._pending)
+        written = 0
+        for key in keys:
+            batch = self._pending.pop(key, [])
+            if not batch:
+                continue
+            try:
+                written += await database_sync_to_async(self._write)(batch)
+            except Exception as e:
+                failures = self._failures.get(key, 0) + 1
+                self._failures[key] = failures
+                delay = self.retry_delay(failures)
+                logger.warning(
+                    f"Chat message flush failed for conversation {key} (attempt {failures}, "
+                    f"retry in {delay:.0f}s): {e}"
+                )
+                # Retried first at the next flush, ahead of newer messages
+                self._pending[key] = batch + self._pending.get(key, [])
+                self._schedule(key, delay)
+            else:
+                self._failures.pop(key, None)
+        return written
+
+    async def replay(self, older_than=None) -> int:
+        """Write the journaled messages of processes that are gone; returns the number kept"""
+        if older_than is None:
+            older_than = getattr(settings, 'CHAT_MESSAGE_REPLAY_AFTER', DEFAULT_REPLAY_AFTER)
+        try:
+            entries = await self._call_journal(self.journal.entries, older_than)
+            if not entries:
+                return 0
+            messages = [self._deserialize(data) for _, data in entries]
+            return await database_sync_to_async(self._write)(messages)
+        except Exception as e:
+            # Entries stay in the journal for the next replay
+            logger.error(f"Chat message journal replay failed: {e}", exc_info=True)
+            return 0
+
+    def retry_delay(self, failures) -> float:
+        """Delay before retrying a batch, doubled on every failure up to CHAT_MESSAGE_RETRY_MAX_DELAY"""
+        max_delay = getattr(settings, 'CHAT_MESSAGE_RETRY_MAX_DELAY', DEFAULT_RETRY_MAX_DELAY)
+        return min(max(self.interval, 0.1) * 2 ** failures, max_delay)
+
+    def _write(self, batch) -> int:
+        """Insert a batch and clear it from the journal; returns the number of messages kept"""
+        try:
+            self.model.objects.bulk_create(batch, ignore_conflicts=True)
+            kept = len(batch)
+        except IntegrityError:
+            # A bad row must not hold back the others: insert them one by one
+            kept = 0
+            for message in batch:
+                try:
+                    self.model.objects.bulk_create([message], ignore_conflicts=True)
+                    kept += 1
+                except IntegrityError as e:
+                    logger.error(f"Dropping chat message {message.pk} of conversation {message.conversation_id}: {e}")
+
+        try:
+            self.journal.remove([str(message.pk) for message in batch])
+        except Exception as e:
+            # Written already: a later replay only hits the ignored conflicts
+            logger.warning(f"Chat message journal cleanup failed: {e}")
+        return kept
+
+    async def _call_journal(self, method, *args):
+        if self.journal.blocking:
+            return await sync_to_async(method, thread_sensitive=False)(*args)
+        return method(*args)
+
+    def _serialize(self, message) -> dict:
+        return {
+            field.attname: field.value_to_string(message)
+            for field in self.model._meta.concrete_fields
+            if field.value_from_object(message) is not None
+        }
+
+    def _deserialize(self, data):
+        return self.model(**{
+            field.attname: field.to_python(data[field.attname])
+            for field in self.model._meta.concrete_fields
+            if field.attname in data
+        })
+
+    def _schedule(self, key, delay=None):
+        timer = self._timers.get(key)
+        if timer is None or timer.done():
+            self._timers[key] = asyncio.ensure_future(self._flush_later(key, delay))
+
+    async def _flush_later(self, key, delay=None):
+        await asyncio.sleep(self.interval if delay is None else delay)
+        self._timers.pop(key, None)
+        await self.flush(key)
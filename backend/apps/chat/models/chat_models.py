@@ -17,6 +17,12 @@ class ConversationMessage(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a conversation's history
+            models.Index(fields=['conversation', 'created_at', 'id'], name='chat_message_history_idx'),
+        ]
+
 class Call(models.Model):
     CALL_STATUS_CHOICES = [
         ('initiated', 'Initiated'),
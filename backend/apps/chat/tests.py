@@ -1,3 +1,218 @@
-from django.test import TestCase
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from apps.community.models import ChatMessage, Conversation as CommunityConversation, Profile
+
+from .history import InvalidCursor, decode_cursor, history_page
+from .consumers import ChatConsumer
+from .message_buffer import MemoryMessageJournal, MessageWriteBuffer
+from .models.chat_models import Conversation, ConversationMessage
+
+User = get_user_model()
+
+
+class ChatTestMixin:
+
+    def setUp(self):
+        self.alice = User.objects.create_user(
+            username='alice', email='alice@example.com', password='testpass123', is_active=True
+        )
+        self.bob = User.objects.create_user(
+            username='bob', email='bob@example.com', password='testpass123', is_active=True
+        )
+        self.conversation = Conversation.objects.create()
+        self.conversation.users.add(self.alice, self.bob)
+
+    def message(self, body, conversation=None):
+        return ConversationMessage(
+            conversation=conversation or self.conversation, body=body, sent_to=self.bob, created_by=self.alice
+        )
+
+
+class MessageWriteBufferTest(ChatTestMixin, TransactionTestCase):
+    """
+    Tests for the chat write-behind buffer
+
+    database_sync_to_async closes the connection: a TestCase transaction would not survive it.
+    """
+
+    def buffer(self, **kwargs):
+        return MessageWriteBuffer(ConversationMessage, journal=MemoryMessageJournal(), **kwargs)
+
+    def test_flush_at_size(self):
+        other = Conversation.objects.create()
+        buffer = self.buffer(max_size=3, interval=60)
+        for i in range(2):
+            async_to_sync(buffer.add)(self.message(str(i)))
+        async_to_sync(buffer.add)(self.message('other', conversation=other))
+        self.assertFalse(ConversationMessage.objects.exists())
+
+        async_to_sync(buffer.add)(self.message('2'))
+        self.assertEqual(ConversationMessage.objects.filter(conversation=self.conversation).count(), 3)
+        self.assertEqual(buffer.pending(), 1)
+
+        self.assertEqual(async_to_sync(buffer.flush)(), 1)
+        self.assertEqual(buffer.pending(), 0)
+        self.assertEqual(buffer.journal.entries(older_than=0), [])
+
+    def test_failed_flush_is_retried(self):
+        buffer = self.buffer(max_size=10, interval=60)
+        messages = [self.message(str(i)) for i in range(3)]
+        async_to_sync(buffer.add)(messages[0])
+
+        with mock.patch.object(ConversationMessage.objects, 'bulk_create', side_effect=RuntimeError('database is down')):
+            self.assertEqual(async_to_sync(buffer.flush)(), 0)
+        self.assertEqual(buffer.pending(self.conversation.id), 1)
+
+        # The batch was partly written before the failure: the retry does not duplicate it
+        ConversationMessage.objects.bulk_create([messages[0]])
+        async_to_sync(buffer.add)(messages[1])
+        self.assertEqual(async_to_sync(buffer.flush)(), 2)
+        self.assertEqual(ConversationMessage.objects.count(), 2)
+
+    def test_failed_batches_are_never_dropped(self):
+        buffer = self.buffer(max_size=10, interval=1)
+        async_to_sync(buffer.add)(self.message('kept'))
+
+        with mock.patch.object(ConversationMessage.objects, 'bulk_create', side_effect=RuntimeError('database is down')):
+            for _ in range(10):
+                async_to_sync(buffer.flush)()
+        self.assertEqual(buffer.pending(), 1)
+        self.assertEqual(len(buffer.journal.entries(older_than=0)), 1)
+        self.assertEqual(buffer.retry_delay(10), 60)
+
+        self.assertEqual(async_to_sync(buffer.flush)(), 1)
+        self.assertEqual(buffer.journal.entries(older_than=0), [])
+
+    def test_journal_is_replayed_after_a_crash(self):
+        journal = MemoryMessageJournal()
+        crashed = MessageWriteBuffer(ConversationMessage, max_size=10, interval=60, journal=journal)
+        message = self.message('survivor')
+        async_to_sync(crashed.add)(message)
+
+        # A new process only has the journal
+        restarted = MessageWriteBuffer(ConversationMessage, max_size=10, interval=60, journal=journal)
+        self.assertEqual(async_to_sync(restarted.replay)(0), 1)
+        self.assertEqual(ConversationMessage.objects.get().pk, message.pk)
+        self.assertEqual(journal.entries(older_than=0), [])
+
+
+class MessageWriteBufferIntegrityTest(ChatTestMixin, TransactionTestCase):
+    """
+    Rows that cannot be inserted are dropped (foreign keys are checked at commit)
+    """
+
+    def test_bad_row_does_not_block_conversation(self):
+        buffer = MessageWriteBuffer(ConversationMessage, max_size=10, interval=60, journal=MemoryMessageJournal())
+        bad = self.message('bad')
+        bad.sent_to_id = 999999
+        for message in (self.message('before'), bad, self.message('after')):
+            async_to_sync(buffer.add)(message)
+
+        self.assertEqual(async_to_sync(buffer.flush)(), 2)
+        self.assertEqual(buffer.pending(), 0)
+        self.assertEqual(
+            sorted(ConversationMessage.objects.values_list('body', flat=True)), ['after', 'before']
+        )
+
+    def test_consumer_checks_participants(self):
+        consumer = ChatConsumer()
+        consumer.scope = {'user': self.alice}
+        consumer.participants = {}
+        self.assertEqual(async_to_sync(consumer.get_participants)(self.conversation.id), {self.alice.id, self.bob.id})
+        self.assertEqual(async_to_sync(consumer.get_participants)('not-a-uuid'), set())
+
+        consumer.send = mock.AsyncMock()
+        consumer.channel_layer = mock.AsyncMock()
+        consumer.room_group_name = 'chat_test'
+        payload = {'data': {'conversation_id': str(self.conversation.id), 'sent_to_id': 999999, 'name': 'alice', 'body': 'hi'}}
+        with mock.patch('apps.chat.consumers.message_buffer') as buffer:
+            async_to_sync(consumer.receive)(json.dumps(payload))
+        self.assertFalse(buffer.add.called)
+        self.assertFalse(consumer.channel_layer.group_send.called)
+        consumer.send.assert_called_once()
+
+
+class ConversationHistoryTest(ChatTestMixin, TestCase):
+    """
+    Tests for the keyset-paginated history
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.messages = [self.message(str(i)) for i in range(7)]
+        for message in self.messages:
+            message.save()
+
+    def test_pages_cover_history_once(self):
+        queryset = ConversationMessage.objects.filter(conversation=self.conversation)
+        seen, cursor = [], None
+        while True:
+            page = history_page(queryset, 'created_at', cursor, limit=3)
+            seen += page.messages
+            if not page.has_more:
+                break
+            cursor = page.next_cursor
+        self.assertEqual([m.body for m in seen], [str(i) for i in reversed(range(7))])
+
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor')
+
+    def test_history_api(self):
+        self.client.force_login(self.alice)
+        url = f'/chat/api/conversations/{self.conversation.id}/history/'
+        data = self.client.get(url, {'limit': 4}).json()
+        self.assertEqual([m['body'] for m in data['messages']], ['6', '5', '4', '3'])
+        self.assertTrue(data['has_more'])
+
+        data = self.client.get(url, {'limit': 4, 'before': data['next_cursor']}).json()
+        self.assertEqual([m['body'] for m in data['messages']], ['2', '1', '0'])
+        self.assertFalse(data['has_more'])
+
+        self.assertEqual(self.client.get(url, {'before': '!!'}).status_code, 400)
+
+        outsider = User.objects.create_user(
+            username='outsider', email='outsider@example.com', password='testpass123', is_active=True
+        )
+        self.client.force_login(outsider)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class CommunityMessagesApiTest(TestCase):
+    """
+    get_messages returns the whole conversation unless a page is requested
+    """
+
+    def setUp(self):
+        self.alice = User.objects.create_user(
+            username='alice', email='alice@example.com', password='testpass123', is_active=True
+        )
+        self.bob = User.objects.create_user(
+            username='bob', email='bob@example.com', password='testpass123', is_active=True
+        )
+        alice, _ = Profile.objects.get_or_create(user=self.alice)
+        bob, _ = Profile.objects.get_or_create(user=self.bob)
+        self.conversation = CommunityConversation.objects.create()
+        self.conversation.participants.add(alice, bob)
+        for i in range(4):
+            ChatMessage.objects.create(conversation=self.conversation, sender=alice, receiver=bob, message=str(i))
+        self.url = f'/chat/api/conversations/{self.conversation.id}/messages/'
+
+    @override_settings(CHAT_HISTORY_PAGE_SIZE=2)
+    def test_full_history_by_default_and_pages_on_request(self):
+        self.client.force_login(self.alice)
+
+        data = self.client.get(self.url).json()
+        self.assertEqual([m['content'] for m in data['messages']], ['0', '1', '2', '3'])
+        self.assertNotIn('next_cursor', data)
+
+        data = self.client.get(self.url, {'limit': 2}).json()
+        self.assertEqual([m['content'] for m in data['messages']], ['2', '3'])
+        data = self.client.get(self.url, {'before': data['next_cursor']}).json()
+        self.assertEqual([m['content'] for m in data['messages']], ['0', '1'])
+        self.assertFalse(data['has_more'])
 
-# Create your tests here.
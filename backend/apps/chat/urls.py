@@ -12,6 +12,7 @@ urlpatterns = [
     # API endpoints pour le chat frontend
     path('api/conversations/', views.get_conversations, name='api_conversations'),
     path('api/conversations/<int:conversation_id>/messages/', views.get_messages, name='api_messages'),
+    path('api/conversations/<uuid:conversation_id>/history/', api.conversation_history, name='api_conversation_history'),
     path('api/conversations/start/', views.start_conversation, name='api_start_conversation'),
     path('api/users/search/', views.search_users, name='api_search_users'),
     path('api/messages/send/', views.send_message, name='api_send_message'),
@@ -5,6 +5,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth import get_user_model
 from apps.community.models import Conversation, ChatMessage, Profile
+from ..history import InvalidCursor, history_page
 import json
 
 User = get_user_model()
@@ -90,8 +91,20 @@ def get_messages(request, conversation_id):
         profile = Profile.objects.get(user=request.user)
         conversation = Conversation.objects.get(id=conversation_id, participants=profile)
         
-        # Récupérer les messages
-        messages = ChatMessage.objects.filter(conversation=conversation).order_by('timestamp')
+        # Toute la conversation par défaut ; une page par keyset avec ?limit= ou ?before=<curseur>
+        messages = ChatMessage.objects.filter(conversation=conversation).select_related('sender__user')
+        paged = 'limit' in request.GET or 'before' in request.GET
+        if paged:
+            try:
+                page = history_page(messages, 'timestamp', request.GET.get('before'), request.GET.get('limit'))
+            except InvalidCursor:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Invalid cursor'
+                }, status=400)
+            messages = reversed(page.messages)
+        else:
+            messages = messages.order_by('timestamp', 'id')
         
         messages_data = []
         for msg in messages:
@@ -114,10 +127,13 @@ def get_messages(request, conversation_id):
             is_read=False
         ).update(is_read=True)
         
-        return JsonResponse({
+        response = {
             'status': 'success',
-            'messages': messages_data
-        })
+            'messages': messages_data,
+        }
+        if paged:
+            response.update(next_cursor=page.next_cursor, has_more=page.has_more)
+        return JsonResponse(response)
         
     except (Profile.DoesNotExist, Conversation.DoesNotExist):
         return JsonResponse({
@@ -13,6 +13,7 @@ import json
 
 from apps.authentication.models import User
 from .models import Profile, Conversation, ChatMessage, FriendRequest
+from .presence import online_user_ids
 from .serializers import ConversationSerializer, ChatMessageSerializer
 
 
@@ -321,6 +322,8 @@ def get_friend_suggestions(request):
         ).exclude(
             id__in=user_profile.friends.values_list('user_id', flat=True)
         ).select_related('profile')
+        suggestions = list(suggestions)
+        online_ids = online_user_ids(suggested_user.id for suggested_user in suggestions)
         
         suggestions_data = []
         for suggested_user in suggestions:
@@ -343,7 +346,7 @@ def get_friend_suggestions(request):
                 'native_language': suggested_user.get_native_language_display() if hasattr(suggested_user, 'get_native_language_display') else None,
                 'target_language': suggested_user.get_target_language_display() if hasattr(suggested_user, 'get_target_language_display') else None,
                 'bio': suggested_profile.bio,
-                'is_online': suggested_profile.is_online,
+                'is_online': suggested_profile.is_online or suggested_user.id in online_ids,
                 'suggestion_reasons': reasons[:2]  # Limit to 2 main reasons
             })
         
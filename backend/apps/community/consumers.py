@@ -2,6 +2,7 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from apps.authentication.models import User
+from . import presence
 from .models import Profile, ChatMessage, Conversation
 import json
 import logging
@@ -13,24 +14,16 @@ class StatusConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope['user']
         if self.user.is_authenticated:
-            await self.update_user_online_status(True)
+            # Counted in the presence service, written to profiles in batches
+            await presence.user_connected(self.user.id)
             await self.channel_layer.group_add(f'user_status_{self.user.id}', self.channel_name)
         await self.accept()
 
     async def disconnect(self, close_code):
         if self.user.is_authenticated:
-            await self.update_user_online_status(False)
+            await presence.user_disconnected(self.user.id)
             await self.channel_layer.group_discard(f'user_status_{self.user.id}', self.channel_name)
 
-    @database_sync_to_async
-    def update_user_online_status(self, is_online):
-        try:
-            profile, created = Profile.objects.get_or_create(user=self.user)
-            profile.is_online = is_online
-            profile.save()
-        except Exception as e:
-            logger.error(f"Error updating user status: {e}")
-
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -46,6 +39,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def send_notification(self, event):
         await self.send(text_data=json.dumps(event['notification']))
 
+    async def notification_message(self, event):
+        # Messages of NotificationDeliveryService
+        await self.send(text_data=json.dumps(event['notification']))
+
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -144,11 +141,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def save_message(self, message_content):
         try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            sender_profile = Profile.objects.get(user=self.user)
-            
-            # Get the other participant (receiver)
-            receiver_profile = conversation.participants.exclude(id=sender_profile.id).first()
+            # Participants do not change during a connection: looked up once
+            if not hasattr(self, 'participants'):
+                conversation = Conversation.objects.get(id=self.conversation_id)
+                sender_profile = Profile.objects.select_related('user').get(user=self.user)
+                # Get the other participant (receiver)
+                receiver_profile = conversation.participants.exclude(id=sender_profile.id).first()
+                self.participants = (conversation, sender_profile, receiver_profile)
+            conversation, sender_profile, receiver_profile = self.participants
             
             if receiver_profile:
                 message = ChatMessage.objects.create(
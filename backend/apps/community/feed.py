@@ -0,0 +1,316 @@
+"""
+Fil d'activités en fan-out à l'écriture
+
+Quand une activité est créée, son id est poussé dans le fil de chaque profil
+qui suit l'auteur (ceux qui l'ont en ami). Lire une page de fil revient à lire
+une tranche d'ids dans ce fil, sans jointure sur la liste d'amis.
+
+Les auteurs suivis par plus de COMMUNITY_FEED_FANOUT_LIMIT profils ne sont
+pas poussés : leurs activités (``fanned_out=False``) sont lues à la demande
+et fusionnées avec le fil. Les fils sont plafonnés à COMMUNITY_FEED_MAX_LENGTH
+activités et stockés par un backend interchangeable (table ou listes Redis).
+"""
+import os
+from typing import Iterable, List, Sequence, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import ActivityFeed, FeedTimelineEntry, Profile
+
+DEFAULT_BACKEND = 'apps.community.feed.DatabaseFeedBackend'
+DEFAULT_MAX_LENGTH = 500
+DEFAULT_FANOUT_LIMIT = 1000
+
+
+def feed_max_length() -> int:
+    return getattr(settings, 'COMMUNITY_FEED_MAX_LENGTH', DEFAULT_MAX_LENGTH)
+
+
+def feed_fanout_limit() -> int:
+    return getattr(settings, 'COMMUNITY_FEED_FANOUT_LIMIT', DEFAULT_FANOUT_LIMIT)
+
+
+class FeedBackend:
+    """
+    Stockage des fils : pour chaque profil, les ids des activités reçues
+    (avec leur auteur), de la plus récente à la plus ancienne
+    """
+
+    def push(self, activity_id: int, author_id: int, owner_ids: Sequence[int]):
+        """Ajoute une activité en tête du fil de chaque profil"""
+        raise NotImplementedError
+
+    def range(self, owner_id: int, start: int, stop: int) -> List[int]:
+        """Ids des activités ``start`` à ``stop`` (exclu) du fil, plus récentes d'abord"""
+        raise NotImplementedError
+
+    def length(self, owner_id: int) -> int:
+        raise NotImplementedError
+
+    def merge(self, owner_id: int, items: Iterable[Tuple[int, int]]):
+        """Insère à leur place des (activity_id, author_id) dans le fil (nouvel ami)"""
+        raise NotImplementedError
+
+    def remove_author(self, owner_id: int, author_id: int):
+        """Retire du fil les activités d'un auteur (ami retiré)"""
+        raise NotImplementedError
+
+    def load(self, owner_id: int, items: Iterable[Tuple[int, int]]):
+        """Remplace le fil par des (activity_id, author_id), plus récents d'abord"""
+        raise NotImplementedError
+
+    def trim(self) -> int:
+        """Supprime ce qui dépasse la longueur maximale des fils"""
+        return 0
+
+
+class DatabaseFeedBackend(FeedBackend):
+    """
+    Fils stockés dans FeedTimelineEntry, lus par l'index (owner, -activity)
+
+    Les lectures s'arrêtent à la longueur maximale ; les lignes au-delà sont
+    supprimées par ``trim`` (commande trim_feed_timelines) plutôt qu'à chaque
+    écriture, qui coûterait une requête par abonné.
+    """
+
+    def push(self, activity_id, author_id, owner_ids):
+        FeedTimelineEntry.objects.bulk_create(
+            [FeedTimelineEntry(owner_id=owner_id, activity_id=activity_id, author_id=author_id)
+             for owner_id in owner_ids],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+
+    def range(self, owner_id, start, stop):
+        return list(
+            FeedTimelineEntry.objects.filter(owner_id=owner_id)
+            .order_by('-activity_id')
+            .values_list('activity_id', flat=True)[start:stop]
+        )
+
+    def length(self, owner_id):
+        return min(FeedTimelineEntry.objects.filter(owner_id=owner_id).count(), feed_max_length())
+
+    def remove_author(self, owner_id, author_id):
+        FeedTimelineEntry.objects.filter(owner_id=owner_id, author_id=author_id).delete()
+
+    def load(self, owner_id, items):
+        FeedTimelineEntry.objects.filter(owner_id=owner_id).delete()
+        self.merge(owner_id, items)
+
+    def merge(self, owner_id, items):
+        FeedTimelineEntry.objects.bulk_create(
+            [FeedTimelineEntry(owner_id=owner_id, activity_id=activity_id, author_id=author_id)
+             for activity_id, author_id in items],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+
+    def trim(self):
+        max_length = feed_max_length()
+        deleted = 0
+        owners = FeedTimelineEntry.objects.values('owner_id').order_by()
+        for owner_id in owners.distinct().values_list('owner_id', flat=True):
+            # Id de la dernière activité conservée dans ce fil
+            last_kept = self.range(owner_id, max_length - 1, max_length)
+            if last_kept:
+                count, _ = FeedTimelineEntry.objects.filter(
+                    owner_id=owner_id, activity_id__lt=last_kept[0]
+                ).delete()
+                deleted += count
+        return deleted
+
+
+class RedisFeedBackend(FeedBackend):
+    """
+    Fils stockés dans des listes Redis ``"<activity_id>:<author_id>"``,
+    plafonnées par LTRIM à chaque écriture
+    """
+
+    KEY_PREFIX = 'community_feed'
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            url = getattr(settings, 'COMMUNITY_FEED_REDIS_URL', None) or os.environ.get(
+                'REDIS_URL', 'redis://127.0.0.1:6379/0'
+            )
+            self._client = redis.Redis.from_url(url)
+        return self._client
+
+    def _key(self, owner_id):
+        return f"{self.KEY_PREFIX}:{owner_id}"
+
+    def push(self, activity_id, author_id, owner_ids):
+        value = f"{activity_id}:{author_id}"
+        pipe = self.client.pipeline(transaction=False)
+        for owner_id in owner_ids:
+            pipe.lpush(self._key(owner_id), value)
+            pipe.ltrim(self._key(owner_id), 0, feed_max_length() - 1)
+        pipe.execute()
+
+    def range(self, owner_id, start, stop):
+        if stop <= start:
+            return []
+        values = self.client.lrange(self._key(owner_id), start, stop - 1)
+        return [int(value.split(b':', 1)[0]) for value in values]
+
+    def length(self, owner_id):
+        return self.client.llen(self._key(owner_id))
+
+    def merge(self, owner_id, items):
+        current = []
+        for value in self.client.lrange(self._key(owner_id), 0, -1):
+            activity_id, author_id = value.split(b':', 1)
+            current.append((int(activity_id), int(author_id)))
+        self.load(owner_id, sorted(set(current) | set(items), reverse=True))
+
+    def remove_author(self, owner_id, author_id):
+        key = self._key(owner_id)
+        suffix = f":{author_id}".encode()
+        pipe = self.client.pipeline(transaction=False)
+        for value in set(self.client.lrange(key, 0, -1)):
+            if value.endswith(suffix):
+                pipe.lrem(key, 0, value)
+        pipe.execute()
+
+    def load(self, owner_id, items):
+        key = self._key(owner_id)
+        values = [f"{activity_id}:{author_id}" for activity_id, author_id in items][:feed_max_length()]
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        if values:
+            pipe.rpush(key, *values)
+        pipe.execute()
+
+
+_backends = {}
+
+
+def get_feed_backend() -> FeedBackend:
+    """Backend configuré par ``COMMUNITY_FEED_BACKEND`` (base de données par défaut)"""
+    path = getattr(settings, 'COMMUNITY_FEED_BACKEND', DEFAULT_BACKEND)
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+# ---------------------------------------------------------------------------
+# Écriture
+# ---------------------------------------------------------------------------
+
+def fan_out_activity(activity: ActivityFeed):
+    """Pousse une nouvelle activité dans le fil des profils qui suivent son auteur"""
+    limit = feed_fanout_limit()
+    # Profils ayant l'auteur dans leurs amis
+    followers = list(
+        Profile.friends.through.objects.filter(to_profile_id=activity.profile_id)
+        .values_list('from_profile_id', flat=True)[:limit + 1]
+    )
+    if len(followers) > limit:
+        # Auteur très suivi : ses activités seront lues à la demande
+        ActivityFeed.objects.filter(pk=activity.pk).update(fanned_out=False)
+        activity.fanned_out = False
+        return
+    if followers:
+        get_feed_backend().push(activity.id, activity.profile_id, followers)
+
+
+def follow(owner_id: int, author_id: int):
+    """Ajoute au fil les dernières activités d'un nouvel ami"""
+    activities = list(
+        ActivityFeed.objects.filter(profile_id=author_id, fanned_out=True)
+        .order_by('-id').values_list('id', flat=True)[:feed_max_length()]
+    )
+    if activities:
+        get_feed_backend().merge(owner_id, [(activity_id, author_id) for activity_id in activities])
+
+
+def unfollow(owner_id: int, author_id: int):
+    get_feed_backend().remove_author(owner_id, author_id)
+
+
+def rebuild_timelines() -> int:
+    """Recalcule les auteurs très suivis et tous les fils ; renvoie le nombre de fils"""
+    limit = feed_fanout_limit()
+    backend = get_feed_backend()
+
+    Friendship = Profile.friends.through
+    follower_counts = {}
+    for author_id in Friendship.objects.values_list('to_profile_id', flat=True).iterator():
+        follower_counts[author_id] = follower_counts.get(author_id, 0) + 1
+    popular = [author_id for author_id, count in follower_counts.items() if count > limit]
+    ActivityFeed.objects.exclude(profile_id__in=popular).filter(fanned_out=False).update(fanned_out=True)
+    ActivityFeed.objects.filter(profile_id__in=popular, fanned_out=True).update(fanned_out=False)
+
+    rebuilt = 0
+    for owner in Profile.objects.only('id').iterator():
+        items = list(
+            ActivityFeed.objects.filter(
+                profile__in=owner.friends.values('id'), fanned_out=True
+            ).order_by('-id').values_list('id', 'profile_id')[:feed_max_length()]
+        )
+        backend.load(owner.id, items)
+        rebuilt += 1
+    return rebuilt
+
+
+# ---------------------------------------------------------------------------
+# Lecture
+# ---------------------------------------------------------------------------
+
+class Timeline:
+    """
+    Fil d'un profil, découpable comme un queryset (pour Paginator / ListView)
+
+    Une page lit ``offset + limit`` ids dans le fil et dans les activités des
+    auteurs très suivis, les fusionne par id décroissant (ordre de création)
+    et ne charge que les activités de la page.
+    """
+
+    def __init__(self, profile: Profile, backend: FeedBackend = None):
+        self.profile = profile
+        self.backend = backend or get_feed_backend()
+
+    def _pulled(self):
+        return ActivityFeed.objects.filter(
+            profile__in=self.profile.friends.values('id'), fanned_out=False
+        )
+
+    def count(self) -> int:
+        return min(self.backend.length(self.profile.id) + self._pulled().count(), feed_max_length())
+
+    def __len__(self):
+        return self.count()
+
+    def page(self, offset: int, limit: int) -> List[ActivityFeed]:
+        stop = min(offset + limit, feed_max_length())
+        if stop <= offset:
+            return []
+
+        ids = self.backend.range(self.profile.id, 0, stop)
+        ids += list(self._pulled().order_by('-id').values_list('id', flat=True)[:stop])
+        page_ids = sorted(set(ids), reverse=True)[offset:stop]
+
+        activities = ActivityFeed.objects.filter(id__in=page_ids).select_related('profile__user')
+        by_id = {activity.id: activity for activity in activities}
+        # Les activités supprimées entre-temps sont ignorées
+        return [by_id[activity_id] for activity_id in page_ids if activity_id in by_id]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            offset = item.start or 0
+            stop = item.stop if item.stop is not None else feed_max_length()
+            return self.page(offset, stop - offset)
+        page = self.page(item, 1)
+        if not page:
+            raise IndexError(item)
+        return page[0]
+
+    def __iter__(self):
+        return iter(self.page(0, feed_max_length()))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from apps.community.feed import get_feed_backend, rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the activity feed timelines of every community profile'
+
+    def handle(self, *args, **options):
+        backend = get_feed_backend()
+        self.stdout.write(f'Rebuilding activity feeds with {backend.__class__.__name__}...')
+
+        timelines = rebuild_timelines()
+
+        self.stdout.write(self.style.SUCCESS(f'Activity feeds rebuilt: {timelines} timelines'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.community.partners import rebuild_partner_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the language partner index from the learning profiles'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding language partner index...')
+
+        entries = rebuild_partner_index()
+
+        self.stdout.write(self.style.SUCCESS(f'Partner index rebuilt: {entries} profiles'))
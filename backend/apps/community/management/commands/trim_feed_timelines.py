@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.community.feed import feed_max_length, get_feed_backend
+
+
+class Command(BaseCommand):
+    help = 'Delete activity feed entries beyond the maximum timeline length'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Trimming activity feeds to {feed_max_length()} activities...')
+
+        deleted = get_feed_backend().trim()
+
+        self.stdout.write(self.style.SUCCESS(f'Activity feeds trimmed: {deleted} entries deleted'))
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnerIndexEntry',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='partner_index', serialize=False, to='community.profile')),
+                ('native_language', models.CharField(help_text='Langue que le profil peut enseigner', max_length=20)),
+                ('target_language', models.CharField(help_text='Langue que le profil apprend', max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['native_language', 'target_language'], name='community_partner_lang_idx'), models.Index(fields=['target_language'], name='community_partner_target_idx')],
+            },
+        ),
+    ]
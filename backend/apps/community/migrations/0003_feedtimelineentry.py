@@ -0,0 +1,52 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_partnerindexentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedTimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='activityfeed',
+            name='fanned_out',
+            field=models.BooleanField(default=True, help_text='Poussée dans les fils des amis ; sinon lue à la demande (auteurs très suivis)'),
+        ),
+        migrations.AddIndex(
+            model_name='activityfeed',
+            index=models.Index(fields=['profile', 'fanned_out', '-id'], name='community_activity_pull_idx'),
+        ),
+        migrations.AddField(
+            model_name='feedtimelineentry',
+            name='activity',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='community.activityfeed'),
+        ),
+        migrations.AddField(
+            model_name='feedtimelineentry',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='community.profile'),
+        ),
+        migrations.AddField(
+            model_name='feedtimelineentry',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='community.profile'),
+        ),
+        migrations.AddIndex(
+            model_name='feedtimelineentry',
+            index=models.Index(fields=['owner', '-activity'], name='community_timeline_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='feedtimelineentry',
+            unique_together={('owner', 'activity')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0003_feedtimelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='last_seen',
+            field=models.DateTimeField(blank=True, help_text='Dernière connexion ou déconnexion (voir presence.py)', null=True),
+        ),
+    ]
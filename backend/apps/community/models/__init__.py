@@ -19,9 +19,12 @@ from .community_models import (
     UserStatistics,
     Report,
     ActivityFeed,
+    FeedTimelineEntry,
     LanguageExchangeSession,
     StudySession,
     LanguagePartnerMatch,
+    PartnerIndexEntry,
+    compatibility_score,
 )
 
 __all__ = [
@@ -42,7 +45,10 @@ __all__ = [
     'UserStatistics',
     'Report',
     'ActivityFeed',
+    'FeedTimelineEntry',
     'LanguageExchangeSession',
     'StudySession',
     'LanguagePartnerMatch',
+    'PartnerIndexEntry',
+    'compatibility_score',
 ]
\ No newline at end of file
@@ -21,6 +21,7 @@ class Profile(models.Model):
     blocked_users = models.ManyToManyField('self', blank=True, symmetrical=False, related_name='blocked_by')
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True, help_text="Photo de profil")
     is_online = models.BooleanField(default=False, help_text="Statut en ligne de l'utilisateur")
+    last_seen = models.DateTimeField(null=True, blank=True, help_text="Dernière connexion ou déconnexion (voir presence.py)")
 
     def __str__(self):
         return self.user.username
@@ -51,62 +52,30 @@ class Profile(models.Model):
     def suggest_friends(self, limit=10):
         """
         Returns intelligent friend suggestions based on multiple factors:
-        - Language exchange compatibility (native/target language match)
-        - Common friends
-        - Similar learning goals
+        - Language exchange compatibility (native/target language match),
+          read from the language partner index (see partners.py)
         - Activity level
         """
-        from django.db.models import Q, Count, F
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
+        from django.db.models import Q
+        from ..partners import get_learning_languages, top_partners
+        from ..presence import annotate_presence
         
         # Exclude current friends and self
-        excluded_ids = list(self.friends.values_list('id', flat=True)) + [self.id]
+        suggestions = Profile.objects.exclude(id=self.id).exclude(id__in=self.friends.values('id'))
         
-        # Start with all profiles except excluded
-        suggestions = Profile.objects.exclude(id__in=excluded_ids)
-        
-        # Priority 1: Perfect language exchange match
-        # Users whose native language is what I'm learning AND who are learning my native language
-        if hasattr(self.user, 'learning_profile'):
-            user_learning = self.user.learning_profile
-            if user_learning.native_language and user_learning.target_language:
-                perfect_matches = suggestions.filter(
-                    user__learning_profile__native_language=user_learning.target_language,
-                    user__learning_profile__target_language=user_learning.native_language
-                )
-
-                # Priority 2: One-way language match
-                # Users who speak what I'm learning OR are learning what I speak
-                good_matches = suggestions.filter(
-                    Q(user__learning_profile__native_language=user_learning.target_language) |
-                    Q(user__learning_profile__target_language=user_learning.native_language)
-                ).exclude(id__in=perfect_matches.values_list('id', flat=True))
-
-                # Priority 3: Same target language (study buddies)
-                study_buddies = suggestions.filter(
-                    user__learning_profile__target_language=user_learning.target_language
-                ).exclude(
-                    id__in=list(perfect_matches.values_list('id', flat=True)) +
-                    list(good_matches.values_list('id', flat=True))
-                )
-            
-                # Combine with weights
-                from itertools import chain
-                weighted_suggestions = list(chain(
-                perfect_matches[:limit//2],  # Half of suggestions from perfect matches
-                good_matches[:limit//3],      # Third from good matches
-                study_buddies[:limit//6]       # Remaining from study buddies
-            ))
+        languages = get_learning_languages(self.user)
+        if languages:
+            # Best partners first: perfect exchange, one-way match, study buddies...
+            weighted_suggestions = top_partners(self, limit=limit, languages=languages)
             
             # If we still need more suggestions, add random active users
             if len(weighted_suggestions) < limit:
                 remaining = suggestions.exclude(
                     id__in=[p.id for p in weighted_suggestions]
-                ).filter(is_online=True)[:limit - len(weighted_suggestions)]
+                ).filter(is_online=True).select_related('user')[:limit - len(weighted_suggestions)]
                 weighted_suggestions.extend(remaining)
             
-            return weighted_suggestions[:limit]
+            return annotate_presence(weighted_suggestions[:limit])
         
         # Fallback to original logic if user doesn't have language preferences set
         return suggestions.filter(
@@ -176,6 +145,12 @@ class ChatMessage(models.Model):
     is_read = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Pagination de l'historique par (timestamp, id)
+            models.Index(fields=['conversation', 'timestamp', 'id'], name='community_chat_history_idx'),
+        ]
+
     def __str__(self):
         return f"{self.sender.user.username} -> {self.receiver.user.username} ({self.timestamp})"
 
@@ -380,12 +355,35 @@ class ActivityFeed(models.Model):
     ])
     activity_data = models.JSONField()
     created_at = models.DateTimeField(auto_now_add=True)
+    fanned_out = models.BooleanField(
+        default=True,
+        help_text="Poussée dans les fils des amis ; sinon lue à la demande (auteurs très suivis)"
+    )
 
     def __str__(self):
         return f"Activity for {self.profile.user.username} - {self.activity_type}"
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['profile', 'fanned_out', '-id'], name='community_activity_pull_idx'),
+        ]
+
+
+class FeedTimelineEntry(models.Model):
+    """Activité poussée dans le fil d'un profil au moment de son écriture (voir feed.py)"""
+    owner = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='timeline_entries')
+    activity = models.ForeignKey(ActivityFeed, on_delete=models.CASCADE, related_name='timeline_entries')
+    author = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        unique_together = ('owner', 'activity')
+        indexes = [
+            models.Index(fields=['owner', '-activity'], name='community_timeline_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner.user.username} <- activity {self.activity_id}"
 
 
 class LanguageExchangeSession(models.Model):
@@ -496,29 +494,61 @@ class LanguagePartnerMatch(models.Model):
 
     def calculate_compatibility(self):
         """Calculate compatibility score based on language exchange potential"""
-        score = 0
-        
+        score = compatibility_score(
+            self.requester_teaches, self.requester_learns,
+            self.partner_teaches, self.partner_learns
+        )
         # Perfect mutual exchange (both can teach what the other wants to learn)
-        if (self.requester_teaches == self.partner_learns and 
-            self.partner_teaches == self.requester_learns):
-            score = 100
+        if score == MUTUAL_EXCHANGE_SCORE:
             self.is_mutual = True
         
-        # One-way exchange (requester can teach what partner wants to learn)
-        elif self.requester_teaches == self.partner_learns:
-            score = 70
-        
-        # One-way exchange (partner can teach what requester wants to learn)
-        elif self.partner_teaches == self.requester_learns:
-            score = 70
-        
-        # Same target language (can practice together)
-        elif self.requester_learns == self.partner_learns:
-            score = 40
-        
-        # Same native language (can help with culture/advanced topics)
-        elif self.requester_teaches == self.partner_teaches:
-            score = 30
-        
         self.compatibility_score = score
         return score
+
+
+# Règles de compatibilité entre partenaires, de la meilleure à la moins bonne.
+# Chaque règle liste les paires (côté demandeur, côté partenaire) qui doivent
+# être égales ; la première règle satisfaite donne le score.
+MUTUAL_EXCHANGE_SCORE = 100
+COMPATIBILITY_RULES = (
+    # Échange mutuel parfait
+    (MUTUAL_EXCHANGE_SCORE, (('teaches', 'learns'), ('learns', 'teaches'))),
+    # Échange à sens unique (le demandeur enseigne ce que le partenaire apprend)
+    (70, (('teaches', 'learns'),)),
+    # Échange à sens unique (le partenaire enseigne ce que le demandeur apprend)
+    (70, (('learns', 'teaches'),)),
+    # Même langue cible (pratique commune)
+    (40, (('learns', 'learns'),)),
+    # Même langue maternelle (culture, sujets avancés)
+    (30, (('teaches', 'teaches'),)),
+)
+
+
+def compatibility_score(requester_teaches, requester_learns, partner_teaches, partner_learns):
+    """Score (0-100) d'un échange linguistique selon COMPATIBILITY_RULES"""
+    requester = {'teaches': requester_teaches, 'learns': requester_learns}
+    partner = {'teaches': partner_teaches, 'learns': partner_learns}
+    for score, pairs in COMPATIBILITY_RULES:
+        if all(requester[mine] == partner[theirs] for mine, theirs in pairs):
+            return score
+    return 0
+
+
+class PartnerIndexEntry(models.Model):
+    """
+    Index des partenaires linguistiques : langues de chaque profil communautaire,
+    recopiées depuis le profil d'apprentissage et tenues à jour par signaux
+    """
+    profile = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True, related_name='partner_index')
+    native_language = models.CharField(max_length=20, help_text="Langue que le profil peut enseigner")
+    target_language = models.CharField(max_length=20, help_text="Langue que le profil apprend")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['native_language', 'target_language'], name='community_partner_lang_idx'),
+            models.Index(fields=['target_language'], name='community_partner_target_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile.user.username} ({self.native_language}→{self.target_language})"
@@ -0,0 +1,112 @@
+"""
+Index des partenaires linguistiques
+
+Les langues de chaque profil sont recopiées dans PartnerIndexEntry, indexé
+par (native_language, target_language). Les meilleurs partenaires d'un profil
+sortent d'une seule requête sur cet index, notée en SQL avec les mêmes règles
+que LanguagePartnerMatch.calculate_compatibility.
+"""
+from typing import List, Optional
+
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import PartnerIndexEntry, Profile
+from .models.community_models import COMPATIBILITY_RULES
+
+# Champ de l'index correspondant à chaque côté d'une règle
+PARTNER_FIELDS = {'teaches': 'native_language', 'learns': 'target_language'}
+
+
+def get_learning_languages(user):
+    """(langue maternelle, langue cible) du profil d'apprentissage, ou None"""
+    try:
+        learning_profile = user.learning_profile
+    except AttributeError:
+        # Pas de profil d'apprentissage
+        return None
+    if not learning_profile.native_language or not learning_profile.target_language:
+        return None
+    return learning_profile.native_language, learning_profile.target_language
+
+
+def refresh_partner_entry(profile: Profile, languages=None) -> Optional[PartnerIndexEntry]:
+    """Met à jour l'entrée d'index d'un profil (supprimée s'il n'a plus de langues)"""
+    if languages is None:
+        languages = get_learning_languages(profile.user)
+    if languages is None:
+        PartnerIndexEntry.objects.filter(profile=profile).delete()
+        return None
+
+    native_language, target_language = languages
+    entry, _ = PartnerIndexEntry.objects.update_or_create(
+        profile=profile,
+        defaults={'native_language': native_language, 'target_language': target_language}
+    )
+    return entry
+
+
+def rebuild_partner_index(batch_size=1000) -> int:
+    """Reconstruit tout l'index depuis les profils d'apprentissage"""
+    from apps.language_learning.models import UserLearningProfile
+
+    PartnerIndexEntry.objects.all().delete()
+    rows = UserLearningProfile.objects.exclude(native_language='').exclude(target_language='')
+    languages = {
+        user_id: (native, target)
+        for user_id, native, target in rows.values_list('user_id', 'native_language', 'target_language')
+    }
+    entries = [
+        PartnerIndexEntry(profile_id=profile_id, native_language=languages[user_id][0],
+                          target_language=languages[user_id][1])
+        for profile_id, user_id in Profile.objects.filter(user_id__in=languages).values_list('id', 'user_id')
+    ]
+    PartnerIndexEntry.objects.bulk_create(entries, batch_size=batch_size)
+    return len(entries)
+
+
+def compatibility_expression(native_language, target_language):
+    """Score de compatibilité des entrées de l'index avec ces langues, en SQL"""
+    requester = {'teaches': native_language, 'learns': target_language}
+    return Case(
+        *[
+            When(Q(**{PARTNER_FIELDS[theirs]: requester[mine] for mine, theirs in pairs}), then=Value(score))
+            for score, pairs in COMPATIBILITY_RULES
+        ],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def top_partners(profile: Profile, limit=10, languages=None) -> List[Profile]:
+    """
+    Les ``limit`` profils les plus compatibles, hors amis, bloqués et soi-même
+
+    Chaque profil renvoyé porte ``compatibility_score``.
+    """
+    if languages is None:
+        languages = get_learning_languages(profile.user)
+    if languages is None:
+        return []
+    native_language, target_language = languages
+
+    # Seules les entrées partageant une langue obtiennent un score non nul
+    entries = PartnerIndexEntry.objects.filter(
+        Q(native_language__in=[native_language, target_language]) |
+        Q(target_language__in=[native_language, target_language])
+    ).exclude(
+        profile=profile
+    ).exclude(
+        profile__in=profile.friends.values('id')
+    ).exclude(
+        profile__in=profile.blocked_users.values('id')
+    ).annotate(
+        compatibility=compatibility_expression(native_language, target_language)
+    ).filter(
+        compatibility__gt=0
+    ).select_related('profile__user').order_by('-compatibility', '-profile__is_online', '-updated_at')
+
+    partners = []
+    for entry in entries[:limit]:
+        entry.profile.compatibility_score = entry.compatibility
+        partners.append(entry.profile)
+    return partners
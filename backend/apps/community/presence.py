@@ -0,0 +1,258 @@
+"""
+Présence en ligne des utilisateurs
+
+Chaque connexion websocket incrémente un compteur par utilisateur (plusieurs
+onglets ou appareils) et note l'heure de dernière activité. Ces compteurs
+vivent en mémoire ou dans un hash Redis ; les profils ne sont écrits en base
+que par lots, au plus toutes les COMMUNITY_PRESENCE_FLUSH_INTERVAL secondes,
+pour les seuls utilisateurs dont l'état a changé. Une connexion qui clignote
+entre deux flushs ne coûte donc aucune écriture.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'apps.community.presence.MemoryPresenceBackend'
+DEFAULT_FLUSH_INTERVAL = 5
+
+
+class PresenceBackend:
+    """Compteurs de connexions et heures de dernière activité, par utilisateur"""
+
+    # Vue commune à tous les processus (sinon, seulement les connexions locales)
+    shared = False
+    # Appels réseau : exécutés hors de la boucle d'événements
+    blocking = False
+
+    def connect(self, user_id: int) -> int:
+        """Ajoute une connexion ; renvoie le nombre de connexions de l'utilisateur"""
+        raise NotImplementedError
+
+    def disconnect(self, user_id: int) -> int:
+        raise NotImplementedError
+
+    def online(self, user_ids: Iterable[int]) -> Set[int]:
+        """Parmi ces utilisateurs, ceux qui ont au moins une connexion"""
+        raise NotImplementedError
+
+    def drain(self) -> Dict[int, Tuple[bool, float]]:
+        """État (en ligne, dernière activité) des utilisateurs modifiés depuis le dernier appel"""
+        raise NotImplementedError
+
+
+class MemoryPresenceBackend(PresenceBackend):
+    """Présence dans la mémoire du processus (un seul serveur ASGI)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections: Dict[int, int] = {}
+        self._last_seen: Dict[int, float] = {}
+        self._dirty: Set[int] = set()
+
+    def _change(self, user_id, delta):
+        with self._lock:
+            count = max(self._connections.get(user_id, 0) + delta, 0)
+            if count:
+                self._connections[user_id] = count
+            else:
+                self._connections.pop(user_id, None)
+            self._last_seen[user_id] = time.time()
+            self._dirty.add(user_id)
+            return count
+
+    def connect(self, user_id):
+        return self._change(user_id, 1)
+
+    def disconnect(self, user_id):
+        return self._change(user_id, -1)
+
+    def online(self, user_ids):
+        with self._lock:
+            return {user_id for user_id in user_ids if user_id in self._connections}
+
+    def drain(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            changes = {
+                user_id: (user_id in self._connections, self._last_seen[user_id])
+                for user_id in dirty
+            }
+            # Les heures des utilisateurs partis sont désormais en base
+            for user_id, (is_online, _) in changes.items():
+                if not is_online:
+                    del self._last_seen[user_id]
+            return changes
+
+
+class RedisPresenceBackend(PresenceBackend):
+    """Présence partagée entre serveurs : deux hashes Redis et un set des modifiés"""
+
+    KEY_PREFIX = 'community_presence'
+    shared = True
+    blocking = True
+
+    def __init__(self, client=None):
+        self._client = client
+        self.connections_key = f"{self.KEY_PREFIX}:connections"
+        self.last_seen_key = f"{self.KEY_PREFIX}:last_seen"
+        self.dirty_key = f"{self.KEY_PREFIX}:dirty"
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            url = getattr(settings, 'COMMUNITY_PRESENCE_REDIS_URL', None) or os.environ.get(
+                'REDIS_URL', 'redis://127.0.0.1:6379/0'
+            )
+            self._client = redis.Redis.from_url(url)
+        return self._client
+
+    def _change(self, user_id, delta):
+        pipe = self.client.pipeline()
+        pipe.hincrby(self.connections_key, user_id, delta)
+        pipe.hset(self.last_seen_key, user_id, time.time())
+        pipe.sadd(self.dirty_key, user_id)
+        count = pipe.execute()[0]
+        if count <= 0:
+            # Plus de connexion (ou déconnexion sans connexion connue)
+            self.client.hdel(self.connections_key, user_id)
+            count = 0
+        return count
+
+    def connect(self, user_id):
+        return self._change(user_id, 1)
+
+    def disconnect(self, user_id):
+        return self._change(user_id, -1)
+
+    def online(self, user_ids):
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        counts = self.client.hmget(self.connections_key, user_ids)
+        return {user_id for user_id, count in zip(user_ids, counts) if count and int(count) > 0}
+
+    def drain(self):
+        pipe = self.client.pipeline()
+        pipe.smembers(self.dirty_key)
+        pipe.delete(self.dirty_key)
+        dirty = [int(user_id) for user_id in pipe.execute()[0]]
+        if not dirty:
+            return {}
+        pipe = self.client.pipeline()
+        pipe.hmget(self.connections_key, dirty)
+        pipe.hmget(self.last_seen_key, dirty)
+        counts, last_seen = pipe.execute()
+        return {
+            user_id: (bool(count and int(count) > 0), float(seen or time.time()))
+            for user_id, count, seen in zip(dirty, counts, last_seen)
+        }
+
+
+_backends = {}
+
+
+def get_presence_backend() -> PresenceBackend:
+    """Backend configuré par ``COMMUNITY_PRESENCE_BACKEND`` (mémoire par défaut)"""
+    path = getattr(settings, 'COMMUNITY_PRESENCE_BACKEND', DEFAULT_BACKEND)
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def online_user_ids(user_ids: Iterable[int]) -> Set[int]:
+    """Parmi ces utilisateurs, ceux qui sont connectés en ce moment"""
+    return get_presence_backend().online(user_ids)
+
+
+def annotate_presence(profiles):
+    """
+    Met ``is_online`` des profils à jour depuis la présence, en une seule lecture
+
+    Un backend propre au processus ne connaît que ses connexions : l'état
+    écrit en base par les autres processus est alors conservé.
+    """
+    profiles = list(profiles)
+    backend = get_presence_backend()
+    online = backend.online({profile.user_id for profile in profiles})
+    for profile in profiles:
+        if backend.shared:
+            profile.is_online = profile.user_id in online
+        else:
+            profile.is_online = profile.is_online or profile.user_id in online
+    return profiles
+
+
+def flush_presence(backend: Optional[PresenceBackend] = None) -> int:
+    """Écrit en base l'état des utilisateurs modifiés ; renvoie le nombre de profils mis à jour"""
+    changes = (backend or get_presence_backend()).drain()
+    if not changes:
+        return 0
+
+    profiles = list(Profile.objects.filter(user_id__in=changes).only('id', 'user_id'))
+    for profile in profiles:
+        is_online, last_seen = changes[profile.user_id]
+        profile.is_online = is_online
+        profile.last_seen = datetime.fromtimestamp(last_seen, tz=dt_timezone.utc)
+    Profile.objects.bulk_update(profiles, ['is_online', 'last_seen'], batch_size=500)
+    return len(profiles)
+
+
+class PresenceFlusher:
+    """Flush différé : un seul flush planifié à la fois par processus"""
+
+    def __init__(self):
+        self._task = None
+        self._pending = False
+
+    def schedule(self):
+        self._pending = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(getattr(settings, 'COMMUNITY_PRESENCE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+        self._pending = False
+        try:
+            await database_sync_to_async(flush_presence)()
+        except Exception as e:
+            logger.error(f"Presence flush failed: {e}", exc_info=True)
+        finally:
+            # Changements arrivés pendant le flush (après drain) : un autre flush
+            if self._pending:
+                self._task = asyncio.ensure_future(self._flush_later())
+
+
+flusher = PresenceFlusher()
+
+
+async def _change_presence(method: str, user_id: int) -> int:
+    backend = get_presence_backend()
+    change = getattr(backend, method)
+    if backend.blocking:
+        count = await sync_to_async(change, thread_sensitive=False)(user_id)
+    else:
+        count = change(user_id)
+    flusher.schedule()
+    return count
+
+
+async def user_connected(user_id: int) -> int:
+    return await _change_presence('connect', user_id)
+
+
+async def user_disconnected(user_id: int) -> int:
+    return await _change_presence('disconnect', user_id)
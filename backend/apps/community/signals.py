@@ -1,8 +1,10 @@
 # signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import ChatMessage, Notification, Profile
+from . import feed
+from .models import ActivityFeed, ChatMessage, Notification, PartnerIndexEntry, Profile
+from .partners import refresh_partner_entry
 try:
     from app_manager.models import App, UserAppSettings
 except ImportError:
@@ -141,3 +143,74 @@ def update_community_profile_on_user_change(sender, instance, created, **kwargs)
         except Profile.DoesNotExist:
             # Create profile if it doesn't exist
             create_community_profile_and_enable_apps(sender, instance, True, **kwargs)
+
+
+@receiver(post_save, sender=Profile)
+def index_new_profile_languages(sender, instance, created, **kwargs):
+    """
+    Signal to add new community profiles to the language partner index
+    """
+    if created:
+        refresh_partner_entry(instance)
+
+
+@receiver(post_save, sender='language_learning.UserLearningProfile')
+def refresh_partner_index_on_languages_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Signal to keep the language partner index in sync with learning profiles
+    """
+    if update_fields is not None and not {'native_language', 'target_language'} & set(update_fields):
+        return
+
+    profile = Profile.objects.filter(user_id=instance.user_id).first()
+    if profile is None:
+        return
+
+    languages = None
+    if instance.native_language and instance.target_language:
+        languages = (instance.native_language, instance.target_language)
+        # Learning profiles are saved for every lesson or streak update
+        if PartnerIndexEntry.objects.filter(
+            profile=profile, native_language=languages[0], target_language=languages[1]
+        ).exists():
+            return
+    refresh_partner_entry(profile, languages)
+
+
+@receiver(post_delete, sender='language_learning.UserLearningProfile')
+def remove_partner_index_entry(sender, instance, **kwargs):
+    PartnerIndexEntry.objects.filter(profile__user_id=instance.user_id).delete()
+
+
+@receiver(post_save, sender=ActivityFeed)
+def fan_out_new_activity(sender, instance, created, **kwargs):
+    """
+    Signal to push new activities into the feeds of the author's followers
+    """
+    if not created:
+        return
+    try:
+        feed.fan_out_activity(instance)
+    except Exception as e:
+        # Feeds can be rebuilt; a failure must not break the activity
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Feed fan-out failed for activity {instance.id}: {e}", exc_info=True)
+
+
+@receiver(m2m_changed, sender=Profile.friends.through)
+def sync_feed_with_friends(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal to add or remove a friend's activities from the feed
+    """
+    if action == 'post_clear' and not reverse:
+        feed.get_feed_backend().load(instance.id, [])
+        return
+    if action not in ('post_add', 'post_remove'):
+        return
+
+    update = feed.follow if action == 'post_add' else feed.unfollow
+    for pk in pk_set:
+        # Forward: instance added pk to its friends; reverse: pk added instance
+        owner_id, author_id = (pk, instance.id) if reverse else (instance.id, pk)
+        update(owner_id, author_id)
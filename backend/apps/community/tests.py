@@ -1,3 +1,252 @@
-from django.test import TestCase
+from itertools import product
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from apps.language_learning.models import UserLearningProfile
+
+from . import presence
+from .feed import Timeline, get_feed_backend, rebuild_timelines
+from .models import (ActivityFeed, FeedTimelineEntry, LanguagePartnerMatch, PartnerIndexEntry, Profile,
+                     compatibility_score)
+from .partners import compatibility_expression, rebuild_partner_index, top_partners
+
+User = get_user_model()
+
+
+class PartnerIndexTest(TestCase):
+    """
+    Tests for the language partner index
+    """
+
+    def create_member(self, username, native, target):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        learning_profile, _ = UserLearningProfile.objects.get_or_create(user=user)
+        learning_profile.native_language = native
+        learning_profile.target_language = target
+        learning_profile.save()
+        return Profile.objects.get(user=user)
+
+    def setUp(self):
+        self.me = self.create_member('me', 'EN', 'FR')
+        self.mutual = self.create_member('mutual', 'FR', 'EN')
+        self.teacher = self.create_member('teacher', 'FR', 'ES')
+        self.buddy = self.create_member('buddy', 'NL', 'FR')
+        self.stranger = self.create_member('stranger', 'NL', 'ES')
+
+    def test_index_follows_learning_profiles(self):
+        entry = PartnerIndexEntry.objects.get(profile=self.buddy)
+        self.assertEqual((entry.native_language, entry.target_language), ('NL', 'FR'))
+
+        learning_profile = self.buddy.user.learning_profile
+        learning_profile.target_language = 'EN'
+        learning_profile.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.target_language, 'EN')
+
+        learning_profile.delete()
+        self.assertFalse(PartnerIndexEntry.objects.filter(profile=self.buddy).exists())
+
+    def test_top_partners_single_query(self):
+        me = Profile.objects.select_related('user__learning_profile').get(id=self.me.id)
+        with self.assertNumQueries(1):
+            partners = top_partners(me, limit=10)
+        self.assertEqual(partners, [self.mutual, self.teacher, self.buddy])
+        self.assertEqual([p.compatibility_score for p in partners], [100, 70, 40])
+
+    def test_friends_are_excluded(self):
+        self.me.friends.add(self.mutual)
+        self.me.blocked_users.add(self.buddy)
+        self.assertEqual(top_partners(self.me), [self.teacher])
+
+    def test_sql_score_matches_compatibility_rules(self):
+        languages = ['EN', 'FR', 'ES']
+        for native, target in product(languages, repeat=2):
+            scores = dict(
+                PartnerIndexEntry.objects.annotate(
+                    score=compatibility_expression(native, target)
+                ).values_list('profile_id', 'score')
+            )
+            for entry in PartnerIndexEntry.objects.all():
+                match = LanguagePartnerMatch(
+                    requester_teaches=native, requester_learns=target,
+                    partner_teaches=entry.native_language, partner_learns=entry.target_language
+                )
+                self.assertEqual(scores[entry.profile_id], match.calculate_compatibility())
+
+        self.assertEqual(compatibility_score('EN', 'FR', 'FR', 'EN'), 100)
+
+    def test_suggest_friends_and_rebuild(self):
+        self.stranger.is_online = True
+        self.stranger.save()
+        self.assertEqual(self.me.suggest_friends(limit=4), [self.mutual, self.teacher, self.buddy, self.stranger])
+
+        PartnerIndexEntry.objects.all().delete()
+        self.assertEqual(rebuild_partner_index(), 5)
+        self.assertEqual(top_partners(self.me, limit=1), [self.mutual])
+
+
+class ActivityFeedTimelineTest(TestCase):
+    """
+    Tests for the fan-out activity feed
+    """
+
+    def create_profile(self, username):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        return Profile.objects.get(user=user)
+
+    def post(self, profile, text):
+        return ActivityFeed.objects.create(profile=profile, activity_type='post', activity_data={'text': text})
+
+    def setUp(self):
+        self.reader = self.create_profile('reader')
+        self.friend = self.create_profile('friend')
+        self.other = self.create_profile('other')
+        self.reader.friends.add(self.friend)
+
+    def test_activity_is_pushed_to_followers(self):
+        activity = self.post(self.friend, 'hello')
+        self.post(self.other, 'not followed')
+        self.assertEqual(list(Timeline(self.reader)), [activity])
+        self.assertEqual(list(Timeline(self.friend)), [])
+
+    def test_page_reads(self):
+        activities = [self.post(self.friend, str(i)) for i in range(5)]
+        timeline = Timeline(self.reader)
+        self.assertEqual(timeline.count(), 5)
+        with self.assertNumQueries(3):  # timeline ids, pulled ids, page activities
+            page = timeline[1:3]
+        self.assertEqual(page, [activities[3], activities[2]])
+
+    def test_follow_and_unfollow(self):
+        old = self.post(self.other, 'before friendship')
+        self.reader.friends.add(self.other)
+        self.assertEqual(list(Timeline(self.reader)), [old])
+
+        self.reader.friends.remove(self.other)
+        self.assertEqual(list(Timeline(self.reader)), [])
+
+    @override_settings(COMMUNITY_FEED_FANOUT_LIMIT=1)
+    def test_popular_authors_are_pulled(self):
+        self.other.friends.add(self.friend)
+        pushed = self.post(self.other, 'pushed')
+        self.reader.friends.add(self.other)
+        popular = self.post(self.friend, 'popular')
+        popular.refresh_from_db()
+
+        self.assertFalse(popular.fanned_out)
+        self.assertFalse(FeedTimelineEntry.objects.filter(activity=popular).exists())
+        self.assertEqual(list(Timeline(self.reader)), [popular, pushed])
+
+    @override_settings(COMMUNITY_FEED_MAX_LENGTH=3)
+    def test_timelines_are_capped(self):
+        activities = [self.post(self.friend, str(i)) for i in range(5)]
+        self.assertEqual(list(Timeline(self.reader)), activities[:1:-1])
+        self.assertEqual(get_feed_backend().trim(), 2)
+        self.assertEqual(FeedTimelineEntry.objects.filter(owner=self.reader).count(), 3)
+
+    def test_rebuild_and_feed_view(self):
+        activity = self.post(self.friend, 'hello')
+        FeedTimelineEntry.objects.all().delete()
+        rebuild_timelines()
+        self.assertEqual(list(Timeline(self.reader)), [activity])
+
+        self.client.force_login(self.reader.user)
+        response = self.client.get('/community/feed/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['activities']), [activity])
+
+
+class PresenceTest(TestCase):
+    """
+    Tests for the batched presence service
+    """
+
+    def setUp(self):
+        presence._backends.clear()
+        self.backend = presence.get_presence_backend()
+        self.users = [
+            User.objects.create_user(
+                username=f'presence{i}',
+                email=f'presence{i}@example.com',
+                password='testpass123',
+                is_active=True
+            )
+            for i in range(3)
+        ]
+
+    def test_connections_are_counted(self):
+        user_id = self.users[0].id
+        self.assertEqual(self.backend.connect(user_id), 1)
+        self.assertEqual(self.backend.connect(user_id), 2)
+        self.assertEqual(self.backend.disconnect(user_id), 1)
+        self.assertEqual(presence.online_user_ids([u.id for u in self.users]), {user_id})
+        self.assertEqual(self.backend.disconnect(user_id), 0)
+        self.assertEqual(self.backend.disconnect(user_id), 0)
+        self.assertEqual(presence.online_user_ids([user_id]), set())
+
+    def test_flush_writes_final_state_in_one_batch(self):
+        first, second, third = self.users
+        # A flapping connection ends up online
+        for _ in range(10):
+            self.backend.connect(first.id)
+            self.backend.disconnect(first.id)
+        self.backend.connect(first.id)
+        self.backend.connect(second.id)
+        self.backend.disconnect(second.id)
+
+        with self.assertNumQueries(2):  # profiles, bulk update
+            self.assertEqual(presence.flush_presence(), 2)
+
+        profiles = {p.user_id: p for p in Profile.objects.filter(user__in=self.users)}
+        self.assertTrue(profiles[first.id].is_online)
+        self.assertFalse(profiles[second.id].is_online)
+        self.assertIsNotNone(profiles[second.id].last_seen)
+        self.assertIsNone(profiles[third.id].last_seen)
+
+        # Nothing changed since the last flush
+        with self.assertNumQueries(0):
+            self.assertEqual(presence.flush_presence(), 0)
+
+    def test_annotate_presence(self):
+        self.backend.connect(self.users[1].id)
+        profiles = presence.annotate_presence(Profile.objects.filter(user__in=self.users).order_by('user_id'))
+        self.assertEqual([p.is_online for p in profiles], [False, True, False])
+
+    def test_changes_during_a_flush_are_flushed_later(self):
+        user_id = self.users[0].id
+
+        def flush_with_late_change():
+            changes = real_flush()
+            if flush.call_count == 1:
+                # A connection arrives once the backend has been drained
+                self.backend.connect(user_id)
+                presence.flusher.schedule()
+            return changes
+
+        async def run():
+            presence.flusher.schedule()
+            await presence.flusher._task
+            await presence.flusher._task
+
+        real_flush = presence.flush_presence
+        with override_settings(COMMUNITY_PRESENCE_FLUSH_INTERVAL=0), \
+                mock.patch.object(presence, 'database_sync_to_async', side_effect=lambda func: sync_to_async(func)), \
+                mock.patch.object(presence, 'flush_presence', side_effect=flush_with_late_change) as flush:
+            async_to_sync(run)()
+
+        self.assertEqual(flush.call_count, 2)
+        self.assertTrue(Profile.objects.get(user_id=user_id).is_online)
 
-# Create your tests here.
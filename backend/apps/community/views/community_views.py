@@ -9,6 +9,8 @@ from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
 
 from apps.authentication.models import User
+from ..feed import Timeline
+from ..presence import annotate_presence
 from ..models import (Profile, FriendRequest, Post, ActivityFeed, Recommendation,
                      LanguageExchangeSession, StudySession, LanguagePartnerMatch)
 
@@ -127,7 +129,8 @@ class FriendsListView(LoginRequiredMixin, TemplateView):
         # Obtenir ou créer le profil utilisateur
         profile, created = Profile.objects.get_or_create(user=self.request.user)
         
-        friends = profile.friends.all()
+        # Live online status from the presence service
+        friends = annotate_presence(profile.friends.select_related('user'))
         online_friends_count = sum(1 for friend in friends if friend.is_online)
         
         context.update({
@@ -166,12 +169,8 @@ class ActivityFeedView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         profile, created = Profile.objects.get_or_create(user=self.request.user)
         
-        # Activités des amis
-        friends_profiles = profile.friends.all()
-        
-        return ActivityFeed.objects.filter(
-            profile__in=friends_profiles
-        ).select_related('profile__user').order_by('-created_at')
+        # Activités des amis, poussées dans le fil à leur création (voir feed.py)
+        return Timeline(profile)
 
 
 class UserProfileView(LoginRequiredMixin, TemplateView):
@@ -132,20 +132,24 @@ class DocumentVersionAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['document__title', 'created_by__username', 'notes']
     autocomplete_fields = ['document', 'created_by']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'is_snapshot', 'full_content']
     
     fieldsets = (
         ('Version', {
             'fields': ('document', 'version_number', 'notes')
         }),
         ('Contenu', {
-            'fields': ('content',)
+            'fields': ('is_snapshot', 'full_content')
         }),
         ('Métadonnées', {
             'fields': ('created_by', 'created_at'),
             'classes': ('collapse',)
         }),
     )
+    
+    def full_content(self, obj):
+        return obj.get_content()
+    full_content.short_description = 'Contenu de la version'
 
 
 class DocumentCommentReplyInline(admin.TabularInline):
@@ -11,4 +11,9 @@ class DocumentsConfig(AppConfig):
         try:
             import apps.documents.signals
         except ImportError:
-            pass
\ No newline at end of file
+            pass
+        
+        from core.models.search import register_search_model
+        register_search_model(
+            self.get_model('Document'), title_fields=['title'], body_fields=['content', 'tags'], owner_field='owner'
+        )
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Edit sessions: autosave buffering
+
+Autosaved content is kept in the cache per (document, user) instead of being
+written to the document on every call. A draft is written to the document:
+
+- when the user saves explicitly (the submitted content replaces the draft),
+- during an autosave, once the draft has been buffered for
+  DOCUMENTS_DRAFT_FLUSH_INTERVAL seconds (continuous typing),
+- by the flush_document_drafts command (cron) once nothing has been
+  autosaved for DOCUMENTS_DRAFT_IDLE_TIMEOUT seconds.
+
+Flushed drafts create at most one version per DOCUMENTS_VERSION_WINDOW
+seconds for a document. A draft started before another save of the document
+does not overwrite it: it is kept as a version of the document instead.
+
+Drafts must outlive the worker that received them and be visible to the
+flush command, so buffering is only enabled when DOCUMENTS_DRAFT_CACHE is a
+shared backend (Redis, memcached or database cache). Otherwise autosaves are
+written to the document directly.
+"""
+import logging
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+
+from .versioning import record_detached_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 60
+DEFAULT_IDLE_TIMEOUT = 30
+DEFAULT_VERSION_WINDOW = 300
+# Drafts outlive many missed flushes before the cache drops them
+DRAFT_TTL = 24 * 60 * 60
+
+INDEX_KEY = 'documents:drafts'
+INDEX_LOCK_KEY = 'documents:drafts:lock'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_draft_cache():
+    return caches[_setting('DOCUMENTS_DRAFT_CACHE', 'default')]
+
+
+def drafts_enabled() -> bool:
+    """True if the draft cache is shared by all processes (not local memory or dummy)"""
+    cache = get_draft_cache()
+    return (
+        isinstance(cache, (RedisCache, DatabaseCache, BaseMemcachedCache))
+        or type(cache).__module__.startswith('django_redis')
+    )
+
+
+def draft_key(document_id, user_id):
+    return f'documents:draft:{document_id}:{user_id}'
+
+
+def _update_index(change):
+    """Apply ``change`` to the index of pending drafts under a cache lock"""
+    cache = get_draft_cache()
+    for _ in range(100):
+        if cache.add(INDEX_LOCK_KEY, 1, timeout=5):
+            try:
+                index = cache.get(INDEX_KEY) or {}
+                change(index)
+                cache.set(INDEX_KEY, index, None)
+            finally:
+                cache.delete(INDEX_LOCK_KEY)
+            return
+        time.sleep(0.01)
+    logger.warning("Document drafts index is locked, change skipped")
+
+
+def _register(document_id, user_id):
+    _update_index(lambda index: index.__setitem__(draft_key(document_id, user_id), (document_id, user_id)))
+
+
+def _unregister(document_id, user_id):
+    _update_index(lambda index: index.pop(draft_key(document_id, user_id), None))
+
+
+def get_draft(document_id, user_id) -> Optional[dict]:
+    """Buffered draft ({content, base, started_at, updated_at}) or None"""
+    if not drafts_enabled():
+        return None
+    return get_draft_cache().get(draft_key(document_id, user_id))
+
+
+def save_draft(document, user, content, flush=False) -> bool:
+    """
+    Buffer autosaved content; returns True if it was written to the document
+
+    ``flush`` writes it at once (the editor is being closed). Without a
+    shared draft cache the content is always written at once.
+    """
+    if not drafts_enabled():
+        document.content = content
+        document.last_edited_by = user
+        document.save(
+            update_fields=['content', 'last_edited_by', 'updated_at'],
+            version_window=_setting('DOCUMENTS_VERSION_WINDOW', DEFAULT_VERSION_WINDOW)
+        )
+        return True
+
+    cache = get_draft_cache()
+    key = draft_key(document.pk, user.pk)
+    now = time.time()
+
+    draft = cache.get(key)
+    if draft is None:
+        # The draft applies on top of the document as it is now
+        draft = {'started_at': now, 'base': document.updated_at.isoformat()}
+        _register(document.pk, user.pk)
+    draft.update(content=content, updated_at=now)
+    cache.set(key, draft, DRAFT_TTL)
+
+    if flush or now - draft['started_at'] >= _setting('DOCUMENTS_DRAFT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL):
+        return flush_draft(document.pk, user.pk)
+    return False
+
+
+def discard_draft(document_id, user_id):
+    get_draft_cache().delete(draft_key(document_id, user_id))
+    _unregister(document_id, user_id)
+
+
+def flush_draft(document_id, user_id) -> bool:
+    """Write a buffered draft to its document; returns False if there was nothing to write"""
+    from .models import Document
+
+    cache = get_draft_cache()
+    key = draft_key(document_id, user_id)
+    draft = cache.get(key)
+    if draft is None:
+        _unregister(document_id, user_id)
+        return False
+
+    with transaction.atomic():
+        try:
+            document = Document.objects.select_for_update().get(pk=document_id)
+        except Document.DoesNotExist:
+            discard_draft(document_id, user_id)
+            return False
+
+        if document.updated_at.isoformat() != draft['base']:
+            # Someone saved the document after the draft was started
+            record_detached_version(
+                document, draft['content'], created_by_id=user_id, notes='Brouillon en conflit (non appliqué)'
+            )
+            discard_draft(document_id, user_id)
+            logger.info(f"Draft of user {user_id} on document {document_id} conflicted and was kept as a version")
+            return False
+
+        document.content = draft['content']
+        document.last_edited_by_id = user_id
+        document.save(
+            update_fields=['content', 'last_edited_by', 'updated_at'],
+            version_window=_setting('DOCUMENTS_VERSION_WINDOW', DEFAULT_VERSION_WINDOW)
+        )
+
+    current = cache.get(key)
+    if current is not None and current['updated_at'] != draft['updated_at']:
+        # Autosaved again meanwhile: keep the newer content buffered, now on top of this save
+        current.update(started_at=time.time(), base=document.updated_at.isoformat())
+        cache.set(key, current, DRAFT_TTL)
+    else:
+        discard_draft(document_id, user_id)
+    return True
+
+
+def flush_idle_drafts(idle_timeout=None) -> int:
+    """Write the drafts not autosaved for ``idle_timeout`` seconds (0: all); returns the number written"""
+    if not drafts_enabled():
+        return 0
+    if idle_timeout is None:
+        idle_timeout = _setting('DOCUMENTS_DRAFT_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT)
+    cache = get_draft_cache()
+    now = time.time()
+
+    flushed = 0
+    for key, (document_id, user_id) in list((cache.get(INDEX_KEY) or {}).items()):
+        draft = cache.get(key)
+        if draft is None:
+            _unregister(document_id, user_id)
+        elif now - draft['updated_at'] >= idle_timeout:
+            try:
+                flushed += flush_draft(document_id, user_id)
+            except Exception as e:
+                logger.error(f"Error flushing draft of document {document_id}: {e}", exc_info=True)
+    return flushed
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from apps.documents.versioning import compact_histories
+
+
+class Command(BaseCommand):
+    help = 'Re-encode document version histories as periodic snapshots and compressed diffs'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Compacting document version histories...')
+
+        documents, deltas = compact_histories()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Version histories compacted: {documents} documents, {deltas} versions stored as diffs'
+        ))
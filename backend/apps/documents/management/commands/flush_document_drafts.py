@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from apps.documents.drafts import flush_idle_drafts
+
+
+class Command(BaseCommand):
+    help = 'Write idle autosaved drafts to their documents (run every minute from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Write every pending draft, idle or not')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Flushing document drafts...')
+
+        flushed = flush_idle_drafts(0 if options['all'] else None)
+
+        self.stdout.write(self.style.SUCCESS(f'Document drafts flushed: {flushed}'))
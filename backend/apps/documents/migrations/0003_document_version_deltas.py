@@ -0,0 +1,50 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def init_version_counters(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    DocumentVersion = apps.get_model('documents', 'DocumentVersion')
+    last_version = DocumentVersion.objects.filter(document=OuterRef('pk')).order_by().values(
+        'document'
+    ).annotate(last=Max('version_number')).values('last')
+    Document.objects.filter(versions__isnull=False).update(version_counter=Subquery(last_version))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_alter_document_collaborators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='version_counter',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Compteur de versions'),
+        ),
+        migrations.AddField(
+            model_name='documentversion',
+            name='base',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deltas', to='documents.documentversion', verbose_name='Instantané de base'),
+        ),
+        migrations.AddField(
+            model_name='documentversion',
+            name='delta',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Différence compressée'),
+        ),
+        migrations.AddField(
+            model_name='documentversion',
+            name='is_snapshot',
+            field=models.BooleanField(default=True, verbose_name='Instantané complet'),
+        ),
+        migrations.AlterField(
+            model_name='documentversion',
+            name='content',
+            field=models.TextField(blank=True, verbose_name='Contenu de la version'),
+        ),
+        migrations.RunPython(init_version_counters, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.urls import reverse
@@ -139,6 +139,9 @@ class Document(models.Model):
         verbose_name="Tags"
     )
     
+    # Number of the last stored version
+    version_counter = models.PositiveIntegerField(default=0, editable=False, verbose_name="Compteur de versions")
+    
     class Meta:
         verbose_name = "Document"
         verbose_name_plural = "Documents"
@@ -160,18 +163,20 @@ class Document(models.Model):
         return []
         
     def save(self, *args, **kwargs):
-        # Update last_edited_by if content has changed
-        if self.pk:
-            old_doc = Document.objects.get(pk=self.pk)
-            if old_doc.content != self.content:
-                # Create a version snapshot before saving
-                DocumentVersion.objects.create(
-                    document=self,
-                    content=old_doc.content,
-                    version_number=self.versions.count() + 1,
-                    created_by=self.last_edited_by or self.owner
-                )
-        super().save(*args, **kwargs)
+        # At most one version per window of this many seconds (autosave flushes)
+        version_window = kwargs.pop('version_window', None)
+        if not self.pk:
+            return super().save(*args, **kwargs)
+        
+        from ..versioning import record_version
+        
+        with transaction.atomic():
+            # Store the previous content as a version if it has changed
+            version = record_version(self, created_by=self.last_edited_by or self.owner, window=version_window)
+            update_fields = kwargs.get('update_fields')
+            if version and update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'version_counter'}
+            super().save(*args, **kwargs)
 
 
 class DocumentShare(models.Model):
@@ -241,8 +246,19 @@ class DocumentVersion(models.Model):
         related_name='versions',
         verbose_name="Document"
     )
-    content = models.TextField(verbose_name="Contenu de la version")
+    # Full content for snapshots, empty for diffs (see apps.documents.versioning)
+    content = models.TextField(blank=True, verbose_name="Contenu de la version")
     version_number = models.PositiveIntegerField(verbose_name="Numéro de version")
+    is_snapshot = models.BooleanField(default=True, verbose_name="Instantané complet")
+    base = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='deltas',
+        verbose_name="Instantané de base"
+    )
+    delta = models.BinaryField(null=True, blank=True, verbose_name="Différence compressée")
     
     created_by = models.ForeignKey(
         User,
@@ -266,6 +282,15 @@ class DocumentVersion(models.Model):
         
     def __str__(self):
         return f"{self.document.title} - v{self.version_number}"
+        
+    def get_content(self):
+        """Content of this version, rebuilt from its base snapshot if needed"""
+        if self.is_snapshot:
+            return self.content
+        if not hasattr(self, '_content_cache'):
+            from ..versioning import apply_delta
+            self._content_cache = apply_delta(self.base.content, self.delta)
+        return self._content_cache
 
 
 class DocumentComment(models.Model):
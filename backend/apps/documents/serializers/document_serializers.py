@@ -53,6 +53,8 @@ class DocumentListSerializer(serializers.ModelSerializer):
     tags_list = serializers.ReadOnlyField(source='get_tags_list')
     collaborators_count = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
+    # Highlighted excerpt, only on search results
+    search_headline = serializers.CharField(read_only=True)
     
     class Meta:
         model = Document
@@ -60,7 +62,7 @@ class DocumentListSerializer(serializers.ModelSerializer):
             'id', 'title', 'content_type', 'visibility', 'language', 
             'difficulty_level', 'tags_list', 'owner', 'last_edited_by',
             'folder', 'folder_name', 'created_at', 'updated_at',
-            'collaborators_count', 'comments_count'
+            'collaborators_count', 'comments_count', 'search_headline'
         ]
         
     def get_collaborators_count(self, obj):
@@ -204,6 +206,7 @@ class DocumentVersionSerializer(serializers.ModelSerializer):
     """Serializer for document versions"""
     created_by = UserBasicSerializer(read_only=True)
     document_title = serializers.CharField(source='document.title', read_only=True)
+    content = serializers.CharField(source='get_content', read_only=True)
     
     class Meta:
         model = DocumentVersion
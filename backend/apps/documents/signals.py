@@ -1,7 +1,7 @@
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Document, DocumentShare, DocumentComment, DocumentVersion
+from .models import Document, DocumentShare, DocumentComment
 import logging
 
 logger = logging.getLogger(__name__)
@@ -95,39 +95,6 @@ def notify_document_comment(sender, instance, created, **kwargs):
         logger.error(f"Error sending notification for document comment: {e}")
 
 
-@receiver(pre_save, sender=Document)
-def create_document_version(sender, instance, **kwargs):
-    """Create version snapshot before document content changes"""
-    if not instance.pk:  # New document, no version needed
-        return
-        
-    try:
-        # Get the old document content
-        old_document = Document.objects.get(pk=instance.pk)
-        
-        # Check if content has actually changed
-        if old_document.content != instance.content:
-            # Get next version number
-            version_number = instance.versions.count() + 1
-            
-            # Create version snapshot
-            DocumentVersion.objects.create(
-                document=instance,
-                content=old_document.content,
-                version_number=version_number,
-                created_by=instance.last_edited_by or instance.owner,
-                notes=f'Version automatique #{version_number}'
-            )
-            
-            logger.info(f"Created version {version_number} for document: {instance.id}")
-            
-    except Document.DoesNotExist:
-        # Document doesn't exist yet, skip version creation
-        pass
-    except Exception as e:
-        logger.error(f"Error creating document version: {e}")
-
-
 @receiver(post_save, sender=Document)
 def notify_document_updated(sender, instance, created, **kwargs):
     """Notify collaborators when document is updated"""
@@ -201,7 +168,6 @@ def track_document_changes(sender, instance, **kwargs):
     """Track changes to determine if notifications should be sent"""
     if instance.pk:
         try:
-            old_instance = Document.objects.get(pk=instance.pk)
-            instance._old_updated_at = old_instance.updated_at
+            instance._old_updated_at = Document.objects.values_list('updated_at', flat=True).get(pk=instance.pk)
         except Document.DoesNotExist:
             pass
\ No newline at end of file
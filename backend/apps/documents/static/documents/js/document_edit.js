@@ -9,6 +9,7 @@ class DocumentEditor {
         this.currentEditorType = 'html'; // Always HTML/visual mode
         this.autoSaveTimeout = null;
         this.autoSaveInterval = 3000; // 3 seconds
+        this.hasPendingDraft = false; // Autosaved but not yet written to the document
         this.isInitialized = false;
         
         this.init();
@@ -55,6 +56,12 @@ class DocumentEditor {
         
         // Version events
         this.bindVersionEvents();
+        
+        // Write the buffered draft when the editor is left or hidden
+        window.addEventListener('beforeunload', () => this.flushDraft());
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') this.flushDraft();
+        });
     }
     
     bindMetadataEvents() {
@@ -189,6 +196,9 @@ class DocumentEditor {
     
     // Document saving methods
     async saveDocument() {
+        // The explicit save replaces the server-side draft
+        this.clearAutoSaveTimeout();
+        this.hasPendingDraft = false;
         const data = this.getDocumentData();
         return this.submitDocument(data, false);
     }
@@ -198,9 +208,47 @@ class DocumentEditor {
         return this.submitDocument(data, true);
     }
     
+    sendDraft(flush = false) {
+        return fetch(`/documents/api/v1/documents/${this.documentId}/draft/`, {
+            method: 'PUT',
+            keepalive: flush, // Survives the page being closed
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': this.getCsrfToken()
+            },
+            body: JSON.stringify({ content: this.getCurrentContent(), flush: flush })
+        });
+    }
+    
+    flushDraft() {
+        if (!this.documentId || (!this.hasPendingDraft && !this.autoSaveTimeout)) return;
+        
+        this.clearAutoSaveTimeout();
+        this.hasPendingDraft = false;
+        this.sendDraft(true).catch(error => console.error('Draft flush error:', error));
+    }
+    
     async autoSave() {
-        const data = this.getDocumentData();
-        return this.submitDocument(data, true, true);
+        // Buffered server-side, written on explicit save, when idle or when the editor is left
+        if (!this.documentId) return;
+        
+        const indicator = document.getElementById('auto-save-indicator');
+        try {
+            const response = await this.sendDraft();
+            
+            if (response.ok) {
+                const result = await response.json();
+                this.hasPendingDraft = !result.saved;
+                indicator.textContent = 'Sauvegardé automatiquement';
+                indicator.className = 'auto-save-indicator success';
+                setTimeout(() => {
+                    indicator.textContent = '';
+                    indicator.className = 'auto-save-indicator';
+                }, 2000);
+            }
+        } catch (error) {
+            console.error('Auto-save error:', error);
+        }
     }
     
     getDocumentData() {
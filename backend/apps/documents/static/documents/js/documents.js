@@ -455,8 +455,8 @@ class DocumentsApp {
         
         if (!documentId || !content) return;
         
-        fetch(`/documents/api/v1/documents/${documentId}/`, {
-            method: 'PATCH',
+        fetch(`/documents/api/v1/documents/${documentId}/draft/`, {
+            method: 'PUT',
             headers: {
                 'Authorization': `Bearer ${this.getAuthToken()}`,
                 'Content-Type': 'application/json',
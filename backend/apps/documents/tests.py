@@ -1,9 +1,14 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import Document, Folder, DocumentShare, DocumentComment
+from .models import Document, Folder, DocumentShare, DocumentComment, DocumentVersion
+from .drafts import flush_idle_drafts, get_draft, save_draft
+from .versioning import compact_history
 
 User = get_user_model()
 
@@ -362,4 +367,201 @@ class WebViewTest(TestCase):
         
         # Verify document was created
         document = Document.objects.get(title='New Document')
-        self.assertEqual(document.owner, self.user)
\ No newline at end of file
+        self.assertEqual(document.owner, self.user)
+
+
+class DocumentVersionStorageTest(APITestCase):
+    """Test cases for snapshot + diff version storage"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='writer',
+            email='writer@example.com',
+            password='testpass123'
+        )
+        self.document = Document.objects.create(title='Essay', content='', owner=self.user)
+        self.contents = []
+    
+    def write(self, content):
+        """Save new content; self.contents[n - 1] is the content kept by version n"""
+        self.contents.append(self.document.content)
+        self.document.content = content
+        self.document.save()
+    
+    def edit(self, count):
+        """Append a paragraph per save, as autosave would"""
+        for i in range(count):
+            self.write(self.document.content + f'Paragraph {i} with enough words to compress.\n' * 3)
+    
+    @override_settings(DOCUMENTS_VERSION_SNAPSHOT_INTERVAL=4)
+    def test_versions_are_snapshots_and_diffs(self):
+        self.write('Intro line that stays.\n' * 20)
+        self.edit(8)
+        
+        # Saving without a content change stores nothing
+        self.document.title = 'Renamed'
+        self.document.save()
+        
+        versions = list(self.document.versions.select_related('base').order_by('version_number'))
+        self.assertEqual([v.version_number for v in versions], list(range(1, 10)))
+        self.assertEqual(Document.objects.get(pk=self.document.pk).version_counter, 9)
+        self.assertEqual([v.version_number for v in versions if v.is_snapshot], [1, 5, 9])
+        self.assertEqual([v.get_content() for v in versions], self.contents)
+        self.assertTrue(all(v.content == '' and v.base.is_snapshot for v in versions if not v.is_snapshot))
+    
+    def test_compact_existing_history(self):
+        self.write('Intro line that stays.\n' * 20)
+        self.edit(5)
+        # Legacy rows: full copies, no counter
+        DocumentVersion.objects.filter(document=self.document).delete()
+        DocumentVersion.objects.bulk_create([
+            DocumentVersion(document=self.document, content=content, version_number=number)
+            for number, content in enumerate(self.contents[1:], start=1)
+        ])
+        Document.objects.filter(pk=self.document.pk).update(version_counter=0)
+        
+        self.assertEqual(compact_history(self.document), 4)
+        versions = self.document.versions.select_related('base').order_by('version_number')
+        self.assertEqual([v.get_content() for v in versions], self.contents[1:])
+        self.assertEqual(Document.objects.get(pk=self.document.pk).version_counter, 5)
+    
+    def test_retrieve_and_restore(self):
+        self.write('Intro line that stays.\n' * 20)
+        self.edit(3)
+        version = self.document.versions.get(version_number=3)
+        self.assertFalse(version.is_snapshot)
+        
+        self.client.force_authenticate(user=self.user)
+        url = reverse('documents:documentversion-detail', kwargs={'pk': version.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content'], self.contents[2])
+        
+        response = self.client.post(reverse('documents:documentversion-restore', kwargs={'pk': version.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.content, self.contents[2])
+        self.assertEqual(self.document.version_counter, 5)
+
+
+class DocumentDraftTest(APITestCase):
+    """Test cases for autosave buffering"""
+    
+    def setUp(self):
+        cache.clear()
+        # The test cache is process-local; buffering needs a shared one
+        patcher = mock.patch('apps.documents.drafts.drafts_enabled', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            username='typist',
+            email='typist@example.com',
+            password='testpass123'
+        )
+        self.document = Document.objects.create(title='Notes', content='First line\n', owner=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('documents:document-draft', kwargs={'pk': self.document.pk})
+    
+    def test_autosaves_are_buffered(self):
+        with self.assertNumQueries(0):
+            for i in range(5):
+                self.assertFalse(save_draft(self.document, self.user, f'Draft {i}\n'))
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.content, 'First line\n')
+        
+        response = self.client.put(self.url, {'content': 'Typed\n'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(response.data['saved'])
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['content'], 'Typed\n')
+        self.assertTrue(response.data['is_draft'])
+        self.assertEqual(self.client.put(self.url, {'content': 3}, format='json').status_code, 400)
+        
+        # An explicit save replaces the draft
+        detail = reverse('documents:document-detail', kwargs={'pk': self.document.pk})
+        self.client.patch(detail, {'content': 'Saved\n'}, format='json')
+        self.assertIsNone(get_draft(self.document.pk, self.user.pk))
+        self.assertFalse(self.client.get(self.url).data['is_draft'])
+    
+    def test_idle_drafts_are_flushed_once_per_window(self):
+        save_draft(self.document, self.user, 'Second\n')
+        self.assertEqual(flush_idle_drafts(0), 1)
+        self.assertEqual(flush_idle_drafts(0), 0)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.content, 'Second\n')
+        self.assertEqual(self.document.last_edited_by, self.user)
+        
+        save_draft(self.document, self.user, 'Third\n')
+        self.assertEqual(flush_idle_drafts(0), 1)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.content, 'Third\n')
+        # Both flushes fall in the same version window
+        self.assertEqual(self.document.versions.count(), 1)
+    
+    @override_settings(DOCUMENTS_DRAFT_FLUSH_INTERVAL=0)
+    def test_continuous_typing_is_flushed(self):
+        self.assertTrue(save_draft(self.document, self.user, 'Second\n'))
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.content, 'Second\n')
+        self.assertIsNone(get_draft(self.document.pk, self.user.pk))
+    
+    def test_draft_does_not_overwrite_later_save(self):
+        save_draft(self.document, self.user, 'Stale draft\n')
+        editor = User.objects.create_user(username='editor', email='editor@example.com', password='testpass123')
+        document = Document.objects.get(pk=self.document.pk)
+        document.content = 'Saved by someone else\n'
+        document.last_edited_by = editor
+        document.save()
+        
+        self.assertEqual(flush_idle_drafts(0), 0)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.content, 'Saved by someone else\n')
+        self.assertIsNone(get_draft(self.document.pk, self.user.pk))
+        # The draft is not lost: it is kept as a version
+        kept = self.document.versions.order_by('-version_number').first()
+        self.assertEqual(kept.get_content(), 'Stale draft\n')
+        self.assertEqual(kept.created_by, self.user)
+    
+    def test_flush_on_leave(self):
+        response = self.client.put(self.url, {'content': 'Closing\n', 'flush': True}, format='json')
+        self.assertTrue(response.data['saved'])
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.content, 'Closing\n')
+    
+    def test_autosave_without_shared_cache_saves_directly(self):
+        with mock.patch('apps.documents.drafts.drafts_enabled', return_value=False):
+            self.assertTrue(save_draft(self.document, self.user, 'Direct\n'))
+            self.assertIsNone(get_draft(self.document.pk, self.user.pk))
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.content, 'Direct\n')
+
+
+class DocumentSearchTest(APITestCase):
+    """Test cases for full-text document search"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='searcher',
+            email='searcher@example.com',
+            password='testpass123'
+        )
+        self.other = User.objects.create_user(
+            username='stranger',
+            email='stranger@example.com',
+            password='testpass123'
+        )
+        Document.objects.create(title='Subjunctive', content='Il faut que tu viennes.', owner=self.user)
+        Document.objects.create(title='Weekly plan', content='Review the subjunctive mood.', owner=self.user)
+        Document.objects.create(title='Subjunctive notes', content='Private', owner=self.other)
+        self.client.force_authenticate(user=self.user)
+    
+    def test_search_is_ranked_and_highlighted(self):
+        response = self.client.get(reverse('documents:document-list'), {'search': 'subjunct'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([d['title'] for d in results], ['Subjunctive', 'Weekly plan'])
+        self.assertEqual(results[1]['search_headline'], 'Review the <mark>subjunct</mark>ive mood.')
+        
+        results = self.client.get(reverse('documents:document-list')).data
+        results = results['results'] if isinstance(results, dict) else results
+        self.assertNotIn('search_headline', results[0])
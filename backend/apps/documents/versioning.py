@@ -0,0 +1,179 @@
+"""
+Document version storage
+
+A version is either a full snapshot of the content or a zlib-compressed
+line diff against its base snapshot (the latest snapshot before it). Any
+version is rebuilt from at most two rows, whatever the length of the
+history. A new snapshot is taken every DOCUMENTS_VERSION_SNAPSHOT_INTERVAL
+versions, or sooner when the diff is no longer much smaller than the
+content itself.
+
+Version numbers come from Document.version_counter, read with the previous
+content under a row lock, instead of counting the existing versions.
+"""
+import json
+import zlib
+from datetime import timedelta
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULT_SNAPSHOT_INTERVAL = 20
+
+
+def snapshot_interval():
+    return getattr(settings, 'DOCUMENTS_VERSION_SNAPSHOT_INTERVAL', DEFAULT_SNAPSHOT_INTERVAL)
+
+
+def make_delta(base, target):
+    """Compressed diff turning ``base`` into ``target``"""
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops = []
+    matcher = SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            # Lines copied from the base
+            ops.append([i1, i2])
+        elif j2 > j1:
+            # New text
+            ops.append(''.join(target_lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(',', ':')).encode())
+
+
+def apply_delta(base, delta):
+    """Content rebuilt from ``base`` and a diff made by ``make_delta``"""
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in json.loads(zlib.decompress(bytes(delta))):
+        if isinstance(op, list):
+            parts.extend(base_lines[op[0]:op[1]])
+        else:
+            parts.append(op)
+    return ''.join(parts)
+
+
+def build_version(document, content, version_number, base=None, **fields):
+    """
+    Unsaved DocumentVersion holding ``content``
+
+    Stored as a diff against ``base`` (a snapshot version) unless a new
+    snapshot is due.
+    """
+    from .models import DocumentVersion
+
+    if base is not None and version_number - base.version_number < snapshot_interval():
+        delta = make_delta(base.content, content)
+        # A diff that saves little is not worth a reconstruction
+        if len(delta) * 2 < len(content.encode()):
+            return DocumentVersion(
+                document=document, version_number=version_number, is_snapshot=False,
+                base=base, delta=delta, content='', **fields
+            )
+    return DocumentVersion(
+        document=document, version_number=version_number, is_snapshot=True, content=content, **fields
+    )
+
+
+def latest_snapshot(document):
+    return document.versions.filter(is_snapshot=True).order_by('-version_number').first()
+
+
+def record_version(document, created_by=None, notes=None, window=None):
+    """
+    Store the current database content of ``document`` as a new version if
+    the instance's content differs from it
+
+    Must run in the transaction that saves the document: the row stays
+    locked until then. Returns the version, or None if the content did not
+    change or the last version is less than ``window`` seconds old.
+    ``document.version_counter`` is updated but not saved.
+    """
+    from .models import Document
+
+    try:
+        previous = Document.objects.select_for_update().values('content', 'version_counter').get(pk=document.pk)
+    except Document.DoesNotExist:
+        return None
+    if previous['content'] == document.content:
+        return None
+    if window:
+        last_created = document.versions.order_by('-version_number').values_list('created_at', flat=True).first()
+        if last_created and timezone.now() - last_created < timedelta(seconds=window):
+            return None
+
+    version_number = previous['version_counter'] + 1
+    version = build_version(
+        document, previous['content'], version_number, base=latest_snapshot(document),
+        created_by=created_by, notes=notes if notes is not None else f'Version automatique #{version_number}'
+    )
+    version.save()
+    document.version_counter = version_number
+    return version
+
+
+def record_detached_version(document, content, created_by_id=None, notes=None):
+    """
+    Store ``content`` as a new version without changing the document (e.g. a
+    draft that can no longer be applied); the document row must be locked
+    """
+    from .models import Document
+
+    version_number = document.version_counter + 1
+    version = build_version(
+        document, content, version_number, base=latest_snapshot(document),
+        created_by_id=created_by_id, notes=notes
+    )
+    version.save()
+    # update() leaves updated_at alone
+    Document.objects.filter(pk=document.pk).update(version_counter=version_number)
+    document.version_counter = version_number
+    return version
+
+
+def compact_history(document):
+    """
+    Re-encode the versions of a document as snapshots and diffs; returns the
+    number of versions stored as diffs afterwards
+    """
+    from .models import Document, DocumentVersion
+
+    with transaction.atomic():
+        versions = list(
+            document.versions.select_for_update(of=('self',)).select_related('base').order_by('version_number')
+        )
+        # Contents are rebuilt before any row is rewritten
+        contents = [version.get_content() for version in versions]
+
+        base = None
+        rewritten = []
+        for version, content in zip(versions, contents):
+            stored = build_version(document, content, version.version_number, base=base)
+            version.is_snapshot = stored.is_snapshot
+            version.content = stored.content
+            version.delta = stored.delta
+            version.base = stored.base
+            version._content_cache = content
+            if version.is_snapshot:
+                base = version
+            rewritten.append(version)
+        DocumentVersion.objects.bulk_update(rewritten, ['is_snapshot', 'content', 'delta', 'base'], batch_size=100)
+
+        counter = versions[-1].version_number if versions else 0
+        Document.objects.filter(pk=document.pk, version_counter__lt=counter).update(version_counter=counter)
+    return sum(1 for version in rewritten if not version.is_snapshot)
+
+
+def compact_histories(documents=None):
+    """Compact the history of every document (or of a queryset); returns (documents, diffs)"""
+    from .models import Document
+
+    if documents is None:
+        documents = Document.objects.all()
+    compacted = deltas = 0
+    for document in documents.filter(versions__isnull=False).distinct().order_by('id').only('id').iterator():
+        deltas += compact_history(document)
+        compacted += 1
+    return compacted, deltas
@@ -1,3 +1,5 @@
+from datetime import datetime, timezone as dt_timezone
+
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -5,6 +7,8 @@ from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from core.views.search_views import FullTextSearchMixin
+from ..drafts import discard_draft, get_draft, save_draft
 from ..models import Document, DocumentShare, DocumentVersion, Folder, DocumentComment
 from ..serializers import (
     FolderSerializer, DocumentSerializer, DocumentListSerializer,
@@ -126,10 +130,13 @@ class FolderViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
 
 
-class DocumentViewSet(viewsets.ModelViewSet):
+class DocumentViewSet(FullTextSearchMixin, viewsets.ModelViewSet):
     """ViewSet for managing documents with enhanced error handling and logging"""
     
     permission_classes = [permissions.IsAuthenticated]
+    # ?search= goes through the full-text index (FullTextSearchMixin)
+    search_app_name = 'documents'
+    search_model_name = 'Document'
     
     def get_serializer_class(self):
         """Use different serializers for list vs detail views"""
@@ -165,13 +172,8 @@ class DocumentViewSet(viewsets.ModelViewSet):
                         user=user
                     )
                 
-            search = self.request.query_params.get('search')
+            search = self.get_search_query()
             if search:
-                queryset = queryset.filter(
-                    Q(title__icontains=search) | 
-                    Q(content__icontains=search) |
-                    Q(tags__icontains=search)
-                )
                 monitor.add_metric('search_query', search[:50])  # Limit for privacy
                 
             visibility = self.request.query_params.get('visibility')
@@ -263,6 +265,8 @@ class DocumentViewSet(viewsets.ModelViewSet):
         
     def perform_update(self, serializer):
         """Track last editor when updating"""
+        # An explicit save replaces the autosaved draft
+        discard_draft(serializer.instance.pk, self.request.user.pk)
         serializer.save(last_edited_by=self.request.user)
     
     @handle_api_errors
@@ -317,6 +321,38 @@ class DocumentViewSet(viewsets.ModelViewSet):
         
         return super().retrieve(request, *args, **kwargs)
     
+    @handle_api_errors
+    @action(detail=True, methods=['get', 'put', 'delete'])
+    def draft(self, request, pk=None):
+        """Read (GET), autosave (PUT, ``flush`` to write it now) or discard (DELETE) the user's current draft"""
+        document = self.get_object()
+        
+        if request.method == 'GET':
+            validate_document_permission(request.user, document, 'view')
+            draft = get_draft(document.pk, request.user.pk)
+            return Response({
+                'document_id': document.id,
+                'content': draft['content'] if draft else document.content,
+                'is_draft': draft is not None,
+                'updated_at': (
+                    datetime.fromtimestamp(draft['updated_at'], tz=dt_timezone.utc)
+                    if draft else document.updated_at
+                )
+            })
+        
+        validate_document_permission(request.user, document, 'edit')
+        
+        if request.method == 'DELETE':
+            discard_draft(document.pk, request.user.pk)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        
+        content = request.data.get('content')
+        if not isinstance(content, str):
+            raise DocumentValidationError("Draft content is required", field='content', value=type(content).__name__)
+        
+        saved = save_draft(document, request.user, content, flush=bool(request.data.get('flush')))
+        return Response({'document_id': document.id, 'saved': saved}, status=status.HTTP_202_ACCEPTED)
+    
     @action(detail=True, methods=['post'])
     def duplicate(self, request, pk=None):
         """Create a copy of an existing document"""
@@ -583,7 +619,7 @@ class DocumentVersionViewSet(viewsets.ReadOnlyModelViewSet):
                 Q(document__owner=user) |
                 Q(document__shares__user=user)
             ).distinct().select_related(
-                'document', 'created_by'
+                'document', 'created_by', 'base'
             ).order_by('-version_number')
             
             monitor.add_metric('version_count', queryset.count())
@@ -625,7 +661,8 @@ class DocumentVersionViewSet(viewsets.ReadOnlyModelViewSet):
         old_content_length = len(document.content) if document.content else 0
         
         # Restore content
-        document.content = version.content
+        restored_content = version.get_content()
+        document.content = restored_content
         document.last_edited_by = request.user
         document.save()
         
@@ -646,7 +683,7 @@ class DocumentVersionViewSet(viewsets.ReadOnlyModelViewSet):
             details={
                 'restored_version': version.version_number,
                 'version_date': version.created_at.isoformat(),
-                'content_change': len(version.content) - old_content_length,
+                'content_change': len(restored_content) - old_content_length,
                 'restored_by': version.created_by.username if version.created_by else 'unknown'
             }
         )
@@ -6,6 +6,8 @@ from django.contrib import messages
 from django.urls import reverse_lazy
 from django.db.models import Q
 from django.http import JsonResponse, HttpResponseForbidden
+from core.models.search import search_queryset
+from ..drafts import get_draft
 from ..models import Document, Folder, DocumentShare
 from ..serializers import DocumentSerializer
 from ..forms import DocumentForm, FolderForm
@@ -59,10 +61,8 @@ class DocumentListView(DocumentsContextMixin, LoginRequiredMixin, ListView):
             
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(content__icontains=search) |
-                Q(tags__icontains=search)
+            queryset = search_queryset(queryset, search, 'documents', 'Document').order_by(
+                '-search_rank', '-updated_at'
             )
             
         return queryset
@@ -237,6 +237,11 @@ def document_editor(request, pk):
     if not can_edit:
         return HttpResponseForbidden("Vous n'avez pas les droits pour modifier ce document")
     
+    # Reopen on the autosaved draft not yet written to the document
+    draft = get_draft(document.pk, request.user.pk)
+    if draft:
+        document.content = draft['content']
+    
     context = {
         'document': document,
         'can_edit': can_edit,
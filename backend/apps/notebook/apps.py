@@ -9,3 +9,10 @@ class NotebookConfig(AppConfig):
     name = 'apps.notebook'
     label = 'notebook'
     verbose_name = _('Notes')
+
+    def ready(self):
+        from core.models.search import register_search_model
+        register_search_model(
+            self.get_model('Note'), title_fields=['title'],
+            body_fields=['content', 'translation', 'example_sentences', 'related_words']
+        )
@@ -3,7 +3,7 @@
 from django.db import models
 from apps.authentication.models import User
 from django.conf import settings
-from core.models.tags import Tag, get_tags_for_object, add_tag_to_object, remove_tag_from_object
+from core.models.tags import PREFETCHED_TAGS_ATTR, Tag, get_tags_for_object, add_tag_to_object, remove_tag_from_object, set_object_tags
 
 
 def default_list():
@@ -125,25 +125,24 @@ class Note(models.Model):
     @property
     def tags(self):
         """Get tags for this note using the global tag system"""
+        if hasattr(self, PREFETCHED_TAGS_ATTR):
+            return getattr(self, PREFETCHED_TAGS_ATTR)
         return get_tags_for_object('notebook', 'Note', self.id, self.user)
     
     def add_tag(self, tag):
         """Add a tag to this note using the global tag system"""
+        self.__dict__.pop(PREFETCHED_TAGS_ATTR, None)
         return add_tag_to_object(tag, 'notebook', 'Note', self.id, self.user)
     
     def remove_tag(self, tag):
         """Remove a tag from this note using the global tag system"""
+        self.__dict__.pop(PREFETCHED_TAGS_ATTR, None)
         return remove_tag_from_object(tag, 'notebook', 'Note', self.id)
     
     def set_tags(self, tags):
         """Set tags for this note using the global tag system"""
-        # First remove all existing tags
-        current_tags = self.tags
-        for tag in current_tags:
-            self.remove_tag(tag)
-        # Then add new tags
-        for tag in tags:
-            self.add_tag(tag)
+        self.__dict__.pop(PREFETCHED_TAGS_ATTR, None)
+        set_object_tags(tags, 'notebook', 'Note', [self.id], self.user)
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
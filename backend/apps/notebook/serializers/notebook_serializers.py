@@ -4,7 +4,7 @@ from rest_framework import serializers
 from django.utils import timezone
 from ..models import Note, NoteCategory, SharedNote
 from core.models.tags import Tag
-from core.serializers.tag_serializers import TagSerializer
+from core.serializers.tag_serializers import TagSerializer, TaggedObjectSerializerMixin
 
 # TagSerializer is now imported from core.serializers.tag_serializers
 
@@ -70,33 +70,44 @@ class NoteCategorySerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         return NoteCategory.objects.create(user=user, **validated_data)
 
-class NoteListSerializer(serializers.ModelSerializer):
+class NoteListSerializer(TaggedObjectSerializerMixin, serializers.ModelSerializer):
     """Serializer léger pour les listes de notes"""
+    tag_app_name = 'notebook'
+    tag_model_name = 'Note'
+    tag_owner_field = 'user_id'
+    tag_serializer_class = TagSerializer
+
     category_name = serializers.CharField(source='category.name', read_only=True)
-    tags = TagSerializer(many=True, read_only=True)
     is_due_for_review = serializers.SerializerMethodField()
+    # Extrait surligné, seulement dans les résultats de recherche
+    search_headline = serializers.CharField(read_only=True)
 
-    class Meta:
+    class Meta(TaggedObjectSerializerMixin.Meta):
         model = Note
         fields = [
             'id', 'title', 'content', 'category_name', 'tags', 'note_type',
             'is_pinned', 'created_at', 'updated_at', 'is_due_for_review',
-            'language'  # Also add language field
+            'language',  # Also add language field
+            'search_headline'
         ]
 
     def get_is_due_for_review(self, obj):
         # Utiliser la propriété needs_review qui fait le calcul sur place
         return obj.needs_review
 
-class NoteSerializer(serializers.ModelSerializer):
-    tags = TagSerializer(many=True, read_only=True)
+class NoteSerializer(TaggedObjectSerializerMixin, serializers.ModelSerializer):
+    tag_app_name = 'notebook'
+    tag_model_name = 'Note'
+    tag_owner_field = 'user_id'
+    tag_serializer_class = TagSerializer
+
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_path = serializers.SerializerMethodField()
     is_shared = serializers.SerializerMethodField()
     is_due_for_review = serializers.SerializerMethodField()
     time_until_review = serializers.SerializerMethodField()
     
-    class Meta:
+    class Meta(TaggedObjectSerializerMixin.Meta):
         model = Note
         fields = [
             'id', 'title', 'content', 'category', 'category_name',
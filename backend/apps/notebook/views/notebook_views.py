@@ -31,6 +31,8 @@ from ..models import *
 from core.models.tags import Tag
 from ..serializers import *
 from core.serializers.tag_serializers import TagSerializer
+from core.models.search import highlight_objects, search_queryset
+from core.views.search_views import FullTextSearchMixin
 
 
 @method_decorator(login_required, name='dispatch')
@@ -126,18 +128,18 @@ def get_notes(request):
         queryset = queryset.filter(is_archived=False)
     # Si "all", pas de filtre
     
-    # Filtrage par recherche
+    # Filtrage par recherche (index plein texte)
     if search:
-        queryset = queryset.filter(
-            Q(title__icontains=search) | Q(content__icontains=search)
-        )
+        queryset = search_queryset(queryset, search, 'notebook', 'Note')
     
     # Filtrage par langue
     if language:
         queryset = queryset.filter(language=language)
     
-    # Tri
-    if sort == 'updated_desc':
+    # Tri (par pertinence pour une recherche sans tri explicite)
+    if search and 'sort' not in request.GET:
+        queryset = queryset.order_by('-is_pinned', '-search_rank', '-updated_at')
+    elif sort == 'updated_desc':
         queryset = queryset.order_by('-is_pinned', '-updated_at')
     elif sort == 'updated_asc':
         queryset = queryset.order_by('-is_pinned', 'updated_at')
@@ -151,6 +153,8 @@ def get_notes(request):
     # Pagination
     paginator = Paginator(queryset, 50)
     page_obj = paginator.get_page(page)
+    if search:
+        highlight_objects(page_obj, search, 'notebook', 'Note')
     
     # Sérialisation simple des notes
     notes_data = []
@@ -172,6 +176,7 @@ def get_notes(request):
             'created_at': note.created_at.isoformat(),
             'updated_at': note.updated_at.isoformat(),
             'review_count': note.review_count,
+            'search_headline': getattr(note, 'search_headline', None),
         })
     
     return JsonResponse({
@@ -477,9 +482,9 @@ class NoteCategoryViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(category)
         return Response(serializer.data)
 
-class NoteViewSet(viewsets.ModelViewSet):
+class NoteViewSet(FullTextSearchMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     pagination_class = StandardResultsSetPagination  # Revenir à la pagination standard pour s'assurer de la stabilité
     filterset_fields = {
         'category': ['exact', 'isnull'],
@@ -490,10 +495,10 @@ class NoteViewSet(viewsets.ModelViewSet):
         'created_at': ['gte', 'lte'],
         'updated_at': ['gte', 'lte'],
     }
-    search_fields = [
-        'title', 'content',
-        'category__name'
-    ]
+    # ?search= goes through the full-text index (FullTextSearchMixin)
+    search_app_name = 'notebook'
+    search_model_name = 'Note'
+    search_related_fields = ('category__name',)
     # Note: tag search is handled separately through the global tag system
     ordering_fields = [
         'created_at', 'updated_at', 'last_reviewed_at',
@@ -547,17 +552,14 @@ class NoteViewSet(viewsets.ModelViewSet):
             )
             
         # Normal case for list and other actions
-        user_notes = queryset.filter(user_id=user_id)
-        
-        # Only add shared notes for list action
+        # (a single filter rather than union(): search and filters apply after)
         if self.action == 'list':
             shared_notes_ids = SharedNote.objects.filter(
                 shared_with_id=user_id
             ).values_list('note_id', flat=True)
-            shared_notes = queryset.filter(id__in=shared_notes_ids)
-            queryset = user_notes.union(shared_notes)
+            queryset = queryset.filter(Q(user_id=user_id) | Q(id__in=shared_notes_ids))
         else:
-            queryset = user_notes
+            queryset = queryset.filter(user_id=user_id)
 
         # Apply additional filters from query params
         tags = self.request.query_params.getlist('tags')
@@ -585,9 +587,6 @@ class NoteViewSet(viewsets.ModelViewSet):
             from django.utils import timezone
             from datetime import timedelta
             
-            # Filtrer les notes qui n'ont jamais été révisées
-            never_reviewed = queryset.filter(last_reviewed_at__isnull=True)
-            
             # Pour les notes qui ont été révisées, calculer les dates de prochaine révision
             # basées sur leur nombre de révisions
             review_levels = {
@@ -618,7 +617,7 @@ class NoteViewSet(viewsets.ModelViewSet):
                     )
             
             # Combiner avec les notes jamais révisées
-            queryset = never_reviewed.union(queryset.filter(due_reviews_filter))
+            queryset = queryset.filter(Q(last_reviewed_at__isnull=True) | due_reviews_filter)
 
         return queryset
 
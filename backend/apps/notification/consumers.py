@@ -11,6 +11,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from django.conf import settings
 from .models.notification_models import Notification, NotificationSetting, NotificationType
+from .settings_cache import notification_settings_cache
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -196,19 +197,19 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             self.subscriptions = set(NotificationType.values)
             
             # Remove types the user has disabled
-            if not settings.lesson_reminders:
+            if not settings['lesson_reminders']:
                 self.subscriptions.discard(NotificationType.LESSON_REMINDER)
                 
-            if not settings.flashcard_reminders:
+            if not settings['flashcard_reminders']:
                 self.subscriptions.discard(NotificationType.FLASHCARD)
                 
-            if not settings.achievement_notifications:
+            if not settings['achievement_notifications']:
                 self.subscriptions.discard(NotificationType.ACHIEVEMENT)
                 
-            if not settings.streak_notifications:
+            if not settings['streak_notifications']:
                 self.subscriptions.discard(NotificationType.STREAK)
                 
-            if not settings.system_notifications:
+            if not settings['system_notifications']:
                 self.subscriptions.discard(NotificationType.SYSTEM)
                 
             logger.debug(f"Loaded subscriptions for user {self.user.id}: {self.subscriptions}")
@@ -566,14 +567,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def _get_user_notification_settings(self):
         """
-        Get user notification settings
+        Get user notification settings (shared settings cache)
         """
-        try:
-            settings = NotificationSetting.objects.get(user=self.user)
-            return settings
-        except NotificationSetting.DoesNotExist:
-            # Create default settings if they don't exist
-            return NotificationSetting.objects.create(user=self.user)
+        return notification_settings_cache.get(self.user.id)
     
     @database_sync_to_async
     def _update_user_subscription(self, notification_type, subscribed):
@@ -0,0 +1,78 @@
+# backend/apps/notification/delivery_queue.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DELIVERY_WORKERS = 4
+DEFAULT_DELIVERY_MAX_PENDING = 100
+
+
+class DeliveryQueue:
+    """
+    Bounded background queue for slow delivery channels (web push, email)
+
+    At most ``NOTIFICATION_DELIVERY_WORKERS`` jobs run at once and at most
+    ``NOTIFICATION_DELIVERY_MAX_PENDING`` jobs are queued; producers block
+    when the queue is full instead of piling up work in memory.
+    With ``NOTIFICATION_DELIVERY_EAGER = True`` jobs run inline (tests, scripts).
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._executor is None:
+                workers = getattr(settings, 'NOTIFICATION_DELIVERY_WORKERS', DEFAULT_DELIVERY_WORKERS)
+                max_pending = getattr(settings, 'NOTIFICATION_DELIVERY_MAX_PENDING', DEFAULT_DELIVERY_MAX_PENDING)
+                self._slots = threading.BoundedSemaphore(workers + max_pending)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='notification-delivery'
+                )
+
+    def submit(self, func, *args):
+        """
+        Queue ``func(*args)`` once the current transaction commits
+
+        Jobs only receive primary keys, so the rows they load are committed.
+        """
+        transaction.on_commit(lambda: self._submit_now(func, *args))
+
+    def _submit_now(self, func, *args):
+        if getattr(settings, 'NOTIFICATION_DELIVERY_EAGER', False):
+            self._run(func, args)
+            return
+
+        self._ensure_started()
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._run_and_release, func, args)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _run_and_release(self, func, args):
+        try:
+            self._run(func, args)
+        finally:
+            # Worker threads own their DB connections
+            close_old_connections()
+            self._slots.release()
+
+    @staticmethod
+    def _run(func, args):
+        try:
+            func(*args)
+        except Exception as e:
+            logger.error(f"Notification delivery job {getattr(func, '__name__', func)} failed: {str(e)}", exc_info=True)
+
+
+delivery_queue = DeliveryQueue()
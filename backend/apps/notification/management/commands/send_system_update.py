@@ -0,0 +1,27 @@
+"""
+Management command to announce a system update to active users
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.notification.services import NotificationService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Send a system update notification to all active users (one bulk fan-out per language)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('message', help='Update message shown to users')
+        parser.add_argument('--email', help='Only notify the user with this email')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options['email']:
+            users = users.filter(email=options['email'])
+
+        notifications = NotificationService.notify_system_update_bulk(
+            users.only('id', 'interface_language'), options['message']
+        )
+        self.stdout.write(self.style.SUCCESS(f'{len(notifications)} system update notifications sent'))
@@ -0,0 +1,213 @@
+# backend/apps/notification/push_delivery.py
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+# Optional import for web push notifications
+try:
+    from pywebpush import WebPusher
+    from py_vapid import Vapid
+    WEBPUSH_AVAILABLE = True
+except ImportError:
+    WEBPUSH_AVAILABLE = False
+    WebPusher = None
+    Vapid = None
+
+from .models.notification_models import NotificationDevice
+
+logger = logging.getLogger(__name__)
+
+# Default VAPID keys (should be overridden in settings)
+DEFAULT_VAPID_CLAIMS = {
+    "sub": "mailto:info@linguify.com",
+}
+
+DEFAULT_PUSH_WORKERS = 8
+DEFAULT_PUSH_TIMEOUT = 10  # seconds
+DEFAULT_PUSH_TTL = 86400  # 1 day
+
+# VAPID tokens are valid 12 hours; they are re-signed an hour before expiry
+VAPID_TOKEN_LIFETIME = 12 * 60 * 60
+VAPID_TOKEN_REFRESH_MARGIN = 60 * 60
+
+# Push service answers meaning the subscription is gone for good
+EXPIRED_STATUS_CODES = {404, 410}
+
+
+class WebPushEngine:
+    """
+    Web push delivery engine
+
+    - one VAPID signature per push service origin, reused until near expiry;
+    - concurrent sends from a bounded thread pool over a pooled HTTP session;
+    - expired subscriptions (404/410) deactivated with a single UPDATE;
+    - latency stats for every batch (``last_batch_stats``).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_workers = max_workers or getattr(settings, 'PUSH_DELIVERY_WORKERS', DEFAULT_PUSH_WORKERS)
+        self.timeout = timeout or getattr(settings, 'PUSH_DELIVERY_TIMEOUT', DEFAULT_PUSH_TIMEOUT)
+        self.last_batch_stats = None
+        self._vapid = None
+        self._vapid_headers = {}
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def send(self, messages: List[Tuple[NotificationDevice, Dict]]) -> Dict:
+        """
+        Send push payloads to devices
+
+        Args:
+            messages: (device, payload) pairs; payloads are JSON-serialisable dicts
+
+        Returns:
+            Batch stats: counts of sent/failed/expired devices and latencies in ms
+        """
+        started = time.monotonic()
+        stats = {
+            'devices': len(messages),
+            'sent': 0,
+            'failed': 0,
+            'expired': 0,
+            'elapsed_ms': 0.0,
+            'avg_latency_ms': 0.0,
+            'max_latency_ms': 0.0,
+        }
+
+        if not messages:
+            self.last_batch_stats = stats
+            return stats
+
+        if not WEBPUSH_AVAILABLE or not getattr(settings, 'VAPID_PRIVATE_KEY', None):
+            logger.warning("Web push not available (pywebpush not installed or VAPID_PRIVATE_KEY missing)")
+            stats['failed'] = len(messages)
+            self.last_batch_stats = stats
+            return stats
+
+        jobs = []
+        expired_ids = []
+        for device, payload in messages:
+            subscription = self._parse_subscription(device)
+            if subscription is None:
+                logger.warning(f"Device {device.id} has no valid web push subscription")
+                stats['failed'] += 1
+                continue
+            headers = self._get_vapid_headers(subscription['endpoint'])
+            jobs.append((device, subscription, json.dumps(payload), headers))
+
+        executor = self._get_executor()
+        results = list(executor.map(lambda job: self._send_one(*job), jobs))
+
+        latencies = []
+        for device_id, outcome, latency_ms in results:
+            latencies.append(latency_ms)
+            if outcome == 'sent':
+                stats['sent'] += 1
+            elif outcome == 'expired':
+                expired_ids.append(device_id)
+            else:
+                stats['failed'] += 1
+
+        if expired_ids:
+            NotificationDevice.objects.filter(id__in=expired_ids).update(is_active=False)
+            stats['expired'] = len(expired_ids)
+            logger.info(f"Deactivated {len(expired_ids)} expired push devices")
+
+        stats['elapsed_ms'] = (time.monotonic() - started) * 1000
+        if latencies:
+            stats['avg_latency_ms'] = sum(latencies) / len(latencies)
+            stats['max_latency_ms'] = max(latencies)
+
+        self.last_batch_stats = stats
+        logger.debug(f"Push batch stats: {stats}")
+        return stats
+
+    def _send_one(self, device, subscription, data, headers):
+        """
+        Encrypt and send one payload; returns (device_id, outcome, latency_ms)
+        """
+        started = time.monotonic()
+        try:
+            response = WebPusher(subscription, requests_session=self._get_session()).send(
+                data,
+                dict(headers),
+                ttl=getattr(settings, 'PUSH_DELIVERY_TTL', DEFAULT_PUSH_TTL),
+                timeout=self.timeout,
+            )
+            if response.status_code in EXPIRED_STATUS_CODES:
+                outcome = 'expired'
+            elif response.status_code >= 300:
+                logger.error(f"Push notification failed for device {device.id}: {response.status_code}")
+                outcome = 'failed'
+            else:
+                outcome = 'sent'
+        except Exception as e:
+            logger.error(f"Push notification failed for device {device.id}: {str(e)}")
+            outcome = 'failed'
+        return device.id, outcome, (time.monotonic() - started) * 1000
+
+    @staticmethod
+    def _parse_subscription(device: NotificationDevice) -> Optional[Dict]:
+        """
+        Push subscription stored as JSON in ``device_token`` (None if unusable)
+        """
+        try:
+            subscription = json.loads(device.device_token)
+        except (TypeError, ValueError):
+            return None
+        if not subscription.get('endpoint') or not subscription.get('keys'):
+            return None
+        return subscription
+
+    def _get_vapid_headers(self, endpoint: str) -> Dict:
+        """
+        VAPID Authorization header for the endpoint's origin, signed once per origin
+        """
+        url = urlparse(endpoint)
+        origin = f"{url.scheme}://{url.netloc}"
+
+        with self._lock:
+            cached = self._vapid_headers.get(origin)
+            if cached and cached[1] - VAPID_TOKEN_REFRESH_MARGIN > time.time():
+                return cached[0]
+
+            if self._vapid is None:
+                self._vapid = Vapid.from_string(private_key=settings.VAPID_PRIVATE_KEY)
+
+            expires_at = int(time.time()) + VAPID_TOKEN_LIFETIME
+            claims = dict(getattr(settings, 'VAPID_CLAIMS', DEFAULT_VAPID_CLAIMS))
+            claims.update({'aud': origin, 'exp': expires_at})
+            headers = self._vapid.sign(claims)
+            self._vapid_headers[origin] = (headers, expires_at)
+            return headers
+
+    def _get_session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='web-push'
+                )
+            return self._executor
+
+
+push_engine = WebPushEngine()
@@ -1,7 +1,7 @@
 # backend/apps/notification/services.py
-import json
+import asyncio
 import logging
-import time
+from itertools import islice
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime, timedelta
 
@@ -14,30 +14,30 @@ from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.translation import gettext as _, activate, get_language
 
-# Optional import for web push notifications
-try:
-    from pywebpush import webpush, WebPushException
-    WEBPUSH_AVAILABLE = True
-except ImportError:
-    WEBPUSH_AVAILABLE = False
-    webpush = None
-    WebPushException = Exception
-
 from .models.notification_models import Notification, NotificationType, NotificationPriority, NotificationSetting, NotificationDevice
 from .serializers import NotificationSerializer
+from .delivery_queue import delivery_queue
+from .push_delivery import push_engine
+from .settings_cache import notification_settings_cache
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
-# Default VAPID keys (should be overridden in settings)
-DEFAULT_VAPID_CLAIMS = {
-    "sub": "mailto:info@linguify.com",
-}
 
-# Cache of user notification settings (to reduce DB queries)
-_user_notification_settings_cache = {}
-_user_notification_settings_cache_expiry = {}
-SETTINGS_CACHE_TTL = 300  # 5 minutes
+async def _group_send_many(channel_layer, messages, concurrency):
+    """
+    Send (group, message) pairs to the channel layer with bounded concurrency
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(group, message):
+        async with semaphore:
+            try:
+                await channel_layer.group_send(group, message)
+            except Exception as e:
+                logger.error(f"Failed to send WebSocket notification to {group}: {str(e)}")
+
+    await asyncio.gather(*(send(group, message) for group, message in messages))
 
 
 class NotificationDeliveryService:
@@ -45,6 +45,11 @@ class NotificationDeliveryService:
     Service for delivering notifications through various channels
     """
 
+    # Users handled per bulk_create / settings query
+    FANOUT_BATCH_SIZE = 500
+    # Concurrent channel-layer sends per bulk WebSocket delivery
+    WEBSOCKET_SEND_CONCURRENCY = 50
+
     @staticmethod
     def create_and_deliver(
         user: User,
@@ -111,40 +116,106 @@ class NotificationDeliveryService:
             return None
 
     @staticmethod
-    def _get_user_notification_settings(user: User) -> Dict:
+    def create_and_deliver_bulk(
+        users,
+        title: str,
+        message: str,
+        notification_type: NotificationType = NotificationType.INFO,
+        priority: NotificationPriority = NotificationPriority.MEDIUM,
+        data: Optional[Dict] = None,
+        action_url: Optional[str] = None,
+        **kwargs
+    ) -> List[Notification]:
         """
-        Get user notification settings with caching
+        Create the same notification for many users and fan it out
+
+        Notifications are created with bulk_create and WebSocket messages are
+        sent in one batch per chunk of users. Push and email are handed to the
+        background delivery queue.
+
+        Args:
+            users: Users (list or queryset) to send the notification to
+            title: Notification title
+            message: Notification message
+            notification_type: Type of notification
+            priority: Priority level
+            data: Additional data for the notification
+            action_url: URL for action button
+            **kwargs: Additional fields for notification
+
+        Returns:
+            List of created Notification objects
         """
-        # Check cache
-        if user.id in _user_notification_settings_cache:
-            if time.time() < _user_notification_settings_cache_expiry.get(user.id, 0):
-                return _user_notification_settings_cache[user.id]
+        notification_data = dict(data or {})
+        if action_url:
+            notification_data['action_url'] = action_url
+
+        if hasattr(users, 'iterator'):
+            users = users.iterator(chunk_size=NotificationDeliveryService.FANOUT_BATCH_SIZE)
+        users = iter(users)
+
+        created = []
+        while True:
+            batch = list(islice(users, NotificationDeliveryService.FANOUT_BATCH_SIZE))
+            if not batch:
+                break
+
+            try:
+                settings_by_user = NotificationDeliveryService._get_bulk_notification_settings(
+                    [user.id for user in batch]
+                )
+
+                notifications = Notification.objects.bulk_create([
+                    Notification(
+                        user=user,
+                        title=title,
+                        message=message,
+                        type=notification_type,
+                        priority=priority,
+                        data=dict(notification_data),
+                        **kwargs
+                    )
+                    for user in batch
+                ])
 
-        # Load from database
-        try:
-            setting = NotificationSetting.objects.get(user=user)
-            settings = {
-                'push_notifications': setting.push_enabled,
-                'email_notifications': setting.email_enabled,
-                'web_notifications': setting.web_enabled,
-                'quiet_hours_start': setting.quiet_hours_start if setting.quiet_hours_enabled else None,
-                'quiet_hours_end': setting.quiet_hours_end if setting.quiet_hours_enabled else None,
-            }
-        except NotificationSetting.DoesNotExist:
-            # Return default settings
-            settings = {
-                'push_notifications': True,
-                'email_notifications': True,
-                'web_notifications': True,
-                'quiet_hours_start': None,
-                'quiet_hours_end': None,
-            }
+                NotificationDeliveryService._deliver_bulk_via_websocket(notifications)
+
+                push_ids = [
+                    notification.id for notification in notifications
+                    if settings_by_user[notification.user_id].get('push_notifications', False)
+                ]
+                if push_ids:
+                    delivery_queue.submit(NotificationDeliveryService._deliver_push_batch, push_ids)
 
-        # Update cache
-        _user_notification_settings_cache[user.id] = settings
-        _user_notification_settings_cache_expiry[user.id] = time.time() + SETTINGS_CACHE_TTL
+                if priority == NotificationPriority.HIGH:
+                    email_ids = [
+                        notification.id for notification in notifications
+                        if settings_by_user[notification.user_id].get('email_notifications', False)
+                    ]
+                    if email_ids:
+                        delivery_queue.submit(NotificationDeliveryService._deliver_email_batch, email_ids)
 
-        return settings
+                created.extend(notifications)
+
+            except Exception as e:
+                logger.error(f"Failed to create/deliver bulk notifications: {str(e)}", exc_info=True)
+
+        logger.info(f"{len(created)} notifications created and delivered")
+        return created
+
+    @staticmethod
+    def _get_user_notification_settings(user: User) -> Dict:
+        """
+        Get user notification settings with caching
+        """
+        return notification_settings_cache.get(user.id)
+
+    @staticmethod
+    def _get_bulk_notification_settings(user_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Get notification settings for many users with a single query
+        """
+        return notification_settings_cache.get_many(user_ids)
 
     @staticmethod
     def _deliver_via_websocket(notification: Notification):
@@ -157,14 +228,15 @@ class NotificationDeliveryService:
             # Serialize notification
             serializer = NotificationSerializer(notification)
 
-            # Send to user's notification channel
-            async_to_sync(channel_layer.group_send)(
-                f"notifications_{notification.user.id}",
-                {
-                    "type": "notification_message",
-                    "notification": serializer.data
-                }
-            )
+            # Send to every notification channel of the user
+            for group in NotificationDeliveryService._user_group_names(notification.user_id):
+                async_to_sync(channel_layer.group_send)(
+                    group,
+                    {
+                        "type": "notification_message",
+                        "notification": serializer.data
+                    }
+                )
 
             logger.debug(f"WebSocket notification sent to user {notification.user.id}")
 
@@ -172,63 +244,108 @@ class NotificationDeliveryService:
             logger.error(f"Failed to send WebSocket notification: {str(e)}")
 
     @staticmethod
-    def _deliver_via_push(notification: Notification):
+    def _user_group_names(user_id: int) -> List[str]:
         """
-        Deliver notification via web push
+        Channel groups joined by the notification and community NotificationConsumers for a user
         """
-        if not WEBPUSH_AVAILABLE:
-            logger.warning("Web push not available (pywebpush not installed)")
+        return [f"user_{user_id}_notifications", f"notifications_{user_id}"]
+
+    @staticmethod
+    def _deliver_bulk_via_websocket(notifications: List[Notification]):
+        """
+        Deliver many notifications via WebSocket in a single event loop run
+        """
+        if not notifications:
             return
 
         try:
-            # Get user's registered devices
-            devices = NotificationDevice.objects.filter(
-                user=notification.user,
-                is_active=True
+            channel_layer = get_channel_layer()
+            if channel_layer is None:
+                return
+
+            payloads = NotificationSerializer(notifications, many=True).data
+            messages = [
+                (group, {"type": "notification_message", "notification": payload})
+                for notification, payload in zip(notifications, payloads)
+                for group in NotificationDeliveryService._user_group_names(notification.user_id)
+            ]
+
+            async_to_sync(_group_send_many)(
+                channel_layer, messages, NotificationDeliveryService.WEBSOCKET_SEND_CONCURRENCY
             )
 
-            for device in devices:
-                try:
-                    # Prepare push data
-                    push_data = {
-                        'title': notification.title,
-                        'body': notification.message,
-                        'icon': '/static/images/logo.png',
-                        'badge': '/static/images/badge.png',
-                        'url': notification.data.get('action_url') if notification.data else '/',
-                        'tag': f'notification-{notification.id}',
-                        'requireInteraction': notification.priority >= NotificationPriority.HIGH,
-                    }
+            logger.debug(f"WebSocket notifications sent to {len(messages)} users")
 
-                    # Send push notification
-                    webpush(
-                        subscription_info={
-                            'endpoint': device.endpoint,
-                            'keys': {
-                                'p256dh': device.public_key,
-                                'auth': device.auth_key,
-                            }
-                        },
-                        data=json.dumps(push_data),
-                        vapid_private_key=settings.VAPID_PRIVATE_KEY,
-                        vapid_claims=DEFAULT_VAPID_CLAIMS
-                    )
+        except Exception as e:
+            logger.error(f"Failed to send bulk WebSocket notifications: {str(e)}")
 
-                    logger.debug(f"Push notification sent to device {device.id}")
+    @staticmethod
+    def _deliver_push_batch(notification_ids: List):
+        """
+        Background job: deliver already created notifications via web push
+        """
+        notifications = list(Notification.objects.filter(id__in=notification_ids))
+        NotificationDeliveryService._send_push_notifications(notifications)
 
-                except WebPushException as e:
-                    # Handle push errors (e.g., expired subscription)
-                    if e.response and e.response.status_code == 410:
-                        # Subscription expired, deactivate device
-                        device.is_active = False
-                        device.save()
-                        logger.info(f"Deactivated expired device {device.id}")
-                    else:
-                        logger.error(f"Push notification failed: {str(e)}")
+    @staticmethod
+    def _deliver_email_batch(notification_ids: List):
+        """
+        Background job: deliver already created notifications via email
+        """
+        notifications = Notification.objects.filter(id__in=notification_ids).select_related('user')
+        for notification in notifications:
+            NotificationDeliveryService._deliver_via_email(notification)
 
+    @staticmethod
+    def _deliver_via_push(notification: Notification):
+        """
+        Deliver notification via web push
+        """
+        try:
+            NotificationDeliveryService._send_push_notifications([notification])
         except Exception as e:
             logger.error(f"Failed to send push notifications: {str(e)}")
 
+    @staticmethod
+    def _send_push_notifications(notifications: List[Notification]) -> Dict:
+        """
+        Send notifications to all active web devices of their users in one push batch
+
+        Returns:
+            Push batch stats (see WebPushEngine.send)
+        """
+        devices_by_user = {}
+        devices = NotificationDevice.objects.filter(
+            user_id__in={notification.user_id for notification in notifications},
+            device_type='web',
+            is_active=True
+        )
+        for device in devices:
+            devices_by_user.setdefault(device.user_id, []).append(device)
+
+        messages = []
+        for notification in notifications:
+            push_data = NotificationDeliveryService._push_payload(notification)
+            for device in devices_by_user.get(notification.user_id, []):
+                messages.append((device, push_data))
+
+        return push_engine.send(messages)
+
+    @staticmethod
+    def _push_payload(notification: Notification) -> Dict:
+        """
+        Web push payload shown by the service worker
+        """
+        return {
+            'title': notification.title,
+            'body': notification.message,
+            'icon': '/static/images/logo.png',
+            'badge': '/static/images/badge.png',
+            'url': notification.data.get('action_url') if notification.data else '/',
+            'tag': f'notification-{notification.id}',
+            'requireInteraction': notification.priority == NotificationPriority.HIGH,
+        }
+
     @staticmethod
     def _deliver_via_email(notification: Notification):
         """
@@ -492,25 +609,36 @@ class NotificationService:
         """
         Send system update notification with localization
         """
-        current_language = get_language()
+        notifications = NotificationService.notify_system_update_bulk([user], update_info)
+        return notifications[0] if notifications else None
 
-        try:
-            user_language = getattr(user, 'interface_language', 'en')
-            activate(user_language)
+    @staticmethod
+    def notify_system_update_bulk(users, update_info: str) -> List[Notification]:
+        """
+        Send a system update notification to many users, one fan-out per interface language
+        """
+        users_by_language = {}
+        for user in users:
+            users_by_language.setdefault(getattr(user, 'interface_language', 'en'), []).append(user)
 
-            title = _('System Update')
-            message = update_info
+        current_language = get_language()
+        notifications = []
 
-            return NotificationDeliveryService.create_and_deliver(
-                user=user,
-                title=title,
-                message=message,
-                notification_type=NotificationType.SYSTEM,
-                priority=NotificationPriority.LOW
-            )
+        try:
+            for user_language, language_users in users_by_language.items():
+                activate(user_language)
+                notifications.extend(NotificationDeliveryService.create_and_deliver_bulk(
+                    users=language_users,
+                    title=_('System Update'),
+                    message=update_info,
+                    notification_type=NotificationType.SYSTEM,
+                    priority=NotificationPriority.LOW
+                ))
         finally:
             activate(current_language)
 
+        return notifications
+
 
 def send_terms_acceptance_email_and_notification(user):
     """
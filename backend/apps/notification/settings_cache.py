@@ -0,0 +1,176 @@
+# backend/apps/notification/settings_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from .models import NotificationSetting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS_CACHE_TTL = 300  # 5 minutes
+DEFAULT_SETTINGS_CACHE_MAX_ENTRIES = 10000
+
+_MISSING = object()
+
+
+class TTLLRUCache:
+    """
+    Thread-safe in-process cache bounded in size (LRU eviction) and in age (TTL)
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict:
+        """
+        Hit/miss counters and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class NotificationSettingsCache:
+    """
+    Delivery settings of users, shared by every notification delivery path
+
+    Entries are invalidated by NotificationSetting post_save/post_delete
+    signals; the TTL bounds staleness across worker processes.
+    """
+
+    def __init__(self):
+        self._cache = TTLLRUCache(
+            max_entries=getattr(settings, 'NOTIFICATION_SETTINGS_CACHE_MAX_ENTRIES', DEFAULT_SETTINGS_CACHE_MAX_ENTRIES),
+            ttl=getattr(settings, 'NOTIFICATION_SETTINGS_CACHE_TTL', DEFAULT_SETTINGS_CACHE_TTL),
+        )
+
+    def get(self, user_id: int) -> Dict:
+        """
+        Get delivery settings for a user (defaults if the user has none)
+        """
+        return self.get_many([user_id])[user_id]
+
+    def get_many(self, user_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Get delivery settings for many users, loading misses with a single query
+        """
+        from .models.notification_models import NotificationSetting
+
+        result = {}
+        missing = []
+        for user_id in user_ids:
+            cached = self._cache.get(user_id)
+            if cached is None:
+                missing.append(user_id)
+            else:
+                result[user_id] = cached
+
+        if missing:
+            loaded = {
+                setting.user_id: setting
+                for setting in NotificationSetting.objects.filter(user_id__in=missing)
+            }
+            for user_id in missing:
+                user_settings = self.settings_to_dict(loaded.get(user_id))
+                self._cache.set(user_id, user_settings)
+                result[user_id] = user_settings
+
+        return result
+
+    def invalidate(self, user_id: int):
+        self._cache.invalidate(user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        return self._cache.stats()
+
+    @staticmethod
+    def settings_to_dict(setting: Optional['NotificationSetting']) -> Dict:
+        """
+        Delivery settings of a NotificationSetting row (defaults when None)
+        """
+        if setting is None:
+            return {
+                'push_notifications': True,
+                'email_notifications': True,
+                'web_notifications': True,
+                'quiet_hours_start': None,
+                'quiet_hours_end': None,
+                'lesson_reminders': True,
+                'flashcard_reminders': True,
+                'achievement_notifications': True,
+                'streak_notifications': True,
+                'system_notifications': True,
+            }
+        return {
+            'push_notifications': setting.push_enabled,
+            'email_notifications': setting.email_enabled,
+            'web_notifications': setting.web_enabled,
+            'quiet_hours_start': setting.quiet_hours_start if setting.quiet_hours_enabled else None,
+            'quiet_hours_end': setting.quiet_hours_end if setting.quiet_hours_enabled else None,
+            'lesson_reminders': setting.lesson_reminders,
+            'flashcard_reminders': setting.flashcard_reminders,
+            'achievement_notifications': setting.achievement_notifications,
+            'streak_notifications': setting.streak_notifications,
+            'system_notifications': setting.system_notifications,
+        }
+
+
+notification_settings_cache = NotificationSettingsCache()
@@ -56,4 +56,13 @@ def cleanup_user_notifications(sender, instance, **kwargs):
     Supprime toutes les notifications associées à un utilisateur supprimé
     """
     Notification.objects.filter(user=instance).delete()
-    NotificationSetting.objects.filter(user=instance).delete()
\ No newline at end of file
+    NotificationSetting.objects.filter(user=instance).delete()
+
+@receiver(post_save, sender=NotificationSetting)
+@receiver(post_delete, sender=NotificationSetting)
+def invalidate_notification_settings_cache(sender, instance, **kwargs):
+    """
+    Invalide les paramètres de notification en cache quand ils changent
+    """
+    from .settings_cache import notification_settings_cache
+    notification_settings_cache.invalidate(instance.user_id)
@@ -0,0 +1,141 @@
+# backend/apps/notification/tests/test_bulk_delivery.py
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.notification.models import Notification, NotificationPriority, NotificationSetting, NotificationType
+from apps.notification.services import NotificationDeliveryService, NotificationService
+from apps.notification.settings_cache import TTLLRUCache, notification_settings_cache
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATION_DELIVERY_EAGER=True)
+class BulkNotificationDeliveryTest(TestCase):
+    """
+    Tests for NotificationDeliveryService.create_and_deliver_bulk
+    """
+
+    def setUp(self):
+        notification_settings_cache.clear()
+        self.users = [
+            User.objects.create_user(
+                username=f'bulk{i}',
+                email=f'bulk{i}@example.com',
+                password='testpass123',
+                interface_language='fr' if i % 2 else 'en'
+            )
+            for i in range(6)
+        ]
+        NotificationSetting.objects.update_or_create(user=self.users[0], defaults={'push_enabled': False})
+
+    def test_bulk_create_with_bounded_queries(self):
+        """One settings query and one insert per batch, whatever the audience size"""
+        with patch.object(NotificationDeliveryService, '_deliver_bulk_via_websocket') as websocket, \
+                patch.object(NotificationDeliveryService, '_deliver_push_batch') as push:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertNumQueries(2):
+                    notifications = NotificationDeliveryService.create_and_deliver_bulk(
+                        self.users, 'Maintenance', 'Back soon', notification_type=NotificationType.SYSTEM
+                    )
+
+        self.assertEqual(len(notifications), 6)
+        self.assertEqual(Notification.objects.filter(type=NotificationType.SYSTEM).count(), 6)
+        websocket.assert_called_once()
+        push_ids = push.call_args.args[0]
+        self.assertEqual(len(push_ids), 5)
+        self.assertNotIn(notifications[0].id, push_ids)
+
+    def test_websocket_messages_target_consumer_groups(self):
+        """Bulk WebSocket delivery uses the group joined by NotificationConsumer"""
+        notifications = NotificationDeliveryService.create_and_deliver_bulk(
+            self.users[:2], 'Hello', 'World', priority=NotificationPriority.LOW
+        )
+
+        with patch('apps.notification.services._group_send_many') as group_send_many:
+            NotificationDeliveryService._deliver_bulk_via_websocket(notifications)
+
+        messages = group_send_many.call_args.args[1]
+        self.assertEqual(
+            [group for group, _ in messages],
+            [
+                group
+                for user in self.users[:2]
+                for group in (f'user_{user.id}_notifications', f'notifications_{user.id}')
+            ]
+        )
+
+    def test_system_update_bulk_groups_by_language(self):
+        """notify_system_update_bulk fans out once per interface language"""
+        with patch.object(NotificationDeliveryService, 'create_and_deliver_bulk', return_value=[]) as bulk:
+            NotificationService.notify_system_update_bulk(self.users, 'New release')
+
+        self.assertEqual(bulk.call_count, 2)
+        self.assertEqual(sorted(len(call.kwargs['users']) for call in bulk.call_args_list), [3, 3])
+
+    def test_system_update_command_uses_bulk_fanout(self):
+        """send_system_update notifies every active user through the bulk pipeline"""
+        User.objects.filter(pk__in=[user.pk for user in self.users]).update(is_active=True)
+        with patch.object(NotificationDeliveryService, '_deliver_bulk_via_websocket') as websocket:
+            call_command('send_system_update', 'New release', stdout=StringIO())
+
+        self.assertEqual(Notification.objects.filter(type=NotificationType.SYSTEM).count(), 6)
+        self.assertEqual(websocket.call_count, 2)
+
+    def test_single_system_update_uses_bulk_fanout(self):
+        """notify_system_update is the bulk fan-out for one user"""
+        with patch.object(NotificationDeliveryService, '_deliver_bulk_via_websocket'):
+            notification = NotificationService.notify_system_update(self.users[0], 'New release')
+
+        self.assertEqual(notification.user, self.users[0])
+        self.assertEqual(notification.type, NotificationType.SYSTEM)
+
+
+class NotificationSettingsCacheTest(TestCase):
+    """
+    Tests for the shared notification settings cache
+    """
+
+    def setUp(self):
+        notification_settings_cache.clear()
+        self.user = User.objects.create_user(
+            username='cacheuser', email='cacheuser@example.com', password='testpass123'
+        )
+
+    def test_lru_evicts_and_counts(self):
+        """The cache stays bounded and reports hits and misses"""
+        cache = TTLLRUCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        stats = cache.stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_expired_entries_are_reloaded(self):
+        """Entries older than the TTL count as misses"""
+        cache = TTLLRUCache(max_entries=10, ttl=0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_setting_change_invalidates_cache(self):
+        """Saving NotificationSetting is visible to the next delivery"""
+        NotificationSetting.objects.update_or_create(user=self.user, defaults={'push_enabled': True})
+        self.assertTrue(notification_settings_cache.get(self.user.id)['push_notifications'])
+
+        with self.assertNumQueries(0):
+            notification_settings_cache.get(self.user.id)
+
+        setting = NotificationSetting.objects.get(user=self.user)
+        setting.push_enabled = False
+        setting.save()
+
+        self.assertFalse(NotificationDeliveryService._get_user_notification_settings(self.user)['push_notifications'])
@@ -0,0 +1,129 @@
+# backend/apps/notification/tests/test_push_delivery.py
+import base64
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from apps.notification.models import NotificationDevice
+from apps.notification.push_delivery import WebPushEngine
+
+User = get_user_model()
+
+
+def _b64url(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def _vapid_private_key():
+    key = ec.generate_private_key(ec.SECP256R1())
+    return _b64url(key.private_numbers().private_value.to_bytes(32, 'big'))
+
+
+def _subscription(endpoint):
+    client_key = ec.generate_private_key(ec.SECP256R1())
+    public_key = client_key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    return json.dumps({
+        'endpoint': endpoint,
+        'keys': {'p256dh': _b64url(public_key), 'auth': _b64url(os.urandom(16))},
+    })
+
+
+class _StubPushService(BaseHTTPRequestHandler):
+    """
+    Local push service: /gone/* answers 410, everything else 201
+    """
+    requests = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.requests.append((self.path, self.headers.get('Authorization'), body))
+        self.send_response(410 if self.path.startswith('/gone/') else 201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(VAPID_PRIVATE_KEY=_vapid_private_key())
+class WebPushEngineTest(TestCase):
+    """
+    Tests for WebPushEngine against a local stub push service
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubPushService)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        _StubPushService.requests = []
+        self.user = User.objects.create_user(
+            username='pushuser', email='pushuser@example.com', password='testpass123'
+        )
+        self.devices = [
+            NotificationDevice.objects.create(
+                user=self.user,
+                device_type='web',
+                device_token=_subscription(f'{self.base_url}/{path}/{i}')
+            )
+            for i, path in enumerate(['live', 'live', 'gone', 'live'])
+        ]
+
+    def test_sends_concurrently_and_deactivates_expired_devices(self):
+        """Every device gets the payload; 410 devices are deactivated in bulk"""
+        engine = WebPushEngine(max_workers=4)
+        payload = {'title': 'Hello', 'body': 'World'}
+
+        with self.assertNumQueries(1):
+            stats = engine.send([(device, payload) for device in self.devices])
+
+        self.assertEqual(stats['devices'], 4)
+        self.assertEqual(stats['sent'], 3)
+        self.assertEqual(stats['expired'], 1)
+        self.assertEqual(stats['failed'], 0)
+        self.assertGreater(stats['max_latency_ms'], 0)
+        self.assertEqual(engine.last_batch_stats, stats)
+        self.assertEqual(len(_StubPushService.requests), 4)
+
+        self.devices[2].refresh_from_db()
+        self.assertFalse(self.devices[2].is_active)
+
+    def test_vapid_header_is_signed_once_per_origin(self):
+        """Devices on the same push service share one VAPID signature"""
+        engine = WebPushEngine(max_workers=2)
+        engine.send([(device, {'title': 't'}) for device in self.devices])
+        engine.send([(self.devices[0], {'title': 't'})])
+
+        authorizations = {authorization for _, authorization, _ in _StubPushService.requests}
+        self.assertEqual(len(authorizations), 1)
+        self.assertEqual(len(engine._vapid_headers), 1)
+
+    def test_invalid_subscription_is_skipped(self):
+        """A device without a web push subscription is counted as failed, not deactivated"""
+        device = NotificationDevice.objects.create(
+            user=self.user, device_type='web', device_token='not-a-subscription'
+        )
+
+        stats = WebPushEngine().send([(device, {'title': 't'})])
+
+        self.assertEqual(stats['failed'], 1)
+        device.refresh_from_db()
+        self.assertTrue(device.is_active)
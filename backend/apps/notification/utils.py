@@ -8,6 +8,8 @@ import json
 
 from .models.notification_models import Notification, NotificationType, NotificationPriority, NotificationSetting
 from .serializers import NotificationSerializer
+from .settings_cache import notification_settings_cache
+from .services import NotificationDeliveryService
 
 User = get_user_model()
 
@@ -44,48 +46,34 @@ class NotificationManager:
             The created Notification instance
         """
         # Check if user has disabled this type of notification
-        try:
-            settings = NotificationSetting.objects.get(user=user)
+        settings = notification_settings_cache.get(user.id)
+        if not NotificationManager._is_type_enabled(settings, notification_type):
+            return None
+        
+        # Check quiet hours if enabled
+        if settings['quiet_hours_start'] is not None and settings['quiet_hours_end'] is not None:
+            now = timezone.localtime()
+            start_time = now.replace(
+                hour=int(settings['quiet_hours_start'].hour),
+                minute=int(settings['quiet_hours_start'].minute),
+                second=0
+            )
+            end_time = now.replace(
+                hour=int(settings['quiet_hours_end'].hour),
+                minute=int(settings['quiet_hours_end'].minute),
+                second=0
+            )
             
-            # Check if notification is disabled based on type
-            if notification_type == NotificationType.LESSON_REMINDER and not settings.lesson_reminders:
-                return None
-            elif notification_type == NotificationType.FLASHCARD and not settings.flashcard_reminders:
-                return None
-            elif notification_type == NotificationType.ACHIEVEMENT and not settings.achievement_notifications:
-                return None
-            elif notification_type == NotificationType.STREAK and not settings.streak_notifications:
-                return None
-            elif notification_type == NotificationType.SYSTEM and not settings.system_notifications:
-                return None
+            # Handle case where quiet hours span midnight
+            if start_time > end_time:
+                is_quiet_time = now >= start_time or now <= end_time
+            else:
+                is_quiet_time = start_time <= now <= end_time
             
-            # Check quiet hours if enabled
-            if settings.quiet_hours_enabled:
-                now = timezone.localtime()
-                start_time = now.replace(
-                    hour=int(settings.quiet_hours_start.hour),
-                    minute=int(settings.quiet_hours_start.minute),
-                    second=0
-                )
-                end_time = now.replace(
-                    hour=int(settings.quiet_hours_end.hour),
-                    minute=int(settings.quiet_hours_end.minute),
-                    second=0
-                )
-                
-                # Handle case where quiet hours span midnight
-                if start_time > end_time:
-                    is_quiet_time = now >= start_time or now <= end_time
-                else:
-                    is_quiet_time = start_time <= now <= end_time
-                
-                if is_quiet_time:
-                    # If in quiet hours, only send high priority notifications
-                    if priority != NotificationPriority.HIGH:
-                        return None
-        except NotificationSetting.DoesNotExist:
-            # If settings don't exist, create with defaults
-            NotificationSetting.objects.create(user=user)
+            if is_quiet_time:
+                # If in quiet hours, only send high priority notifications
+                if priority != NotificationPriority.HIGH:
+                    return None
         
         # Calculate expiration if provided
         expires_at = None
@@ -109,6 +97,21 @@ class NotificationManager:
         
         return notification
     
+    @staticmethod
+    def _is_type_enabled(settings, notification_type):
+        """
+        Whether the user's cached settings allow this notification type
+        """
+        type_settings = {
+            NotificationType.LESSON_REMINDER: 'lesson_reminders',
+            NotificationType.FLASHCARD: 'flashcard_reminders',
+            NotificationType.ACHIEVEMENT: 'achievement_notifications',
+            NotificationType.STREAK: 'streak_notifications',
+            NotificationType.SYSTEM: 'system_notifications',
+        }
+        setting_name = type_settings.get(notification_type)
+        return setting_name is None or settings[setting_name]
+    
     @staticmethod
     def send_realtime_notification(notification):
         """
@@ -125,14 +128,15 @@ class NotificationManager:
             try:
                 channel_layer = get_channel_layer()
 
-                # Send to user's notification group
-                async_to_sync(channel_layer.group_send)(
-                    f'user_{notification.user.id}_notifications',
-                    {
-                        'type': 'notification_message',
-                        'notification': serializer.data
-                    }
-                )
+                # Send to user's notification groups
+                for group in NotificationDeliveryService._user_group_names(notification.user_id):
+                    async_to_sync(channel_layer.group_send)(
+                        group,
+                        {
+                            'type': 'notification_message',
+                            'notification': serializer.data
+                        }
+                    )
                 return True
             except Exception as channel_error:
                 print(f"Error sending notification via WebSocket: {channel_error}")
@@ -180,25 +184,12 @@ class NotificationManager:
         
         # Create notifications for each user in bulk
         notification_objects = []
+        users = list(users)
+        settings_by_user = notification_settings_cache.get_many([user.id for user in users])
         for user in users:
             # Skip users who have disabled this type of notification
-            try:
-                settings = NotificationSetting.objects.get(user=user)
-                
-                # Check if notification is disabled based on type
-                if notification_type == NotificationType.LESSON_REMINDER and not settings.lesson_reminders:
-                    continue
-                elif notification_type == NotificationType.FLASHCARD and not settings.flashcard_reminders:
-                    continue
-                elif notification_type == NotificationType.ACHIEVEMENT and not settings.achievement_notifications:
-                    continue
-                elif notification_type == NotificationType.STREAK and not settings.streak_notifications:
-                    continue
-                elif notification_type == NotificationType.SYSTEM and not settings.system_notifications:
-                    continue
-            except NotificationSetting.DoesNotExist:
-                # If settings don't exist, create with defaults
-                NotificationSetting.objects.create(user=user)
+            if not NotificationManager._is_type_enabled(settings_by_user[user.id], notification_type):
+                continue
             
             notification_objects.append(
                 Notification(
@@ -216,10 +207,9 @@ class NotificationManager:
         if notification_objects:
             notifications = Notification.objects.bulk_create(notification_objects)
             
-            # Send real-time notifications if requested
+            # Send real-time notifications if requested, in one batch
             if send_realtime:
-                for notification in notifications:
-                    NotificationManager.send_realtime_notification(notification)
+                NotificationDeliveryService._deliver_bulk_via_websocket(notifications)
         
         return notifications
     
@@ -0,0 +1,398 @@
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import LeaderboardEntry, QuizSession
+
+logger = logging.getLogger(__name__)
+
+ALL_CATEGORIES = 'all'
+ALL_TIME_START = date(1970, 1, 1)
+
+LEADERBOARD_TIMEFRAMES = ('weekly', 'monthly', 'quarterly', 'yearly', 'all-time')
+# Rolling timeframes accepted by the API map to the matching calendar period
+TIMEFRAME_ALIASES = {
+    '7d': 'weekly',
+    '30d': 'monthly',
+    '90d': 'quarterly',
+    '1y': 'yearly',
+}
+DEFAULT_TIMEFRAME = 'monthly'
+
+DEFAULT_BACKEND = 'apps.quizz.leaderboard.DatabaseLeaderboardBackend'
+
+
+class LeaderboardBucket(NamedTuple):
+    category: str
+    timeframe: str
+    period_start: date
+
+
+@dataclass(frozen=True)
+class LeaderboardRow:
+    user_id: int
+    score: int
+    total_points: int
+    quizzes_completed: int
+    last_active: datetime
+    streak: int
+    streak_date: date
+
+    def current_streak(self, today: Optional[date] = None) -> int:
+        """Streak still running today (0 once a day has been missed)"""
+        today = today or timezone.localdate()
+        return self.streak if self.streak_date == today else 0
+
+
+def resolve_timeframe(timeframe: str) -> str:
+    """Calendar timeframe for an API timeframe parameter"""
+    timeframe = TIMEFRAME_ALIASES.get(timeframe, timeframe)
+    return timeframe if timeframe in LEADERBOARD_TIMEFRAMES else DEFAULT_TIMEFRAME
+
+
+def period_start(timeframe: str, day: date) -> date:
+    """First day of the ``timeframe`` period containing ``day``"""
+    if timeframe == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if timeframe == 'monthly':
+        return day.replace(day=1)
+    if timeframe == 'quarterly':
+        return day.replace(month=3 * ((day.month - 1) // 3) + 1, day=1)
+    if timeframe == 'yearly':
+        return day.replace(month=1, day=1)
+    return ALL_TIME_START
+
+
+def get_bucket(category: str, timeframe: str, day: Optional[date] = None) -> LeaderboardBucket:
+    """Current bucket for the ``category`` and ``timeframe`` API parameters"""
+    timeframe = resolve_timeframe(timeframe)
+    return LeaderboardBucket(
+        category or ALL_CATEGORIES,
+        timeframe,
+        period_start(timeframe, day or timezone.localdate()),
+    )
+
+
+def session_buckets(session: QuizSession, day: date) -> List[LeaderboardBucket]:
+    """Every bucket a session completed on ``day`` counts towards"""
+    categories = [ALL_CATEGORIES]
+    if session.quiz.category and session.quiz.category != ALL_CATEGORIES:
+        categories.append(session.quiz.category)
+    return [
+        LeaderboardBucket(category, timeframe, period_start(timeframe, day))
+        for category in categories
+        for timeframe in LEADERBOARD_TIMEFRAMES
+    ]
+
+
+def add_session(stats: Optional[Dict], session: QuizSession, day: date) -> Dict:
+    """Leaderboard stats updated with one completed session"""
+    if stats is None:
+        return {
+            'score': session.score,
+            'total_points': session.total_points,
+            'quizzes_completed': 1,
+            'last_active': session.completed_at,
+            'streak': 1,
+            'streak_date': day,
+        }
+
+    streak, streak_date = stats['streak'], stats['streak_date']
+    if day == streak_date + timedelta(days=1):
+        streak, streak_date = streak + 1, day
+    elif day > streak_date:
+        streak, streak_date = 1, day
+
+    return {
+        'score': stats['score'] + session.score,
+        'total_points': stats['total_points'] + session.total_points,
+        'quizzes_completed': stats['quizzes_completed'] + 1,
+        'last_active': max(stats['last_active'], session.completed_at),
+        'streak': streak,
+        'streak_date': streak_date,
+    }
+
+
+class LeaderboardBackend:
+    """
+    Storage for materialized leaderboards
+
+    Backends keep, for every bucket, one row of stats per user ranked by score.
+    """
+
+    def record(self, session: QuizSession, buckets: List[LeaderboardBucket], day: date):
+        """Add a completed session to the user's row in each bucket"""
+        raise NotImplementedError
+
+    def top(self, bucket: LeaderboardBucket, limit: int) -> List[LeaderboardRow]:
+        """Best ``limit`` rows of a bucket, highest score first"""
+        raise NotImplementedError
+
+    def rank(self, bucket: LeaderboardBucket, user_id: int) -> Tuple[Optional[int], int]:
+        """(rank, participants) of a user; (None, 0) if the user has no row"""
+        raise NotImplementedError
+
+    def load(self, rows: Dict[LeaderboardBucket, Dict[int, Dict]]):
+        """Replace all leaderboards with precomputed stats"""
+        raise NotImplementedError
+
+
+class DatabaseLeaderboardBackend(LeaderboardBackend):
+    """Leaderboards stored in LeaderboardEntry, ranked through its score index"""
+
+    STATS_FIELDS = ['score', 'total_points', 'quizzes_completed', 'last_active', 'streak', 'streak_date']
+
+    def record(self, session, buckets, day):
+        try:
+            self._record(session, buckets, day)
+        except IntegrityError:
+            # A concurrent completion created the rows first; they are locked and updated now
+            self._record(session, buckets, day)
+
+    @transaction.atomic
+    def _record(self, session, buckets, day):
+        lookup = Q()
+        for bucket in buckets:
+            lookup |= Q(category=bucket.category, timeframe=bucket.timeframe, period_start=bucket.period_start)
+
+        existing = {
+            LeaderboardBucket(entry.category, entry.timeframe, entry.period_start): entry
+            for entry in LeaderboardEntry.objects.select_for_update().filter(lookup, user_id=session.user_id)
+        }
+
+        to_create = []
+        to_update = []
+        for bucket in buckets:
+            entry = existing.get(bucket)
+            if entry is None:
+                to_create.append(LeaderboardEntry(
+                    category=bucket.category,
+                    timeframe=bucket.timeframe,
+                    period_start=bucket.period_start,
+                    user_id=session.user_id,
+                    **add_session(None, session, day)
+                ))
+            else:
+                stats = add_session(self._entry_stats(entry), session, day)
+                for field, value in stats.items():
+                    setattr(entry, field, value)
+                to_update.append(entry)
+
+        if to_create:
+            LeaderboardEntry.objects.bulk_create(to_create)
+        if to_update:
+            LeaderboardEntry.objects.bulk_update(to_update, self.STATS_FIELDS)
+
+    def top(self, bucket, limit):
+        entries = self._bucket_entries(bucket).order_by('-score', 'user_id')[:limit]
+        return [self._to_row(entry) for entry in entries]
+
+    def rank(self, bucket, user_id):
+        entries = self._bucket_entries(bucket)
+        score = entries.filter(user_id=user_id).values_list('score', flat=True).first()
+        if score is None:
+            return None, 0
+        return entries.filter(score__gt=score).count() + 1, entries.count()
+
+    @transaction.atomic
+    def load(self, rows):
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(
+            (
+                LeaderboardEntry(
+                    category=bucket.category,
+                    timeframe=bucket.timeframe,
+                    period_start=bucket.period_start,
+                    user_id=user_id,
+                    **stats
+                )
+                for bucket, users in rows.items()
+                for user_id, stats in users.items()
+            ),
+            batch_size=1000
+        )
+
+    @staticmethod
+    def _bucket_entries(bucket):
+        return LeaderboardEntry.objects.filter(
+            category=bucket.category,
+            timeframe=bucket.timeframe,
+            period_start=bucket.period_start
+        )
+
+    def _entry_stats(self, entry):
+        return {field: getattr(entry, field) for field in self.STATS_FIELDS}
+
+    def _to_row(self, entry):
+        return LeaderboardRow(user_id=entry.user_id, **self._entry_stats(entry))
+
+
+class RedisLeaderboardBackend(LeaderboardBackend):
+    """
+    Leaderboards stored in Redis: a sorted set of scores per bucket (O(log n)
+    rank) and a hash with the other stats of each user
+    """
+
+    KEY_PREFIX = 'quiz_leaderboard'
+    # Past periods are never read again; their keys expire after a grace period
+    PERIOD_TTL_DAYS = {
+        'weekly': 14,
+        'monthly': 62,
+        'quarterly': 124,
+        'yearly': 397,
+    }
+    # Optimistic transactions retried this many times under contention
+    MAX_WATCH_RETRIES = 10
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            url = getattr(settings, 'QUIZ_LEADERBOARD_REDIS_URL', None) or os.environ.get(
+                'REDIS_URL', 'redis://127.0.0.1:6379/0'
+            )
+            self._client = redis.Redis.from_url(url)
+        return self._client
+
+    def record(self, session, buckets, day):
+        for bucket in buckets:
+            self._record_bucket(session, bucket, day)
+
+    def _record_bucket(self, session, bucket, day):
+        from redis.exceptions import WatchError
+
+        scores_key, stats_key = self._keys(bucket)
+        # Read-modify-write under WATCH: a concurrent update of the same bucket
+        # aborts the transaction and the session is applied again on fresh stats
+        for _ in range(self.MAX_WATCH_RETRIES):
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(stats_key)
+                    stats = add_session(self._load_stats(pipe.hget(stats_key, session.user_id)), session, day)
+                    pipe.multi()
+                    pipe.zadd(scores_key, {session.user_id: stats['score']})
+                    pipe.hset(stats_key, session.user_id, self._dump_stats(stats))
+                    self._expire(pipe, bucket)
+                    pipe.execute()
+                    return
+                except WatchError:
+                    continue
+        raise RuntimeError(f'Leaderboard bucket {stats_key} kept changing, update abandoned')
+
+    def top(self, bucket, limit):
+        scores_key, stats_key = self._keys(bucket)
+        user_ids = [int(member) for member in self.client.zrevrange(scores_key, 0, limit - 1)]
+        if not user_ids:
+            return []
+        rows = []
+        for user_id, raw in zip(user_ids, self.client.hmget(stats_key, user_ids)):
+            stats = self._load_stats(raw)
+            if stats is not None:
+                rows.append(LeaderboardRow(user_id=user_id, **stats))
+        return rows
+
+    def rank(self, bucket, user_id):
+        scores_key, _ = self._keys(bucket)
+        score = self.client.zscore(scores_key, user_id)
+        if score is None:
+            return None, 0
+        return self.client.zcount(scores_key, f'({score}', '+inf') + 1, self.client.zcard(scores_key)
+
+    def load(self, rows):
+        pipe = self.client.pipeline()
+        for key in self.client.scan_iter(f'{self.KEY_PREFIX}:*'):
+            pipe.delete(key)
+        for bucket, users in rows.items():
+            scores_key, stats_key = self._keys(bucket)
+            pipe.zadd(scores_key, {user_id: stats['score'] for user_id, stats in users.items()})
+            pipe.hset(stats_key, mapping={user_id: self._dump_stats(stats) for user_id, stats in users.items()})
+            self._expire(pipe, bucket)
+        pipe.execute()
+
+    def _keys(self, bucket):
+        base = f'{self.KEY_PREFIX}:{bucket.category}:{bucket.timeframe}:{bucket.period_start.isoformat()}'
+        return f'{base}:scores', f'{base}:stats'
+
+    def _expire(self, pipe, bucket):
+        ttl_days = self.PERIOD_TTL_DAYS.get(bucket.timeframe)
+        if ttl_days:
+            expire_on = bucket.period_start + timedelta(days=ttl_days)
+            for key in self._keys(bucket):
+                pipe.expireat(key, datetime.combine(expire_on, datetime.min.time()))
+
+    @staticmethod
+    def _dump_stats(stats):
+        return json.dumps({
+            **stats,
+            'last_active': stats['last_active'].isoformat(),
+            'streak_date': stats['streak_date'].isoformat(),
+        })
+
+    @staticmethod
+    def _load_stats(raw):
+        if raw is None:
+            return None
+        stats = json.loads(raw)
+        stats['last_active'] = datetime.fromisoformat(stats['last_active'])
+        stats['streak_date'] = date.fromisoformat(stats['streak_date'])
+        return stats
+
+
+_backends = {}
+
+
+def get_leaderboard_backend() -> LeaderboardBackend:
+    """Backend configured by ``QUIZ_LEADERBOARD_BACKEND`` (database by default)"""
+    path = getattr(settings, 'QUIZ_LEADERBOARD_BACKEND', DEFAULT_BACKEND)
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def record_completed_session(session: QuizSession):
+    """Add a newly completed session to every leaderboard it counts towards"""
+    day = timezone.localdate(session.completed_at)
+    try:
+        get_leaderboard_backend().record(session, session_buckets(session, day), day)
+    except Exception as e:
+        # The leaderboard can be rebuilt; a failure must not break quiz completion
+        logger.error(f"Leaderboard update failed for quiz session {session.id}: {str(e)}", exc_info=True)
+
+
+def rebuild_leaderboards(sessions: Optional[Iterable[QuizSession]] = None) -> int:
+    """
+    Recompute the current period of every leaderboard from completed sessions
+
+    Returns the number of (bucket, user) rows written.
+    """
+    if sessions is None:
+        sessions = QuizSession.objects.filter(
+            completed_at__isnull=False
+        ).select_related('quiz').order_by('completed_at').iterator(chunk_size=2000)
+
+    today = timezone.localdate()
+    current_periods = {timeframe: period_start(timeframe, today) for timeframe in LEADERBOARD_TIMEFRAMES}
+
+    rows = {}
+    for session in sessions:
+        day = timezone.localdate(session.completed_at)
+        for bucket in session_buckets(session, day):
+            if bucket.period_start != current_periods[bucket.timeframe]:
+                continue
+            users = rows.setdefault(bucket, {})
+            users[session.user_id] = add_session(users.get(session.user_id), session, day)
+
+    get_leaderboard_backend().load(rows)
+    return sum(len(users) for users in rows.values())
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from apps.quizz.leaderboard import rebuild_leaderboards, get_leaderboard_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized quiz leaderboards of the current periods from completed sessions'
+
+    def handle(self, *args, **options):
+        backend = get_leaderboard_backend()
+        self.stdout.write(f'Rebuilding quiz leaderboards with {backend.__class__.__name__}...')
+
+        rows = rebuild_leaderboards()
+
+        self.stdout.write(self.style.SUCCESS(f'Leaderboards rebuilt: {rows} entries'))
@@ -4,6 +4,7 @@ from django.utils import timezone
 from datetime import timedelta
 import random
 from apps.quizz.models import Quiz, Question, Answer, QuizSession, QuizResult
+from apps.quizz.leaderboard import rebuild_leaderboards
 
 User = get_user_model()
 
@@ -102,5 +103,8 @@ class Command(BaseCommand):
                 
                 self.stdout.write(f'Created session for {user.username} on {quiz.title}')
 
+        # Sessions are created already completed; leaderboards are rebuilt from them
+        rebuild_leaderboards()
+
         self.stdout.write(self.style.SUCCESS('Sample quiz data created successfully!'))
         self.stdout.write(f'Created {len(users)} users, {quizzes.count()} quizzes, and {QuizSession.objects.count()} quiz sessions')
\ No newline at end of file
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(help_text="Catégorie du quiz ou 'all'", max_length=100)),
+                ('timeframe', models.CharField(choices=[('weekly', 'Semaine'), ('monthly', 'Mois'), ('quarterly', 'Trimestre'), ('yearly', 'Année'), ('all-time', 'Depuis toujours')], max_length=20)),
+                ('period_start', models.DateField(help_text='Premier jour de la période du classement')),
+                ('score', models.IntegerField(default=0)),
+                ('total_points', models.IntegerField(default=0)),
+                ('quizzes_completed', models.IntegerField(default=0)),
+                ('last_active', models.DateTimeField()),
+                ('streak', models.IntegerField(default=0, help_text='Jours consécutifs avec un quiz terminé')),
+                ('streak_date', models.DateField(help_text='Dernier jour compté dans la série')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'timeframe', 'period_start', '-score'], name='quizz_leaderboard_rank_idx')],
+                'unique_together': {('category', 'timeframe', 'period_start', 'user')},
+            },
+        ),
+    ]
@@ -92,4 +92,37 @@ class QuizResult(models.Model):
     points_earned = models.IntegerField(default=0)
     
     def __str__(self):
-        return f"{self.session} - {self.question}"
\ No newline at end of file
+        return f"{self.session} - {self.question}"
+
+class LeaderboardEntry(models.Model):
+    """Score matérialisé d'un utilisateur dans un classement (catégorie, période)"""
+    TIMEFRAME_CHOICES = [
+        ('weekly', 'Semaine'),
+        ('monthly', 'Mois'),
+        ('quarterly', 'Trimestre'),
+        ('yearly', 'Année'),
+        ('all-time', 'Depuis toujours'),
+    ]
+
+    category = models.CharField(max_length=100, help_text="Catégorie du quiz ou 'all'")
+    timeframe = models.CharField(max_length=20, choices=TIMEFRAME_CHOICES)
+    period_start = models.DateField(help_text="Premier jour de la période du classement")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    score = models.IntegerField(default=0)
+    total_points = models.IntegerField(default=0)
+    quizzes_completed = models.IntegerField(default=0)
+    last_active = models.DateTimeField()
+    streak = models.IntegerField(default=0, help_text="Jours consécutifs avec un quiz terminé")
+    streak_date = models.DateField(help_text="Dernier jour compté dans la série")
+
+    class Meta:
+        unique_together = ['category', 'timeframe', 'period_start', 'user']
+        indexes = [
+            models.Index(
+                fields=['category', 'timeframe', 'period_start', '-score'],
+                name='quizz_leaderboard_rank_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.category}/{self.timeframe} {self.period_start} - {self.score}"
@@ -1,8 +1,13 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
-from ..models import Quiz, Question, Answer, QuizSession, QuizResult
+from ..models import Quiz, Question, Answer, QuizSession, QuizResult, LeaderboardEntry
+from ..leaderboard import add_session, rebuild_leaderboards
 
 User = get_user_model()
 
@@ -123,4 +128,97 @@ class QuizAPITests(APITestCase):
         response = self.client.post(f'/api/v1/quizz/{self.quiz.id}/submit_answer/', data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['is_correct'])
-        self.assertEqual(response.data['points_earned'], 1)
\ No newline at end of file
+        self.assertEqual(response.data['points_earned'], 1)
+
+class LeaderboardTests(APITestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f'player{i}',
+                email=f'player{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        self.quiz = Quiz.objects.create(
+            title='Leaderboard Quiz',
+            creator=self.users[0],
+            category='Grammar'
+        )
+        self.other_quiz = Quiz.objects.create(
+            title='Other Quiz',
+            creator=self.users[0],
+            category='Vocabulary'
+        )
+
+    def complete(self, user, quiz, score, total_points=10):
+        session = QuizSession.objects.create(user=user, quiz=quiz, score=score, total_points=total_points)
+        self.client.force_authenticate(user=user)
+        response = self.client.post(f'/api/v1/quizz/{quiz.id}/complete_session/', {'session_id': session.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return session
+
+    def test_completion_updates_every_bucket(self):
+        self.complete(self.users[0], self.quiz, 7)
+        self.complete(self.users[0], self.other_quiz, 5)
+
+        entries = LeaderboardEntry.objects.filter(user=self.users[0])
+        self.assertEqual(entries.filter(category='all').count(), 5)
+        self.assertEqual(entries.filter(category='Grammar').count(), 5)
+        overall = entries.get(category='all', timeframe='all-time')
+        self.assertEqual((overall.score, overall.total_points, overall.quizzes_completed), (12, 20, 2))
+        self.assertEqual(overall.streak, 1)
+
+    def test_completing_twice_counts_once(self):
+        session = self.complete(self.users[0], self.quiz, 7)
+        self.client.post(f'/api/v1/quizz/{self.quiz.id}/complete_session/', {'session_id': session.id})
+
+        entry = LeaderboardEntry.objects.get(user=self.users[0], category='all', timeframe='weekly')
+        self.assertEqual(entry.quizzes_completed, 1)
+
+    def test_leaderboard_and_rank(self):
+        self.complete(self.users[0], self.quiz, 4)
+        self.complete(self.users[1], self.quiz, 9)
+        self.complete(self.users[2], self.other_quiz, 6)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/quizz/leaderboard/', {'timeframe': 'weekly'})
+        leaderboard_queries = [q['sql'] for q in queries if 'quizz_' in q['sql'] or 'authentication_user' in q['sql']]
+        self.assertEqual(len(leaderboard_queries), 2)
+        self.assertNotIn('quizz_quizsession', ' '.join(leaderboard_queries))
+        self.assertEqual([row['username'] for row in response.data], ['player1', 'player2', 'player0'])
+        self.assertEqual(response.data[0]['score'], 9)
+        self.assertEqual(response.data[0]['averageScore'], 90.0)
+        self.assertEqual(response.data[0]['streak'], 1)
+
+        response = self.client.get('/api/v1/quizz/leaderboard/', {'category': 'Grammar', 'timeframe': '30d'})
+        self.assertEqual([row['username'] for row in response.data], ['player1', 'player0'])
+
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.get('/api/v1/quizz/leaderboard/my_rank/', {'timeframe': 'weekly'})
+        self.assertEqual(response.data, {'rank': 3, 'total': 3})
+        response = self.client.get('/api/v1/quizz/leaderboard/my_rank/', {'category': 'Vocabulary'})
+        self.assertEqual(response.data, {'rank': None, 'total': 0})
+
+    def test_streak_counts_consecutive_days(self):
+        today = timezone.localdate()
+        stats = None
+        for days_ago in (3, 1, 0):
+            session = QuizSession(score=1, total_points=1, completed_at=timezone.now() - timedelta(days=days_ago))
+            stats = add_session(stats, session, today - timedelta(days=days_ago))
+        self.assertEqual((stats['streak'], stats['streak_date']), (2, today))
+
+    def test_rebuild_matches_incremental_updates(self):
+        self.complete(self.users[0], self.quiz, 4)
+        self.complete(self.users[1], self.other_quiz, 8)
+        self.complete(self.users[0], self.other_quiz, 3)
+        expected = sorted(LeaderboardEntry.objects.values_list(
+            'category', 'timeframe', 'user_id', 'score', 'quizzes_completed', 'streak'
+        ))
+
+        rows = rebuild_leaderboards()
+
+        self.assertEqual(rows, len(expected))
+        self.assertEqual(sorted(LeaderboardEntry.objects.values_list(
+            'category', 'timeframe', 'user_id', 'score', 'quizzes_completed', 'streak'
+        )), expected)
@@ -20,8 +20,6 @@ router.register(r'', QuizViewSet, basename='quiz')
 app_name = 'quizz'
 
 urlpatterns = [
-    path('', include(router.urls)),
-    
     # Analytics endpoints
     path('analytics/stats/', AnalyticsStatsView.as_view(), name='analytics-stats'),
     path('analytics/categories/', AnalyticsCategoriesView.as_view(), name='analytics-categories'),
@@ -38,4 +36,7 @@ urlpatterns = [
     
     # Settings endpoint
     path('settings/', QuizSettingsView.as_view(), name='quiz-settings'),
+    
+    # Quiz routes last: the detail route would otherwise capture the paths above
+    path('', include(router.urls)),
 ]
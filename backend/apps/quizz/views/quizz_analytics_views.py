@@ -8,6 +8,7 @@ from django.db.models.functions import TruncDate
 from datetime import datetime, timedelta
 from ..models import Quiz, QuizSession, QuizResult
 from ..utils import get_timeframe_filter
+from ..leaderboard import get_bucket, get_leaderboard_backend
 
 
 class LeaderboardView(APIView):
@@ -19,75 +20,41 @@ class LeaderboardView(APIView):
         timeframe = request.query_params.get('timeframe', 'weekly')
         limit = int(request.query_params.get('limit', 50))
         
-        since_date = get_timeframe_filter(timeframe)
+        # Materialized leaderboard of the current period
+        rows = get_leaderboard_backend().top(get_bucket(category, timeframe), limit)
         
-        # Base query for sessions in timeframe
-        sessions_query = QuizSession.objects.filter(
-            completed_at__isnull=False,
-            completed_at__gte=since_date
-        )
-        
-        # Filter by category if specified
-        if category != 'all':
-            sessions_query = sessions_query.filter(quiz__category=category)
-        
-        # Group by user and calculate stats
-        user_stats = sessions_query.values('user').annotate(
-            total_score=Sum('score'),
-            total_points=Sum('total_points'),
-            quizzes_completed=Count('id'),
-            total_earned_points=Sum('score'),
-            last_active=Max('completed_at')
-        ).filter(quizzes_completed__gt=0).order_by('-total_earned_points')[:limit]
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+        users = User.objects.in_bulk([row.user_id for row in rows])
+        today = timezone.localdate()
         
-        # Calculate streaks for each user
         result = []
-        for i, stat in enumerate(user_stats):
-            user_id = stat['user']
-            
-            # Get user info
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            try:
-                user = User.objects.get(id=user_id)
-                username = user.username
-                # Add avatar logic if you have a profile picture field
-                avatar = getattr(user, 'profile_picture', None)
-                if avatar:
-                    avatar = avatar.url if hasattr(avatar, 'url') else str(avatar)
-            except User.DoesNotExist:
+        for i, row in enumerate(rows):
+            user = users.get(row.user_id)
+            if user is None:
                 continue
             
-            # Calculate streak for this user
-            user_sessions = sessions_query.filter(user_id=user_id)
-            recent_dates = user_sessions.values_list(
-                TruncDate('completed_at'), flat=True
-            ).distinct().order_by('-completed_at__date')
-            
-            streak = 0
-            current_date = timezone.now().date()
-            
-            for session_date in recent_dates:
-                if session_date == current_date or session_date == current_date - timedelta(days=streak):
-                    streak += 1
-                    current_date = session_date
-                else:
-                    break
+            # Add avatar logic if you have a profile picture field
+            avatar = getattr(user, 'profile_picture', None)
+            if avatar:
+                avatar = avatar.url if hasattr(avatar, 'url') else str(avatar)
+            else:
+                avatar = None
             
             # Calculate average score percentage
-            average_score = (stat['total_score'] / stat['total_points'] * 100) if stat['total_points'] > 0 else 0
+            average_score = (row.score / row.total_points * 100) if row.total_points > 0 else 0
             
             result.append({
                 'rank': i + 1,
-                'userId': str(user_id),
-                'username': username,
+                'userId': str(row.user_id),
+                'username': user.username,
                 'avatar': avatar,
-                'score': stat['total_earned_points'],
-                'quizzesCompleted': stat['quizzes_completed'],
+                'score': row.score,
+                'quizzesCompleted': row.quizzes_completed,
                 'averageScore': round(average_score, 1),
-                'totalPoints': stat['total_earned_points'],
-                'streak': streak,
-                'lastActive': stat['last_active'].strftime('%Y-%m-%d')
+                'totalPoints': row.score,
+                'streak': row.current_streak(today),
+                'lastActive': row.last_active.strftime('%Y-%m-%d')
             })
         
         return Response(result)
@@ -105,45 +72,10 @@ class LeaderboardMyRankView(APIView):
         category = request.query_params.get('category', 'all')
         timeframe = request.query_params.get('timeframe', 'weekly')
         
-        since_date = get_timeframe_filter(timeframe)
-        
-        # Base query for sessions in timeframe
-        sessions_query = QuizSession.objects.filter(
-            completed_at__isnull=False,
-            completed_at__gte=since_date
-        )
-        
-        # Filter by category if specified
-        if category != 'all':
-            sessions_query = sessions_query.filter(quiz__category=category)
-        
-        # Get user's total score
-        user_stats = sessions_query.filter(user=request.user).aggregate(
-            total_score=Sum('score'),
-            quizzes_completed=Count('id')
+        user_rank, total_participants = get_leaderboard_backend().rank(
+            get_bucket(category, timeframe), request.user.id
         )
         
-        if not user_stats['quizzes_completed']:
-            return Response({'rank': None, 'total': 0})
-        
-        user_total_score = user_stats['total_score']
-        
-        # Count users with higher scores
-        higher_scores = sessions_query.exclude(user=request.user).values('user').annotate(
-            total_score=Sum('score'),
-            quizzes_completed=Count('id')
-        ).filter(
-            quizzes_completed__gt=0,
-            total_score__gt=user_total_score
-        ).count()
-        
-        # Total participants
-        total_participants = sessions_query.values('user').annotate(
-            quizzes_completed=Count('id')
-        ).filter(quizzes_completed__gt=0).count()
-        
-        user_rank = higher_scores + 1
-        
         return Response({
             'rank': user_rank,
             'total': total_participants
@@ -15,6 +15,7 @@ from ..serializers import (
     QuizSessionSerializer, QuizResultSerializer
 )
 from ..utils import get_timeframe_filter
+from ..leaderboard import record_completed_session
 
 class QuizzMainView(LoginRequiredMixin, TemplateView):
     """Vue principale pour l'app Quizz"""
@@ -138,11 +139,15 @@ class QuizViewSet(viewsets.ModelViewSet):
                 user=request.user,
                 quiz_id=pk
             )
+            newly_completed = session.completed_at is None
             session.completed_at = timezone.now()
             time_diff = session.completed_at - session.started_at
             session.time_spent = int(time_diff.total_seconds())
             session.save()
             
+            if newly_completed:
+                record_completed_session(session)
+            
             serializer = QuizSessionSerializer(session)
             return Response(serializer.data)
             
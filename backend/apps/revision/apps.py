@@ -21,6 +21,9 @@ class RevisionConfig(AppConfig):
             from . import signals
             logger.info("Revision signals registered")
             
+            from core.models.search import register_search_model
+            register_search_model(self.get_model('Flashcard'), title_fields=['front_text'], body_fields=['back_text'])
+            
         except ImportError as e:
             logger.warning(f"Could not import revision settings models or signals: {e}")
         except Exception as e:
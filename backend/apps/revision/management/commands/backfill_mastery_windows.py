@@ -0,0 +1,105 @@
+"""
+Management command pour initialiser les fenêtres glissantes de CardMastery.
+Rejoue les derniers résultats de chaque mode depuis l'historique CardPerformance
+afin que les mises à jour incrémentales partent d'un état correct.
+"""
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.revision.models import CardPerformance, CardMastery, StudyMode
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit les fenêtres de résultats récents de CardMastery depuis l\'historique'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='ID d\'utilisateur spécifique (optionnel)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Nombre de CardMastery mis à jour par requête (défaut: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Affiche ce qui serait fait sans appliquer les changements',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+
+        self.stdout.write(self.style.WARNING('=== Initialisation des fenêtres CardMastery ===\n'))
+
+        performances = CardPerformance.objects.all()
+        if options.get('user'):
+            performances = performances.filter(user_id=options['user'])
+
+        rows = performances.order_by('card_id', 'study_mode', '-created_at').values_list(
+            'card_id', 'study_mode', 'was_correct'
+        ).iterator(chunk_size=2000)
+
+        self.updated_count = 0
+        self.missing_count = 0
+        pending = {}
+
+        with transaction.atomic():
+            for card_id, card_rows in groupby(rows, key=lambda row: row[0]):
+                windows = {}
+                for mode, mode_rows in groupby(card_rows, key=lambda row: row[1]):
+                    # Les lignes arrivent de la plus récente à la plus ancienne
+                    recent = [was_correct for _, _, was_correct in mode_rows][:CardMastery.RECENT_WINDOW_SIZE]
+                    window = 0
+                    for was_correct in reversed(recent):
+                        window = CardMastery.push_outcome(window, was_correct)
+                    windows[mode] = window
+
+                pending[card_id] = windows
+                if len(pending) >= batch_size:
+                    self._write_batch(pending)
+                    pending = {}
+
+            if pending:
+                self._write_batch(pending)
+
+            if dry_run:
+                # Annuler la transaction en mode dry-run
+                transaction.set_rollback(True)
+
+        self.stdout.write("\n" + "=" * 50)
+        self.stdout.write(self.style.SUCCESS("\n[OK] Initialisation terminee!\n"))
+        self.stdout.write(f"  Mis a jour:    {self.updated_count}")
+        if self.missing_count:
+            self.stdout.write(self.style.WARNING(
+                f"  Sans mastery:  {self.missing_count} (lancez migrate_to_adaptive d'abord)"
+            ))
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("\n[!] Mode DRY-RUN - Aucune modification appliquee"))
+
+    def _write_batch(self, pending):
+        """Applique les fenêtres d'un lot de cartes avec un seul bulk_update."""
+        masteries = list(CardMastery.objects.filter(card_id__in=pending.keys()))
+        self.missing_count += len(pending) - len(masteries)
+
+        for mastery in masteries:
+            for mode, window in pending[mastery.card_id].items():
+                if mode not in StudyMode.values:
+                    continue
+                setattr(mastery, f"{mode}_window", window)
+                setattr(mastery, f"{mode}_score", CardMastery.window_score(window) or 0.0)
+            mastery.confidence_score = mastery.calculate_confidence_score()
+            mastery.update_mastery_level(save=False)
+
+        fields = ['confidence_score', 'mastery_level']
+        for mode in StudyMode.values:
+            fields.extend([f"{mode}_window", f"{mode}_score"])
+
+        CardMastery.objects.bulk_update(masteries, fields)
+        self.updated_count += len(masteries)
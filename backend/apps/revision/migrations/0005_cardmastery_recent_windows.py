@@ -0,0 +1,38 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('revision', '0004_revisionsettings_shortcut_audio_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardmastery',
+            name='flashcards_window',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Derniers résultats en mode Flashcards'),
+        ),
+        migrations.AddField(
+            model_name='cardmastery',
+            name='learn_window',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Derniers résultats en mode Apprendre'),
+        ),
+        migrations.AddField(
+            model_name='cardmastery',
+            name='match_window',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Derniers résultats en mode Associer'),
+        ),
+        migrations.AddField(
+            model_name='cardmastery',
+            name='review_window',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Derniers résultats en mode Révision'),
+        ),
+        migrations.AddField(
+            model_name='cardmastery',
+            name='write_window',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Derniers résultats en mode Écrire'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('revision', '0005_cardmastery_recent_windows'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardperformance',
+            name='client_answer_id',
+            field=models.CharField(blank=True, help_text="Clé d'idempotence fournie par le client (évite les doublons lors des renvois)", max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='cardperformance',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_answer_id__isnull', False)), fields=('user', 'client_answer_id'), name='unique_card_performance_client_answer'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('revision', '0006_cardperformance_client_answer_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='revisionsettings',
+            index=models.Index(fields=['daily_reminder_enabled', 'reminder_time'], name='revision_re_daily_r_71d368_idx'),
+        ),
+    ]
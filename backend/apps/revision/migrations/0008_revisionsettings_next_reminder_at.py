@@ -0,0 +1,52 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:10
+
+import zoneinfo
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_existing_reminders(apps, schema_editor):
+    """Calcule next_reminder_at pour les rappels déjà activés"""
+    RevisionSettings = apps.get_model('revision', 'RevisionSettings')
+    now = timezone.now()
+
+    batch = []
+    queryset = RevisionSettings.objects.filter(daily_reminder_enabled=True).select_related('user')
+    for revision_settings in queryset.iterator(chunk_size=1000):
+        user_timezone = getattr(revision_settings.user, 'timezone', None) or settings.TIME_ZONE
+        if isinstance(user_timezone, str):
+            user_timezone = zoneinfo.ZoneInfo(user_timezone)
+
+        local_now = now.astimezone(user_timezone)
+        candidate = datetime.combine(local_now.date(), revision_settings.reminder_time, tzinfo=user_timezone)
+        if candidate <= local_now:
+            candidate += timedelta(days=1)
+        revision_settings.next_reminder_at = candidate.astimezone(dt_timezone.utc)
+        batch.append(revision_settings)
+
+        if len(batch) >= 1000:
+            RevisionSettings.objects.bulk_update(batch, ['next_reminder_at'])
+            batch = []
+
+    if batch:
+        RevisionSettings.objects.bulk_update(batch, ['next_reminder_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_user_is_device_user_timezone_and_more'),
+        ('revision', '0007_revisionsettings_reminder_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='revisionsettings',
+            name='next_reminder_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text="Prochain rappel (UTC), calculé depuis reminder_time et le fuseau de l'utilisateur", null=True),
+        ),
+        migrations.RunPython(schedule_existing_reminders, migrations.RunPython.noop),
+    ]
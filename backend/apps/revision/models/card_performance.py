@@ -1,5 +1,5 @@
 # backend/apps/revision/models/card_performance.py
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -80,6 +80,12 @@ class CardPerformance(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(100)],
         help_text="Score de confiance après cette performance"
     )
+    client_answer_id = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text="Clé d'idempotence fournie par le client (évite les doublons lors des renvois)"
+    )
 
     class Meta:
         app_label = 'revision'
@@ -90,6 +96,13 @@ class CardPerformance(models.Model):
             models.Index(fields=['card', '-created_at']),
             models.Index(fields=['study_mode', '-created_at']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'client_answer_id'],
+                condition=models.Q(client_answer_id__isnull=False),
+                name='unique_card_performance_client_answer',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.card.front_text[:30]} - {self.study_mode} - {self.difficulty} ({self.created_at.strftime('%Y-%m-%d')})"
@@ -165,6 +178,16 @@ class CardMastery(models.Model):
     last_match = models.DateTimeField(null=True, blank=True)
     last_review = models.DateTimeField(null=True, blank=True)
 
+    # Fenêtre glissante des derniers résultats par mode.
+    # Encodage compact : bit sentinelle à la position n (n = nombre de résultats,
+    # au plus RECENT_WINDOW_SIZE) suivi des n derniers résultats (bit 0 = le plus récent).
+    # 0 = aucun résultat.
+    learn_window = models.PositiveSmallIntegerField(default=0, help_text="Derniers résultats en mode Apprendre")
+    flashcards_window = models.PositiveSmallIntegerField(default=0, help_text="Derniers résultats en mode Flashcards")
+    write_window = models.PositiveSmallIntegerField(default=0, help_text="Derniers résultats en mode Écrire")
+    match_window = models.PositiveSmallIntegerField(default=0, help_text="Derniers résultats en mode Associer")
+    review_window = models.PositiveSmallIntegerField(default=0, help_text="Derniers résultats en mode Révision")
+
     # Compteurs
     total_attempts = models.PositiveIntegerField(default=0)
     successful_attempts = models.PositiveIntegerField(default=0)
@@ -185,6 +208,9 @@ class CardMastery(models.Model):
         help_text="Niveau de maîtrise calculé automatiquement"
     )
 
+    # Nombre de résultats récents pris en compte pour le score d'un mode
+    RECENT_WINDOW_SIZE = 10
+
     class Meta:
         app_label = 'revision'
         verbose_name = 'Card Mastery'
@@ -251,10 +277,84 @@ class CardMastery(models.Model):
 
         return int(max(0, min(100, weighted_score)))
 
-    def update_mastery_level(self):
+    @classmethod
+    def push_outcome(cls, window, was_correct):
+        """
+        Ajoute un résultat à une fenêtre glissante encodée.
+
+        Args:
+            window (int): Fenêtre encodée (voir ``learn_window``)
+            was_correct (bool): Résultat à ajouter
+
+        Returns:
+            int: Nouvelle fenêtre encodée
+        """
+        count = max(window.bit_length() - 1, 0)
+        outcomes = window & ((1 << count) - 1)
+        outcomes = ((outcomes << 1) | int(bool(was_correct))) & ((1 << cls.RECENT_WINDOW_SIZE) - 1)
+        count = min(count + 1, cls.RECENT_WINDOW_SIZE)
+        return (1 << count) | outcomes
+
+    @staticmethod
+    def window_score(window):
+        """
+        Taux de réussite d'une fenêtre encodée.
+
+        Returns:
+            float | None: Taux de réussite (0.0-1.0), None si la fenêtre est vide
+        """
+        count = max(window.bit_length() - 1, 0)
+        if not count:
+            return None
+        outcomes = window & ((1 << count) - 1)
+        return bin(outcomes).count('1') / count
+
+    def apply_performance(self, performance):
+        """
+        Intègre une performance en mémoire, sans requête.
+
+        Met à jour les compteurs, la fenêtre glissante et le score du mode,
+        le score de confiance et le niveau de maîtrise.
+
+        Args:
+            performance (CardPerformance): La performance à intégrer
+
+        Returns:
+            list: Champs modifiés (pour ``save(update_fields=...)``)
+        """
+        update_fields = ['total_attempts', 'successful_attempts', 'confidence_score', 'mastery_level']
+
+        self.total_attempts += 1
+        if performance.was_correct:
+            self.successful_attempts += 1
+
+        mode = performance.study_mode
+        mode_field = f"last_{mode}"
+        window_field = f"{mode}_window"
+        score_field = f"{mode}_score"
+
+        if hasattr(self, mode_field):
+            setattr(self, mode_field, performance.created_at)
+            update_fields.append(mode_field)
+
+        if hasattr(self, window_field):
+            window = self.push_outcome(getattr(self, window_field), performance.was_correct)
+            setattr(self, window_field, window)
+            setattr(self, score_field, self.window_score(window))
+            update_fields.extend([window_field, score_field])
+
+        self.confidence_score = self.calculate_confidence_score()
+        self.update_mastery_level(save=False)
+
+        return update_fields
+
+    def update_mastery_level(self, save=True):
         """
         Met à jour le niveau de maîtrise basé sur le score de confiance
         et la cohérence des performances entre les modes.
+
+        Args:
+            save (bool): Sauvegarder immédiatement ``mastery_level``
         """
         score = self.confidence_score
 
@@ -283,7 +383,8 @@ class CardMastery(models.Model):
             # En apprentissage par défaut
             self.mastery_level = 'learning'
 
-        self.save(update_fields=['mastery_level', 'updated_at'])
+        if save:
+            self.save(update_fields=['mastery_level', 'updated_at'])
 
     def should_be_learned(self):
         """
@@ -315,75 +416,58 @@ class CardMastery(models.Model):
         """
         Met à jour ou crée le CardMastery basé sur une nouvelle performance.
 
+        Une lecture (verrouillée) et une écriture du mastery par réponse :
+        le score du mode vient de la fenêtre glissante stockée, sans relire
+        l'historique des performances. Si la performance n'est pas encore
+        enregistrée, elle est insérée avec ses scores avant/après.
+
         Args:
             performance (CardPerformance): La performance à intégrer
         """
-        mastery, created = cls.objects.get_or_create(card=performance.card)
-
-        # Enregistrer le score avant
-        performance.confidence_before = mastery.confidence_score
+        with transaction.atomic():
+            mastery = cls.objects.select_for_update().filter(card_id=performance.card_id).first()
+            created = mastery is None
+            if created:
+                mastery = cls(card=performance.card)
+
+            # Enregistrer le score avant
+            performance.confidence_before = mastery.confidence_score
+
+            update_fields = mastery.apply_performance(performance)
+            if created:
+                mastery.save(force_insert=True)
+            else:
+                mastery.save(update_fields=update_fields + ['updated_at'])
+
+            # Enregistrer le score après dans la performance
+            performance.confidence_after = mastery.confidence_score
+            if performance._state.adding:
+                performance.save()
+            else:
+                performance.save(update_fields=['confidence_before', 'confidence_after'])
 
-        # Mettre à jour les compteurs
-        mastery.total_attempts += 1
-        if performance.was_correct:
-            mastery.successful_attempts += 1
-
-        # Mettre à jour la date de dernière pratique pour ce mode
-        mode_field = f"last_{performance.study_mode}"
-        if hasattr(mastery, mode_field):
-            setattr(mastery, mode_field, performance.created_at)
-
-        # Recalculer le score pour ce mode spécifique
-        # Exclure la performance actuelle de la requête si elle est déjà sauvegardée
-        recent_performances = list(CardPerformance.objects.filter(
-            card=performance.card,
-            study_mode=performance.study_mode
-        ).order_by('-created_at')[:10])
-
-        if recent_performances:
-            correct_count = sum(1 for p in recent_performances if p.was_correct)
-            mode_score = correct_count / len(recent_performances)
-            score_field = f"{performance.study_mode}_score"
-
-            if hasattr(mastery, score_field):
-                setattr(mastery, score_field, mode_score)
-
-        # Recalculer le score de confiance global
-        mastery.confidence_score = mastery.calculate_confidence_score()
-
-        # Mettre à jour le niveau de maîtrise (déjà sauvegarde avec update_fields)
-        mastery.update_mastery_level()
-
-        # Sauvegarder toutes les modifications du mastery
-        # (update_mastery_level a déjà sauvegardé mastery_level et updated_at)
-        # On sauvegarde les autres champs modifiés
-        update_fields = [
-            'total_attempts', 'successful_attempts',
-            'confidence_score'
-        ]
-
-        # Ajouter les champs de mode seulement s'ils existent
-        score_field = f"{performance.study_mode}_score"
-        if hasattr(mastery, mode_field):
-            update_fields.append(mode_field)
-        if hasattr(mastery, score_field):
-            update_fields.append(score_field)
-
-        mastery.save(update_fields=update_fields)
+        # Mettre à jour le statut "learned" de la carte
+        mastery.sync_card_learned(performance.card)
 
-        # Enregistrer le score après dans la performance
-        performance.confidence_after = mastery.confidence_score
-        performance.save(update_fields=['confidence_before', 'confidence_after'])
+        return mastery
 
-        # Mettre à jour le statut "learned" de la carte
-        should_learn = mastery.should_be_learned()
-        should_review = mastery.should_be_reviewed()
+    def sync_card_learned(self, card, save=True):
+        """
+        Aligne le statut "learned" de la carte sur le niveau de maîtrise.
 
-        if should_learn and not performance.card.learned:
-            performance.card.learned = True
-            performance.card.save(update_fields=['learned'])
-        elif should_review and performance.card.learned:
-            performance.card.learned = False
-            performance.card.save(update_fields=['learned'])
+        Args:
+            card (Flashcard): La carte à mettre à jour
+            save (bool): Sauvegarder immédiatement la carte si elle change
 
-        return mastery
\ No newline at end of file
+        Returns:
+            bool: True si la carte a été modifiée
+        """
+        if self.should_be_learned() and not card.learned:
+            card.learned = True
+        elif self.should_be_reviewed() and card.learned:
+            card.learned = False
+        else:
+            return False
+        if save:
+            card.save(update_fields=['learned'])
+        return True
@@ -5,7 +5,9 @@ from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 import logging
+import zoneinfo
 
 logger = logging.getLogger(__name__)
 
@@ -125,6 +127,14 @@ class RevisionSettings(models.Model):
         help_text="Heure des rappels quotidiens"
     )
     
+    next_reminder_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Prochain rappel (UTC), calculé depuis reminder_time et le fuseau de l'utilisateur"
+    )
+    
     notification_frequency = models.CharField(
         max_length=20,
         choices=NOTIFICATION_FREQUENCY_CHOICES,
@@ -299,6 +309,9 @@ class RevisionSettings(models.Model):
         app_label = 'revision'
         verbose_name = "Paramètres de révision"
         verbose_name_plural = "Paramètres de révision"
+        indexes = [
+            models.Index(fields=['daily_reminder_enabled', 'reminder_time']),  # Sélection des rappels à envoyer
+        ]
         
     def __str__(self):
         return f"Paramètres de révision - {self.user.username}"
@@ -422,6 +435,7 @@ class RevisionSettings(models.Model):
         self.full_clean()  # Appelle clean() pour validation
         
         # Log les changements importants
+        old_instance = None
         if self.pk:  # Mise à jour existante
             try:
                 old_instance = RevisionSettings.objects.get(pk=self.pk)
@@ -434,8 +448,64 @@ class RevisionSettings(models.Model):
         else:
             logger.info(f"Creating new revision settings for user {self.user.username}")
         
+        # Replanifier le prochain rappel si l'heure ou l'activation a changé
+        if (
+            old_instance is None
+            or old_instance.reminder_time != self.reminder_time
+            or old_instance.daily_reminder_enabled != self.daily_reminder_enabled
+            or (self.daily_reminder_enabled and self.next_reminder_at is None)
+        ):
+            self.next_reminder_at = self.compute_next_reminder_at()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'next_reminder_at'}
+        
         super().save(*args, **kwargs)
     
+    def compute_next_reminder_at(self, after=None):
+        """
+        Calcule la prochaine occurrence de ``reminder_time`` dans le fuseau de
+        l'utilisateur, strictement après ``after``
+        
+        Args:
+            after: Instant de référence (maintenant par défaut)
+            
+        Returns:
+            datetime UTC, ou None si les rappels sont désactivés
+        """
+        if not self.daily_reminder_enabled:
+            return None
+        
+        after = after or timezone.now()
+        user_timezone = self._user_timezone()
+        reminder_time = self._reminder_time()
+        
+        local_after = after.astimezone(user_timezone)
+        candidate = datetime.combine(local_after.date(), reminder_time, tzinfo=user_timezone)
+        if candidate <= local_after:
+            candidate = datetime.combine(local_after.date() + timedelta(days=1), reminder_time, tzinfo=user_timezone)
+        return candidate.astimezone(dt_timezone.utc)
+    
+    def reminder_matches_timezone(self):
+        """
+        Indique si ``next_reminder_at`` tombe à ``reminder_time`` dans le fuseau
+        actuel de l'utilisateur (faux après un changement de fuseau)
+        """
+        if self.next_reminder_at is None:
+            return True
+        local_reminder = self.next_reminder_at.astimezone(self._user_timezone())
+        return local_reminder.time().replace(tzinfo=None) == self._reminder_time()
+    
+    def _user_timezone(self):
+        user_timezone = getattr(self.user, 'timezone', None) or timezone.get_default_timezone()
+        if isinstance(user_timezone, str):
+            user_timezone = zoneinfo.ZoneInfo(user_timezone)
+        return user_timezone
+    
+    def _reminder_time(self):
+        if isinstance(self.reminder_time, str):
+            return time.fromisoformat(self.reminder_time)
+        return self.reminder_time
+    
     def reset_to_defaults(self):
         """
         Remet tous les paramètres aux valeurs par défaut
@@ -443,7 +513,7 @@ class RevisionSettings(models.Model):
         logger.info(f"Resetting revision settings to defaults for user {self.user.username}")
         
         # Champs à exclure lors du reset (timestamps, clés étrangères)
-        excluded_fields = ['user', 'created_at', 'updated_at', 'id']
+        excluded_fields = ['user', 'created_at', 'updated_at', 'id', 'next_reminder_at']
         
         # Récupérer les valeurs par défaut du modèle
         for field in self._meta.fields:
@@ -13,6 +13,8 @@ class FlashcardSerializer(serializers.ModelSerializer):
     # Nouveaux champs calculés pour le système d'apprentissage
     learning_progress_percentage = serializers.SerializerMethodField()
     reviews_remaining_to_learn = serializers.SerializerMethodField()
+    # Extrait surligné, seulement dans les résultats de recherche
+    search_headline = serializers.CharField(read_only=True)
     
     class Meta:
         model = Flashcard
@@ -21,7 +23,8 @@ class FlashcardSerializer(serializers.ModelSerializer):
             'learned', 'created_at', 'updated_at', 'last_reviewed', 'review_count', 
             'next_review', 'days_since_last_review', 'is_due',
             'correct_reviews_count', 'total_reviews_count',
-            'learning_progress_percentage', 'reviews_remaining_to_learn'
+            'learning_progress_percentage', 'reviews_remaining_to_learn',
+            'search_headline'
         ]
         read_only_fields = [
             'created_at', 'updated_at', 'last_reviewed', 
@@ -7,7 +7,7 @@ import uuid
 from datetime import timedelta
 from django.utils import timezone
 from django.db.models import Avg, Count, Q, F
-from django.db import models
+from django.db import models, transaction
 from apps.revision.models import CardPerformance, CardMastery, StudyMode, DifficultyLevel, Flashcard
 
 
@@ -46,8 +46,8 @@ class AdaptiveLearningService:
         if not session_id:
             session_id = str(uuid.uuid4())
 
-        # Créer la performance
-        performance = CardPerformance.objects.create(
+        # Créer la performance (insérée par update_from_performance avec ses scores)
+        performance = CardPerformance(
             card=card,
             user=user,
             study_mode=study_mode,
@@ -62,6 +62,106 @@ class AdaptiveLearningService:
 
         return performance, mastery
 
+    @staticmethod
+    def record_performances_batch(user, answers, session_id=None):
+        """
+        Enregistre un lot de réponses en une seule transaction.
+
+        Les performances sont insérées avec ``bulk_create`` ; leurs effets sur
+        chaque CardMastery sont fusionnés en mémoire (dans l'ordre des réponses)
+        puis écrits avec ``bulk_create`` / ``bulk_update``. Les réponses dont la
+        ``client_answer_id`` est déjà connue sont ignorées, ce qui rend les
+        renvois du client idempotents.
+
+        Args:
+            user (User): L'utilisateur
+            answers (list[dict]): Réponses avec les clés ``card`` (Flashcard),
+                ``study_mode``, ``difficulty``, ``was_correct`` et, en option,
+                ``response_time_seconds``, ``client_answer_id``, ``answered_at``
+            session_id (str, optional): ID de session commun au lot
+
+        Returns:
+            dict: ``performances`` (créées), ``masteries`` (par card_id),
+            ``duplicates`` (client_answer_id ignorées)
+        """
+        if not session_id:
+            session_id = str(uuid.uuid4())
+
+        # Idempotence : doublons dans le lot et réponses déjà enregistrées
+        client_ids = {a['client_answer_id'] for a in answers if a.get('client_answer_id')}
+        known_ids = set(CardPerformance.objects.filter(
+            user=user, client_answer_id__in=client_ids
+        ).values_list('client_answer_id', flat=True)) if client_ids else set()
+
+        duplicates = []
+        pending = []
+        for answer in answers:
+            client_answer_id = answer.get('client_answer_id')
+            if client_answer_id:
+                if client_answer_id in known_ids:
+                    duplicates.append(client_answer_id)
+                    continue
+                known_ids.add(client_answer_id)
+            pending.append(answer)
+
+        if not pending:
+            return {'performances': [], 'masteries': {}, 'duplicates': duplicates}
+
+        now = timezone.now()
+        for answer in pending:
+            if answer.get('answered_at') and timezone.is_naive(answer['answered_at']):
+                answer['answered_at'] = timezone.make_aware(answer['answered_at'])
+        pending.sort(key=lambda a: a.get('answered_at') or now)
+        cards = {answer['card'].id: answer['card'] for answer in pending}
+
+        with transaction.atomic():
+            # Les CardMastery manquants sont créés d'abord, sans erreur si un
+            # lot concurrent les crée en même temps, puis tous sont verrouillés
+            CardMastery.objects.bulk_create(
+                [CardMastery(card=card) for card in cards.values()], ignore_conflicts=True
+            )
+            masteries = {
+                mastery.card_id: mastery
+                for mastery in CardMastery.objects.select_for_update().filter(card_id__in=cards.keys())
+            }
+
+            performances = []
+            update_fields = {'updated_at'}
+            for answer in pending:
+                card = answer['card']
+                mastery = masteries[card.id]
+                performance = CardPerformance(
+                    card=card,
+                    user=user,
+                    study_mode=answer['study_mode'],
+                    difficulty=answer['difficulty'],
+                    was_correct=answer['was_correct'],
+                    response_time_seconds=answer.get('response_time_seconds'),
+                    session_id=session_id,
+                    client_answer_id=answer.get('client_answer_id'),
+                    created_at=answer.get('answered_at') or now,
+                    confidence_before=mastery.confidence_score,
+                )
+                update_fields.update(mastery.apply_performance(performance))
+                performance.confidence_after = mastery.confidence_score
+                performances.append(performance)
+
+            CardPerformance.objects.bulk_create(performances)
+
+            for mastery in masteries.values():
+                mastery.updated_at = now
+            CardMastery.objects.bulk_update(list(masteries.values()), sorted(update_fields))
+
+            # Statut "learned" des cartes, en une seule requête
+            changed_cards = [
+                card for card_id, card in cards.items()
+                if masteries[card_id].sync_card_learned(card, save=False)
+            ]
+            if changed_cards:
+                Flashcard.objects.bulk_update(changed_cards, ['learned'])
+
+        return {'performances': performances, 'masteries': masteries, 'duplicates': duplicates}
+
     @staticmethod
     def get_cards_to_review(user, deck=None, limit=20):
         """
@@ -3,10 +3,11 @@
 Service pour gérer les rappels de révision
 """
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time as dt_time
 from typing import Optional, Dict, Any, List
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q, Count
 from apps.revision.models.settings_models import RevisionSettings
 from apps.revision.models.revision_flashcard import FlashcardDeck, Flashcard
@@ -19,11 +20,21 @@ logger = logging.getLogger(__name__)
 class RevisionReminderService:
     """Service pour gérer les rappels de révision"""
     
+    # Nombre d'utilisateurs traités par requête d'agrégation
+    REMINDER_BATCH_SIZE = 500
+    REMINDER_TOLERANCE_MINUTES = 5
+    # Au-delà, un rappel manqué (worker arrêté) est replanifié sans être envoyé
+    MAX_REMINDER_DELAY = timedelta(hours=2)
+    
     @staticmethod
     def send_daily_reminders(dry_run: bool = False, test_user: Optional[str] = None) -> Dict[str, Any]:
         """
         Envoie les rappels quotidiens de révision
         
+        Seuls les utilisateurs dont l'heure de rappel tombe dans la fenêtre
+        courante sont chargés (une requête indexée), puis les cartes dues sont
+        comptées par lots avec une seule agrégation groupée par lot.
+        
         Args:
             dry_run: Si True, simule l'envoi sans vraiment envoyer
             test_user: Si spécifié, ne traite que cet utilisateur
@@ -42,38 +53,211 @@ class RevisionReminderService:
             'errors': []
         }
         
+        settings_query = RevisionReminderService._settings_at_reminder_time(current_time)
+        
         # Filtrer les utilisateurs
         if test_user:
-            users_query = User.objects.filter(
-                Q(username=test_user) | Q(email=test_user),
-                is_active=True
+            settings_query = settings_query.filter(
+                Q(user__username=test_user) | Q(user__email=test_user)
             )
-        else:
-            users_query = User.objects.filter(is_active=True)
         
-        for user in users_query.iterator():
+        batch = []
+        for revision_settings in settings_query.iterator(chunk_size=RevisionReminderService.REMINDER_BATCH_SIZE):
+            batch.append(revision_settings)
+            if len(batch) >= RevisionReminderService.REMINDER_BATCH_SIZE:
+                RevisionReminderService._process_reminder_batch(batch, current_time, dry_run, stats)
+                if not dry_run:
+                    RevisionReminderService.reschedule_reminders(batch, current_time)
+                batch = []
+        
+        if batch:
+            RevisionReminderService._process_reminder_batch(batch, current_time, dry_run, stats)
+            if not dry_run:
+                RevisionReminderService.reschedule_reminders(batch, current_time)
+        
+        return stats
+    
+    @staticmethod
+    def send_due_reminders(dry_run: bool = False, batch_size: int = REMINDER_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Envoie les rappels dont ``next_reminder_at`` est échu, du plus ancien au plus récent
+        
+        Les lots sont verrouillés (``skip_locked``) et replanifiés avant l'envoi :
+        plusieurs workers peuvent tourner en parallèle sans doublon. Un rappel
+        en retard de plus de ``MAX_REMINDER_DELAY`` est replanifié sans envoi.
+        
+        Args:
+            dry_run: Si True, simule l'envoi sans envoyer ni replanifier
+            batch_size: Nombre d'utilisateurs par lot
+            
+        Returns:
+            Dictionnaire avec les statistiques d'envoi
+        """
+        current_time = timezone.now()
+        stats = {
+            'users_checked': 0,
+            'notifications_sent': 0,
+            'users_with_settings': 0,
+            'users_with_reminders_enabled': 0,
+            'users_at_reminder_time': 0,
+            'users_with_cards_due': 0,
+            'reminders_skipped_late': 0,
+            'errors': []
+        }
+        
+        due_query = RevisionSettings.objects.filter(
+            daily_reminder_enabled=True,
+            next_reminder_at__lte=current_time,
+            user__is_active=True
+        ).select_related('user').order_by('next_reminder_at', 'pk')
+        
+        if dry_run:
+            batch = list(due_query[:batch_size])
+            RevisionReminderService._process_reminder_batch(batch, current_time, dry_run, stats)
+            return stats
+        
+        while True:
+            with transaction.atomic():
+                batch = list(due_query.select_for_update(skip_locked=True, of=('self',))[:batch_size])
+                scheduled_at = {revision_settings.pk: revision_settings.next_reminder_at for revision_settings in batch}
+                RevisionReminderService.reschedule_reminders(batch, current_time)
+            
+            on_time = [
+                revision_settings for revision_settings in batch
+                if current_time - scheduled_at[revision_settings.pk] <= RevisionReminderService.MAX_REMINDER_DELAY
+            ]
+            stats['reminders_skipped_late'] += len(batch) - len(on_time)
+            RevisionReminderService._process_reminder_batch(on_time, current_time, dry_run, stats)
+            
+            if len(batch) < batch_size:
+                break
+        
+        return stats
+    
+    @staticmethod
+    def reschedule_reminders(batch: List[RevisionSettings], current_time: Optional[datetime] = None) -> None:
+        """
+        Avance ``next_reminder_at`` à la prochaine occurrence après ``current_time``
+        
+        Args:
+            batch: Paramètres de révision (avec ``user`` préchargé)
+            current_time: Instant de référence (maintenant par défaut)
+        """
+        if not batch:
+            return
+        current_time = current_time or timezone.now()
+        for revision_settings in batch:
+            revision_settings.next_reminder_at = revision_settings.compute_next_reminder_at(after=current_time)
+        RevisionSettings.objects.bulk_update(batch, ['next_reminder_at'])
+    
+    @staticmethod
+    def _process_reminder_batch(batch: List[RevisionSettings], current_time: datetime,
+                                dry_run: bool, stats: Dict[str, Any]) -> None:
+        """
+        Traite un lot d'utilisateurs à l'heure de leur rappel
+        
+        Args:
+            batch: Paramètres de révision (avec ``user`` préchargé)
+            current_time: Heure actuelle
+            dry_run: Mode simulation
+            stats: Statistiques d'envoi, mises à jour en place
+        """
+        due_counts = RevisionReminderService.get_cards_due_counts(
+            [revision_settings.user_id for revision_settings in batch], current_time
+        )
+        
+        for revision_settings in batch:
+            user = revision_settings.user
             stats['users_checked'] += 1
+            stats['users_with_settings'] += 1
+            stats['users_with_reminders_enabled'] += 1
+            stats['users_at_reminder_time'] += 1
+            
+            cards_due_count = due_counts.get(user.id, 0)
+            if cards_due_count == 0:
+                continue
+            stats['users_with_cards_due'] += 1
+            
+            if dry_run:
+                continue
             
             try:
-                result = RevisionReminderService._process_user_reminder(
-                    user, current_time, dry_run
-                )
-                
-                # Mettre à jour les statistiques
-                for key in ['users_with_settings', 'users_with_reminders_enabled', 
-                           'users_at_reminder_time', 'users_with_cards_due']:
-                    if result.get(key):
-                        stats[key] += 1
-                
-                if result.get('notification_sent'):
+                if RevisionReminderService._send_revision_reminder(user, cards_due_count, revision_settings):
                     stats['notifications_sent'] += 1
-                
             except Exception as e:
                 error_msg = f"Erreur pour {user.username}: {str(e)}"
                 stats['errors'].append(error_msg)
                 logger.error(error_msg)
+    
+    @staticmethod
+    def _reminder_window(current_time: datetime, tolerance_minutes: int = REMINDER_TOLERANCE_MINUTES):
+        """
+        Bornes (heures) de la fenêtre de rappel autour de l'heure actuelle
         
-        return stats
+        La fenêtre est limitée à la journée courante, comme ``_is_reminder_time``.
+        
+        Args:
+            current_time: Heure actuelle
+            tolerance_minutes: Tolérance en minutes autour de l'heure du rappel
+            
+        Returns:
+            Tuple (start_time, end_time)
+        """
+        tolerance = timedelta(minutes=tolerance_minutes)
+        start = current_time - tolerance
+        end = current_time + tolerance
+        start_time = start.time() if start.date() == current_time.date() else dt_time.min
+        end_time = end.time() if end.date() == current_time.date() else dt_time.max
+        return start_time, end_time
+    
+    @staticmethod
+    def _settings_at_reminder_time(current_time: datetime,
+                                   tolerance_minutes: int = REMINDER_TOLERANCE_MINUTES):
+        """
+        Paramètres des utilisateurs actifs dont le rappel tombe maintenant
+        
+        Args:
+            current_time: Heure actuelle
+            tolerance_minutes: Tolérance en minutes autour de l'heure du rappel
+            
+        Returns:
+            QuerySet de RevisionSettings avec l'utilisateur préchargé
+        """
+        start_time, end_time = RevisionReminderService._reminder_window(current_time, tolerance_minutes)
+        return RevisionSettings.objects.filter(
+            daily_reminder_enabled=True,
+            reminder_time__gte=start_time,
+            reminder_time__lte=end_time,
+            user__is_active=True
+        ).select_related('user').order_by('pk')
+    
+    @staticmethod
+    def get_cards_due_counts(user_ids: List[int], current_time: Optional[datetime] = None) -> Dict[int, int]:
+        """
+        Compte les cartes dues pour plusieurs utilisateurs en une seule requête
+        
+        Une carte est due si elle n'a jamais été planifiée ou si sa date de
+        révision est passée, dans un deck actif de l'utilisateur.
+        
+        Args:
+            user_ids: IDs des utilisateurs
+            current_time: Heure de référence (maintenant par défaut)
+            
+        Returns:
+            Dictionnaire {user_id: nombre de cartes dues}, sans les utilisateurs à 0
+        """
+        if not user_ids:
+            return {}
+        current_time = current_time or timezone.now()
+        
+        rows = Flashcard.objects.filter(
+            deck__user_id__in=user_ids,
+            deck__is_active=True
+        ).filter(
+            Q(next_review__isnull=True) | Q(next_review__lte=current_time)
+        ).order_by().values('deck__user_id').annotate(cards_due=Count('id'))
+        
+        return {row['deck__user_id']: row['cards_due'] for row in rows}
     
     @staticmethod
     def _process_user_reminder(user: User, current_time: datetime, dry_run: bool) -> Dict[str, Any]:
@@ -114,7 +298,7 @@ class RevisionReminderService:
         result['users_at_reminder_time'] = True
         
         # Vérifier s'il y a des cartes à réviser
-        cards_due_count = RevisionReminderService._get_cards_due_count(user)
+        cards_due_count = RevisionReminderService._get_cards_due_count(user, current_time)
         if cards_due_count == 0:
             return result
         result['users_with_cards_due'] = True
@@ -159,34 +343,19 @@ class RevisionReminderService:
         return time_diff <= tolerance
     
     @staticmethod
-    def _get_cards_due_count(user: User) -> int:
+    def _get_cards_due_count(user: User, current_time: Optional[datetime] = None) -> int:
         """
         Calcule le nombre de cartes à réviser pour un utilisateur
         
         Args:
             user: Utilisateur
+            current_time: Heure de référence (maintenant par défaut)
             
         Returns:
             Nombre de cartes à réviser
         """
         try:
-            # Obtenir tous les decks actifs de l'utilisateur
-            active_decks = FlashcardDeck.objects.filter(
-                user=user,
-                is_active=True
-            )
-            
-            if not active_decks.exists():
-                return 0
-            
-            # Compter les cartes qui ont besoin d'être révisées
-            cards_due = Flashcard.objects.filter(
-                deck__in=active_decks,
-                deck__is_active=True
-            ).count()
-            
-            return cards_due
-            
+            return RevisionReminderService.get_cards_due_counts([user.id], current_time).get(user.id, 0)
         except Exception as e:
             logger.error(f"Erreur lors du calcul des cartes dues pour {user.username}: {e}")
             return 0
@@ -297,20 +466,7 @@ class RevisionReminderService:
         Returns:
             Liste des utilisateurs éligibles
         """
-        current_time = timezone.now()
-        current_time_only = current_time.time()
-        
-        # Créer une fenêtre de temps avec tolérance
-        tolerance = timedelta(minutes=tolerance_minutes)
-        start_time = (current_time - tolerance).time()
-        end_time = (current_time + tolerance).time()
-        
-        # Obtenir les utilisateurs avec des paramètres de révision actifs
-        users = User.objects.filter(
-            is_active=True,
-            revision_settings__daily_reminder_enabled=True,
-            revision_settings__reminder_time__gte=start_time,
-            revision_settings__reminder_time__lte=end_time
-        ).select_related('revision_settings')
-        
-        return list(users)
\ No newline at end of file
+        settings_query = RevisionReminderService._settings_at_reminder_time(
+            timezone.now(), tolerance_minutes
+        )
+        return [revision_settings.user for revision_settings in settings_query]
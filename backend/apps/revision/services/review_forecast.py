@@ -0,0 +1,143 @@
+# backend/apps/revision/services/review_forecast.py
+"""
+Prévision de la charge de révision à partir de ``Flashcard.next_review``.
+
+Les échéances sont regroupées par (jour, intervalle) en une seule requête,
+puis chaque groupe est projeté en avant avec son intervalle déclaré
+(``next_review - last_reviewed``), ce qui correspond à une réponse « good »
+de ``SpacedRepetitionMixin`` (facteur d'aisance 1.0).
+
+Le résultat est déterministe : il est mis en cache par utilisateur pour
+l'horizon maximal et invalidé à chaque révision d'une carte.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, F, IntegerField
+from django.db.models.functions import Cast, Floor, TruncDate
+from django.utils import timezone
+
+from apps.revision.models import Flashcard
+from .review_queue import DaysSince
+
+
+class ReviewForecastService:
+    """
+    Prévision journalière des cartes à réviser.
+    """
+
+    # Horizon calculé et mis en cache ; les horizons plus courts en sont des tranches
+    MAX_HORIZON_DAYS = 365
+    CACHE_TIMEOUT = 6 * 3600
+    CACHE_KEY = 'revision_forecast_{user_id}'
+
+    @classmethod
+    def cache_key(cls, user_id):
+        return cls.CACHE_KEY.format(user_id=user_id)
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """Supprime la prévision en cache (appelé après chaque révision)."""
+        cache.delete(cls.cache_key(user_id))
+
+    @classmethod
+    def get_forecast(cls, user, days_ahead=30):
+        """
+        Retourne la prévision pour les ``days_ahead`` prochains jours.
+
+        Args:
+            user (User): L'utilisateur
+            days_ahead (int): Horizon en jours (borné à MAX_HORIZON_DAYS)
+
+        Returns:
+            dict: ``days_ahead``, ``due_today``, ``forecast`` (liste de
+            ``{'date', 'predicted_reviews', 'confidence'}``) et ``avg_daily_base``
+        """
+        days_ahead = max(1, min(int(days_ahead), cls.MAX_HORIZON_DAYS))
+        today = timezone.localdate()
+
+        buckets = cls._get_daily_buckets(user, today)
+
+        forecast = []
+        for i in range(1, days_ahead + 1):
+            forecast.append({
+                'date': (today + timedelta(days=i)).isoformat(),
+                'predicted_reviews': buckets[i],
+                'confidence': 'high' if i < 7 else 'medium' if i < 30 else 'low',
+            })
+
+        total = sum(entry['predicted_reviews'] for entry in forecast)
+        return {
+            'days_ahead': days_ahead,
+            'due_today': buckets[0],
+            'forecast': forecast,
+            'avg_daily_base': round(total / days_ahead, 1),
+        }
+
+    @classmethod
+    def _get_daily_buckets(cls, user, today):
+        """
+        Liste des échéances par jour (index 0 = aujourd'hui, retards inclus).
+
+        Mise en cache pour la journée courante : tous les horizons réutilisent
+        le même tableau sans relire la table des cartes.
+        """
+        key = cls.cache_key(user.id)
+        cached = cache.get(key)
+        if cached and cached['date'] == today.isoformat():
+            return cached['buckets']
+
+        buckets = cls.compute_daily_buckets(user, today)
+        cache.set(key, {'date': today.isoformat(), 'buckets': buckets}, cls.CACHE_TIMEOUT)
+        return buckets
+
+    @classmethod
+    def compute_daily_buckets(cls, user, today, horizon=None):
+        """
+        Calcule les échéances par jour avec une seule requête groupée.
+
+        Args:
+            user (User): L'utilisateur
+            today (date): Jour de référence (index 0)
+            horizon (int, optional): Nombre de jours à simuler
+
+        Returns:
+            list[int]: ``horizon + 1`` compteurs journaliers
+        """
+        horizon = horizon or cls.MAX_HORIZON_DAYS
+        buckets = [0] * (horizon + 1)
+
+        for group in cls._due_groups(user, today, horizon):
+            due_date = group['due_date']
+            offset = max(0, (due_date - today).days) if due_date else 0
+            interval = group['interval_days']
+            count = group['count']
+
+            while offset <= horizon:
+                buckets[offset] += count
+                if interval is None:
+                    # Intervalle inconnu (carte jamais révisée) : pas de projection
+                    break
+                offset += max(1, interval)
+
+        return buckets
+
+    @staticmethod
+    def _due_groups(user, today, horizon):
+        window_end = timezone.make_aware(datetime.combine(today + timedelta(days=horizon + 1), time.min))
+        return (
+            Flashcard.objects.filter(
+                user=user,
+                deck__is_active=True,
+                deck__is_archived=False,
+                next_review__isnull=False,
+                next_review__lt=window_end,
+            )
+            .annotate(
+                due_date=TruncDate('next_review'),
+                interval_days=Cast(Floor(DaysSince(F('next_review'), F('last_reviewed'))), IntegerField()),
+            )
+            .values('due_date', 'interval_days')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
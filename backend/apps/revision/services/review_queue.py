@@ -0,0 +1,248 @@
+# backend/apps/revision/services/review_queue.py
+"""
+Moteur de file de révision côté base de données.
+
+Calcule le statut, l'échéance, le retard et la priorité des cartes via des
+annotations SQL, puis sélectionne uniquement les K cartes de la session.
+Le coût de construction d'une session ne dépend plus de la taille du deck.
+"""
+from datetime import timedelta
+
+from django.db.models import (
+    BooleanField, Case, CharField, Count, F, FloatField, Func, IntegerField,
+    Q, Value, When, DateTimeField,
+)
+from django.db.models.functions import Cast, Floor, Greatest, Least
+from django.utils import timezone
+
+
+class DaysSince(Func):
+    """
+    Nombre de jours (fractionnaire) écoulés entre ``reference`` et ``expression``.
+
+    Équivalent SQL de ``(reference - expression).total_seconds() / 86400``.
+    """
+    output_field = FloatField()
+    arity = 2
+
+    def __init__(self, reference, expression, **extra):
+        if not hasattr(reference, 'resolve_expression'):
+            reference = Value(reference, output_field=DateTimeField())
+        super().__init__(reference, expression, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # PostgreSQL (backend de production)
+        return super().as_sql(
+            compiler, connection,
+            template='(EXTRACT(EPOCH FROM (%(expressions)s)) / 86400.0)',
+            arg_joiner=' - ',
+            **extra_context
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection,
+            template='(julianday(%(expressions)s))',
+            arg_joiner=') - julianday(',
+            **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        reference, expression = self.get_source_expressions()
+        reference_sql, reference_params = compiler.compile(reference)
+        expression_sql, expression_params = compiler.compile(expression)
+        return (
+            f'(TIMESTAMPDIFF(MICROSECOND, {expression_sql}, {reference_sql}) / 86400000000.0)',
+            (*expression_params, *reference_params),
+        )
+
+
+class ReviewQueueService:
+    """
+    File de révision d'un deck, calculée dans la base de données.
+
+    Reproduit les règles de ``SpacedRepetitionMixin._analyze_card`` /
+    ``_calculate_card_priority`` sous forme d'expressions SQL afin de ne
+    charger que les cartes réellement retenues pour la session.
+    """
+
+    # Nombre de révisions au-delà duquel une carte apprise devient « mature »
+    MATURE_REVIEWS_THRESHOLD = 5
+
+    DEFAULT_PRIORITY_WEIGHTS = {
+        'overdue_days': 2.0,
+        'difficulty': 1.5,
+        'learning_progress': 1.2,
+    }
+
+    def __init__(self, deck, now=None, priority_weights=None, new_cards_priority=3.0):
+        self.deck = deck
+        self.now = now or timezone.now()
+        self.priority_weights = {**self.DEFAULT_PRIORITY_WEIGHTS, **(priority_weights or {})}
+        self.new_cards_priority = new_cards_priority
+
+    # ------------------------------------------------------------------
+    # Filtres
+    # ------------------------------------------------------------------
+
+    def base_queryset(self):
+        """Cartes du deck, sans tri par défaut (le tri est fixé par la sélection)."""
+        return self.deck.flashcards.select_related('deck').order_by()
+
+    def due_q(self):
+        """Carte à réviser maintenant (jamais planifiée ou échéance passée)."""
+        return Q(next_review__isnull=True) | Q(next_review__lte=self.now)
+
+    def overdue_q(self):
+        """Carte en retard d'au moins un jour complet (``days_overdue > 0``)."""
+        return Q(next_review__lte=self.now - timedelta(days=1))
+
+    def new_q(self):
+        return Q(total_reviews_count=0)
+
+    def reviewable_q(self, review_ahead_days=0):
+        """Carte due, ou due dans les ``review_ahead_days`` prochains jours."""
+        if review_ahead_days > 0:
+            # next_review_in = (next_review - now).days <= review_ahead_days
+            horizon = self.now + timedelta(days=review_ahead_days + 1)
+            return Q(next_review__isnull=True) | Q(next_review__lt=horizon)
+        return self.due_q()
+
+    # ------------------------------------------------------------------
+    # Annotations
+    # ------------------------------------------------------------------
+
+    def status_expression(self):
+        return Case(
+            When(total_reviews_count=0, then=Value('new')),
+            When(learned=False, then=Value('learning')),
+            When(total_reviews_count__lt=self.MATURE_REVIEWS_THRESHOLD, then=Value('young')),
+            default=Value('mature'),
+            output_field=CharField(),
+        )
+
+    def _success_rate_expression(self):
+        return Cast('correct_reviews_count', FloatField()) / Cast('total_reviews_count', FloatField())
+
+    def difficulty_expression(self):
+        review_factor = Least(Cast('total_reviews_count', FloatField()) / 10.0, Value(1.0))
+        difficulty = (
+            (Value(1.0) - self._success_rate_expression()) * review_factor
+            + Value(0.5) * (Value(1.0) - review_factor)
+        )
+        return Case(
+            When(total_reviews_count=0, then=Value(0.5)),
+            default=Greatest(Value(0.0), Least(Value(1.0), difficulty)),
+            output_field=FloatField(),
+        )
+
+    def learning_progress_expression(self):
+        review_progress = Least(Cast('total_reviews_count', FloatField()) / 8.0, Value(1.0))
+        return Case(
+            When(total_reviews_count=0, then=Value(0)),
+            When(learned=True, then=Value(100)),
+            default=Cast(Floor(self._success_rate_expression() * review_progress * 100.0), IntegerField()),
+            output_field=IntegerField(),
+        )
+
+    def days_overdue_expression(self):
+        return Case(
+            When(self.overdue_q(), then=Cast(Floor(DaysSince(self.now, F('next_review'))), IntegerField())),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+    def annotate(self, queryset):
+        """Ajoute les colonnes ``sr_*`` calculées par la base de données."""
+        queryset = queryset.annotate(
+            sr_status=self.status_expression(),
+            sr_is_due=Case(When(self.due_q(), then=Value(True)), default=Value(False), output_field=BooleanField()),
+            sr_days_overdue=self.days_overdue_expression(),
+            sr_difficulty=self.difficulty_expression(),
+            sr_learning_progress=self.learning_progress_expression(),
+        )
+        weights = self.priority_weights
+        return queryset.annotate(
+            sr_priority=(
+                Cast('sr_days_overdue', FloatField()) * weights['overdue_days']
+                + Case(When(sr_is_due=True, then=Value(5.0)), default=Value(0.0), output_field=FloatField())
+                + F('sr_difficulty') * weights['difficulty']
+                + Case(
+                    When(
+                        sr_status='learning',
+                        then=(Value(1.0) - Cast('sr_learning_progress', FloatField()) / 100.0)
+                        * weights['learning_progress'],
+                    ),
+                    When(sr_status='new', then=Value(float(self.new_cards_priority))),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+            )
+        )
+
+    # ------------------------------------------------------------------
+    # Agrégats
+    # ------------------------------------------------------------------
+
+    def deck_counters(self):
+        """
+        Compteurs de statut et prévision d'échéances en une seule requête.
+
+        Returns:
+            dict: total, new, learning, young, mature, forecast_today,
+            forecast_tomorrow, forecast_this_week, forecast_later
+        """
+        now = self.now
+        tomorrow = now + timedelta(days=1)
+        week_end = now + timedelta(days=7)
+        reviewed = Q(total_reviews_count__gt=0)
+        counters = self.base_queryset().aggregate(
+            total=Count('id'),
+            new=Count('id', filter=self.new_q()),
+            learning=Count('id', filter=reviewed & Q(learned=False)),
+            young=Count('id', filter=reviewed & Q(learned=True, total_reviews_count__lt=self.MATURE_REVIEWS_THRESHOLD)),
+            mature=Count('id', filter=Q(learned=True, total_reviews_count__gte=self.MATURE_REVIEWS_THRESHOLD)),
+            forecast_today=Count('id', filter=Q(next_review__lte=now)),
+            forecast_tomorrow=Count('id', filter=Q(next_review__gt=now, next_review__lte=tomorrow)),
+            forecast_this_week=Count('id', filter=Q(next_review__gt=tomorrow, next_review__lte=week_end)),
+            forecast_later=Count('id', filter=Q(next_review__gt=week_end)),
+        )
+        return counters
+
+    # ------------------------------------------------------------------
+    # Sélection top-K
+    # ------------------------------------------------------------------
+
+    def _top(self, queryset, limit):
+        if limit <= 0:
+            return []
+        return list(self.annotate(queryset).order_by('-sr_priority', 'id')[:limit])
+
+    def select_session_cards(self, max_cards=20, new_cards_limit=5, review_ahead_days=0,
+                             prioritize_overdue=True):
+        """
+        Sélectionne les cartes de la session, dans l'ordre de priorité.
+
+        Même règles que ``SpacedRepetitionMixin._select_session_cards`` :
+        cartes en retard d'abord (si demandé), puis cartes dues, puis au plus
+        ``new_cards_limit`` nouvelles cartes, le tout borné à ``max_cards``.
+        Chaque requête est limitée par un ``LIMIT`` : on ne charge jamais plus
+        de ``max_cards`` lignes par catégorie.
+
+        Returns:
+            list[Flashcard]: cartes annotées avec les colonnes ``sr_*``
+        """
+        base = self.base_queryset()
+        due_reviewed = base.filter(self.due_q()).exclude(self.new_q())
+
+        selected = []
+        if prioritize_overdue:
+            selected += self._top(due_reviewed.filter(self.overdue_q()), max_cards)
+            selected += self._top(due_reviewed.exclude(self.overdue_q()), max_cards - len(selected))
+        else:
+            selected += self._top(due_reviewed, max_cards)
+
+        new_slots = min(new_cards_limit, max_cards - len(selected))
+        selected += self._top(base.filter(self.new_q()).filter(self.reviewable_q(review_ahead_days)), new_slots)
+
+        return selected[:max_cards]
@@ -0,0 +1,170 @@
+# backend/apps/revision/services/settings_cache.py
+"""
+Accès typé et mis en cache aux paramètres de révision d'un utilisateur.
+
+Deux niveaux de cache devant ``RevisionSettings`` :
+- un LRU local au processus (TTL court, borne la désynchronisation entre workers) ;
+- le cache Django partagé.
+
+Les deux niveaux sont invalidés par ``post_save`` / ``post_delete`` sur
+``RevisionSettings`` (voir ``signals.py``).
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields
+from datetime import time as dt_time
+
+from django.core.cache import cache
+
+
+@dataclass(frozen=True)
+class UserRevisionSettings:
+    """Instantané immuable des paramètres utilisés par la répétition espacée"""
+    user_id: int
+    default_study_mode: str = 'spaced'
+    default_difficulty: str = 'normal'
+    default_session_duration: int = 20
+    cards_per_session: int = 20
+    auto_advance: bool = True
+    spaced_repetition_enabled: bool = True
+    initial_interval_easy: int = 4
+    initial_interval_normal: int = 2
+    initial_interval_hard: int = 1
+    required_reviews_to_learn: int = 3
+    reset_on_wrong_answer: bool = False
+    daily_reminder_enabled: bool = True
+    reminder_time: dt_time = dt_time(18, 0)
+    notification_frequency: str = 'daily'
+
+    # Correspondance difficulté (RevisionSettings) -> perception (préférences SR)
+    DIFFICULTY_PERCEPTION = {
+        'easy': 'easy',
+        'normal': 'medium',
+        'hard': 'hard',
+        'expert': 'hard',
+    }
+
+    @classmethod
+    def from_model(cls, revision_settings):
+        values = {
+            field.name: getattr(revision_settings, field.name)
+            for field in fields(cls) if field.name != 'user_id'
+        }
+        # Une instance fraîchement créée garde la valeur par défaut brute ('18:00')
+        if isinstance(values['reminder_time'], str):
+            values['reminder_time'] = dt_time.fromisoformat(values['reminder_time'])
+        return cls(user_id=revision_settings.user_id, **values)
+
+    def interval_settings(self):
+        """Intervalles utilisés par ``SpacedRepetitionMixin._calculate_next_interval``"""
+        return {
+            'initial_interval_easy': self.initial_interval_easy,
+            'initial_interval_normal': self.initial_interval_normal,
+            'initial_interval_hard': self.initial_interval_hard,
+            'spaced_repetition_enabled': self.spaced_repetition_enabled,
+            'difficulty_perception': self.default_difficulty,
+        }
+
+    def session_preferences(self):
+        """Préférences de session exposées par les vues smart flashcards"""
+        return {
+            'difficulty_perception': self.DIFFICULTY_PERCEPTION.get(self.default_difficulty, 'medium'),
+            'session_size': self.cards_per_session,
+            'new_cards_per_day': max(1, self.cards_per_session // 4),  # 25% new cards
+            'review_ahead_days': 1,  # Could be added to RevisionSettings model later
+            'mixed_order': self.default_study_mode != 'intensive',  # Intensive = ordered
+            'time_pressure': 'relaxed' if self.default_session_duration > 30 else 'normal',
+            'study_mode': self.default_study_mode,
+            'session_duration': self.default_session_duration,
+        }
+
+
+class RevisionSettingsCache:
+    """
+    Cache à deux niveaux des ``UserRevisionSettings``.
+    """
+
+    CACHE_KEY = 'revision_settings_{user_id}'
+    CACHE_TIMEOUT = 3600
+    # Le LRU local n'est pas invalidé dans les autres processus : TTL court
+    LOCAL_TTL = 30
+    LOCAL_MAX_ENTRIES = 2048
+
+    def __init__(self):
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cache_key(self, user_id):
+        return self.CACHE_KEY.format(user_id=user_id)
+
+    def get(self, user):
+        """
+        Retourne les paramètres de l'utilisateur, en créant l'enregistrement si besoin.
+
+        Args:
+            user (User | int): L'utilisateur ou son ID
+
+        Returns:
+            UserRevisionSettings
+        """
+        user_id = getattr(user, 'pk', user)
+
+        settings_snapshot = self._get_local(user_id)
+        if settings_snapshot is not None:
+            return settings_snapshot
+
+        cached = cache.get(self.cache_key(user_id))
+        if cached is not None:
+            settings_snapshot = UserRevisionSettings(**cached)
+        else:
+            settings_snapshot = self._load(user_id)
+            cache.set(self.cache_key(user_id), asdict(settings_snapshot), self.CACHE_TIMEOUT)
+
+        self._set_local(user_id, settings_snapshot)
+        return settings_snapshot
+
+    def invalidate(self, user_id):
+        """Supprime les paramètres des deux niveaux de cache."""
+        with self._lock:
+            self._local.pop(user_id, None)
+        cache.delete(self.cache_key(user_id))
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def _load(self, user_id):
+        from ..models.settings_models import RevisionSettings
+
+        revision_settings = RevisionSettings.objects.filter(user_id=user_id).first()
+        if revision_settings is None:
+            revision_settings, _ = RevisionSettings.objects.get_or_create(user_id=user_id)
+        return UserRevisionSettings.from_model(revision_settings)
+
+    def _get_local(self, user_id):
+        with self._lock:
+            entry = self._local.get(user_id)
+            if entry is None:
+                return None
+            settings_snapshot, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._local[user_id]
+                return None
+            self._local.move_to_end(user_id)
+            return settings_snapshot
+
+    def _set_local(self, user_id, settings_snapshot):
+        with self._lock:
+            self._local[user_id] = (settings_snapshot, time.monotonic() + self.LOCAL_TTL)
+            self._local.move_to_end(user_id)
+            while len(self._local) > self.LOCAL_MAX_ENTRIES:
+                self._local.popitem(last=False)
+
+
+revision_settings_cache = RevisionSettingsCache()
+
+
+def get_revision_settings(user):
+    """Paramètres de révision (typés, mis en cache) d'un utilisateur."""
+    return revision_settings_cache.get(user)
@@ -1,7 +1,7 @@
 """
 Signaux pour l'application Révision
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.conf import settings
 import logging
@@ -19,4 +19,44 @@ def create_revision_settings(sender, instance, created, **kwargs):
             RevisionSettings.objects.create(user=instance)
             logger.info(f"Created revision settings for new user: {instance.username}")
         except Exception as e:
-            logger.error(f"Failed to create revision settings for user {instance.username}: {e}")
\ No newline at end of file
+            logger.error(f"Failed to create revision settings for user {instance.username}: {e}")
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reschedule_revision_reminder(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Replanifie le rappel quotidien quand le fuseau horaire de l'utilisateur change
+    """
+    if created or (update_fields is not None and 'timezone' not in update_fields):
+        return
+    from .models.settings_models import RevisionSettings
+    revision_settings = RevisionSettings.objects.filter(
+        user=instance, daily_reminder_enabled=True, next_reminder_at__isnull=False
+    ).first()
+    if revision_settings is None:
+        return
+    revision_settings.user = instance
+    if not revision_settings.reminder_matches_timezone():
+        revision_settings.next_reminder_at = revision_settings.compute_next_reminder_at()
+        revision_settings.save(update_fields=['next_reminder_at'])
+
+
+@receiver(post_save, sender='revision.Flashcard')
+@receiver(post_delete, sender='revision.Flashcard')
+def invalidate_review_forecast(sender, instance, **kwargs):
+    """
+    Invalide la prévision de révisions en cache quand une carte change
+    (révision, création, suppression)
+    """
+    from .services.review_forecast import ReviewForecastService
+    ReviewForecastService.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender='revision.RevisionSettings')
+@receiver(post_delete, sender='revision.RevisionSettings')
+def invalidate_revision_settings_cache(sender, instance, **kwargs):
+    """
+    Invalide les paramètres de révision en cache quand l'utilisateur les modifie
+    """
+    from .services.settings_cache import revision_settings_cache
+    revision_settings_cache.invalidate(instance.user_id)
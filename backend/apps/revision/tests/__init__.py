@@ -13,4 +13,9 @@ from .test_learning_settings import *
 from .test_learning_integration import *
 from .test_learning_edge_cases import *
 from .test_learning_viewsets import *
-from .test_settings import *
\ No newline at end of file
+from .test_settings import *
+from .test_review_queue import *
+from .test_review_forecast import *
+from .test_card_mastery import *
+from .test_settings_cache import *
+from .test_reminder_service import *
@@ -0,0 +1,209 @@
+# Tests pour la mise à jour incrémentale de CardMastery
+
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from apps.revision.models import (
+    FlashcardDeck, Flashcard, CardPerformance, CardMastery, StudyMode, DifficultyLevel
+)
+from apps.revision.services.adaptive_learning import AdaptiveLearningService
+
+User = get_user_model()
+
+
+class CardMasteryWindowTest(TestCase):
+    """Tests pour la fenêtre glissante des résultats récents"""
+
+    def test_push_outcome_keeps_last_results(self):
+        window = 0
+        self.assertIsNone(CardMastery.window_score(window))
+
+        for was_correct in [True, False, True, True]:
+            window = CardMastery.push_outcome(window, was_correct)
+        self.assertEqual(CardMastery.window_score(window), 0.75)
+
+        for _ in range(CardMastery.RECENT_WINDOW_SIZE):
+            window = CardMastery.push_outcome(window, False)
+        self.assertEqual(CardMastery.window_score(window), 0.0)
+        self.assertEqual(window.bit_length() - 1, CardMastery.RECENT_WINDOW_SIZE)
+
+
+class CardMasteryIncrementalUpdateTest(TestCase):
+    """Tests pour CardMastery.update_from_performance"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='masteryuser',
+            email='mastery@example.com',
+            password='testpass123'
+        )
+        self.deck = FlashcardDeck.objects.create(user=self.user, name="Mastery Deck")
+        self.card = Flashcard.objects.create(
+            user=self.user, deck=self.deck, front_text='hola', back_text='bonjour'
+        )
+
+    def _record(self, was_correct, mode=StudyMode.LEARN):
+        difficulty = DifficultyLevel.MEDIUM if was_correct else DifficultyLevel.WRONG
+        return AdaptiveLearningService.record_performance(
+            self.card, self.user, mode, difficulty, was_correct
+        )
+
+    def test_mode_score_uses_last_ten_answers(self):
+        """Le score du mode correspond aux 10 dernières réponses"""
+        outcomes = [False] * 5 + [True] * 8
+        for was_correct in outcomes:
+            performance, mastery = self._record(was_correct)
+
+        self.assertEqual(mastery.learn_score, 0.8)
+        self.assertEqual(mastery.total_attempts, 13)
+        self.assertEqual(mastery.successful_attempts, 8)
+        self.assertEqual(performance.confidence_after, mastery.confidence_score)
+
+        stored = CardMastery.objects.get(card=self.card)
+        self.assertEqual(stored.learn_window, mastery.learn_window)
+        self.assertEqual(stored.mastery_level, mastery.mastery_level)
+
+    def test_answer_reads_and_writes_mastery_once(self):
+        """Une réponse : une lecture et une écriture du mastery"""
+        self._record(True)
+
+        # SAVEPOINT, lecture, insert performance, update mastery, RELEASE
+        with self.assertNumQueries(5):
+            performance, mastery = self._record(True, mode=StudyMode.WRITE)
+
+        self.assertEqual(CardPerformance.objects.filter(card=self.card).count(), 2)
+        self.assertIsNotNone(performance.confidence_before)
+
+    def test_backfill_command_rebuilds_windows(self):
+        """La commande reconstruit les fenêtres depuis l'historique"""
+        for was_correct in [True, True, False, True]:
+            self._record(was_correct, mode=StudyMode.MATCH)
+        expected = CardMastery.objects.get(card=self.card).match_window
+        CardMastery.objects.filter(card=self.card).update(match_window=0, match_score=0.0)
+
+        call_command('backfill_mastery_windows', stdout=StringIO())
+
+        mastery = CardMastery.objects.get(card=self.card)
+        self.assertEqual(mastery.match_window, expected)
+        self.assertEqual(mastery.match_score, 0.75)
+
+
+class BatchPerformanceIngestionTest(TestCase):
+    """Tests pour l'enregistrement de réponses par lots"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='batchuser',
+            email='batch@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        self.deck = FlashcardDeck.objects.create(user=self.user, name="Batch Deck")
+        self.cards = [
+            Flashcard.objects.create(user=self.user, deck=self.deck, front_text=f'front {i}', back_text='back')
+            for i in range(3)
+        ]
+        self.client.force_login(self.user)
+
+    def _payload(self, answers):
+        return json.dumps({'session_id': 'batch-session', 'answers': answers})
+
+    def test_batch_matches_sequential_updates(self):
+        """Le lot produit le même mastery que des réponses une par une"""
+        outcomes = [True, False, True, True, True]
+        AdaptiveLearningService.record_performances_batch(self.user, [
+            {
+                'card': self.cards[0],
+                'study_mode': StudyMode.MATCH,
+                'difficulty': DifficultyLevel.EASY if ok else DifficultyLevel.WRONG,
+                'was_correct': ok,
+            }
+            for ok in outcomes
+        ])
+        for ok in outcomes:
+            AdaptiveLearningService.record_performance(
+                self.cards[1], self.user, StudyMode.MATCH,
+                DifficultyLevel.EASY if ok else DifficultyLevel.WRONG, ok
+            )
+
+        batched = CardMastery.objects.get(card=self.cards[0])
+        sequential = CardMastery.objects.get(card=self.cards[1])
+        for field in ['confidence_score', 'match_score', 'match_window', 'total_attempts',
+                      'successful_attempts', 'mastery_level']:
+            self.assertEqual(getattr(batched, field), getattr(sequential, field), field)
+
+    def test_batch_endpoint_is_idempotent(self):
+        """Un lot renvoyé n'est pas compté deux fois"""
+        url = reverse('revision_web:adaptive-review-batch')
+        answers = [
+            {
+                'card_id': card.id,
+                'study_mode': 'learn',
+                'difficulty': 'medium',
+                'was_correct': True,
+                'client_answer_id': f'answer-{card.id}',
+            }
+            for card in self.cards
+        ]
+        answers.append({'card_id': 999999, 'study_mode': 'learn', 'difficulty': 'medium', 'was_correct': True})
+
+        response = self.client.post(url, self._payload(answers), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['recorded'], 3)
+        self.assertEqual(len(response.json()['rejected']), 1)
+
+        response = self.client.post(url, self._payload(answers[:3]), content_type='application/json')
+        self.assertEqual(response.json()['recorded'], 0)
+        self.assertEqual(len(response.json()['duplicates']), 3)
+
+        self.assertEqual(CardPerformance.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(CardMastery.objects.get(card=self.cards[0]).total_attempts, 1)
+
+    def test_batch_accepts_naive_answered_at(self):
+        """Un horodatage sans décalage est interprété dans le fuseau par défaut"""
+        url = reverse('revision_web:adaptive-review-batch')
+        answers = [
+            {'card_id': self.cards[0].id, 'study_mode': 'learn', 'difficulty': 'medium',
+             'was_correct': True, 'answered_at': '2024-05-01T10:00:00'},
+            {'card_id': self.cards[0].id, 'study_mode': 'learn', 'difficulty': 'medium',
+             'was_correct': False, 'answered_at': '2024-05-01T09:00:00+00:00'},
+        ]
+        response = self.client.post(url, self._payload(answers), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['recorded'], 2)
+
+    def test_batch_rejects_non_object_body(self):
+        """Un corps JSON qui n'est pas un objet est refusé en 400"""
+        url = reverse('revision_web:adaptive-review-batch')
+        for body in ('[]', '42', '"answers"'):
+            response = self.client.post(url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_batch_parses_was_correct_strictly(self):
+        """"false" est une mauvaise réponse, une valeur non booléenne est rejetée"""
+        url = reverse('revision_web:adaptive-review-batch')
+        answers = [
+            {'card_id': self.cards[0].id, 'study_mode': 'learn', 'difficulty': 'medium', 'was_correct': 'false'},
+            {'card_id': self.cards[1].id, 'study_mode': 'learn', 'difficulty': 'medium', 'was_correct': 'maybe'},
+            {'card_id': self.cards[2].id, 'study_mode': 'learn', 'difficulty': 'medium', 'was_correct': 1},
+        ]
+        response = self.client.post(url, self._payload(answers), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['recorded'], 1)
+        self.assertEqual([r['index'] for r in response.json()['rejected']], [1, 2])
+        self.assertFalse(CardPerformance.objects.get(card=self.cards[0]).was_correct)
+
+    def test_existing_mastery_is_updated(self):
+        """Un CardMastery déjà présent est mis à jour, pas recréé"""
+        AdaptiveLearningService.record_performance(
+            self.cards[0], self.user, StudyMode.MATCH, DifficultyLevel.EASY, True
+        )
+        AdaptiveLearningService.record_performances_batch(self.user, [
+            {'card': self.cards[0], 'study_mode': StudyMode.MATCH, 'difficulty': DifficultyLevel.EASY, 'was_correct': True},
+            {'card': self.cards[1], 'study_mode': StudyMode.MATCH, 'difficulty': DifficultyLevel.EASY, 'was_correct': True},
+        ])
+        self.assertEqual(CardMastery.objects.filter(card__in=self.cards[:2]).count(), 2)
+        self.assertEqual(CardMastery.objects.get(card=self.cards[0]).total_attempts, 2)
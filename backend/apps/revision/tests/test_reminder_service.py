@@ -0,0 +1,158 @@
+# Tests pour la sélection et le comptage par lots des rappels de révision
+
+import zoneinfo
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from unittest.mock import patch
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from apps.revision.models import FlashcardDeck, Flashcard, RevisionSettings
+from apps.revision.services.reminder_service import RevisionReminderService
+
+User = get_user_model()
+
+
+class BatchedReminderPipelineTest(TestCase):
+    """Tests pour RevisionReminderService.send_daily_reminders"""
+
+    def setUp(self):
+        self.now = timezone.make_aware(datetime.combine(timezone.now().date(), time(9, 0)))
+        self.users = []
+        for index, reminder_time in enumerate([time(9, 2), time(8, 57), time(15, 0)]):
+            user = User.objects.create_user(
+                username=f'reminder{index}',
+                email=f'reminder{index}@example.com',
+                password='testpass123',
+                is_active=True
+            )
+            RevisionSettings.objects.update_or_create(
+                user=user,
+                defaults={'daily_reminder_enabled': True, 'reminder_time': reminder_time}
+            )
+            self.users.append(user)
+
+        deck = FlashcardDeck.objects.create(user=self.users[0], name="Due Deck")
+        for next_review in [None, self.now - timedelta(days=2), self.now + timedelta(days=3)]:
+            Flashcard.objects.create(
+                user=self.users[0], deck=deck, front_text='q', back_text='a', next_review=next_review
+            )
+        inactive_deck = FlashcardDeck.objects.create(user=self.users[0], name="Inactive", is_active=False)
+        Flashcard.objects.create(user=self.users[0], deck=inactive_deck, front_text='q', back_text='a')
+
+    def test_due_counts_ignore_future_cards_and_inactive_decks(self):
+        """Seules les cartes dues des decks actifs sont comptées"""
+        counts = RevisionReminderService.get_cards_due_counts(
+            [user.id for user in self.users], self.now
+        )
+        self.assertEqual(counts, {self.users[0].id: 2})
+
+    def test_only_users_in_window_are_loaded(self):
+        """Seuls les utilisateurs dans la fenêtre de rappel sont traités"""
+        with patch('apps.revision.services.reminder_service.timezone.now', return_value=self.now), \
+                CaptureQueriesContext(connection) as queries:
+            stats = RevisionReminderService.send_daily_reminders(dry_run=True)
+
+        self.assertEqual(stats['users_checked'], 2)
+        self.assertEqual(stats['users_with_cards_due'], 1)
+        self.assertEqual(stats['notifications_sent'], 0)
+        # Une requête pour les paramètres, une agrégation pour le lot
+        self.assertLessEqual(len(queries), 2)
+
+    def test_sends_reminder_with_due_count(self):
+        """Le rappel annonce le nombre réel de cartes dues"""
+        with patch('apps.revision.services.reminder_service.timezone.now', return_value=self.now), \
+                patch.object(RevisionReminderService, '_send_revision_reminder', return_value=True) as send:
+            stats = RevisionReminderService.send_daily_reminders()
+
+        self.assertEqual(stats['notifications_sent'], 1)
+        user, cards_due_count, _ = send.call_args.args
+        self.assertEqual(user, self.users[0])
+        self.assertEqual(cards_due_count, 2)
+
+    def test_window_does_not_wrap_past_midnight(self):
+        """La fenêtre reste dans la journée courante"""
+        late = datetime.combine(self.now.date(), time(23, 58))
+        start_time, end_time = RevisionReminderService._reminder_window(late)
+        self.assertEqual(start_time, time(23, 53))
+        self.assertEqual(end_time, time.max)
+
+
+class ScheduledReminderTest(TestCase):
+    """Tests pour next_reminder_at et RevisionReminderService.send_due_reminders"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='scheduled',
+            email='scheduled@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        self.user.timezone = 'America/New_York'
+        self.user.save()
+        self.revision_settings = RevisionSettings.objects.get(user=self.user)
+        self.revision_settings.reminder_time = time(9, 0)
+        self.revision_settings.save()
+        deck = FlashcardDeck.objects.create(user=self.user, name="Scheduled Deck")
+        Flashcard.objects.create(user=self.user, deck=deck, front_text='q', back_text='a')
+
+    def test_next_reminder_uses_user_timezone(self):
+        """Le prochain rappel est calculé dans le fuseau de l'utilisateur"""
+        after = datetime(2026, 1, 15, 13, 0, tzinfo=dt_timezone.utc)  # 08:00 à New York
+        next_reminder_at = self.revision_settings.compute_next_reminder_at(after=after)
+        self.assertEqual(next_reminder_at, datetime(2026, 1, 15, 14, 0, tzinfo=dt_timezone.utc))
+
+        after = datetime(2026, 1, 15, 15, 0, tzinfo=dt_timezone.utc)  # 10:00 à New York
+        next_reminder_at = self.revision_settings.compute_next_reminder_at(after=after)
+        self.assertEqual(next_reminder_at, datetime(2026, 1, 16, 14, 0, tzinfo=dt_timezone.utc))
+
+    def test_settings_change_reschedules(self):
+        """Changer l'heure ou désactiver les rappels met à jour next_reminder_at"""
+        self.assertIsNotNone(self.revision_settings.next_reminder_at)
+
+        self.revision_settings.daily_reminder_enabled = False
+        self.revision_settings.save()
+        self.assertIsNone(RevisionSettings.objects.get(pk=self.revision_settings.pk).next_reminder_at)
+
+    def test_timezone_change_reschedules(self):
+        """Changer de fuseau horaire replace le rappel à reminder_time dans le nouveau fuseau"""
+        self.user.timezone = 'Europe/Paris'
+        self.user.save()
+
+        revision_settings = RevisionSettings.objects.select_related('user').get(pk=self.revision_settings.pk)
+        local_reminder = revision_settings.next_reminder_at.astimezone(zoneinfo.ZoneInfo('Europe/Paris'))
+        self.assertEqual(local_reminder.time(), time(9, 0))
+        self.assertTrue(revision_settings.reminder_matches_timezone())
+
+    def test_due_reminder_is_sent_once_and_rescheduled(self):
+        """Un rappel échu est envoyé une fois puis replanifié au lendemain"""
+        now = timezone.now()
+        RevisionSettings.objects.filter(pk=self.revision_settings.pk).update(
+            next_reminder_at=now - timedelta(minutes=1)
+        )
+
+        with patch.object(RevisionReminderService, '_send_revision_reminder', return_value=True) as send:
+            stats = RevisionReminderService.send_due_reminders()
+            RevisionReminderService.send_due_reminders()
+
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(stats['notifications_sent'], 1)
+        next_reminder_at = RevisionSettings.objects.get(pk=self.revision_settings.pk).next_reminder_at
+        self.assertGreater(next_reminder_at, now)
+        self.assertLessEqual(next_reminder_at, now + timedelta(days=1))
+
+    def test_stale_reminder_is_skipped(self):
+        """Un rappel très en retard est replanifié sans être envoyé"""
+        RevisionSettings.objects.filter(pk=self.revision_settings.pk).update(
+            next_reminder_at=timezone.now() - timedelta(days=2)
+        )
+
+        with patch.object(RevisionReminderService, '_send_revision_reminder', return_value=True) as send:
+            stats = RevisionReminderService.send_due_reminders()
+
+        send.assert_not_called()
+        self.assertEqual(stats['reminders_skipped_late'], 1)
+        self.assertGreater(
+            RevisionSettings.objects.get(pk=self.revision_settings.pk).next_reminder_at, timezone.now()
+        )
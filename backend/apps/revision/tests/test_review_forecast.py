@@ -0,0 +1,88 @@
+# Tests pour la prévision des révisions basée sur next_review
+
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from apps.revision.models import FlashcardDeck, Flashcard
+from apps.revision.services.review_forecast import ReviewForecastService
+
+User = get_user_model()
+
+
+class ReviewForecastServiceTest(TestCase):
+    """Tests pour ReviewForecastService"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='forecastuser',
+            email='forecast@example.com',
+            password='testpass123'
+        )
+        self.deck = FlashcardDeck.objects.create(user=self.user, name="Forecast Deck")
+        self.today = timezone.localdate()
+
+    def _at_noon(self, days):
+        return timezone.make_aware(datetime.combine(self.today + timedelta(days=days), time(12, 0)))
+
+    def _card(self, due_in_days, interval_days=None):
+        next_review = self._at_noon(due_in_days)
+        last_reviewed = next_review - timedelta(days=interval_days) if interval_days else None
+        return Flashcard.objects.create(
+            user=self.user,
+            deck=self.deck,
+            front_text='front',
+            back_text='back',
+            total_reviews_count=1 if interval_days else 0,
+            next_review=next_review,
+            last_reviewed=last_reviewed
+        )
+
+    def test_buckets_follow_next_review_and_intervals(self):
+        """Les échéances sont placées au bon jour puis projetées avec leur intervalle"""
+        self._card(due_in_days=2, interval_days=10)
+        self._card(due_in_days=2, interval_days=10)
+        self._card(due_in_days=5)
+        self._card(due_in_days=-3, interval_days=7)
+
+        with self.assertNumQueries(1):
+            buckets = ReviewForecastService.compute_daily_buckets(self.user, self.today, horizon=30)
+
+        self.assertEqual(buckets[0], 1)   # carte en retard
+        self.assertEqual(buckets[2], 2)
+        self.assertEqual(buckets[12], 2)  # 2 + 10
+        self.assertEqual(buckets[22], 2)
+        self.assertEqual(buckets[5], 1)   # nouvelle carte : pas de projection
+        self.assertEqual(buckets[15], 0)
+        self.assertEqual(buckets[7], 1)   # retard reporté de 7 jours
+        self.assertEqual(buckets[14], 1)
+
+    def test_forecast_is_deterministic_and_cached(self):
+        """Plusieurs horizons réutilisent la même prévision en cache"""
+        self._card(due_in_days=1, interval_days=3)
+
+        first = ReviewForecastService.get_forecast(self.user, days_ahead=30)
+        with self.assertNumQueries(0):
+            second = ReviewForecastService.get_forecast(self.user, days_ahead=30)
+            yearly = ReviewForecastService.get_forecast(self.user, days_ahead=365)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(yearly['forecast']), 365)
+        self.assertEqual(yearly['forecast'][:30], first['forecast'])
+        self.assertEqual(first['forecast'][0]['predicted_reviews'], 1)
+        self.assertEqual(first['forecast'][3]['predicted_reviews'], 1)
+
+    def test_review_invalidates_cache(self):
+        """Une révision (sauvegarde de carte) invalide la prévision"""
+        card = self._card(due_in_days=1, interval_days=3)
+        ReviewForecastService.get_forecast(self.user, days_ahead=30)
+
+        card.last_reviewed = self._at_noon(1)
+        card.next_review = self._at_noon(8)
+        card.save()
+
+        forecast = ReviewForecastService.get_forecast(self.user, days_ahead=30)
+        self.assertEqual(forecast['forecast'][0]['predicted_reviews'], 0)
+        self.assertEqual(forecast['forecast'][7]['predicted_reviews'], 1)
@@ -0,0 +1,139 @@
+# Tests pour le moteur de file de révision côté base de données
+
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from apps.revision.models import FlashcardDeck, Flashcard
+from apps.revision.services.review_queue import ReviewQueueService
+from apps.revision.views.spaced_repetition_views import SpacedRepetitionMixin
+
+User = get_user_model()
+
+
+class ReviewQueueServiceTest(TestCase):
+    """Tests pour ReviewQueueService"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='queueuser',
+            email='queue@example.com',
+            password='testpass123'
+        )
+        self.deck = FlashcardDeck.objects.create(user=self.user, name="Queue Deck")
+        self.now = timezone.now()
+
+    def _card(self, **fields):
+        return Flashcard.objects.create(
+            user=self.user,
+            deck=self.deck,
+            front_text=fields.pop('front_text', 'front'),
+            back_text='back',
+            **fields
+        )
+
+    def _populate(self):
+        self.new_card = self._card(front_text='new')
+        self.learning_card = self._card(
+            front_text='learning', total_reviews_count=3, correct_reviews_count=1,
+            next_review=self.now - timedelta(hours=2)
+        )
+        self.overdue_card = self._card(
+            front_text='overdue', total_reviews_count=4, correct_reviews_count=3, learned=True,
+            next_review=self.now - timedelta(days=3, hours=5)
+        )
+        self.mature_card = self._card(
+            front_text='mature', total_reviews_count=12, correct_reviews_count=11, learned=True,
+            next_review=self.now + timedelta(days=20)
+        )
+        self.tomorrow_card = self._card(
+            front_text='tomorrow', total_reviews_count=2, correct_reviews_count=2,
+            next_review=self.now + timedelta(hours=20)
+        )
+
+    def test_annotations_match_python_analysis(self):
+        """Les colonnes sr_* correspondent à l'analyse Python du mixin"""
+        self._populate()
+        mixin = SpacedRepetitionMixin()
+        queue = ReviewQueueService(self.deck, now=self.now)
+
+        for card in queue.annotate(queue.base_queryset()):
+            self.assertEqual(card.sr_status, mixin._determine_card_status(card))
+            self.assertAlmostEqual(card.sr_difficulty, mixin._estimate_card_difficulty(card), places=6)
+            self.assertEqual(card.sr_learning_progress, mixin._calculate_learning_progress(card))
+
+        overdue = queue.annotate(queue.base_queryset()).get(pk=self.overdue_card.pk)
+        self.assertEqual(overdue.sr_days_overdue, 3)
+        self.assertTrue(overdue.sr_is_due)
+
+    def test_deck_counters(self):
+        """Compteurs de statut et prévisions en une requête"""
+        self._populate()
+        queue = ReviewQueueService(self.deck, now=self.now)
+
+        with self.assertNumQueries(1):
+            counters = queue.deck_counters()
+
+        self.assertEqual(counters['total'], 5)
+        self.assertEqual(counters['new'], 1)
+        self.assertEqual(counters['learning'], 2)
+        self.assertEqual(counters['young'], 1)
+        self.assertEqual(counters['mature'], 1)
+        self.assertEqual(counters['forecast_today'], 2)
+        self.assertEqual(counters['forecast_tomorrow'], 1)
+        self.assertEqual(counters['forecast_later'], 1)
+
+    def test_select_session_cards_order_and_limits(self):
+        """Retard d'abord, puis cartes dues, puis nouvelles cartes"""
+        self._populate()
+        queue = ReviewQueueService(self.deck, now=self.now)
+
+        cards = queue.select_session_cards(max_cards=10, new_cards_limit=5)
+        self.assertEqual(
+            [card.pk for card in cards],
+            [self.overdue_card.pk, self.learning_card.pk, self.new_card.pk]
+        )
+
+        cards = queue.select_session_cards(max_cards=2, new_cards_limit=5)
+        self.assertEqual([card.pk for card in cards], [self.overdue_card.pk, self.learning_card.pk])
+
+        cards = queue.select_session_cards(max_cards=10, new_cards_limit=0)
+        self.assertNotIn(self.new_card.pk, [card.pk for card in cards])
+
+    def test_new_cards_review_ahead(self):
+        """Les nouvelles cartes planifiées sont incluses selon review_ahead_days"""
+        planned = self._card(front_text='planned', next_review=self.now + timedelta(days=1, hours=2))
+        queue = ReviewQueueService(self.deck, now=self.now)
+
+        self.assertEqual(queue.select_session_cards(review_ahead_days=0), [])
+        self.assertEqual(
+            [card.pk for card in queue.select_session_cards(review_ahead_days=1)],
+            [planned.pk]
+        )
+
+    def test_session_query_count_independent_of_deck_size(self):
+        """Le nombre de requêtes ne dépend pas de la taille du deck"""
+        Flashcard.objects.bulk_create([
+            Flashcard(
+                user=self.user, deck=self.deck, front_text=f'card {i}', back_text='back',
+                total_reviews_count=i % 7, correct_reviews_count=(i % 7) // 2,
+                next_review=self.now - timedelta(days=i % 4)
+            )
+            for i in range(300)
+        ])
+        mixin = SpacedRepetitionMixin()
+        user_prefs = {'new_cards_priority': 3.0}
+        session_config = {'max_cards': 20, 'new_cards_limit': 5, 'mixed_order': False}
+
+        # settings + agrégat + au plus 3 sélections bornées
+        with CaptureQueriesContext(connection) as queries:
+            study_data = mixin.get_cards_to_review(self.deck, session_config, user_prefs)
+        self.assertLessEqual(len(queries), 5)
+
+        self.assertEqual(len(study_data['session_cards']), 20)
+        self.assertEqual(study_data['statistics']['total_cards_in_deck'], 300)
+        self.assertEqual(study_data['statistics']['session_size'], 20)
+        priorities = [card['days_overdue'] for card in study_data['session_cards']]
+        self.assertEqual(priorities, sorted(priorities, reverse=True))
@@ -0,0 +1,81 @@
+# Tests pour le cache des paramètres de révision
+
+from datetime import time
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth import get_user_model
+from apps.revision.models import RevisionSettings
+from apps.revision.services.settings_cache import (
+    RevisionSettingsCache, UserRevisionSettings, get_revision_settings, revision_settings_cache
+)
+from apps.revision.views.spaced_repetition_views import SmartFlashcardSessionView
+
+User = get_user_model()
+
+
+class RevisionSettingsCacheTest(TestCase):
+    """Tests pour RevisionSettingsCache"""
+
+    def setUp(self):
+        cache.clear()
+        revision_settings_cache.clear_local()
+        self.user = User.objects.create_user(
+            username='settingscache',
+            email='settingscache@example.com',
+            password='testpass123'
+        )
+
+    def test_second_read_hits_no_database(self):
+        """Une seconde lecture ne touche pas la base"""
+        first = get_revision_settings(self.user)
+        self.assertIsInstance(first, UserRevisionSettings)
+
+        with self.assertNumQueries(0):
+            second = get_revision_settings(self.user.id)
+        self.assertEqual(first, second)
+
+    def test_save_invalidates_cached_settings(self):
+        """Une modification des paramètres est visible immédiatement"""
+        self.assertEqual(get_revision_settings(self.user).cards_per_session, 20)
+
+        revision_settings = RevisionSettings.objects.get(user=self.user)
+        revision_settings.cards_per_session = 35
+        revision_settings.default_difficulty = 'hard'
+        revision_settings.save()
+
+        snapshot = get_revision_settings(self.user)
+        self.assertEqual(snapshot.cards_per_session, 35)
+        self.assertEqual(snapshot.session_preferences()['difficulty_perception'], 'hard')
+
+    def test_missing_settings_are_created(self):
+        """Les paramètres absents sont créés avec les valeurs par défaut"""
+        RevisionSettings.objects.filter(user=self.user).delete()
+
+        snapshot = get_revision_settings(self.user)
+
+        self.assertTrue(RevisionSettings.objects.filter(user=self.user).exists())
+        self.assertEqual(snapshot.reminder_time, time(18, 0))
+        self.assertEqual(snapshot.interval_settings()['initial_interval_easy'], 4)
+
+    def test_local_lru_is_bounded(self):
+        """Le LRU local évince les entrées les plus anciennes"""
+        local_cache = RevisionSettingsCache()
+        local_cache.LOCAL_MAX_ENTRIES = 2
+        for user_id in (1, 2, 3):
+            local_cache._set_local(user_id, UserRevisionSettings(user_id=user_id))
+
+        self.assertIsNone(local_cache._get_local(1))
+        self.assertIsNotNone(local_cache._get_local(3))
+
+    def test_session_view_preferences_use_cache(self):
+        """Les préférences de session sont servies depuis le cache"""
+        view = SmartFlashcardSessionView()
+        preferences = view._get_user_preferences(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(view._get_user_preferences(self.user), preferences)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(preferences['session_size'], 20)
+        self.assertEqual(preferences['new_cards_per_day'], 5)
@@ -16,6 +16,7 @@ from .views.web_views import *
 # Import adaptive learning views
 from .views.adaptive_study_views import (
     AdaptiveReviewCardView,
+    AdaptiveBatchReviewView,
     AdaptiveDeckStatsView,
     AdaptiveCardsToReviewView,
     CardMasteryDetailView,
@@ -155,6 +156,9 @@ urlpatterns = [
     # Review card with adaptive algorithm
     path('api/adaptive/card/<int:card_id>/review/', AdaptiveReviewCardView.as_view(), name='adaptive-review-card'),
 
+    # Review many cards in one request (idempotent with client_answer_id)
+    path('api/adaptive/reviews/batch/', AdaptiveBatchReviewView.as_view(), name='adaptive-review-batch'),
+
     # Get deck statistics with adaptive algorithm
     path('api/adaptive/deck/<int:deck_id>/stats/', AdaptiveDeckStatsView.as_view(), name='adaptive-deck-stats'),
 
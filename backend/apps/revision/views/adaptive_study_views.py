@@ -9,7 +9,8 @@ from django.views.generic import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.utils import timezone
-from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 import json
 import logging
@@ -21,6 +22,15 @@ from ..services.adaptive_learning import adaptive
 logger = logging.getLogger(__name__)
 
 
+def parse_bool(value):
+    """Booléen JSON ou chaîne "true"/"false" ; None pour toute autre valeur"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    return None
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class AdaptiveReviewCardView(View):
     """
@@ -73,6 +83,13 @@ class AdaptiveReviewCardView(View):
                     'error': 'Missing required fields: study_mode, difficulty, was_correct'
                 }, status=400)
 
+            was_correct = parse_bool(was_correct)
+            if was_correct is None:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Invalid was_correct. Must be true or false'
+                }, status=400)
+
             # Validation des valeurs
             valid_modes = [choice[0] for choice in StudyMode.choices]
             valid_difficulties = [choice[0] for choice in DifficultyLevel.choices]
@@ -143,6 +160,165 @@ class AdaptiveReviewCardView(View):
             }, status=500)
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class AdaptiveBatchReviewView(View):
+    """
+    Enregistre plusieurs réponses en une seule requête (modes "match" et "learn" sur mobile).
+    Les réponses déjà reçues (même client_answer_id) sont ignorées : le client peut renvoyer un lot sans risque.
+    Note: CSRF exempt because this is an API endpoint with manual authentication.
+    """
+
+    MAX_BATCH_SIZE = 200
+
+    def post(self, request):
+        """
+        Body JSON attendu :
+        {
+            "session_id": "abc123",                  // optionnel
+            "answers": [
+                {
+                    "card_id": 456,
+                    "study_mode": "match",
+                    "difficulty": "easy",
+                    "was_correct": true,
+                    "response_time_seconds": 2.4,     // optionnel
+                    "client_answer_id": "c0ffee-1",   // optionnel, clé d'idempotence
+                    "answered_at": "2025-10-05T17:28:00Z"  // optionnel
+                }
+            ]
+        }
+        """
+        if not request.user.is_authenticated:
+            return JsonResponse({
+                'success': False,
+                'error': 'Authentication required'
+            }, status=401)
+
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'success': False,
+                'error': 'Invalid JSON in request body'
+            }, status=400)
+
+        if not isinstance(data, dict):
+            return JsonResponse({
+                'success': False,
+                'error': 'Request body must be a JSON object'
+            }, status=400)
+
+        answers = data.get('answers')
+        if not isinstance(answers, list) or not answers:
+            return JsonResponse({
+                'success': False,
+                'error': 'Missing required field: answers'
+            }, status=400)
+
+        if len(answers) > self.MAX_BATCH_SIZE:
+            return JsonResponse({
+                'success': False,
+                'error': f'Too many answers in batch (max {self.MAX_BATCH_SIZE})'
+            }, status=400)
+
+        valid_modes = [choice[0] for choice in StudyMode.choices]
+        valid_difficulties = [choice[0] for choice in DifficultyLevel.choices]
+
+        # Charger toutes les cartes du lot en une requête (propres cartes ou decks publics)
+        card_ids = {
+            str(answer.get('card_id')) for answer in answers
+            if isinstance(answer, dict) and str(answer.get('card_id')).isdigit()
+        }
+        cards = Flashcard.objects.select_related('deck').filter(
+            Q(id__in=card_ids) & (Q(deck__user=request.user) | Q(deck__is_public=True))
+        ).in_bulk()
+
+        accepted = []
+        rejected = []
+        for index, answer in enumerate(answers):
+            if not isinstance(answer, dict):
+                rejected.append({'index': index, 'error': 'Invalid answer'})
+                continue
+
+            card_id = str(answer.get('card_id'))
+            card = cards.get(int(card_id)) if card_id.isdigit() else None
+            if card is None:
+                error = 'Card not found'
+            elif answer.get('study_mode') not in valid_modes:
+                error = f'Invalid study_mode. Must be one of: {valid_modes}'
+            elif answer.get('difficulty') not in valid_difficulties:
+                error = f'Invalid difficulty. Must be one of: {valid_difficulties}'
+            elif answer.get('was_correct') is None:
+                error = 'Missing required field: was_correct'
+            elif parse_bool(answer['was_correct']) is None:
+                error = 'Invalid was_correct. Must be true or false'
+            else:
+                error = None
+
+            answered_at = None
+            if error is None and answer.get('answered_at'):
+                try:
+                    answered_at = parse_datetime(str(answer['answered_at']))
+                except ValueError:
+                    answered_at = None
+                if answered_at is None:
+                    error = 'Invalid answered_at'
+                elif timezone.is_naive(answered_at):
+                    # Sans décalage : heure du fuseau par défaut
+                    answered_at = timezone.make_aware(answered_at)
+
+            if error:
+                rejected.append({'index': index, 'client_answer_id': answer.get('client_answer_id'), 'error': error})
+                continue
+
+            accepted.append({
+                'card': card,
+                'study_mode': answer['study_mode'],
+                'difficulty': answer['difficulty'],
+                'was_correct': parse_bool(answer['was_correct']),
+                'response_time_seconds': answer.get('response_time_seconds'),
+                'client_answer_id': str(answer['client_answer_id'])[:64] if answer.get('client_answer_id') else None,
+                'answered_at': answered_at,
+            })
+
+        try:
+            result = adaptive.record_performances_batch(
+                user=request.user,
+                answers=accepted,
+                session_id=data.get('session_id')
+            ) if accepted else {'performances': [], 'masteries': {}, 'duplicates': []}
+        except IntegrityError:
+            # Un renvoi concurrent du même lot a été enregistré entre-temps
+            # (client_answer_id déjà présente ; les CardMastery ne lèvent pas d'erreur)
+            return JsonResponse({
+                'success': False,
+                'error': 'Duplicate answers submitted concurrently, please retry'
+            }, status=409)
+        except Exception as e:
+            logger.error(f"Error processing adaptive batch review: {str(e)}", exc_info=True)
+            return JsonResponse({
+                'success': False,
+                'error': 'An error occurred while processing the reviews'
+            }, status=500)
+
+        return JsonResponse({
+            'success': True,
+            'recorded': len(result['performances']),
+            'duplicates': result['duplicates'],
+            'rejected': rejected,
+            'cards': [
+                {
+                    'card_id': card_id,
+                    'confidence_score': mastery.confidence_score,
+                    'mastery_level': mastery.mastery_level,
+                    'is_learned': cards[card_id].learned,
+                    'total_attempts': mastery.total_attempts,
+                }
+                for card_id, mastery in result['masteries'].items()
+            ]
+        })
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class AdaptiveDeckStatsView(View):
     """
@@ -15,6 +15,7 @@ import pandas as pd
 from rest_framework import filters
 from django.shortcuts import get_object_or_404
 from apps.revision.models import FlashcardDeck, Flashcard
+from core.views.search_views import FullTextSearchMixin
 from apps.revision.serializers import (
     FlashcardDeckSerializer, 
     FlashcardSerializer,
@@ -544,11 +545,13 @@ class FlashcardDeckViewSet(DeckPermissionMixin, OptimizedQuerysetMixin, viewsets
             "deck_name": deck.name
         })
 
-class FlashcardViewSet(viewsets.ModelViewSet):
+class FlashcardViewSet(FullTextSearchMixin, viewsets.ModelViewSet):
     serializer_class = FlashcardSerializer
     permission_classes = [FlashcardPermission]  # Permissions granulaires
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['front_text', 'back_text']
+    filter_backends = [filters.OrderingFilter]
+    # ?search= passe par l'index plein texte (FullTextSearchMixin)
+    search_app_name = 'revision'
+    search_model_name = 'Flashcard'
     ordering_fields = ['created_at', 'last_reviewed', 'review_count']
     ordering = ['-created_at']
 
@@ -10,11 +10,12 @@ from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views.generic import View
 from django.utils import timezone
-from collections import defaultdict
 import json
 import logging
 
 from ..models.revision_flashcard import FlashcardDeck, Flashcard
+from ..services.review_queue import ReviewQueueService
+from ..services.settings_cache import get_revision_settings
 from django.db.models import Q, Count, Avg
 from django.db import models
 import math
@@ -52,11 +53,8 @@ class SpacedRepetitionMixin:
     def _get_user_preferences(self, user):
         """Get user preferences from database using existing RevisionSettings"""
         try:
-            # Import here to avoid circular imports
-            from ..models.settings_models import RevisionSettings
-            
-            # Get existing revision settings
-            revision_settings, created = RevisionSettings.objects.get_or_create(user=user)
+            # Cached, typed snapshot of the user's RevisionSettings
+            revision_settings = get_revision_settings(user)
             
             # Map existing settings to spaced repetition preferences
             return {
@@ -120,33 +118,34 @@ class SpacedRepetitionMixin:
         # Get user-specific interval settings from RevisionSettings
         user_intervals = self._get_user_interval_settings(deck.user)
         
-        # Get all cards in deck with related data
-        all_cards = deck.flashcards.select_related().all()
+        # Status counts and due forecast come from a single aggregate query
+        review_queue = self._get_review_queue(deck, user_prefs)
+        deck_counters = review_queue.deck_counters()
         
-        if not all_cards.exists():
+        if not deck_counters['total']:
             return self._empty_session_response(deck)
         
-        # Analyze each card
-        card_analyses = []
-        for card in all_cards:
-            analysis = self._analyze_card(card, user_prefs, user_intervals)
-            card_analyses.append(analysis)
-        
-        # Filter cards that need review
-        reviewable_cards = [
-            analysis for analysis in card_analyses 
-            if self._should_review_card(analysis, session_config)
+        # Bounded top-K selection done by the database; only the selected
+        # cards are loaded and analyzed in Python
+        selected_cards = review_queue.select_session_cards(
+            max_cards=session_config.get('max_cards', 20),
+            new_cards_limit=session_config.get('new_cards_limit', 5),
+            review_ahead_days=session_config.get('review_ahead_days', 0),
+            prioritize_overdue=session_config.get('prioritize_overdue', True),
+        )
+        session_cards = [
+            self._analyze_card(card, user_prefs, user_intervals)
+            for card in selected_cards
         ]
         
-        # Prioritize and select cards for session
-        session_cards = self._select_session_cards(
-            reviewable_cards, session_config, user_prefs
-        )
+        # Mix order if requested
+        if session_config.get('mixed_order', True):
+            random.shuffle(session_cards)
         
         # Generate statistics and recommendations
-        statistics = self._calculate_session_statistics(card_analyses, session_cards)
+        statistics = self._calculate_session_statistics(deck_counters, session_cards)
         recommendations = self._generate_recommendations(statistics, deck, user_prefs)
-        next_review_forecast = self._calculate_next_review_forecast(card_analyses)
+        next_review_forecast = self._calculate_next_review_forecast(deck_counters)
         
         return {
             'session_cards': session_cards,
@@ -266,17 +265,7 @@ class SpacedRepetitionMixin:
     def _get_user_interval_settings(self, user):
         """Get user's custom interval settings from RevisionSettings"""
         try:
-            from ..models.settings_models import RevisionSettings
-            
-            revision_settings, created = RevisionSettings.objects.get_or_create(user=user)
-            
-            return {
-                'initial_interval_easy': revision_settings.initial_interval_easy,
-                'initial_interval_normal': revision_settings.initial_interval_normal,
-                'initial_interval_hard': revision_settings.initial_interval_hard,
-                'spaced_repetition_enabled': revision_settings.spaced_repetition_enabled,
-                'difficulty_perception': revision_settings.default_difficulty
-            }
+            return get_revision_settings(user).interval_settings()
             
         except Exception as e:
             logger.error(f"Error loading user interval settings: {str(e)}")
@@ -405,60 +394,6 @@ class SpacedRepetitionMixin:
         
         return max(0.0, priority)
     
-    def _should_review_card(self, analysis, session_config):
-        """Determine if a card should be included in review session"""
-        # Always include due cards
-        if analysis['is_due']:
-            return True
-        
-        # Include cards due within review_ahead_days
-        review_ahead = session_config.get('review_ahead_days', 0)
-        if review_ahead > 0 and analysis['next_review_in'] is not None:
-            return analysis['next_review_in'] <= review_ahead
-        
-        return False
-    
-    def _select_session_cards(self, reviewable_cards, session_config, user_prefs):
-        """Select final cards for session based on priority and limits"""
-        max_cards = session_config.get('max_cards', 20)
-        new_cards_limit = session_config.get('new_cards_limit', 5)
-        prioritize_overdue = session_config.get('prioritize_overdue', True)
-        mixed_order = session_config.get('mixed_order', True)
-        
-        # Separate card types
-        new_cards = [c for c in reviewable_cards if c['status'] == 'new']
-        due_cards = [c for c in reviewable_cards if c['status'] != 'new' and c['is_due']]
-        overdue_cards = [c for c in due_cards if c['days_overdue'] > 0]
-        
-        # Sort by priority
-        new_cards.sort(key=lambda x: x['priority_level'], reverse=True)
-        due_cards.sort(key=lambda x: x['priority_level'], reverse=True)
-        overdue_cards.sort(key=lambda x: x['priority_level'], reverse=True)
-        
-        session_cards = []
-        
-        # Add overdue cards first if prioritized
-        if prioritize_overdue:
-            session_cards.extend(overdue_cards)
-        
-        # Add remaining due cards
-        remaining_due = [c for c in due_cards if c not in session_cards]
-        session_cards.extend(remaining_due)
-        
-        # Add new cards up to limit
-        remaining_slots = max_cards - len(session_cards)
-        new_cards_to_add = min(new_cards_limit, remaining_slots, len(new_cards))
-        session_cards.extend(new_cards[:new_cards_to_add])
-        
-        # Trim to max_cards
-        session_cards = session_cards[:max_cards]
-        
-        # Mix order if requested
-        if mixed_order:
-            random.shuffle(session_cards)
-        
-        return session_cards
-    
     def _calculate_next_interval(self, card, user_response, user_intervals):
         """Calculate next review interval based on spaced repetition algorithm"""
         if not user_intervals['spaced_repetition_enabled']:
@@ -520,18 +455,21 @@ class SpacedRepetitionMixin:
         pass
     
     
-    def _calculate_session_statistics(self, all_card_analyses, session_cards):
+    def _get_review_queue(self, deck, user_prefs):
+        """Build the database-side review queue for a deck"""
+        return ReviewQueueService(
+            deck,
+            priority_weights=self.PRIORITY_WEIGHTS,
+            new_cards_priority=user_prefs.get('new_cards_priority', 3.0),
+        )
+    
+    def _calculate_session_statistics(self, deck_counters, session_cards):
         """Calculate comprehensive session statistics"""
-        total_cards = len(all_card_analyses)
+        total_cards = deck_counters['total']
         
         if total_cards == 0:
             return {'total_cards': 0}
         
-        # Count by status
-        status_counts = defaultdict(int)
-        for analysis in all_card_analyses:
-            status_counts[analysis['status']] += 1
-        
         # Session-specific counts
         session_new = sum(1 for c in session_cards if c['status'] == 'new')
         session_due = sum(1 for c in session_cards if c['is_due'] and c['status'] != 'new')
@@ -540,10 +478,10 @@ class SpacedRepetitionMixin:
         return {
             'total_cards_in_deck': total_cards,
             'session_size': len(session_cards),
-            'new_cards': status_counts['new'],
-            'learning_cards': status_counts['learning'],
-            'young_cards': status_counts['young'],
-            'mature_cards': status_counts['mature'],
+            'new_cards': deck_counters['new'],
+            'learning_cards': deck_counters['learning'],
+            'young_cards': deck_counters['young'],
+            'mature_cards': deck_counters['mature'],
             'new_cards_in_session': session_new,
             'due_cards_in_session': session_due,
             'overdue_cards': session_overdue,
@@ -614,30 +552,14 @@ class SpacedRepetitionMixin:
         
         return recommendations
     
-    def _calculate_next_review_forecast(self, card_analyses):
+    def _calculate_next_review_forecast(self, deck_counters):
         """Calculate when next reviews will be due"""
-        forecast = {'today': 0, 'tomorrow': 0, 'this_week': 0, 'later': 0}
-        
-        now = timezone.now()
-        tomorrow = now + timezone.timedelta(days=1)
-        week_end = now + timezone.timedelta(days=7)
-        
-        for analysis in card_analyses:
-            if not analysis['card'].next_review:
-                continue
-                
-            next_review = analysis['card'].next_review
-            
-            if next_review <= now:
-                forecast['today'] += 1
-            elif next_review <= tomorrow:
-                forecast['tomorrow'] += 1
-            elif next_review <= week_end:
-                forecast['this_week'] += 1
-            else:
-                forecast['later'] += 1
-        
-        return forecast
+        return {
+            'today': deck_counters['forecast_today'],
+            'tomorrow': deck_counters['forecast_tomorrow'],
+            'this_week': deck_counters['forecast_this_week'],
+            'later': deck_counters['forecast_later'],
+        }
     
     def _empty_session_response(self, deck):
         """Return response for empty deck"""
@@ -763,37 +685,8 @@ class UserSpacedRepetitionPreferencesView(View):
     def _get_user_preferences(self, user):
         """Get user preferences from database using existing RevisionSettings"""
         try:
-            # Import here to avoid circular imports
-            from ..models.settings_models import RevisionSettings
-            
-            # Get existing revision settings
-            revision_settings, created = RevisionSettings.objects.get_or_create(user=user)
-            
-            # Map existing settings to spaced repetition preferences
-            difficulty_perception_map = {
-                'easy': 'easy',
-                'normal': 'medium', 
-                'hard': 'hard',
-                'expert': 'hard'
-            }
-            
-            study_mode_map = {
-                'spaced': 'medium',
-                'intensive': 'easy',  # Intensive = user finds cards easier
-                'mixed': 'medium',
-                'custom': 'medium'
-            }
-            
-            return {
-                'difficulty_perception': difficulty_perception_map.get(revision_settings.default_difficulty, 'medium'),
-                'session_size': revision_settings.cards_per_session,
-                'new_cards_per_day': max(1, revision_settings.cards_per_session // 4),  # 25% new cards
-                'review_ahead_days': 1,  # Could be added to RevisionSettings model later
-                'mixed_order': revision_settings.default_study_mode != 'intensive',  # Intensive = ordered
-                'time_pressure': 'relaxed' if revision_settings.default_session_duration > 30 else 'normal',
-                'study_mode': revision_settings.default_study_mode,
-                'session_duration': revision_settings.default_session_duration
-            }
+            # Cached, typed snapshot of the user's RevisionSettings
+            return get_revision_settings(user).session_preferences()
             
         except Exception as e:
             logger.error(f"Error loading user preferences: {str(e)}")
@@ -971,37 +864,8 @@ class SmartFlashcardSessionView(View, SpacedRepetitionMixin):
     def _get_user_preferences(self, user):
         """Get user preferences from database using existing RevisionSettings"""
         try:
-            # Import here to avoid circular imports
-            from ..models.settings_models import RevisionSettings
-            
-            # Get existing revision settings
-            revision_settings, created = RevisionSettings.objects.get_or_create(user=user)
-            
-            # Map existing settings to spaced repetition preferences
-            difficulty_perception_map = {
-                'easy': 'easy',
-                'normal': 'medium', 
-                'hard': 'hard',
-                'expert': 'hard'
-            }
-            
-            study_mode_map = {
-                'spaced': 'medium',
-                'intensive': 'easy',  # Intensive = user finds cards easier
-                'mixed': 'medium',
-                'custom': 'medium'
-            }
-            
-            return {
-                'difficulty_perception': difficulty_perception_map.get(revision_settings.default_difficulty, 'medium'),
-                'session_size': revision_settings.cards_per_session,
-                'new_cards_per_day': max(1, revision_settings.cards_per_session // 4),  # 25% new cards
-                'review_ahead_days': 1,  # Could be added to RevisionSettings model later
-                'mixed_order': revision_settings.default_study_mode != 'intensive',  # Intensive = ordered
-                'time_pressure': 'relaxed' if revision_settings.default_session_duration > 30 else 'normal',
-                'study_mode': revision_settings.default_study_mode,
-                'session_duration': revision_settings.default_session_duration
-            }
+            # Cached, typed snapshot of the user's RevisionSettings
+            return get_revision_settings(user).session_preferences()
             
         except Exception as e:
             logger.error(f"Error loading user preferences: {str(e)}")
@@ -1232,30 +1096,8 @@ class SmartFlashcardReviewView(View, SpacedRepetitionMixin):
     def _get_user_preferences(self, user):
         """Get user preferences from database using existing RevisionSettings"""
         try:
-            # Import here to avoid circular imports
-            from ..models.settings_models import RevisionSettings
-            
-            # Get existing revision settings
-            revision_settings, created = RevisionSettings.objects.get_or_create(user=user)
-            
-            # Map existing settings to spaced repetition preferences
-            difficulty_perception_map = {
-                'easy': 'easy',
-                'normal': 'medium', 
-                'hard': 'hard',
-                'expert': 'hard'
-            }
-            
-            return {
-                'difficulty_perception': difficulty_perception_map.get(revision_settings.default_difficulty, 'medium'),
-                'session_size': revision_settings.cards_per_session,
-                'new_cards_per_day': max(1, revision_settings.cards_per_session // 4),
-                'review_ahead_days': 1,
-                'mixed_order': revision_settings.default_study_mode != 'intensive',
-                'time_pressure': 'relaxed' if revision_settings.default_session_duration > 30 else 'normal',
-                'study_mode': revision_settings.default_study_mode,
-                'session_duration': revision_settings.default_session_duration
-            }
+            # Cached, typed snapshot of the user's RevisionSettings
+            return get_revision_settings(user).session_preferences()
             
         except Exception as e:
             logger.error(f"Error loading user preferences: {str(e)}")
@@ -16,6 +16,7 @@ from rest_framework import status
 from ..models.revision_flashcard import FlashcardDeck, Flashcard
 from ..models.revision_schedule import RevisionSession
 from ..models.card_performance import CardPerformance, CardMastery
+from ..services.review_forecast import ReviewForecastService
 
 import logging
 logger = logging.getLogger(__name__)
@@ -149,7 +150,8 @@ class AdvancedStatsAPIView(APIView):
                 stats['card_maturity'] = self._get_card_maturity_stats(user)
             
             if include_forecast:
-                stats['forecast'] = self._get_forecast_data(user, days_ahead=30)
+                forecast_days = int(request.GET.get('forecast_days', 30))
+                stats['forecast'] = self._get_forecast_data(user, days_ahead=forecast_days)
             
             if include_hourly:
                 stats['hourly_performance'] = self._get_hourly_performance(user)
@@ -249,44 +251,7 @@ class AdvancedStatsAPIView(APIView):
     
     def _get_forecast_data(self, user, days_ahead=30):
         """Predict future revision workload like Anki's due graph"""
-        # For now, we'll create a simple prediction based on current learning patterns
-        # In a real implementation, this would use spaced repetition intervals
-
-        now = timezone.now().date()
-        forecast = []
-
-        # Get average daily reviews from last 7 days using CardPerformance
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_performances = CardPerformance.objects.filter(
-            user=user,
-            created_at__gte=week_ago
-        ).values('card').distinct()
-
-        avg_daily_reviews = 0
-        if recent_performances.exists():
-            total_cards = recent_performances.count()
-            avg_daily_reviews = total_cards / 7
-
-        # Simple prediction: maintain average with some variation
-        import random
-        for i in range(days_ahead):
-            future_date = now + timedelta(days=i+1)
-
-            # Add some realistic variation (±30%)
-            variation = random.uniform(0.7, 1.3)
-            predicted_reviews = max(0, int(avg_daily_reviews * variation))
-
-            forecast.append({
-                'date': future_date.isoformat(),
-                'predicted_reviews': predicted_reviews,
-                'confidence': 'medium' if i < 7 else 'low' if i < 14 else 'very_low'
-            })
-
-        return {
-            'days_ahead': days_ahead,
-            'forecast': forecast,
-            'avg_daily_base': round(avg_daily_reviews, 1)
-        }
+        return ReviewForecastService.get_forecast(user, days_ahead=days_ahead)
     
     def _get_hourly_performance(self, user):
         """Analyze performance by hour of day like Anki"""
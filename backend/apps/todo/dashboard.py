@@ -0,0 +1,89 @@
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models.todo_models import PersonalStageType, Task
+
+# Counters depending on the clock (overdue, due today, this week) are at most
+# this old; task and stage changes invalidate the entry right away
+DASHBOARD_CACHE_TIMEOUT = 300
+
+OPEN_STATES = ['1_todo', '1_in_progress']
+
+
+def dashboard_cache_key(user_id) -> str:
+    return f"todo_dashboard_stats_{user_id}"
+
+
+def invalidate_dashboard_stats(user_id):
+    cache.delete(dashboard_cache_key(user_id))
+
+
+def get_dashboard_stats(user, queryset=None) -> Dict:
+    """
+    Dashboard counters of a user's active tasks
+
+    Every counter comes from one conditional-aggregate query over the tasks
+    (plus one query for the stage names). Results for the unfiltered task
+    list are cached per user; a filtered ``queryset`` is always computed.
+    """
+    if queryset is not None:
+        return compute_dashboard_stats(user, queryset)
+
+    today = timezone.now().date()
+    cache_key = dashboard_cache_key(user.id)
+    stats = cache.get(cache_key)
+    if stats is None or stats.get('date') != today.isoformat():
+        stats = compute_dashboard_stats(user)
+        cache.set(cache_key, stats, DASHBOARD_CACHE_TIMEOUT)
+    return stats
+
+
+def compute_dashboard_stats(user, queryset: Optional = None) -> Dict:
+    if queryset is None:
+        queryset = Task.objects.filter(user=user, active=True)
+
+    now = timezone.now()
+    today = now.date()
+    week_ago = now - timedelta(days=7)
+    stages = list(PersonalStageType.objects.filter(user=user).values_list('id', 'name'))
+
+    counters = {
+        'total_tasks': Count('id'),
+        'completed_tasks': Count('id', filter=Q(state='1_done')),
+        'due_today': Count('id', filter=Q(due_date__date=today)),
+        'overdue': Count('id', filter=Q(due_date__lt=now, state__in=OPEN_STATES)),
+        'normal': Count('id', filter=Q(priority='0')),
+        'starred': Count('id', filter=Q(priority='1')),
+        'completed_this_week': Count('id', filter=Q(state='1_done', completed_at__gte=week_ago)),
+        'created_this_week': Count('id', filter=Q(created_at__gte=week_ago)),
+    }
+    for index, (stage_id, _) in enumerate(stages):
+        counters[f'stage_{index}'] = Count('id', filter=Q(personal_stage_type_id=stage_id))
+
+    totals = queryset.order_by().aggregate(**counters)
+
+    by_stage = {}
+    for index, (_, name) in enumerate(stages):
+        by_stage[name] = totals[f'stage_{index}']
+
+    return {
+        'date': today.isoformat(),
+        'total_tasks': totals['total_tasks'],
+        'completed_tasks': totals['completed_tasks'],
+        'due_today': totals['due_today'],
+        'overdue': totals['overdue'],
+        'important': totals['starred'],
+        'by_stage': by_stage,
+        'by_priority': {
+            'normal': totals['normal'],
+            'starred': totals['starred'],
+        },
+        'activity': {
+            'tasks_completed_this_week': totals['completed_this_week'],
+            'tasks_created_this_week': totals['created_this_week'],
+        },
+    }
@@ -0,0 +1,119 @@
+import csv
+import json
+import tempfile
+from typing import Dict, Iterable, Iterator
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models.todo_models import Task
+
+# Tasks fetched per database round trip while streaming an export
+DEFAULT_EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = [
+    'id', 'title', 'description', 'state', 'priority', 'project', 'stage', 'tags',
+    'created_at', 'updated_at', 'completed_at', 'due_date', 'progress_percentage',
+    'is_overdue', 'active',
+]
+
+# Same wording as the import parser expects (see importer.py)
+PRIORITY_LABELS = {'0': 'Normal', '1': 'High'}
+
+
+def export_queryset(user, start_date=None, include_completed=True):
+    """Tasks of an activity export, newest first"""
+    tasks = Task.objects.filter(user=user)
+    if start_date is not None:
+        tasks = tasks.filter(created_at__gte=start_date)
+    if not include_completed:
+        tasks = tasks.exclude(state='1_done')
+    return tasks.select_related('project', 'personal_stage_type').prefetch_related('tags').order_by('-created_at', 'id')
+
+
+def iter_activities(queryset, chunk_size=None) -> Iterator[Dict]:
+    """
+    Export rows of the tasks, read ``chunk_size`` at a time
+
+    Tags are prefetched per chunk, so memory stays bounded whatever the
+    length of the history.
+    """
+    chunk_size = chunk_size or getattr(settings, 'TODO_EXPORT_CHUNK_SIZE', DEFAULT_EXPORT_CHUNK_SIZE)
+    now = timezone.now()
+    for task in queryset.iterator(chunk_size=chunk_size):
+        yield activity_row(task, now)
+
+
+def activity_row(task: Task, now=None) -> Dict:
+    now = now or timezone.now()
+    description = task.description or ''
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': description[:100] + '...' if len(description) > 100 else description,
+        'state': task.get_state_display(),
+        'priority': PRIORITY_LABELS.get(task.priority, 'Normal'),
+        'project': task.project.name if task.project else 'No Project',
+        'stage': task.personal_stage_type.name if task.personal_stage_type else 'No Stage',
+        'tags': ', '.join(tag.name for tag in task.tags.all()),
+        'created_at': task.created_at.isoformat(),
+        'updated_at': task.updated_at.isoformat() if task.updated_at else '',
+        'completed_at': task.completed_at.isoformat() if task.completed_at else '',
+        'due_date': task.due_date.isoformat() if task.due_date else '',
+        'progress_percentage': task.progress_percentage,
+        'is_overdue': 'Yes' if task.due_date and task.due_date < now and task.state != '1_done' else 'No',
+        'active': 'Yes' if task.active else 'No',
+    }
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(activities: Iterable[Dict]) -> Iterator[str]:
+    # BOM for Excel compatibility with UTF-8
+    yield '\ufeff'
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_FIELDS, lineterminator='\n')
+    yield writer.writeheader()
+    for activity in activities:
+        yield writer.writerow({key: '' if value is None else str(value) for key, value in activity.items()})
+
+
+def iter_ndjson(activities: Iterable[Dict]) -> Iterator[str]:
+    for activity in activities:
+        yield json.dumps(activity, cls=DjangoJSONEncoder) + '\n'
+
+
+def iter_json(activities: Iterable[Dict]) -> Iterator[str]:
+    """``{"activities": [...]}`` written one activity at a time"""
+    yield '{"activities": ['
+    separator = ''
+    for activity in activities:
+        yield separator + json.dumps(activity, cls=DjangoJSONEncoder)
+        separator = ', '
+    yield ']}'
+
+
+def write_xlsx(activities: Iterable[Dict]):
+    """
+    Spreadsheet of the activities in a temporary file, rewound for reading
+
+    The workbook is write-only: rows go straight to disk instead of being
+    kept as cells in memory.
+    """
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Activity Export")
+    sheet.append(EXPORT_FIELDS)
+    for activity in activities:
+        sheet.append([str(activity['id'])] + [activity[key] for key in EXPORT_FIELDS[1:]])
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
@@ -0,0 +1,461 @@
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .dashboard import invalidate_dashboard_stats
+from .models.todo_models import Category, PersonalStageType, Project, Tag, Task, TaskImportJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMPORT_CHUNK_SIZE = 1000
+DEFAULT_IMPORT_WORKERS = 2
+# Only the first errors are kept on the job; the rest are counted
+MAX_REPORTED_ERRORS = 100
+JSON_READ_SIZE = 64 * 1024
+
+SUPPORTED_FORMATS = ('csv', 'json')
+
+
+class ImportFormatError(ValueError):
+    """The file is not a task export this importer understands"""
+
+
+# ---------------------------------------------------------------------------
+# Streaming readers
+# ---------------------------------------------------------------------------
+
+def iter_csv_rows(binary_file) -> Iterator[Dict]:
+    """Yield the rows of a CSV export one at a time"""
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # The caller owns the binary file
+        text.detach()
+
+
+class _JsonStream:
+    """Text buffer over a file, refilled on demand for incremental decoding"""
+
+    def __init__(self, text_file, read_size=None):
+        self.file = text_file
+        self.read_size = read_size or JSON_READ_SIZE
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has already been decoded
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ImportFormatError(f"Expected '{char}' in JSON file")
+        self.pos += 1
+
+    def decode(self):
+        """Decode the next JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_json_rows(binary_file) -> Iterator[Dict]:
+    """
+    Yield the tasks of a JSON export one at a time
+
+    Accepts an array of tasks or an object with a ``tasks`` or
+    ``activities`` array, without loading the whole document.
+    """
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig')
+    try:
+        yield from _iter_json_array(_JsonStream(text))
+    finally:
+        # The caller owns the binary file
+        text.detach()
+
+
+def _iter_json_array(stream: _JsonStream) -> Iterator[Dict]:
+    if stream.peek() == '{':
+        stream.expect('{')
+        while True:
+            if stream.peek() != '"':
+                raise ImportFormatError(
+                    'Invalid JSON format. Expected array of tasks or object with tasks/activities key.'
+                )
+            key = stream.decode()
+            stream.expect(':')
+            if key in ('tasks', 'activities') and stream.peek() == '[':
+                break
+            stream.decode()
+            if stream.peek() == ',':
+                stream.expect(',')
+
+    stream.expect('[')
+    if stream.peek() == ']':
+        return
+    while True:
+        yield stream.decode()
+        if stream.peek() == ']':
+            return
+        stream.expect(',')
+
+
+# ---------------------------------------------------------------------------
+# Row parsing
+# ---------------------------------------------------------------------------
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _parse_state(value) -> str:
+    state = str(value or '').strip().lower()
+    if 'progress' in state:
+        return '1_in_progress'
+    if 'done' in state or 'complete' in state:
+        return '1_done'
+    if 'cancel' in state:
+        return '1_canceled'
+    return '1_todo'
+
+
+STATUS_BY_STATE = {
+    '1_todo': 'todo',
+    '1_in_progress': 'in_progress',
+    '1_done': 'completed',
+    '1_canceled': 'cancelled',
+}
+
+
+def _parse_priority(value) -> str:
+    if isinstance(value, int):
+        return '1' if value > 0 else '0'
+    priority = str(value or '').strip().lower()
+    if priority in ('1', 'high', 'critical', 'urgent', 'starred') or 'high' in priority:
+        return '1'
+    return '0'
+
+
+def _parse_tags(value) -> List[str]:
+    if isinstance(value, list):
+        names = [str(name) for name in value]
+    else:
+        names = str(value or '').split(',')
+    return [name.strip()[:50] for name in names if name and name.strip()]
+
+
+class ImportLookups:
+    """
+    Projects, categories, stages and tags of the importing user, loaded once
+    and completed with the names met during the import
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.projects = {project.name: project for project in Project.objects.filter(user=user)}
+        self.categories = {category.name: category for category in Category.objects.filter(user=user)}
+        self.tags = {tag.name: tag for tag in Tag.objects.filter(user=user)}
+        stages = list(PersonalStageType.objects.filter(user=user).order_by('sequence'))
+        if not stages:
+            PersonalStageType.create_default_stages(user)
+            stages = list(PersonalStageType.objects.filter(user=user).order_by('sequence'))
+        self.stages = {}
+        for stage in stages:
+            self.stages.setdefault(stage.name, stage)
+        self.last_stage_sequence = max(stage.sequence for stage in stages)
+        self.default_stage = self.stages.get('To Do') or stages[0]
+
+    def project(self, name: str, category_name: str = '') -> Optional[Project]:
+        if not name or name == 'No Project':
+            return None
+        if name not in self.projects:
+            self.projects[name] = Project.objects.create(
+                user=self.user,
+                name=name,
+                description=f'Imported project: {name}',
+                category=self.category(category_name)
+            )
+        return self.projects[name]
+
+    def category(self, name: str) -> Optional[Category]:
+        if not name:
+            return None
+        if name not in self.categories:
+            self.categories[name], _ = Category.objects.get_or_create(user=self.user, name=name)
+        return self.categories[name]
+
+    def stage(self, name: str) -> PersonalStageType:
+        if not name or name == 'No Stage':
+            return self.default_stage
+        if name not in self.stages:
+            self.last_stage_sequence += 10
+            self.stages[name] = PersonalStageType.objects.create(
+                user=self.user,
+                name=name,
+                sequence=self.last_stage_sequence,
+                color='#6B7280'  # Default gray color
+            )
+        return self.stages[name]
+
+    def tag(self, name: str) -> Tag:
+        if name not in self.tags:
+            self.tags[name], _ = Tag.objects.get_or_create(user=self.user, name=name)
+        return self.tags[name]
+
+
+def build_task(row: Dict, lookups: ImportLookups) -> Optional[Tuple[Task, List[str]]]:
+    """Unsaved task and tag names for an imported row (None for rows without title)"""
+    title = str(row.get('title') or '').strip()
+    if not title:
+        return None
+
+    stage = lookups.stage(str(row.get('stage') or '').strip())
+    state = _parse_state(row.get('state'))
+    completed_at = _parse_datetime(row.get('completed_at')) if state == '1_done' else None
+
+    # Same state/stage rules as Task.save for new tasks
+    if stage.is_closed and state != '1_done':
+        state = '1_done'
+    elif not stage.is_closed and state == '1_done':
+        state = '1_todo'
+        completed_at = None
+    if state == '1_done' and completed_at is None:
+        completed_at = timezone.now()
+
+    progress = row.get('progress_percentage')
+    task = Task(
+        user=lookups.user,
+        title=title[:200],
+        description=str(row.get('description') or ''),
+        state=state,
+        status=STATUS_BY_STATE[state],
+        priority=_parse_priority(row.get('priority')),
+        project=lookups.project(
+            str(row.get('project') or '').strip(),
+            str(row.get('category') or '').strip()
+        ),
+        personal_stage_type=stage,
+        due_date=_parse_datetime(row.get('due_date')),
+        completed_at=completed_at,
+        progress_percentage=min(max(int(progress), 0), 100) if progress else 0,
+        active=True,
+    )
+    return task, _parse_tags(row.get('tags'))
+
+
+# ---------------------------------------------------------------------------
+# Import jobs
+# ---------------------------------------------------------------------------
+
+class TaskImporter:
+    """
+    Stream an export file into tasks, ``chunk_size`` rows per bulk_create
+
+    Progress is saved on the TaskImportJob after each chunk.
+    """
+
+    def __init__(self, job: TaskImportJob, chunk_size: Optional[int] = None):
+        self.job = job
+        self.chunk_size = chunk_size or getattr(settings, 'TODO_IMPORT_CHUNK_SIZE', DEFAULT_IMPORT_CHUNK_SIZE)
+        self.lookups = None
+        self.projects_touched = set()
+
+    def run(self, path: str) -> TaskImportJob:
+        job = self.job
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.total_bytes = os.path.getsize(path)
+        job.save(update_fields=['status', 'started_at', 'total_bytes'])
+
+        try:
+            self.lookups = ImportLookups(job.user)
+            with open(path, 'rb') as binary_file:
+                self._import(binary_file)
+        except (ImportFormatError, json.JSONDecodeError, UnicodeDecodeError, csv.Error) as e:
+            self._finish('failed', f'{job.file_format.upper()} processing failed: {str(e)}')
+        except Exception as e:
+            logger.error(f"Task import {job.id} failed: {str(e)}", exc_info=True)
+            self._finish('failed', f'Import failed: {str(e)}')
+        else:
+            message = f'Successfully imported {job.tasks_created} tasks'
+            if job.error_count:
+                message += f' with {job.error_count} errors'
+            self._finish('completed', message)
+        finally:
+            self._after_import()
+        return job
+
+    def _import(self, binary_file):
+        if self.job.file_format == 'csv':
+            rows, label, first = iter_csv_rows(binary_file), 'Row', 2
+        else:
+            rows, label, first = iter_json_rows(binary_file), 'Task', 1
+
+        chunk = []
+        for number, row in enumerate(rows, start=first):
+            self.job.rows_processed += 1
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError('expected an object')
+                built = build_task(row, self.lookups)
+                if built:
+                    chunk.append(built)
+            except Exception as e:
+                self._add_error(f"{label} {number}: {str(e)}")
+
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk, binary_file)
+                chunk = []
+        self._flush(chunk, binary_file)
+
+    @transaction.atomic
+    def _write_chunk(self, chunk):
+        tasks = Task.objects.bulk_create([task for task, _ in chunk])
+        TaskTag = Task.tags.through
+        links = [
+            TaskTag(task_id=task.id, tag_id=self.lookups.tag(name).id)
+            for task, (_, tag_names) in zip(tasks, chunk)
+            for name in set(tag_names)
+        ]
+        if links:
+            TaskTag.objects.bulk_create(links, ignore_conflicts=True)
+        self.projects_touched.update(task.project_id for task in tasks if task.project_id)
+        return len(tasks)
+
+    def _flush(self, chunk, binary_file):
+        if chunk:
+            self.job.tasks_created += self._write_chunk(chunk)
+        self.job.processed_bytes = binary_file.tell()
+        self.job.save(update_fields=[
+            'processed_bytes', 'rows_processed', 'tasks_created', 'error_count', 'errors'
+        ])
+
+    def _add_error(self, error: str):
+        self.job.error_count += 1
+        if len(self.job.errors) < MAX_REPORTED_ERRORS:
+            self.job.errors.append(error)
+
+    def _finish(self, status: str, message: str):
+        job = self.job
+        job.status = status
+        job.message = message
+        job.finished_at = timezone.now()
+        job.save()
+
+    def _after_import(self):
+        # bulk_create skips the Task signals
+        for project in Project.objects.filter(id__in=self.projects_touched):
+            project.update_progress()
+        invalidate_dashboard_stats(self.job.user_id)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'TODO_IMPORT_WORKERS', DEFAULT_IMPORT_WORKERS),
+                thread_name_prefix='todo-import'
+            )
+        return _executor
+
+
+def run_import_job(job_id, path: str):
+    """Run an import job from a spooled file, then delete the file"""
+    try:
+        job = TaskImportJob.objects.select_related('user').get(id=job_id)
+        TaskImporter(job).run(path)
+    finally:
+        os.unlink(path)
+
+
+def _run_in_background(job_id, path: str):
+    try:
+        run_import_job(job_id, path)
+    except Exception as e:
+        logger.error(f"Task import job {job_id} crashed: {str(e)}", exc_info=True)
+    finally:
+        # Worker threads own their DB connections
+        close_old_connections()
+
+
+def start_import(user, uploaded_file) -> TaskImportJob:
+    """
+    Spool an upload to disk and import it in the background
+
+    With ``TODO_IMPORT_EAGER = True`` the import runs inline (tests, scripts).
+    """
+    file_format = uploaded_file.name.rsplit('.', 1)[-1].lower()
+    if file_format not in SUPPORTED_FORMATS:
+        raise ImportFormatError('Unsupported file format. Please use CSV or JSON files.')
+
+    spool = tempfile.NamedTemporaryFile(prefix='todo-import-', suffix=f'.{file_format}', delete=False)
+    with spool:
+        for data in uploaded_file.chunks():
+            spool.write(data)
+
+    job = TaskImportJob.objects.create(
+        user=user,
+        file_name=uploaded_file.name[:255],
+        file_format=file_format,
+        total_bytes=uploaded_file.size or 0,
+    )
+
+    if getattr(settings, 'TODO_IMPORT_EAGER', False):
+        run_import_job(job.id, spool.name)
+        job.refresh_from_db()
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_background, job.id, spool.name))
+    return job
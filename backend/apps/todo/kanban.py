@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from .models.todo_models import PersonalStageType, Task
+
+# Tasks rendered per column before a "load more" button
+KANBAN_COLUMN_SIZE = 50
+# Drag-and-drop position first (see reorder.py), newest first among equals
+KANBAN_TASK_ORDERING = ('sequence', '-created_at')
+
+
+@dataclass
+class KanbanColumn:
+    """One stage of the board with a page of its tasks"""
+    stage: PersonalStageType
+    tasks: List[Task] = field(default_factory=list)
+    total: int = 0
+    offset: int = 0
+
+    @property
+    def next_offset(self) -> int:
+        return self.offset + len(self.tasks)
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_offset < self.total
+
+
+@dataclass
+class KanbanBoard:
+    stages: List[PersonalStageType]
+    columns: Dict = field(default_factory=dict)
+
+    @property
+    def tasks_by_stage(self) -> Dict:
+        return {stage_id: column.tasks for stage_id, column in self.columns.items()}
+
+    @property
+    def stage_counts(self) -> Dict:
+        return {stage_id: column.total for stage_id, column in self.columns.items()}
+
+
+class KanbanBoardLoader:
+    """
+    Load a user's kanban board with a fixed number of queries
+
+    All columns come from one task query: a window function numbers the tasks
+    of each stage so only the first ``column_size`` of every column are
+    fetched, along with the column totals. Tags are prefetched once for the
+    whole board. Further pages of a column are loaded with ``load_column``.
+    """
+
+    def __init__(self, user, column_size: Optional[int] = KANBAN_COLUMN_SIZE,
+                 ordering=KANBAN_TASK_ORDERING, queryset=None):
+        self.user = user
+        self.column_size = column_size
+        # Primary key last so pages of a column never overlap
+        self.ordering = [*ordering, 'id']
+        self.queryset = queryset
+
+    def get_stages(self) -> List[PersonalStageType]:
+        """Personal stages of the user, created with defaults on first use"""
+        stages = list(PersonalStageType.objects.filter(user=self.user).order_by('sequence'))
+        if not stages:
+            PersonalStageType.create_default_stages(self.user)
+            stages = list(PersonalStageType.objects.filter(user=self.user).order_by('sequence'))
+        return stages
+
+    def get_tasks(self):
+        """Active tasks the board is built from"""
+        if self.queryset is not None:
+            tasks = self.queryset
+        else:
+            tasks = Task.objects.filter(user=self.user, active=True)
+        return tasks.select_related('project', 'personal_stage_type').prefetch_related('tags')
+
+    def load(self, stages: Optional[List[PersonalStageType]] = None) -> KanbanBoard:
+        """Board with the first page of every column"""
+        if stages is None:
+            stages = self.get_stages()
+        board = KanbanBoard(stages=stages)
+        for stage in stages:
+            board.columns[stage.id] = KanbanColumn(stage=stage)
+
+        tasks = self.get_tasks().filter(
+            personal_stage_type__in=[stage.id for stage in stages]
+        ).annotate(
+            column_total=Window(Count('id'), partition_by=[F('personal_stage_type_id')])
+        )
+        if self.column_size is not None:
+            tasks = tasks.annotate(
+                column_position=Window(
+                    RowNumber(),
+                    partition_by=[F('personal_stage_type_id')],
+                    order_by=self.ordering
+                )
+            ).filter(column_position__lte=self.column_size)
+
+        for task in tasks.order_by(*self.ordering):
+            column = board.columns[task.personal_stage_type_id]
+            column.tasks.append(task)
+            column.total = task.column_total
+
+        return board
+
+    def load_column(self, stage: PersonalStageType, offset: int = 0) -> KanbanColumn:
+        """One page of a column, starting at ``offset``"""
+        tasks = self.get_tasks().filter(personal_stage_type=stage).order_by(*self.ordering)
+        if self.column_size is None:
+            page = list(tasks[offset:])
+            return KanbanColumn(stage=stage, tasks=page, total=offset + len(page), offset=offset)
+
+        # One extra row tells whether another page follows without a COUNT query
+        page = list(tasks[offset:offset + self.column_size + 1])
+        total = offset + len(page)
+        return KanbanColumn(stage=stage, tasks=page[:self.column_size], total=total, offset=offset)
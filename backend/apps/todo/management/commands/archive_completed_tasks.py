@@ -6,6 +6,7 @@ from datetime import timedelta
 import json
 
 from apps.todo.models.todo_models import Task, PersonalStageType
+from apps.todo.dashboard import invalidate_dashboard_stats
 
 User = get_user_model()
 
@@ -129,6 +130,7 @@ class Command(BaseCommand):
             if not dry_run and archived_count > 0:
                 # Move tasks to Archives stage
                 tasks_to_archive.update(personal_stage_type=archives_stage)
+                invalidate_dashboard_stats(user.id)
                 
                 self.stdout.write(
                     f'Archived {archived_count} tasks for user {user.username} '
@@ -161,6 +163,7 @@ class Command(BaseCommand):
             if not dry_run and deleted_count > 0:
                 # Soft delete (set active=False)
                 tasks_to_delete.update(active=False)
+                invalidate_dashboard_stats(user.id)
                 
                 self.stdout.write(
                     f'Deleted {deleted_count} archived tasks for user {user.username} '
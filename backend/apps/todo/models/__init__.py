@@ -1,4 +1,4 @@
 from .todo_models import (
     PersonalStageType, Category, Tag, Project, Task, Note, 
-    Reminder, TaskTemplate, TodoSettings
+    Reminder, TaskTemplate, TodoSettings, TaskImportJob
 )
\ No newline at end of file
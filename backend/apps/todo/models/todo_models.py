@@ -636,4 +636,67 @@ class TodoSettings(models.Model):
     def get_or_create_for_user(cls, user):
         """Get or create settings for a user with defaults"""
         settings, created = cls.objects.get_or_create(user=user)
-        return settings
\ No newline at end of file
+        return settings
+
+class TaskImportJob(models.Model):
+    """Background import of tasks from a CSV/JSON export, polled for progress"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='todo_import_jobs')
+    file_name = models.CharField(max_length=255)
+    file_format = models.CharField(max_length=10)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    # Progress
+    total_bytes = models.BigIntegerField(default=0)
+    processed_bytes = models.BigIntegerField(default=0)
+    rows_processed = models.PositiveIntegerField(default=0)
+    tasks_created = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="First row errors of the import")
+    message = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Task Import Job'
+        verbose_name_plural = 'Task Import Jobs'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Import {self.file_name} for {self.user.username} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+    
+    @property
+    def progress(self):
+        """Progress in percent, from the share of the file already read"""
+        if self.is_finished:
+            return 100
+        if not self.total_bytes:
+            return 0
+        return min(99, int(self.processed_bytes * 100 / self.total_bytes))
+    
+    def to_dict(self):
+        return {
+            'job_id': str(self.id),
+            'status': self.status,
+            'progress': self.progress,
+            'rows_processed': self.rows_processed,
+            'tasks_created': self.tasks_created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'message': self.message,
+            'success': self.status != 'failed',
+            'finished': self.is_finished,
+        }
@@ -0,0 +1,172 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .kanban import KANBAN_TASK_ORDERING
+from .models.todo_models import PersonalStageType, Task
+
+logger = logging.getLogger(__name__)
+
+# Room left between consecutive sequences: a move takes the midpoint of its
+# neighbours, so about ten moves fit into the same gap before a rebalance
+SEQUENCE_GAP = 1024
+# Sequences are stored in a 32-bit IntegerField
+MAX_SEQUENCE = 2 ** 31 - 1 - SEQUENCE_GAP
+
+STAGE_ORDERING = ('sequence', 'created_at')
+
+
+class SequenceReorder:
+    """
+    Gapped ``sequence`` ordering for a list of rows (the stages of a user,
+    the tasks of a stage)
+
+    Moving a row reads its two new neighbours and updates that row only.
+    When no integer is left between the neighbours the whole list is
+    renumbered with a single ``bulk_update``.
+    """
+
+    def __init__(self, queryset, ordering: Iterable[str], field: str = 'sequence'):
+        self.queryset = queryset
+        self.ordering = [*ordering, 'pk']
+        self.field = field
+        self.rebalanced = False
+
+    def move(self, pk, position: int) -> int:
+        """Put row ``pk`` at index ``position`` of the list; returns its new sequence"""
+        position = max(int(position), 0)
+        siblings = self.queryset.exclude(pk=pk).order_by(*self.ordering)
+        values = siblings.values_list(self.field, flat=True)
+
+        if position == 0:
+            previous = None
+            following = values.first()
+        else:
+            neighbours = list(values[position - 1:position + 1])
+            if not neighbours:
+                # Past the end of the list: append after the last row
+                neighbours = [values.last()]
+            previous = neighbours[0]
+            following = neighbours[1] if len(neighbours) > 1 else None
+
+        sequence = self._sequence_between(previous, following)
+        if sequence is None:
+            return self._rebalance(pk, position)
+
+        self.queryset.model.objects.filter(pk=pk).update(**{self.field: sequence})
+        return sequence
+
+    def reorder(self, pks: List) -> int:
+        """
+        Renumber rows in the given order; returns the number of rows updated
+
+        IDs may be strings (JSON payloads); raises ValidationError for an
+        invalid ID. Unknown IDs are skipped.
+        """
+        to_python = self.queryset.model._meta.pk.to_python
+        pks = [to_python(pk) for pk in pks]
+        known = set(self.queryset.filter(pk__in=pks).values_list('pk', flat=True))
+        return self._write([pk for pk in pks if pk in known])
+
+    def _sequence_between(self, previous: Optional[int], following: Optional[int]) -> Optional[int]:
+        if previous is None and following is None:
+            return SEQUENCE_GAP
+        if previous is None:
+            sequence = following - SEQUENCE_GAP
+        elif following is None:
+            sequence = previous + SEQUENCE_GAP
+        elif following - previous >= 2:
+            sequence = (previous + following) // 2
+        else:
+            return None
+        return sequence if abs(sequence) <= MAX_SEQUENCE else None
+
+    def _rebalance(self, pk, position: int) -> int:
+        pks = list(self.queryset.exclude(pk=pk).order_by(*self.ordering).values_list('pk', flat=True))
+        position = min(position, len(pks))
+        pks.insert(position, pk)
+        self._write(pks)
+        self.rebalanced = True
+        logger.debug(f"Rebalanced {len(pks)} {self.queryset.model.__name__} sequences")
+        return (position + 1) * SEQUENCE_GAP
+
+    def _write(self, pks: List) -> int:
+        model = self.queryset.model
+        rows = [model(pk=pk, **{self.field: (index + 1) * SEQUENCE_GAP}) for index, pk in enumerate(pks)]
+        return model.objects.bulk_update(rows, [self.field], batch_size=500)
+
+
+def parse_position(value) -> int:
+    """List index of a move (``None`` or empty means the top); raises ValueError or TypeError"""
+    if value in (None, ''):
+        return 0
+    return max(int(value), 0)
+
+
+def stage_reorder(user) -> SequenceReorder:
+    return SequenceReorder(PersonalStageType.objects.filter(user=user), STAGE_ORDERING)
+
+
+def task_reorder(user, stage) -> SequenceReorder:
+    return SequenceReorder(
+        Task.objects.filter(user=user, personal_stage_type=stage, active=True),
+        KANBAN_TASK_ORDERING
+    )
+
+
+def move_task_to_stage(task: Task, stage: PersonalStageType):
+    """Change the stage of a task, syncing its state with the new stage"""
+    task.personal_stage_type = stage
+
+    if stage.is_closed and task.state != '1_done':
+        # Moving to a closed stage (like Done) - mark as completed
+        task.state = '1_done'
+        task.completed_at = timezone.now()
+    elif not stage.is_closed and task.state == '1_done':
+        # Moving from closed stage to open stage - reopen task
+        task.state = '1_todo'
+        task.completed_at = None
+
+    # Special handling for common stage names
+    stage_name = stage.name.lower()
+    if stage_name in ['done', 'terminé', 'completed', 'fini']:
+        task.state = '1_done'
+        task.completed_at = timezone.now()
+    elif stage_name in ['in progress', 'en cours', 'doing', 'work']:
+        if task.state not in ['1_done']:
+            task.state = '1_in_progress'
+    elif stage_name in ['todo', 'to do', 'à faire', 'backlog']:
+        if task.state not in ['1_done']:
+            task.state = '1_todo'
+
+    task.save()
+
+
+@transaction.atomic
+def apply_moves(user, moves: List[Dict]) -> List[Dict]:
+    """
+    Apply kanban drag-and-drop moves
+
+    Each move is ``{'type': 'task' | 'stage', 'id': ..., 'position': n}``;
+    task moves may also carry the ``stage_id`` the task is dropped into.
+    Returns the new sequence of every moved row. Raises ValueError or
+    TypeError for a malformed move, ValidationError for an invalid ID.
+    """
+    results = []
+    for move in moves:
+        position = parse_position(move.get('position'))
+
+        if move.get('type') == 'stage':
+            stage = PersonalStageType.objects.get(id=move['id'], user=user)
+            sequence = stage_reorder(user).move(stage.pk, position)
+        else:
+            task = Task.objects.select_related('personal_stage_type').get(id=move['id'], user=user)
+            stage_id = move.get('stage_id')
+            if stage_id and str(stage_id) != str(task.personal_stage_type_id):
+                move_task_to_stage(task, PersonalStageType.objects.get(id=stage_id, user=user))
+            sequence = task_reorder(user, task.personal_stage_type).move(task.pk, position)
+
+        results.append({'type': move.get('type', 'task'), 'id': str(move['id']), 'sequence': sequence})
+    return results
@@ -2,6 +2,7 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from .models import Task, Project, Category, Tag, PersonalStageType
+from .dashboard import invalidate_dashboard_stats
 
 User = get_user_model()
 
@@ -20,6 +21,15 @@ def update_project_progress_on_delete(sender, instance, **kwargs):
         instance.project.update_progress()
 
 
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=PersonalStageType)
+@receiver(post_delete, sender=PersonalStageType)
+def invalidate_dashboard_stats_cache(sender, instance, **kwargs):
+    """Drop cached dashboard counters when a task or stage changes"""
+    invalidate_dashboard_stats(instance.user_id)
+
+
 @receiver(post_save, sender=User)
 def create_default_categories_and_onboarding(sender, instance, created, **kwargs):
     """Create default categories and onboarding for new users - Open Linguify inspired"""
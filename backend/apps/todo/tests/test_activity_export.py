@@ -0,0 +1,75 @@
+# backend/apps/todo/tests/test_activity_export.py
+import csv
+import io
+import json
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.todo.exporter import EXPORT_FIELDS, export_queryset, iter_activities
+from apps.todo.models import Tag, Task
+
+User = get_user_model()
+
+
+class ActivityExportTest(TestCase):
+    """
+    Tests for the streaming activity export
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='exporter',
+            email='exporter@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        Task.objects.filter(user=self.user).delete()
+        tag, _ = Tag.objects.get_or_create(user=self.user, name='urgent')
+        for index in range(5):
+            task = Task.objects.create(user=self.user, title=f'Task {index}', priority=str(index % 2))
+            task.tags.add(tag)
+        self.client.force_login(self.user)
+
+    def export(self, export_format):
+        response = self.client.get('/todo/activity/export/', {'format': export_format, 'range': 365})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_rows_are_read_in_chunks(self):
+        # one cursor over the tasks, one tag query per chunk of 2
+        with self.assertNumQueries(4):
+            rows = list(iter_activities(export_queryset(self.user), chunk_size=2))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['tags'], 'urgent')
+        self.assertEqual({row['priority'] for row in rows}, {'Normal', 'High'})
+
+    def test_csv_is_streamed(self):
+        response = self.export('csv')
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['state'], 'To Do')
+
+    def test_json_and_ndjson(self):
+        response = self.export('json')
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data['activities']), 5)
+
+        response = self.export('ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines][-1], 'Task 0')
+
+    def test_xlsx(self):
+        response = self.export('xlsx')
+        workbook = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook.active.values)
+        self.assertEqual(list(rows[0]), EXPORT_FIELDS)
+        self.assertEqual(len(rows), 6)
+
+    def test_unsupported_format(self):
+        response = self.client.get('/todo/activity/export/', {'format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
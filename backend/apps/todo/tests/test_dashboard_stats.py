@@ -0,0 +1,79 @@
+# backend/apps/todo/tests/test_dashboard_stats.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.todo.dashboard import compute_dashboard_stats, get_dashboard_stats
+from apps.todo.models import PersonalStageType, Task
+
+User = get_user_model()
+
+
+class DashboardStatsTest(TestCase):
+    """
+    Tests for the todo dashboard stats service
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='dashboard',
+            email='dashboard@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        # Start from an empty board (the onboarding task is created on signup)
+        Task.objects.filter(user=self.user).delete()
+        self.todo = PersonalStageType.objects.get(user=self.user, name='To Do')
+        self.done = PersonalStageType.objects.get(user=self.user, name='Done')
+        now = timezone.now()
+        Task.objects.create(user=self.user, title='Due today', personal_stage_type=self.todo, due_date=now + timedelta(minutes=1))
+        Task.objects.create(user=self.user, title='Overdue', personal_stage_type=self.todo, due_date=now - timedelta(days=2), priority='1')
+        Task.objects.create(user=self.user, title='Finished', personal_stage_type=self.done)
+        Task.objects.create(user=self.user, title='Inactive', personal_stage_type=self.todo, active=False)
+
+    def test_counters(self):
+        with self.assertNumQueries(2):  # stages, aggregate
+            stats = compute_dashboard_stats(self.user)
+
+        self.assertEqual(stats['total_tasks'], 3)
+        self.assertEqual(stats['completed_tasks'], 1)
+        self.assertEqual(stats['overdue'], 1)
+        self.assertEqual(stats['important'], 1)
+        self.assertEqual(stats['by_priority'], {'normal': 2, 'starred': 1})
+        self.assertEqual(stats['by_stage']['To Do'], 2)
+        self.assertEqual(stats['by_stage']['Done'], 1)
+        self.assertEqual(stats['activity']['tasks_created_this_week'], 3)
+        self.assertEqual(stats['activity']['tasks_completed_this_week'], 1)
+
+    def test_cached_until_a_task_changes(self):
+        get_dashboard_stats(self.user)
+        with self.assertNumQueries(0):
+            stats = get_dashboard_stats(self.user)
+        self.assertEqual(stats['total_tasks'], 3)
+
+        Task.objects.create(user=self.user, title='New', personal_stage_type=self.todo)
+        self.assertEqual(get_dashboard_stats(self.user)['total_tasks'], 4)
+
+        Task.objects.get(title='New').delete()
+        self.assertEqual(get_dashboard_stats(self.user)['total_tasks'], 3)
+
+    def test_stage_rename_invalidates(self):
+        get_dashboard_stats(self.user)
+        self.todo.name = 'Backlog'
+        self.todo.save()
+
+        self.assertIn('Backlog', get_dashboard_stats(self.user)['by_stage'])
+
+    def test_dashboard_endpoint(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/v1/todo/tasks/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_tasks'], 3)
+
+        response = self.client.get('/api/v1/todo/tasks/dashboard/', {'priority': '1'})
+        self.assertEqual(response.json()['total_tasks'], 1)
@@ -0,0 +1,141 @@
+# backend/apps/todo/tests/test_kanban_loader.py
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.todo.kanban import KanbanBoardLoader
+from apps.todo.models import PersonalStageType, Tag, Task
+
+User = get_user_model()
+
+
+class KanbanBoardLoaderTest(TestCase):
+    """
+    Tests for KanbanBoardLoader
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='kanban',
+            email='kanban@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        self.stages = [
+            PersonalStageType.objects.create(user=self.user, name=f'Stage {i}', sequence=i)
+            for i in range(4)
+        ]
+        self.tag, _ = Tag.objects.get_or_create(user=self.user, name='urgent')
+
+    def add_tasks(self, stage, count):
+        tasks = [
+            Task.objects.create(user=self.user, title=f'{stage.name} task {i}', personal_stage_type=stage)
+            for i in range(count)
+        ]
+        for task in tasks:
+            task.tags.add(self.tag)
+        return tasks
+
+    def test_board_query_count_is_independent_of_stages(self):
+        for stage in self.stages:
+            self.add_tasks(stage, 3)
+
+        with CaptureQueriesContext(connection) as small_board:
+            KanbanBoardLoader(self.user).load()
+
+        for i in range(4, 15):
+            stage = PersonalStageType.objects.create(user=self.user, name=f'Stage {i}', sequence=i)
+            self.add_tasks(stage, 2)
+
+        with CaptureQueriesContext(connection) as large_board:
+            board = KanbanBoardLoader(self.user).load()
+            for column in board.columns.values():
+                for task in column.tasks:
+                    list(task.tags.all())
+
+        self.assertEqual(len(small_board), len(large_board))
+        self.assertEqual(len(large_board), 3)  # stages, tasks, tags
+        self.assertEqual(len(board.stages), PersonalStageType.objects.filter(user=self.user).count())
+
+    def test_columns_are_paginated(self):
+        self.add_tasks(self.stages[0], 5)
+        self.add_tasks(self.stages[1], 2)
+
+        board = KanbanBoardLoader(self.user, column_size=3).load()
+
+        first = board.columns[self.stages[0].id]
+        self.assertEqual((len(first.tasks), first.total, first.has_more), (3, 5, True))
+        second = board.columns[self.stages[1].id]
+        self.assertEqual((len(second.tasks), second.total, second.has_more), (2, 2, False))
+        self.assertEqual(board.stage_counts[self.stages[2].id], 0)
+
+        rest = KanbanBoardLoader(self.user, column_size=3).load_column(self.stages[0], offset=first.next_offset)
+        self.assertEqual(len(rest.tasks), 2)
+        self.assertFalse(rest.has_more)
+        loaded = {task.id for task in first.tasks} | {task.id for task in rest.tasks}
+        self.assertEqual(len(loaded), 5)
+
+    def test_inactive_tasks_are_excluded(self):
+        task = self.add_tasks(self.stages[0], 1)[0]
+        Task.objects.filter(id=task.id).update(active=False)
+
+        board = KanbanBoardLoader(self.user).load()
+
+        self.assertEqual(board.tasks_by_stage[self.stages[0].id], [])
+
+    def test_default_stages_are_created(self):
+        PersonalStageType.objects.filter(user=self.user).delete()
+
+        board = KanbanBoardLoader(self.user).load()
+
+        self.assertTrue(board.stages)
+        self.assertEqual(len(board.stages), PersonalStageType.objects.filter(user=self.user).count())
+
+    def test_load_more_endpoint(self):
+        self.add_tasks(self.stages[0], 3)
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            f'/todo/htmx/kanban/column/{self.stages[0].id}/',
+            {'offset': 1},
+            HTTP_HX_REQUEST='true'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().count('class="task-card-linguify kanban-card"'), 2)
+
+    def test_board_page_renders_columns(self):
+        self.add_tasks(self.stages[0], 2)
+        self.client.force_login(self.user)
+
+        response = self.client.get('/todo/kanban/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Stage 0 task 1')
+        self.assertEqual(response.context['stage_counts'][self.stages[0].id], 2)
+
+    def test_kanban_api_groups_tasks(self):
+        self.add_tasks(self.stages[1], 3)
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/v1/todo/tasks/kanban/', {'column_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        column = response.json()[str(self.stages[1].id)]
+        self.assertEqual(len(column['tasks']), 2)
+        self.assertEqual(column['total'], 3)
+        self.assertTrue(column['has_more'])
+
+    def test_invalid_paging_parameters_are_rejected(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/v1/todo/tasks/kanban/', {'column_size': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(
+            f'/todo/htmx/kanban/column/{self.stages[0].id}/',
+            {'offset': 'abc'},
+            HTTP_HX_REQUEST='true'
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,161 @@
+# backend/apps/todo/tests/test_reorder.py
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.todo.kanban import KanbanBoardLoader
+from apps.todo.models import PersonalStageType, Task
+from apps.todo.reorder import SEQUENCE_GAP, apply_moves, stage_reorder, task_reorder
+
+User = get_user_model()
+
+
+class SequenceReorderTest(TestCase):
+    """
+    Tests for the gapped sequence reorder engine
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='reorder',
+            email='reorder@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        self.stage = PersonalStageType.objects.create(user=self.user, name='Column', sequence=100)
+        self.other_stage = PersonalStageType.objects.create(user=self.user, name='Other', sequence=200)
+        self.tasks = [
+            Task.objects.create(user=self.user, title=f'Task {i}', personal_stage_type=self.stage)
+            for i in range(5)
+        ]
+        task_reorder(self.user, self.stage).reorder([task.id for task in self.tasks])
+
+    def column_titles(self, stage=None):
+        board = KanbanBoardLoader(self.user).load()
+        return [task.title for task in board.tasks_by_stage[(stage or self.stage).id]]
+
+    def test_move_updates_a_single_row(self):
+        reorder = task_reorder(self.user, self.stage)
+
+        with self.assertNumQueries(2):  # neighbours, update
+            reorder.move(self.tasks[4].id, 1)
+
+        self.assertFalse(reorder.rebalanced)
+        self.assertEqual(self.column_titles(), ['Task 0', 'Task 4', 'Task 1', 'Task 2', 'Task 3'])
+
+    def test_move_to_ends(self):
+        task_reorder(self.user, self.stage).move(self.tasks[2].id, 0)
+        task_reorder(self.user, self.stage).move(self.tasks[0].id, 99)
+
+        self.assertEqual(self.column_titles(), ['Task 2', 'Task 1', 'Task 3', 'Task 4', 'Task 0'])
+
+    def test_rebalance_when_gap_is_exhausted(self):
+        Task.objects.filter(id=self.tasks[1].id).update(sequence=SEQUENCE_GAP + 1)
+        reorder = task_reorder(self.user, self.stage)
+
+        reorder.move(self.tasks[3].id, 1)
+
+        self.assertTrue(reorder.rebalanced)
+        self.assertEqual(self.column_titles(), ['Task 0', 'Task 3', 'Task 1', 'Task 2', 'Task 4'])
+        sequences = list(Task.objects.filter(personal_stage_type=self.stage).order_by('sequence').values_list('sequence', flat=True))
+        self.assertEqual(sequences, [SEQUENCE_GAP * i for i in range(1, 6)])
+
+    def test_repeated_moves_keep_order(self):
+        expected = [task.title for task in self.tasks]
+        for _ in range(30):
+            task = Task.objects.get(title=expected[-1])
+            task_reorder(self.user, self.stage).move(task.id, 1)
+            expected.insert(1, expected.pop())
+
+        self.assertEqual(self.column_titles(), expected)
+
+    def test_stage_reorder(self):
+        stage_ids = [self.other_stage.id, self.stage.id]
+        stage_reorder(self.user).reorder(stage_ids)
+
+        ordered = list(PersonalStageType.objects.filter(id__in=stage_ids).order_by('sequence'))
+        self.assertEqual(ordered, [self.other_stage, self.stage])
+
+    def test_reorder_api_accepts_string_ids(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            f'/api/v1/todo/stages/{self.stage.id}/reorder_tasks/',
+            json.dumps({'task_ids': [str(task.id) for task in reversed(self.tasks)]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.column_titles(), [f'Task {i}' for i in reversed(range(5))])
+
+        response = self.client.post(
+            '/api/v1/todo/stages/reorder/',
+            json.dumps({'stage_ids': [str(self.other_stage.id), str(self.stage.id)]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        ordered = PersonalStageType.objects.filter(id__in=[self.stage.id, self.other_stage.id]).order_by('sequence')
+        self.assertEqual(list(ordered), [self.other_stage, self.stage])
+
+        response = self.client.post(
+            '/api/v1/todo/stages/reorder/', json.dumps({'stage_ids': ['not-a-uuid']}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_apply_moves_changes_stage(self):
+        apply_moves(self.user, [
+            {'type': 'task', 'id': self.tasks[0].id, 'stage_id': self.other_stage.id, 'position': 0},
+            {'type': 'stage', 'id': self.other_stage.id, 'position': 0},
+        ])
+
+        self.assertEqual(self.column_titles(self.other_stage), ['Task 0'])
+        self.assertEqual(
+            PersonalStageType.objects.filter(user=self.user).order_by('sequence').first(),
+            self.other_stage
+        )
+
+    def test_bulk_endpoint(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            '/todo/htmx/reorder/',
+            json.dumps({'moves': [{'type': 'task', 'id': str(self.tasks[3].id), 'position': 0}]}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['moves'][0]['id'], str(self.tasks[3].id))
+        self.assertEqual(self.column_titles()[0], 'Task 3')
+
+        response = self.client.post(
+            '/todo/htmx/reorder/',
+            json.dumps({'moves': [{'type': 'stage', 'id': '00000000-0000-0000-0000-000000000000', 'position': 0}]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_malformed_moves_are_rejected(self):
+        self.client.force_login(self.user)
+
+        for move in (
+            {'type': 'task', 'id': 'not-a-uuid', 'position': 0},
+            {'type': 'task', 'id': str(self.tasks[0].id), 'stage_id': 'not-a-uuid', 'position': 0},
+            {'type': 'task', 'id': str(self.tasks[0].id), 'position': 'top'},
+        ):
+            response = self.client.post(
+                '/todo/htmx/reorder/', json.dumps({'moves': [move]}), content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400, move)
+
+        response = self.client.post(
+            f'/todo/htmx/stages/{self.stage.id}/reorder/', json.dumps({'position': 'top'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            f'/api/v1/todo/stages/{self.stage.id}/reorder_single/', json.dumps({'position': 'top'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
@@ -0,0 +1,119 @@
+# backend/apps/todo/tests/test_task_import.py
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apps.todo.importer import ImportFormatError, iter_json_rows, start_import
+from apps.todo.models import PersonalStageType, Project, Task, TaskImportJob
+
+User = get_user_model()
+
+CSV_EXPORT = """title,description,state,priority,project,stage,tags,due_date
+"Sample Task 1","First","To Do","Normal","My Project","To Do","tag1,tag2","2025-12-31T23:59:59"
+"Sample Task 2","Second","In Progress","High","My Project","In Progress","tag2","2025-11-30T18:00:00"
+"Sample Task 3","Third","Done","Critical","Other Project","Done","tag1",""
+"","Untitled rows are skipped","","","","","",""
+"Bad progress","","","","","","",""
+"""
+
+
+@override_settings(TODO_IMPORT_EAGER=True, TODO_IMPORT_CHUNK_SIZE=2)
+class TaskImportTest(TestCase):
+    """
+    Tests for the streaming task import
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='importer',
+            email='importer@example.com',
+            password='testpass123',
+            is_active=True
+        )
+        Task.objects.filter(user=self.user).delete()
+
+    def test_csv_import(self):
+        upload = SimpleUploadedFile('tasks.csv', CSV_EXPORT.encode('utf-8'))
+        job = start_import(self.user, upload)
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.rows_processed, 5)
+        self.assertEqual(job.tasks_created, 4)
+        self.assertEqual(job.progress, 100)
+
+        tasks = {task.title: task for task in Task.objects.filter(user=self.user)}
+        self.assertEqual(tasks['Sample Task 1'].state, '1_todo')
+        self.assertEqual(tasks['Sample Task 1'].personal_stage_type.name, 'To Do')
+        self.assertEqual(tasks['Sample Task 2'].priority, '1')
+        self.assertEqual(tasks['Sample Task 3'].state, '1_done')
+        self.assertIsNotNone(tasks['Sample Task 3'].completed_at)
+        self.assertEqual(
+            sorted(tasks['Sample Task 1'].tags.values_list('name', flat=True)),
+            ['tag1', 'tag2']
+        )
+        # Unknown stages and projects are created once
+        self.assertEqual(PersonalStageType.objects.filter(user=self.user, name='In Progress').count(), 1)
+        self.assertEqual(Project.objects.filter(user=self.user, name='My Project').count(), 1)
+
+    def test_json_import_with_errors(self):
+        data = {'version': 1, 'tasks': [
+            {'title': 'From JSON', 'priority': 1, 'tags': ['a', 'b'], 'progress_percentage': 40},
+            'not a task',
+            {'title': 'Bad progress', 'progress_percentage': 'lots'},
+        ]}
+        upload = SimpleUploadedFile('tasks.json', json.dumps(data).encode('utf-8'))
+        job = start_import(self.user, upload)
+
+        self.assertEqual(job.status, 'completed', job.message)
+        self.assertEqual(job.tasks_created, 1)
+        self.assertEqual(job.error_count, 2)
+        self.assertTrue(job.errors[0].startswith('Task 2'))
+        task = Task.objects.get(user=self.user, title='From JSON')
+        self.assertEqual(task.progress_percentage, 40)
+        self.assertEqual(task.tags.count(), 2)
+
+    def test_invalid_json_fails_job(self):
+        upload = SimpleUploadedFile('tasks.json', b'{"other": 1}')
+        job = start_import(self.user, upload)
+        self.assertEqual(job.status, 'failed')
+        self.assertFalse(job.to_dict()['success'])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ImportFormatError):
+            start_import(self.user, SimpleUploadedFile('tasks.xlsx', b'data'))
+        self.assertFalse(TaskImportJob.objects.exists())
+
+    def test_json_stream_small_reads(self):
+        tasks = [{'title': f'Task {i}', 'progress_percentage': i} for i in range(20)]
+        payload = json.dumps({'activities': tasks}).encode('utf-8')
+        from apps.todo import importer
+        original = importer.JSON_READ_SIZE
+        importer.JSON_READ_SIZE = 7
+        try:
+            rows = list(iter_json_rows(io.BytesIO(payload)))
+        finally:
+            importer.JSON_READ_SIZE = original
+        self.assertEqual(rows, tasks)
+
+    def test_process_view_and_status(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('tasks.csv', CSV_EXPORT.encode('utf-8'))
+        response = self.client.post('/todo/import/process/', {'import_file': upload})
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertTrue(data['finished'])
+        self.assertEqual(data['tasks_created'], 4)
+
+        status = self.client.get(data['status_url'])
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual(status.json()['job_id'], data['job_id'])
+
+        other = User.objects.create_user(
+            username='other', email='other@example.com', password='testpass123', is_active=True
+        )
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(data['status_url']).status_code, 404)
@@ -49,6 +49,7 @@ urlpatterns = [
     path('htmx/tasks/modal/<uuid:task_id>/', TaskFormModalHTMXView.as_view(), name='task_form_modal_edit_htmx'),
     path('htmx/stages/<uuid:stage_id>/delete/', StageDeleteHTMXView.as_view(), name='stage_delete_htmx'),
     path('htmx/stages/<uuid:stage_id>/reorder/', StageReorderHTMXView.as_view(), name='stage_reorder_htmx'),
+    path('htmx/reorder/', KanbanReorderHTMXView.as_view(), name='kanban_reorder_htmx'),
     
     # New HTMX dropdown endpoints
     path('htmx/tasks/<uuid:task_id>/dropdown/', TaskDropdownToggleHTMXView.as_view(), name='task_dropdown_toggle_htmx'),
@@ -74,4 +75,5 @@ urlpatterns = [
     # Import endpoints
     path('import/', TaskImportModalHTMXView.as_view(), name='import_modal'),
     path('import/process/', TaskImportProcessHTMXView.as_view(), name='import_process'),
+    path('import/jobs/<uuid:job_id>/', TaskImportStatusView.as_view(), name='import_status'),
 ]
\ No newline at end of file
@@ -2,7 +2,7 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse
 from django.db.models import Q, Count, Avg, Max
 from django.utils import timezone
 from datetime import timedelta
@@ -14,6 +14,7 @@ import logging
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import get_object_or_404
+from ..exporter import export_queryset, iter_activities, iter_csv, iter_json, iter_ndjson, write_xlsx
 from ..models.todo_models import Task, Project, PersonalStageType, Tag, Category, Note, Reminder, TaskTemplate
 
 logger = logging.getLogger(__name__)
@@ -349,7 +350,7 @@ class ActivityExportView(LoginRequiredMixin, TemplateView):
     
     def get(self, request, *args, **kwargs):
         user = request.user
-        export_format = request.GET.get('format', 'json')  # json, csv, xlsx
+        export_format = request.GET.get('format', 'json')  # json, ndjson, csv, xlsx
         time_range = int(request.GET.get('range', 30))  # days
         
         start_date = timezone.now() - timedelta(days=time_range)
@@ -363,147 +364,47 @@ class ActivityExportView(LoginRequiredMixin, TemplateView):
             # Default to including completed tasks if no settings found
             include_completed = True
         
-        # Collect activity data
-        activities = []
-        
-        # Task activities - filter based on settings
-        tasks_query = Task.objects.filter(
-            user=user,
-            created_at__gte=start_date
-        )
-        
-        # Exclude completed tasks if setting is disabled
-        if not include_completed:
-            tasks_query = tasks_query.exclude(state='1_done')
-        
-        tasks = tasks_query.select_related('project', 'personal_stage_type').order_by('-created_at')
-        
-        for task in tasks:
-            # Get priority display name
-            if hasattr(task, 'priority') and task.priority is not None:
-                if task.priority == 0:
-                    priority_display = 'Normal'
-                elif task.priority == 1:
-                    priority_display = 'High'
-                elif task.priority == 2:
-                    priority_display = 'Critical'
-                else:
-                    priority_display = 'Normal'
-            else:
-                priority_display = 'Normal'
-            
-            # Get state display name
-            state_display = ''
-            if hasattr(task, 'state'):
-                if task.state == '0_todo':
-                    state_display = 'To Do'
-                elif task.state == '1_progress':
-                    state_display = 'In Progress'
-                elif task.state == '2_review':
-                    state_display = 'Review'
-                elif task.state == '1_done':
-                    state_display = 'Done'
-                else:
-                    state_display = task.personal_stage_type.name if task.personal_stage_type else 'Unknown'
-            
-            # Get tags
-            tags = ', '.join([tag.name for tag in task.tags.all()]) if hasattr(task, 'tags') else ''
-            
-            activities.append({
-                'id': task.id,
-                'title': task.title,
-                'description': task.description[:100] + '...' if task.description and len(task.description) > 100 else task.description or '',
-                'state': state_display,
-                'priority': priority_display,
-                'project': task.project.name if task.project else 'No Project',
-                'stage': task.personal_stage_type.name if task.personal_stage_type else 'No Stage',
-                'tags': tags,
-                'created_at': task.created_at.isoformat(),
-                'updated_at': task.updated_at.isoformat() if hasattr(task, 'updated_at') and task.updated_at else '',
-                'completed_at': task.completed_at.isoformat() if task.completed_at else '',
-                'due_date': task.due_date.isoformat() if task.due_date else '',
-                'progress_percentage': task.progress_percentage if hasattr(task, 'progress_percentage') else 0,
-                'is_overdue': 'Yes' if task.due_date and task.due_date < timezone.now() and task.state != '1_done' else 'No',
-                'active': 'Yes' if task.active else 'No',
-            })
+        tasks = export_queryset(user, start_date, include_completed)
         
         if export_format == 'json':
-            return self._export_json(activities)
+            return self._export_json(tasks)
+        elif export_format == 'ndjson':
+            return self._export_ndjson(tasks)
         elif export_format == 'csv':
-            return self._export_csv(activities)
+            return self._export_csv(tasks)
         elif export_format == 'xlsx':
-            return self._export_xlsx(activities)
+            return self._export_xlsx(tasks)
         else:
             return JsonResponse({'error': 'Unsupported format'}, status=400)
     
-    def _export_json(self, activities):
-        """Export as JSON"""
-        response = JsonResponse({'activities': activities})
+    def _export_json(self, tasks):
+        """Export as JSON, streamed"""
+        response = StreamingHttpResponse(iter_json(iter_activities(tasks)), content_type='application/json')
         response['Content-Disposition'] = 'attachment; filename="activity_export.json"'
         return response
     
-    def _export_csv(self, activities):
-        """Export as CSV with UTF-8 encoding"""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
+    def _export_ndjson(self, tasks):
+        """Export as newline-delimited JSON, one activity per line"""
+        response = StreamingHttpResponse(iter_ndjson(iter_activities(tasks)), content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="activity_export.ndjson"'
+        return response
+    
+    def _export_csv(self, tasks):
+        """Export as CSV with UTF-8 encoding, streamed"""
+        response = StreamingHttpResponse(iter_csv(iter_activities(tasks)), content_type='text/csv; charset=utf-8')
         response['Content-Disposition'] = 'attachment; filename="tasks_export.csv"'
-        # Add BOM for Excel compatibility with UTF-8
-        response.write('\ufeff')
-        
-        if activities:
-            writer = csv.DictWriter(response, fieldnames=activities[0].keys(), lineterminator='\n')
-            writer.writeheader()
-            for activity in activities:
-                # Ensure all values are properly encoded strings
-                encoded_activity = {}
-                for key, value in activity.items():
-                    if value is None:
-                        encoded_activity[key] = ''
-                    else:
-                        encoded_activity[key] = str(value)
-                writer.writerow(encoded_activity)
-        
         return response
     
-    def _export_xlsx(self, activities):
+    def _export_xlsx(self, tasks):
         """Export as Excel file"""
         try:
-            import openpyxl
-            from django.http import HttpResponse
-            from io import BytesIO
-            
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Activity Export"
-            
-            if activities:
-                # Write headers
-                headers = list(activities[0].keys())
-                for col, header in enumerate(headers, 1):
-                    ws.cell(row=1, column=col, value=header)
-                
-                # Write data
-                for row, activity in enumerate(activities, 2):
-                    for col, key in enumerate(headers, 1):
-                        value = activity[key]
-                        # Convert UUID objects to strings for Excel compatibility
-                        if hasattr(value, 'hex'):  # Check if it's a UUID
-                            value = str(value)
-                        ws.cell(row=row, column=col, value=value)
-            
-            # Save to BytesIO
-            buffer = BytesIO()
-            wb.save(buffer)
-            buffer.seek(0)
-            
-            response = HttpResponse(
-                buffer.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = 'attachment; filename="tasks_export.xlsx"'
-            return response
-            
+            output = write_xlsx(iter_activities(tasks))
         except ImportError:
             return JsonResponse({'error': 'Excel export not available (openpyxl not installed)'}, status=400)
+        
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename='tasks_export.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Q, Count, Avg, Max
 from django.utils import timezone
+from django.core.exceptions import ValidationError as DjangoValidationError
 from datetime import timedelta
 from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
@@ -12,7 +13,10 @@ from django.views.decorators.csrf import csrf_exempt
 import logging
 from ..models.todo_models import Task, Project, PersonalStageType, Tag, Category, Project, Task, Note, Category, Tag, Reminder, TaskTemplate, PersonalStageType
 from ..serializers import *
-from django.views.generic import TemplateView
+from ..kanban import KanbanBoardLoader
+from ..dashboard import get_dashboard_stats
+from ..reorder import apply_moves, parse_position, stage_reorder, task_reorder
+from django.views.generic import TemplateView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import get_object_or_404
 
@@ -73,25 +77,14 @@ class TodoMainView(LoginRequiredMixin, HTMXResponseMixin, TemplateView):
     
     def get_kanban_partial(self, user):
         """Return Kanban view partial"""
-        stages = PersonalStageType.objects.filter(user=user).order_by('sequence')
-        if not stages.exists():
-            PersonalStageType.create_default_stages(user)
-            stages = PersonalStageType.objects.filter(user=user).order_by('sequence')
-        
-        # Get tasks grouped by stages
-        tasks_by_stage = {}
-        for stage in stages:
-            stage_tasks = Task.objects.filter(
-                user=user,
-                personal_stage_type=stage,
-                active=True
-            ).select_related('project', 'personal_stage_type').prefetch_related('tags').order_by('-created_at')
-            
-            tasks_by_stage[stage.id] = stage_tasks
+        # Whole board in one task query, first page of each column
+        board = KanbanBoardLoader(user).load()
         
         context = {
-            'stages': stages, 
-            'tasks_by_stage': tasks_by_stage,
+            'stages': board.stages, 
+            'tasks_by_stage': board.tasks_by_stage,
+            'stage_counts': board.stage_counts,
+            'kanban_columns': board.columns,
             'today': timezone.now().date(),
             'projects': Project.objects.filter(user=user),
             'categories': Category.objects.filter(user=user)
@@ -114,17 +107,13 @@ class TodoMainView(LoginRequiredMixin, HTMXResponseMixin, TemplateView):
             PersonalStageType.create_default_stages(user)
         
         # Basic statistics for dashboard
-        tasks = Task.objects.filter(user=user, active=True)
-        today = timezone.now().date()
+        stats = get_dashboard_stats(user)
         
         context.update({
-            'total_tasks': tasks.count(),
-            'completed_tasks': tasks.filter(state='1_done').count(),
-            'due_today': tasks.filter(due_date__date=today).count(),
-            'overdue': tasks.filter(
-                due_date__lt=timezone.now(),
-                state__in=['1_todo', '1_in_progress']
-            ).count(),
+            'total_tasks': stats['total_tasks'],
+            'completed_tasks': stats['completed_tasks'],
+            'due_today': stats['due_today'],
+            'overdue': stats['overdue'],
             'personal_stages': PersonalStageType.objects.filter(user=user).order_by('sequence'),
             'projects': Project.objects.filter(user=user, status='active'),
             # Category support can be added later
@@ -168,26 +157,15 @@ class TodoKanbanView(LoginRequiredMixin, HTMXResponseMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        # Ensure personal stages exist
-        stages = PersonalStageType.objects.filter(user=user).order_by('sequence')
-        if not stages.exists():
-            PersonalStageType.create_default_stages(user)
-            stages = PersonalStageType.objects.filter(user=user).order_by('sequence')
-        
-        # Get tasks grouped by stages
-        tasks_by_stage = {}
-        for stage in stages:
-            stage_tasks = Task.objects.filter(
-                user=user,
-                personal_stage_type=stage,
-                active=True
-            ).select_related('project', 'personal_stage_type').prefetch_related('tags').order_by('-created_at')
-            
-            tasks_by_stage[stage.id] = stage_tasks
+        # Whole board in one task query (personal stages are created if missing),
+        # first page of each column
+        board = KanbanBoardLoader(user).load()
         
         context.update({
-            'stages': stages,
-            'tasks_by_stage': tasks_by_stage,
+            'stages': board.stages,
+            'tasks_by_stage': board.tasks_by_stage,
+            'stage_counts': board.stage_counts,
+            'kanban_columns': board.columns,
             'view_mode': 'kanban',
             'can_create': True,
             'can_edit': True,
@@ -517,13 +495,10 @@ class PersonalStageTypeViewSet(viewsets.ModelViewSet):
         """Reorder stages by sequence"""
         stage_ids = request.data.get('stage_ids', [])
         
-        for index, stage_id in enumerate(stage_ids):
-            try:
-                stage = self.get_queryset().get(id=stage_id)
-                stage.sequence = (index + 1) * 10
-                stage.save()
-            except PersonalStageType.DoesNotExist:
-                continue
+        try:
+            stage_reorder(request.user).reorder(stage_ids)
+        except (DjangoValidationError, TypeError):
+            return Response({'error': 'Invalid stage_ids'}, status=status.HTTP_400_BAD_REQUEST)
         
         return Response({'message': 'Stages reordered successfully'})
     
@@ -531,21 +506,12 @@ class PersonalStageTypeViewSet(viewsets.ModelViewSet):
     def reorder_single(self, request, pk=None):
         """Reorder single stage to specific position"""
         stage = self.get_object()
-        new_position = request.data.get('position', 0)
-        
-        # Get all stages ordered by sequence
-        all_stages = list(self.get_queryset().order_by('sequence'))
-        
-        # Remove current stage from list
-        all_stages = [s for s in all_stages if s.id != stage.id]
-        
-        # Insert stage at new position
-        all_stages.insert(int(new_position), stage)
+        try:
+            new_position = parse_position(request.data.get('position', 0))
+        except (ValueError, TypeError):
+            return Response({'error': 'Invalid position'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update sequences for all stages
-        for index, s in enumerate(all_stages):
-            s.sequence = (index + 1) * 10
-            s.save(update_fields=['sequence'])
+        apply_moves(request.user, [{'type': 'stage', 'id': stage.id, 'position': new_position}])
         
         return Response({'message': 'Stage reordered successfully'})
     
@@ -555,20 +521,10 @@ class PersonalStageTypeViewSet(viewsets.ModelViewSet):
         stage = self.get_object()
         task_ids = request.data.get('task_ids', [])
         
-        # Import Task model here to avoid circular imports
-        from ..models import Task
-        
-        for index, task_id in enumerate(task_ids):
-            try:
-                task = Task.objects.get(
-                    id=task_id, 
-                    user=request.user, 
-                    personal_stage_type=stage
-                )
-                task.sequence = (index + 1) * 10
-                task.save()
-            except Task.DoesNotExist:
-                continue
+        try:
+            task_reorder(request.user, stage).reorder(task_ids)
+        except (DjangoValidationError, TypeError):
+            return Response({'error': 'Invalid task_ids'}, status=status.HTTP_400_BAD_REQUEST)
         
         return Response({'message': 'Tasks reordered successfully'})
     
@@ -881,15 +837,31 @@ class TaskViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def kanban(self, request):
         """Kanban view data - grouped by personal stages"""
-        tasks = self.get_queryset()
-        stages = PersonalStageType.objects.filter(user=request.user).order_by('sequence')
+        # Columns are complete unless a column_size is requested
+        column_size = request.query_params.get('column_size')
+        if column_size:
+            try:
+                column_size = int(column_size)
+            except ValueError:
+                column_size = 0
+            if column_size < 1:
+                return Response({'error': 'column_size must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        loader = KanbanBoardLoader(
+            request.user,
+            column_size=column_size or None,
+            queryset=self.get_queryset()
+        )
+        stages = list(PersonalStageType.objects.filter(user=request.user).order_by('sequence'))
+        board = loader.load(stages)
         
         kanban_data = {}
         for stage in stages:
-            stage_tasks = tasks.filter(personal_stage_type=stage).order_by('sequence', '-created_at')
+            column = board.columns[stage.id]
             kanban_data[str(stage.id)] = {
                 'stage': PersonalStageTypeSerializer(stage).data,
-                'tasks': TaskKanbanSerializer(stage_tasks, many=True).data
+                'tasks': TaskKanbanSerializer(column.tasks, many=True).data,
+                'total': column.total,
+                'has_more': column.has_more
             }
         
         return Response(kanban_data)
@@ -900,45 +872,8 @@ class TaskViewSet(viewsets.ModelViewSet):
         user = request.user
         tasks = self.get_queryset()
         
-        # Basic stats
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(state='1_done').count()
-        starred_tasks = tasks.filter(priority='1').count()
-        
-        # Due date stats
-        today = timezone.now().date()
-        due_today = tasks.filter(due_date__date=today).count()
-        overdue = tasks.filter(
-            due_date__lt=timezone.now(),
-            state__in=['1_todo', '1_in_progress']
-        ).count()
-        
-        # Stage breakdown
-        stages = PersonalStageType.objects.filter(user=user)
-        by_stage = {}
-        for stage in stages:
-            by_stage[stage.name] = tasks.filter(personal_stage_type=stage).count()
-        
-        # Priority breakdown  
-        by_priority = {
-            'normal': tasks.filter(priority='0').count(),
-            'starred': tasks.filter(priority='1').count(),
-        }
-        
-        # Recent activity
-        recent_completed = tasks.filter(
-            state='1_done',
-            completed_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        
-        recent_created = tasks.filter(
-            created_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        
-        activity = {
-            'tasks_completed_this_week': recent_completed,
-            'tasks_created_this_week': recent_created,
-        }
+        # All counters in one aggregate query, cached per user unless filtered
+        stats = get_dashboard_stats(user, queryset=tasks if request.query_params else None)
         
         # Quick access
         important_tasks = tasks.filter(priority='1', state__in=['1_todo', '1_in_progress'])[:5]
@@ -954,14 +889,14 @@ class TaskViewSet(viewsets.ModelViewSet):
         }
         
         stats_data = {
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'due_today': due_today,
-            'overdue': overdue,
-            'important': starred_tasks,
-            'by_stage': by_stage,
-            'by_priority': by_priority,
-            'activity': activity,
+            'total_tasks': stats['total_tasks'],
+            'completed_tasks': stats['completed_tasks'],
+            'due_today': stats['due_today'],
+            'overdue': stats['overdue'],
+            'important': stats['important'],
+            'by_stage': stats['by_stage'],
+            'by_priority': stats['by_priority'],
+            'activity': stats['activity'],
             'quick_access': quick_access,
         }
         
@@ -1158,55 +1093,25 @@ class TaskMoveHTMXView(LoginRequiredMixin, HTMXResponseMixin, TemplateView):
             new_stage_id = request.POST.get('stage_id')
             new_position = request.POST.get('position', 0)
             
-            print(f"Task move request: task_id={task_id}, stage_id={new_stage_id}, position={new_position}")
-            
             if new_stage_id:
-                new_stage = get_object_or_404(PersonalStageType, id=new_stage_id, user=request.user)
-                old_stage = task.personal_stage_type
-                old_state = task.state
-                
-                task.personal_stage_type = new_stage
-                
-                # Safely convert position to int
                 try:
-                    task.sequence = int(new_position) if new_position else 0
+                    position = int(new_position) if new_position else 0
                 except (ValueError, TypeError):
-                    task.sequence = 0
-                
-                # Update task state based on stage
-                if new_stage.is_closed and task.state != '1_done':
-                    # Moving to a closed stage (like Done) - mark as completed
-                    task.state = '1_done'
-                    task.completed_at = timezone.now()
-                    print(f"Task {task.title} moved to closed stage {new_stage.name}, marked as done")
-                elif not new_stage.is_closed and task.state == '1_done':
-                    # Moving from closed stage to open stage - reopen task
-                    task.state = '1_todo'
-                    task.completed_at = None
-                    print(f"Task {task.title} moved from closed stage to open stage {new_stage.name}, reopened")
-                
-                # Special handling for common stage names
-                if new_stage.name.lower() in ['done', 'terminé', 'completed', 'fini']:
-                    task.state = '1_done'
-                    task.completed_at = timezone.now()
-                    print(f"Task {task.title} moved to '{new_stage.name}', marked as done")
-                elif new_stage.name.lower() in ['in progress', 'en cours', 'doing', 'work']:
-                    if task.state not in ['1_done']:
-                        task.state = '1_in_progress'
-                        print(f"Task {task.title} moved to '{new_stage.name}', marked as in progress")
-                elif new_stage.name.lower() in ['todo', 'to do', 'à faire', 'backlog']:
-                    if task.state not in ['1_done']:
-                        task.state = '1_todo'
-                        print(f"Task {task.title} moved to '{new_stage.name}', marked as todo")
-                
-                print(f"Task state change: {old_state} -> {task.state} (Stage: {old_stage.name if old_stage else 'None'} -> {new_stage.name})")
-                task.save()
+                    position = 0
+                apply_moves(request.user, [{
+                    'type': 'task',
+                    'id': task.id,
+                    'stage_id': new_stage_id,
+                    'position': position
+                }])
             
             # Return empty response for successful move - frontend handles UI updates
             return HttpResponse('')
             
+        except PersonalStageType.DoesNotExist:
+            return HttpResponse('Stage not found', status=404)
         except Exception as e:
-            print(f"Error in TaskMoveHTMXView: {str(e)}")
+            logger.error(f"Error in TaskMoveHTMXView: {str(e)}")
             return HttpResponse(f"Error: {str(e)}", status=500)
 
 
@@ -1358,20 +1263,35 @@ class KanbanColumnHTMXView(LoginRequiredMixin, HTMXResponseMixin, TemplateView):
             stage = get_object_or_404(PersonalStageType, id=stage_id, user=user)
             stages = [stage]
         else:
-            stages = PersonalStageType.objects.filter(user=user).order_by('sequence')
+            stages = list(PersonalStageType.objects.filter(user=user).order_by('sequence'))
+        
+        # "Load more" for one column of the board
+        offset = request.GET.get('offset')
+        if stage_id and offset is not None:
+            try:
+                offset = max(int(offset), 0)
+            except ValueError:
+                return HttpResponse('Invalid offset', status=400)
+            column = KanbanBoardLoader(user).load_column(stage, offset=offset)
+            context = {
+                'stage': stage,
+                'column': column,
+                'tasks': column.tasks,
+                'position_offset': column.offset,
+                'today': timezone.now().date(),
+            }
+            return self.render_htmx_response(context, 'todo/partials/kanban_tasks_page.html')
+        
+        board = KanbanBoardLoader(user).load(stages)
         
         kanban_data = {}
         for stage in stages:
-            stage_tasks = Task.objects.filter(
-                user=user,
-                personal_stage_type=stage,
-                active=True
-            ).order_by('sequence', '-created_at')
-            
+            column = board.columns[stage.id]
             kanban_data[stage.id] = {
                 'stage': stage,
-                'tasks': stage_tasks,
-                'count': stage_tasks.count()
+                'tasks': column.tasks,
+                'count': column.total,
+                'has_more': column.has_more
             }
         
         context = {
@@ -1553,21 +1473,39 @@ class StageReorderHTMXView(LoginRequiredMixin, HTMXResponseMixin, TemplateView):
             # Fallback to POST data
             new_position = request.POST.get('position', 0)
         
-        # Get all stages ordered by sequence
-        all_stages = list(PersonalStageType.objects.filter(user=request.user).order_by('sequence'))
+        try:
+            new_position = parse_position(new_position)
+        except (ValueError, TypeError):
+            return HttpResponse('Invalid position', status=400)
+        
+        apply_moves(request.user, [{'type': 'stage', 'id': stage.id, 'position': new_position}])
+        
+        return HttpResponse('')  # Empty response for successful reorder
+
+
+class KanbanReorderHTMXView(LoginRequiredMixin, View):
+    """Bulk endpoint for kanban drag-and-drop of tasks and stages"""
+    
+    def post(self, request):
+        import json
         
-        # Remove current stage from list
-        all_stages = [s for s in all_stages if s.id != stage.id]
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON'}, status=400)
         
-        # Insert stage at new position
-        all_stages.insert(int(new_position), stage)
+        moves = data.get('moves') if isinstance(data, dict) else data
+        if not isinstance(moves, list):
+            moves = [data]
         
-        # Update sequences for all stages
-        for index, s in enumerate(all_stages):
-            s.sequence = (index + 1) * 10
-            s.save(update_fields=['sequence'])
+        try:
+            results = apply_moves(request.user, moves)
+        except (PersonalStageType.DoesNotExist, Task.DoesNotExist):
+            return JsonResponse({'error': 'Task or stage not found'}, status=404)
+        except (KeyError, ValueError, TypeError, DjangoValidationError) as e:
+            return JsonResponse({'error': f'Invalid move: {str(e)}'}, status=400)
         
-        return HttpResponse('')  # Empty response for successful reorder
+        return JsonResponse({'moves': results})
 
 
 class TaskDropdownToggleHTMXView(LoginRequiredMixin, HTMXResponseMixin, TemplateView):
@@ -4,7 +4,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Count
-from .models.tags import Tag, TagRelation
+from .models.tags import Tag, TagRelation, recalculate_usage_counts as recalculate_tag_usage_counts
 
 
 @admin.register(Tag)
@@ -101,10 +101,7 @@ class TagAdmin(admin.ModelAdmin):
     
     def recalculate_usage_counts(self, request, queryset):
         """Recalculate usage counts for selected tags"""
-        updated_count = 0
-        for tag in queryset:
-            tag.recalculate_usage_counts()
-            updated_count += 1
+        updated_count = recalculate_tag_usage_counts(queryset)
         self.message_user(request, f'Usage counts recalculated for {updated_count} tags.')
     recalculate_usage_counts.short_description = 'Recalculate usage counts'
 
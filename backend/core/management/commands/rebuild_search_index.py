@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.models.search import SEARCH_SOURCES, get_search_source, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index (notes, documents, flashcards...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='Models to reindex (app.Model, e.g. notebook.Note); all by default')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            sources = [get_search_source(*label.split('.', 1)) for label in options['models']] or None
+        except (LookupError, TypeError):
+            labels = ', '.join(f'{app}.{model}' for app, model in SEARCH_SOURCES)
+            raise CommandError(f'Unknown model, expected one of: {labels}')
+
+        self.stdout.write('Rebuilding search index...')
+
+        counts = rebuild_search_index(sources, batch_size=options['batch_size'])
+
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Search index rebuilt: {total} objects ({", ".join(f"{label}: {n}" for label, n in counts.items())})'
+        ))
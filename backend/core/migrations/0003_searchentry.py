@@ -0,0 +1,50 @@
+# Generated by Django 5.1.10 on 2026-10-17 03:50
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS core_searchentry_vector_gin ON core_searchentry USING gin (vector)'
+        )
+
+
+def drop_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS core_searchentry_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_subscriptionplan_usersubscription_paymenthistory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_name', models.CharField(help_text="Nom de l'app (notebook, documents...)", max_length=50)),
+                ('model_name', models.CharField(help_text='Nom du modèle (Note, Document...)', max_length=50)),
+                ('object_id', models.PositiveBigIntegerField(help_text="ID de l'objet indexé")),
+                ('title', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('digest', models.CharField(help_text='Empreinte du texte, pour ignorer les réindexations inutiles', max_length=40)),
+                ('vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Entrée de recherche',
+                'verbose_name_plural': 'Entrées de recherche',
+                'unique_together': {('app_name', 'model_name', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_vector_index, drop_vector_index),
+    ]
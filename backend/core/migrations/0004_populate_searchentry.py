@@ -0,0 +1,28 @@
+from dataclasses import replace
+
+from django.db import migrations
+
+
+def populate_search_index(apps, schema_editor):
+    # Index des objets existants (les nouveaux sont indexés à l'enregistrement)
+    from core.models.search import SEARCH_SOURCES, rebuild_search_index
+
+    sources = [
+        replace(source, model=apps.get_model(source.app_name, source.model_name))
+        for source in SEARCH_SOURCES.values()
+    ]
+    rebuild_search_index(sources)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_searchentry'),
+        ('notebook', '0001_initial'),
+        ('documents', '0003_document_version_deltas'),
+        ('revision', '0008_revisionsettings_next_reminder_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_search_index, migrations.RunPython.noop),
+    ]
@@ -1 +1,2 @@
-# Models de base pour Linguify (équivalent de base dans openlinguify)
\ No newline at end of file
+# Models de base pour Linguify (équivalent de base dans openlinguify)
+from .search import SearchEntry
@@ -0,0 +1,381 @@
+"""
+Recherche plein texte cross-apps pour Linguify
+
+Chaque objet indexé (notes, documents, cartes de révision...) a une entrée
+SearchEntry qui garde son texte et, sous PostgreSQL, son vecteur de recherche
+(titre pondéré A, contenu pondéré B) couvert par un index GIN. Les entrées
+sont mises à jour à l'enregistrement des objets (signaux) et reconstruites
+par la commande rebuild_search_index.
+
+Sous PostgreSQL la recherche utilise to_tsquery, ts_rank et ts_headline. Sur
+les autres bases (SQLite pour les tests) elle se replie sur une recherche
+par mots sur les entrées, avec un score calculé en SQL et un surlignage fait
+en Python.
+"""
+
+import hashlib
+import html
+import re
+from dataclasses import dataclass
+from functools import reduce
+from operator import add
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector, SearchVectorField
+from django.db import connection, models
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+
+SEARCH_HEADLINE_ATTR = 'search_headline'
+
+# Délimiteurs du surlignage PostgreSQL, remplacés après échappement HTML
+HEADLINE_START = '\x02'
+HEADLINE_STOP = '\x03'
+SNIPPET_LENGTH = 200
+
+TERM_RE = re.compile(r'\w+')
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """Modèle indexé et champs dont le texte est recherché"""
+    model: type
+    title_fields: tuple
+    body_fields: tuple
+    owner_field: str = 'user'
+
+    @property
+    def app_name(self):
+        return self.model._meta.app_label
+
+    @property
+    def model_name(self):
+        return self.model.__name__
+
+    @property
+    def fields(self):
+        return {*self.title_fields, *self.body_fields, self.owner_field}
+
+
+# {(app_name, model_name): SearchSource}
+SEARCH_SOURCES = {}
+
+
+class SearchEntry(models.Model):
+    """
+    Texte indexé d'un objet - une entrée par objet
+
+    ``vector`` n'est renseigné que sous PostgreSQL.
+    """
+
+    app_name = models.CharField(max_length=50, help_text="Nom de l'app (notebook, documents...)")
+    model_name = models.CharField(max_length=50, help_text="Nom du modèle (Note, Document...)")
+    object_id = models.PositiveBigIntegerField(help_text="ID de l'objet indexé")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='search_entries'
+    )
+
+    title = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    digest = models.CharField(max_length=40, help_text="Empreinte du texte, pour ignorer les réindexations inutiles")
+    vector = SearchVectorField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Entrée de recherche"
+        verbose_name_plural = "Entrées de recherche"
+        app_label = 'core'
+        unique_together = ['app_name', 'model_name', 'object_id']
+        # L'index GIN sur vector est créé par la migration, sous PostgreSQL seulement
+
+    def __str__(self):
+        return f"{self.app_name}.{self.model_name}({self.object_id})"
+
+
+def search_config():
+    """Configuration text search PostgreSQL ('simple': pas de racinisation, contenus multilingues)"""
+    return getattr(settings, 'SEARCH_CONFIG', 'simple')
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def parse_terms(query):
+    """Mots d'une requête, en minuscules, sans doublon"""
+    return list(dict.fromkeys(term.lower() for term in TERM_RE.findall(query or '')))
+
+
+def field_text(value):
+    """Texte indexé d'une valeur de champ (les listes JSON sont jointes)"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return '\n'.join(field_text(item) for item in value)
+    if isinstance(value, dict):
+        return '\n'.join(field_text(item) for item in value.values())
+    return str(value)
+
+
+def source_text(source, instance):
+    """(titre, contenu) d'un objet"""
+    title = '\n'.join(filter(None, (field_text(getattr(instance, name)) for name in source.title_fields)))
+    body = '\n'.join(filter(None, (field_text(getattr(instance, name)) for name in source.body_fields)))
+    return title, body
+
+
+def text_digest(title, body):
+    return hashlib.sha1(f'{title}\x00{body}'.encode()).hexdigest()
+
+
+def text_vector(title, body):
+    """Expression tsvector d'un texte donné (utilisable à l'insertion)"""
+    config = search_config()
+    return (
+        SearchVector(Value(title, output_field=models.TextField()), weight='A', config=config)
+        + SearchVector(Value(body, output_field=models.TextField()), weight='B', config=config)
+    )
+
+
+def column_vector():
+    """Expression tsvector calculée depuis les colonnes de l'entrée"""
+    config = search_config()
+    return SearchVector('title', weight='A', config=config) + SearchVector('body', weight='B', config=config)
+
+
+def register_search_model(model, title_fields, body_fields, owner_field='user'):
+    """
+    Indexer un modèle: ses objets sont réindexés à chaque enregistrement et
+    retirés de l'index à leur suppression
+    """
+    source = SearchSource(model, tuple(title_fields), tuple(body_fields), owner_field)
+    SEARCH_SOURCES[(source.app_name, source.model_name)] = source
+    post_save.connect(_index_on_save, sender=model, dispatch_uid=f'search_index_{source.app_name}_{source.model_name}')
+    post_delete.connect(_unindex_on_delete, sender=model, dispatch_uid=f'search_unindex_{source.app_name}_{source.model_name}')
+    return source
+
+
+def get_search_source(app_name, model_name):
+    try:
+        return SEARCH_SOURCES[(app_name, model_name)]
+    except KeyError:
+        raise LookupError(f"{app_name}.{model_name} n'est pas indexé pour la recherche")
+
+
+def _source_for(model):
+    return SEARCH_SOURCES.get((model._meta.app_label, model.__name__))
+
+
+def _index_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    source = _source_for(sender)
+    if raw or source is None:
+        return
+    # Enregistrements partiels ne touchant pas au texte (révisions, compteurs...)
+    if update_fields is not None and not source.fields.intersection(update_fields):
+        return
+    index_object(instance, source)
+
+
+def _unindex_on_delete(sender, instance, **kwargs):
+    source = _source_for(sender)
+    if source is not None:
+        unindex_object(source.app_name, source.model_name, instance.pk)
+
+
+def index_object(instance, source=None):
+    """
+    Mettre à jour l'entrée d'un objet
+
+    Returns:
+        bool: False si le texte indexé n'avait pas changé
+    """
+    source = source or _source_for(type(instance))
+    title, body = source_text(source, instance)
+    digest = text_digest(title, body)
+    fields = {
+        'title': title,
+        'body': body,
+        'digest': digest,
+        'user_id': getattr(instance, f'{source.owner_field}_id', None),
+        'vector': text_vector(title, body) if uses_postgres() else None,
+    }
+    key = {'app_name': source.app_name, 'model_name': source.model_name, 'object_id': instance.pk}
+
+    entries = SearchEntry.objects.filter(**key)
+    if entries.exclude(digest=digest).update(**fields):
+        return True
+    if entries.exists():
+        return False
+    SearchEntry.objects.bulk_create([SearchEntry(**key, **fields)], ignore_conflicts=True)
+    return True
+
+
+def unindex_object(app_name, model_name, object_id):
+    SearchEntry.objects.filter(app_name=app_name, model_name=model_name, object_id=object_id).delete()
+
+
+def rebuild_search_index(sources=None, batch_size=500):
+    """
+    Reconstruire l'index de tous les modèles indexés (ou de ``sources``)
+
+    Les entrées sont écrites par lots (upsert) et les vecteurs calculés par un
+    UPDATE par lot; les entrées des objets supprimés sont retirées.
+
+    Returns:
+        dict: {'app.Model': nombre d'objets indexés}
+    """
+    if sources is None:
+        sources = list(SEARCH_SOURCES.values())
+    fields = ['user', 'title', 'body', 'digest']
+    counts = {}
+
+    for source in sources:
+        entries = SearchEntry.objects.filter(app_name=source.app_name, model_name=source.model_name)
+        owner_attname = f'{source.owner_field}_id'
+        objects = source.model._default_manager.order_by('pk').only(
+            *source.title_fields, *source.body_fields, source.owner_field
+        )
+
+        indexed = 0
+        batch = []
+        for instance in objects.iterator(chunk_size=batch_size):
+            title, body = source_text(source, instance)
+            batch.append(SearchEntry(
+                app_name=source.app_name, model_name=source.model_name, object_id=instance.pk,
+                user_id=getattr(instance, owner_attname, None), title=title, body=body,
+                digest=text_digest(title, body)
+            ))
+            if len(batch) >= batch_size:
+                indexed += _write_entries(entries, batch, fields)
+                batch = []
+        if batch:
+            indexed += _write_entries(entries, batch, fields)
+
+        entries.exclude(object_id__in=source.model._default_manager.values('pk')).delete()
+        counts[f'{source.app_name}.{source.model_name}'] = indexed
+    return counts
+
+
+def _write_entries(entries, batch, fields):
+    SearchEntry.objects.bulk_create(
+        batch, update_conflicts=True, unique_fields=['app_name', 'model_name', 'object_id'], update_fields=fields
+    )
+    if uses_postgres():
+        entries.filter(object_id__in=[entry.object_id for entry in batch]).update(vector=column_vector())
+    return len(batch)
+
+
+def _tsquery(terms):
+    """Requête PostgreSQL: tous les mots, le dernier en préfixe (recherche à la frappe)"""
+    parts = [f"'{term}'" for term in terms[:-1]] + [f"'{terms[-1]}':*"]
+    return SearchQuery(' & '.join(parts), search_type='raw', config=search_config())
+
+
+def matching_entries(query, app_name, model_name):
+    """Entrées correspondant à ``query``, annotées de leur score ``rank``"""
+    terms = parse_terms(query)
+    entries = SearchEntry.objects.filter(app_name=app_name, model_name=model_name)
+    if not terms:
+        return entries.none()
+
+    if uses_postgres():
+        tsquery = _tsquery(terms)
+        return entries.filter(vector=tsquery).annotate(rank=SearchRank(F('vector'), tsquery))
+
+    # Repli: chaque mot doit apparaître dans le titre ou le contenu
+    condition = Q()
+    scores = []
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(body__icontains=term)
+        scores.append(
+            Case(When(title__icontains=term, then=Value(2.0)), default=Value(0.0), output_field=FloatField())
+            + Case(When(body__icontains=term, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+        )
+    return entries.filter(condition).annotate(rank=reduce(add, scores))
+
+
+def search_queryset(queryset, query, app_name=None, model_name=None, related_fields=()):
+    """
+    Filtrer ``queryset`` sur les objets correspondant à ``query``, annotés de
+    ``search_rank`` (plus grand = plus pertinent); l'ordre n'est pas modifié
+
+    ``related_fields`` (ex. ``category__name``) sont cherchés en plus, hors
+    index: leur texte change sans que l'objet soit enregistré.
+    """
+    if not parse_terms(query):
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+    model = queryset.model
+    app_name = app_name or model._meta.app_label
+    model_name = model_name or model.__name__
+    entries = matching_entries(query, app_name, model_name)
+    rank = Subquery(entries.filter(object_id=OuterRef('pk')).values('rank')[:1], output_field=FloatField())
+    condition = Q(pk__in=entries.values('object_id'))
+    for field in related_fields:
+        condition |= Q(**{f'{field}__icontains': query.strip()})
+    if related_fields:
+        rank = Coalesce(rank, Value(0.0), output_field=FloatField())
+    return queryset.filter(condition).annotate(search_rank=rank)
+
+
+def _render_headline(text):
+    """HTML d'un extrait PostgreSQL: texte échappé, termes entre <mark>"""
+    return html.escape(text).replace(HEADLINE_START, '<mark>').replace(HEADLINE_STOP, '</mark>')
+
+
+def highlight_text(text, terms, length=SNIPPET_LENGTH):
+    """Extrait HTML de ``text`` autour du premier terme trouvé, termes entre <mark>"""
+    if not text or not terms:
+        return ''
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(text)
+    start = max(0, first.start() - length // 4) if first else 0
+    snippet = text[start:start + length]
+
+    parts = []
+    position = 0
+    for match in pattern.finditer(snippet):
+        parts.append(html.escape(snippet[position:match.start()]))
+        parts.append(f'<mark>{html.escape(match.group())}</mark>')
+        position = match.end()
+    parts.append(html.escape(snippet[position:]))
+    return ('…' if start else '') + ''.join(parts) + ('…' if start + length < len(text) else '')
+
+
+def highlight_objects(objects, query, app_name=None, model_name=None):
+    """
+    Ajouter à chaque objet un extrait surligné (attribut ``search_headline``)
+
+    À appeler sur une page de résultats: une seule requête pour la page.
+    """
+    objects = list(objects)
+    terms = parse_terms(query)
+    if not objects or not terms:
+        return objects
+    model = type(objects[0])
+    app_name = app_name or model._meta.app_label
+    model_name = model_name or model.__name__
+
+    entries = SearchEntry.objects.filter(
+        app_name=app_name, model_name=model_name, object_id__in=[obj.pk for obj in objects]
+    )
+    headlines = {}
+    if uses_postgres():
+        headline = SearchHeadline(
+            'body', _tsquery(terms), config=search_config(),
+            start_sel=HEADLINE_START, stop_sel=HEADLINE_STOP, max_words=35, min_words=15, max_fragments=2
+        )
+        for object_id, title, body, text in entries.annotate(headline=headline).values_list(
+            'object_id', 'title', 'body', 'headline'
+        ):
+            headlines[object_id] = _render_headline(text) if body and HEADLINE_START in text else highlight_text(title, terms)
+    else:
+        for object_id, title, body in entries.values_list('object_id', 'title', 'body'):
+            headlines[object_id] = highlight_text(body, terms) if any(
+                term in body.lower() for term in terms
+            ) else highlight_text(title, terms)
+
+    for obj in objects:
+        setattr(obj, SEARCH_HEADLINE_ATTR, headlines.get(obj.pk, ''))
+    return objects
@@ -3,7 +3,9 @@ Système de tags global et cross-apps pour Linguify
 Vision: Un système unifié permettant de gérer des tags à travers toutes les applications
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth import get_user_model
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 from django.utils import timezone
@@ -11,6 +13,20 @@ import uuid
 
 User = get_user_model()
 
+# Apps ayant un compteur d'usage dédié (usage_count_<app>)
+USAGE_APPS = ('notebook', 'todo', 'calendar', 'revision', 'documents', 'community')
+USAGE_FIELDS = ['usage_count_total'] + [f'usage_count_{app}' for app in USAGE_APPS]
+
+
+def usage_field(app_name):
+    """Nom du compteur d'une app, ou None si l'app n'en a pas"""
+    return f'usage_count_{app_name}' if app_name in USAGE_APPS else None
+
+
+def counter_plus(field, delta):
+    """Expression SQL ``max(field + delta, 0)``"""
+    return Greatest(F(field) + Value(delta), Value(0), output_field=models.PositiveIntegerField())
+
 
 class Tag(models.Model):
     """
@@ -93,47 +109,36 @@ class Tag(models.Model):
             return f"{r}, {g}, {b}"
         return "59, 130, 246"  # Fallback bleu Linguify
     
-    def increment_usage(self, app_name=None):
+    def increment_usage(self, app_name=None, count=1):
         """
         Incrémente le compteur d'usage pour une app spécifique
         
+        La base est mise à jour par une expression F() (pas de mise à jour
+        perdue en cas d'accès concurrents) ; l'instance est ajustée sans relecture.
+        
         Args:
             app_name (str): notebook, todo, calendar, revision, documents, community
+            count (int): Valeur à ajouter (négative pour décrémenter)
         """
-        self.usage_count_total += 1
+        fields = ['usage_count_total']
+        if usage_field(app_name):
+            fields.append(usage_field(app_name))
         
-        if app_name:
-            field_name = f'usage_count_{app_name}'
-            if hasattr(self, field_name):
-                current_value = getattr(self, field_name)
-                setattr(self, field_name, current_value + 1)
-        
-        self.save(update_fields=[
-            'usage_count_total', 
-            f'usage_count_{app_name}' if app_name else None
-        ])
+        Tag.objects.filter(pk=self.pk).update(
+            **{field: counter_plus(field, count) for field in fields}
+        )
+        for field in fields:
+            setattr(self, field, max(getattr(self, field) + count, 0))
     
-    def decrement_usage(self, app_name=None):
+    def decrement_usage(self, app_name=None, count=1):
         """
-        Décrémente le compteur d'usage pour une app spécifique
+        Décrémente le compteur d'usage pour une app spécifique (sans passer sous zéro)
         
         Args:
             app_name (str): notebook, todo, calendar, revision, documents, community
+            count (int): Valeur à retirer
         """
-        if self.usage_count_total > 0:
-            self.usage_count_total -= 1
-        
-        if app_name:
-            field_name = f'usage_count_{app_name}'
-            if hasattr(self, field_name):
-                current_value = getattr(self, field_name)
-                if current_value > 0:
-                    setattr(self, field_name, current_value - 1)
-        
-        self.save(update_fields=[
-            'usage_count_total', 
-            f'usage_count_{app_name}' if app_name else None
-        ])
+        self.increment_usage(app_name, -count)
     
     def get_usage_by_app(self):
         """Retourne un dictionnaire de l'usage par app"""
@@ -157,31 +162,8 @@ class Tag(models.Model):
         """
         Recalcule les compteurs d'usage basés sur les TagRelations existantes
         """
-        # Reset all counters
-        self.usage_count_total = 0
-        self.usage_count_notebook = 0
-        self.usage_count_todo = 0
-        self.usage_count_calendar = 0
-        self.usage_count_revision = 0
-        self.usage_count_documents = 0
-        self.usage_count_community = 0
-        
-        # Count relations by app
-        relations = self.relations.all()
-        for relation in relations:
-            app_name = relation.app_name
-            field_name = f'usage_count_{app_name}'
-            if hasattr(self, field_name):
-                current_value = getattr(self, field_name)
-                setattr(self, field_name, current_value + 1)
-            self.usage_count_total += 1
-        
-        # Save all updated fields
-        self.save(update_fields=[
-            'usage_count_total', 'usage_count_notebook', 'usage_count_todo',
-            'usage_count_calendar', 'usage_count_revision', 'usage_count_documents',
-            'usage_count_community'
-        ])
+        recalculate_usage_counts(Tag.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=USAGE_FIELDS)
     
     @classmethod
     def get_user_tags(cls, user, app_name=None, active_only=True):
@@ -306,7 +288,8 @@ class TagRelation(models.Model):
     
     def save(self, *args, **kwargs):
         """Override save pour mettre à jour les compteurs d'usage"""
-        is_new = self.pk is None
+        # La clé UUID est fixée dès l'instanciation : seul _state dit si la relation est nouvelle
+        is_new = self._state.adding
         super().save(*args, **kwargs)
         
         if is_new:
@@ -323,6 +306,73 @@ class TagRelation(models.Model):
         tag.decrement_usage(app_name)
 
 
+# Attribut où prefetch_tags range les tags d'un objet
+PREFETCHED_TAGS_ATTR = '_prefetched_tags'
+
+
+def object_key(object_id):
+    """ID d'objet tel que stocké dans TagRelation.object_id (UUID, y compris pour les IDs entiers)"""
+    return TagRelation._meta.get_field('object_id').to_python(object_id)
+
+
+# Maintenance des compteurs en masse
+
+def apply_usage_deltas(deltas):
+    """
+    Applique des variations de compteurs à plusieurs tags en un seul UPDATE
+    
+    Args:
+        deltas (dict): {(tag_id, app_name): variation}
+        
+    Returns:
+        int: Nombre de tags mis à jour
+    """
+    by_field = {}
+    for (tag_id, app_name), delta in deltas.items():
+        if not delta:
+            continue
+        fields = ['usage_count_total']
+        if usage_field(app_name):
+            fields.append(usage_field(app_name))
+        for field in fields:
+            field_deltas = by_field.setdefault(field, {})
+            field_deltas[tag_id] = field_deltas.get(tag_id, 0) + delta
+    
+    if not by_field:
+        return 0
+    
+    tag_ids = set()
+    updates = {}
+    for field, field_deltas in by_field.items():
+        tag_ids.update(field_deltas)
+        updates[field] = Case(
+            *[When(pk=tag_id, then=counter_plus(field, delta))
+              for tag_id, delta in field_deltas.items()],
+            default=F(field)
+        )
+    return Tag.objects.filter(pk__in=tag_ids).update(**updates)
+
+
+def recalculate_usage_counts(tags):
+    """
+    Recalcule les compteurs d'usage d'un QuerySet de tags en un seul UPDATE,
+    chaque compteur étant un agrégat groupé sur les TagRelations
+    
+    Returns:
+        int: Nombre de tags mis à jour
+    """
+    def relation_count(**filters):
+        counts = TagRelation.objects.filter(tag=OuterRef('pk'), **filters).order_by().values(
+            'tag'
+        ).annotate(count=Count('pk')).values('count')
+        return Coalesce(Subquery(counts), 0, output_field=models.PositiveIntegerField())
+    
+    updates = {'usage_count_total': relation_count()}
+    for app_name in USAGE_APPS:
+        updates[usage_field(app_name)] = relation_count(app_name=app_name)
+    return tags.order_by().update(**updates)
+
+
 # Helper functions pour faciliter l'usage dans les autres apps
 
 def get_tags_for_object(app_name, model_name, object_id, user=None):
@@ -352,6 +402,66 @@ def get_tags_for_object(app_name, model_name, object_id, user=None):
     )
 
 
+def get_tags_for_objects(app_name, model_name, object_ids, user=None):
+    """
+    Récupère les tags de plusieurs objets en une seule requête (jointure relations/tags)
+    
+    Args:
+        app_name (str): Nom de l'app
+        model_name (str): Nom du modèle
+        object_ids (iterable): IDs des objets
+        user (User, optional): Filtrer par utilisateur
+        
+    Returns:
+        dict: {object_id (UUID): [Tag, ...]}, liste vide pour les objets sans tag
+    """
+    tags_by_object = {object_key(object_id): [] for object_id in object_ids}
+    if not tags_by_object:
+        return tags_by_object
+    
+    relations = TagRelation.objects.filter(
+        app_name=app_name,
+        model_name=model_name,
+        object_id__in=list(tags_by_object)
+    ).select_related('tag').order_by(*[
+        f'-tag__{field[1:]}' if field.startswith('-') else f'tag__{field}'
+        for field in Tag._meta.ordering
+    ])
+    
+    if user:
+        relations = relations.filter(tag__user=user)
+    
+    for relation in relations:
+        tags_by_object[relation.object_id].append(relation.tag)
+    return tags_by_object
+
+
+def prefetch_tags(objects, app_name, model_name, user=None, owner_field=None):
+    """
+    Attache à chaque objet ses tags (attribut PREFETCHED_TAGS_ATTR) en une seule requête
+    
+    Args:
+        objects (iterable): Instances (une page de liste, par exemple)
+        app_name (str): Nom de l'app
+        model_name (str): Nom du modèle
+        user (User, optional): Filtrer par utilisateur
+        owner_field (str, optional): Attribut donnant l'ID du propriétaire de
+            chaque objet (ex: 'user_id') ; seuls les tags de ce propriétaire sont gardés
+        
+    Returns:
+        list: Les objets
+    """
+    objects = list(objects)
+    tags_by_object = get_tags_for_objects(app_name, model_name, [obj.pk for obj in objects], user)
+    for obj in objects:
+        tags = tags_by_object[object_key(obj.pk)]
+        if owner_field:
+            owner_id = getattr(obj, owner_field)
+            tags = [tag for tag in tags if tag.user_id == owner_id]
+        setattr(obj, PREFETCHED_TAGS_ATTR, tags)
+    return objects
+
+
 def add_tag_to_object(tag, app_name, model_name, object_id, user):
     """
     Ajoute un tag à un objet
@@ -402,6 +512,60 @@ def remove_tag_from_object(tag, app_name, model_name, object_id):
         return False
 
 
+def set_object_tags(tags, app_name, model_name, object_ids, user):
+    """
+    Définit les tags de plusieurs objets (remplace les tags existants de l'utilisateur)
+    
+    Les relations manquantes sont créées par bulk_create, celles en trop
+    supprimées en une requête, et les compteurs des tags concernés mis à jour
+    par un seul UPDATE.
+    
+    Args:
+        tags (iterable): Tags à appliquer à chaque objet
+        app_name (str): Nom de l'app
+        model_name (str): Nom du modèle
+        object_ids (iterable): IDs des objets
+        user (User): Utilisateur qui effectue l'action
+        
+    Returns:
+        tuple: (relations créées, relations supprimées)
+    """
+    tag_ids = {tag.pk for tag in tags}
+    object_ids = {object_key(object_id) for object_id in object_ids}
+    wanted = {(tag_id, object_id) for tag_id in tag_ids for object_id in object_ids}
+    
+    with transaction.atomic():
+        existing = {
+            (tag_id, object_id): relation_id
+            for relation_id, tag_id, object_id in TagRelation.objects.filter(
+                app_name=app_name,
+                model_name=model_name,
+                object_id__in=object_ids,
+                tag__user=user
+            ).values_list('id', 'tag_id', 'object_id')
+        }
+        
+        to_delete = [key for key in existing if key not in wanted]
+        to_create = [key for key in wanted if key not in existing]
+        
+        if to_delete:
+            TagRelation.objects.filter(id__in=[existing[key] for key in to_delete]).delete()
+        TagRelation.objects.bulk_create([
+            TagRelation(tag_id=tag_id, app_name=app_name, model_name=model_name,
+                        object_id=object_id, created_by=user)
+            for tag_id, object_id in to_create
+        ], batch_size=1000)
+        
+        deltas = {}
+        for tag_id, _ in to_create:
+            deltas[(tag_id, app_name)] = deltas.get((tag_id, app_name), 0) + 1
+        for tag_id, _ in to_delete:
+            deltas[(tag_id, app_name)] = deltas.get((tag_id, app_name), 0) - 1
+        apply_usage_deltas(deltas)
+    
+    return len(to_create), len(to_delete)
+
+
 def get_objects_with_tag(tag, app_name=None, model_name=None):
     """
     Récupère tous les objets qui ont un tag donné
@@ -4,7 +4,8 @@ Serializers pour le système de tags global Linguify
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from ..models.tags import Tag, TagRelation
+from django.db import models
+from ..models.tags import PREFETCHED_TAGS_ATTR, Tag, TagRelation, prefetch_tags
 
 User = get_user_model()
 
@@ -280,4 +281,46 @@ class TagSearchSerializer(serializers.Serializer):
     app_name = serializers.CharField(max_length=50, required=False, allow_blank=True)
     active_only = serializers.BooleanField(default=True)
     favorites_only = serializers.BooleanField(default=False)
-    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
\ No newline at end of file
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+class TaggedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer qui charge les tags de tous les éléments en une requête
+    avant de les sérialiser
+    """
+    
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.prefetch_tags(items)
+        return super().to_representation(items)
+
+
+class TaggedObjectSerializerMixin(serializers.Serializer):
+    """
+    Ajoute le champ ``tags`` (système de tags global) à un serializer
+    
+    Avec many=True, les tags de toute la liste sont chargés en une seule
+    requête. Les sous-classes définissent ``tag_app_name`` et
+    ``tag_model_name`` et font hériter leur Meta de
+    ``TaggedObjectSerializerMixin.Meta``.
+    """
+    
+    tag_app_name = None
+    tag_model_name = None
+    # Attribut de l'objet donnant le propriétaire des tags à afficher (ex: 'user_id')
+    tag_owner_field = None
+    tag_serializer_class = TagListSerializer
+    
+    tags = serializers.SerializerMethodField()
+    
+    class Meta:
+        list_serializer_class = TaggedListSerializer
+    
+    def prefetch_tags(self, objects):
+        return prefetch_tags(objects, self.tag_app_name, self.tag_model_name, owner_field=self.tag_owner_field)
+    
+    def get_tags(self, obj):
+        if not hasattr(obj, PREFETCHED_TAGS_ATTR):
+            self.prefetch_tags([obj])
+        tags = getattr(obj, PREFETCHED_TAGS_ATTR)
+        return self.tag_serializer_class(tags, many=True, context=self.context).data
@@ -522,6 +522,9 @@ FILE_UPLOAD_DIRECTORY_PERMISSIONS = 0o755  # rwxr-xr-x
 
 ASGI_APPLICATION = 'core.asgi.application'
 
+# Test discovery rooted at backend/ (see core.test_runner)
+TEST_RUNNER = 'core.test_runner.BackendDiscoverRunner'
+
 # Use in-memory channel layer for testing
 if os.environ.get('TEST_MODE') == 'True' or 'test' in sys.argv:
     CHANNEL_LAYERS = {
@@ -550,6 +553,11 @@ else:
                 },
             },
         }
+        # Chat messages are journaled in Redis until written (see apps.chat.message_buffer)
+        CHAT_MESSAGE_JOURNAL_BACKEND = 'apps.chat.message_buffer.RedisMessageJournal'
+        CHAT_MESSAGE_JOURNAL_REDIS_URL = (
+            f"redis://{os.environ.get('REDIS_HOST', '127.0.0.1')}:{int(os.environ.get('REDIS_PORT', 6379))}/0"
+        )
     except Exception:
         # Fallback to in-memory layer if Redis is not available
         CHANNEL_LAYERS = {
@@ -121,7 +121,7 @@ MIDDLEWARE = [m for m in MIDDLEWARE if 'whitenoise' not in m.lower()]
 STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
 
 # Test specific settings
-TEST_RUNNER = 'django.test.runner.DiscoverRunner'
+TEST_RUNNER = 'core.test_runner.BackendDiscoverRunner'
 TEST_CHARSET = None
 TEST_COLLATION = None
 TEST_DEPENDENCIES = {}
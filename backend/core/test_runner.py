@@ -0,0 +1,19 @@
+"""
+Runner de tests du projet
+"""
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class BackendDiscoverRunner(DiscoverRunner):
+    """
+    DiscoverRunner dont la découverte part du dossier backend
+
+    backend/ contient un __init__.py: sans racine explicite, ``manage.py test
+    core`` importait les modules en ``backend.core...`` et les modèles
+    étaient enregistrés deux fois.
+    """
+
+    def __init__(self, top_level=None, **kwargs):
+        super().__init__(top_level=top_level or str(settings.BASE_DIR), **kwargs)
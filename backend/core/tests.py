@@ -0,0 +1,225 @@
+import uuid
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from apps.notebook.models import Note, NoteCategory
+
+from core.models.search import SearchEntry, highlight_objects, rebuild_search_index, search_queryset
+from core.models.tags import (Tag, TagRelation, add_tag_to_object, apply_usage_deltas, get_tags_for_objects,
+                          prefetch_tags, recalculate_usage_counts, remove_tag_from_object, set_object_tags)
+from core.serializers.tag_serializers import ObjectTagsSerializer, TaggedObjectSerializerMixin
+
+User = get_user_model()
+
+
+class TagUsageCounterTest(TestCase):
+    """
+    Tests for the global tag usage counters
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tagger', email='tagger@example.com', password='testpass123', is_active=True
+        )
+        self.grammar = Tag.objects.create(user=self.user, name='grammar')
+        self.verbs = Tag.objects.create(user=self.user, name='verbs')
+
+    def test_relations_update_counters(self):
+        object_id = uuid.uuid4()
+        add_tag_to_object(self.grammar, 'notebook', 'Note', object_id, self.user)
+        add_tag_to_object(self.grammar, 'notebook', 'Note', object_id, self.user)
+
+        # A stale instance does not overwrite the counter
+        stale = Tag.objects.get(pk=self.grammar.pk)
+        add_tag_to_object(self.grammar, 'todo', 'Task', object_id, self.user)
+        stale.increment_usage('notebook')
+
+        self.grammar.refresh_from_db()
+        self.assertEqual((self.grammar.usage_count_total, self.grammar.usage_count_notebook), (3, 2))
+
+        remove_tag_from_object(self.grammar, 'todo', 'Task', object_id)
+        self.verbs.decrement_usage('todo')
+        self.grammar.refresh_from_db()
+        self.verbs.refresh_from_db()
+        self.assertEqual((self.grammar.usage_count_total, self.grammar.usage_count_todo), (2, 0))
+        self.assertEqual(self.verbs.usage_count_total, 0)
+
+    def test_set_object_tags(self):
+        notes = [uuid.uuid4() for _ in range(3)]
+        add_tag_to_object(self.verbs, 'notebook', 'Note', notes[0], self.user)
+
+        # Relations read, relations deleted, relations inserted, counters updated
+        with self.assertNumQueries(6):
+            created, deleted = set_object_tags([self.grammar], 'notebook', 'Note', notes, self.user)
+        self.assertEqual((created, deleted), (3, 1))
+        self.assertEqual(
+            set(TagRelation.objects.values_list('tag_id', 'object_id')),
+            {(self.grammar.pk, note) for note in notes}
+        )
+
+        counts = dict(Tag.objects.values_list('name', 'usage_count_notebook'))
+        self.assertEqual(counts, {'grammar': 3, 'verbs': 0})
+
+    def test_apply_deltas_and_recalculate(self):
+        with self.assertNumQueries(1):
+            apply_usage_deltas({(self.grammar.pk, 'todo'): 2, (self.verbs.pk, 'calendar'): -1,
+                                (self.verbs.pk, 'unknown'): 4})
+        self.verbs.refresh_from_db()
+        self.assertEqual((self.verbs.usage_count_total, self.verbs.usage_count_calendar), (3, 0))
+
+        TagRelation.objects.create(tag=self.grammar, app_name='revision', model_name='Deck',
+                                   object_id=uuid.uuid4(), created_by=self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(recalculate_usage_counts(Tag.objects.filter(user=self.user)), 2)
+
+        self.grammar.refresh_from_db()
+        self.assertEqual(self.grammar.get_usage_by_app()['revision'], 1)
+        self.assertEqual((self.grammar.usage_count_total, self.grammar.usage_count_todo), (1, 0))
+        self.assertEqual(Tag.objects.get(pk=self.verbs.pk).usage_count_total, 0)
+
+
+class ObjectTagsApiTest(TestCase):
+    """
+    Tests for the set_object_tags endpoint
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='tagger', email='tagger@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.grammar = Tag.objects.create(user=self.user, name='grammar')
+
+    def test_unknown_tag_is_not_found(self):
+        data = {
+            'app_name': 'notebook', 'model_name': 'Note', 'object_id': str(uuid.uuid4()),
+            'tag_ids': [str(self.grammar.id), str(uuid.uuid4())],
+        }
+        # Tag deleted after validation: the whole request fails, nothing is tagged
+        with mock.patch.object(ObjectTagsSerializer, 'validate_tag_ids', side_effect=lambda value: value):
+            response = self.client.post('/api/v1/core/object-tags/set_object_tags/', data, format='json')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(TagRelation.objects.exists())
+
+
+class TaggedUserSerializer(TaggedObjectSerializerMixin, serializers.ModelSerializer):
+    tag_app_name = 'community'
+    tag_model_name = 'User'
+
+    class Meta(TaggedObjectSerializerMixin.Meta):
+        model = User
+        fields = ['id', 'username', 'tags']
+
+
+class TagHydrationTest(TestCase):
+    """
+    Tests for batch tag resolution
+    """
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f'member{i}', email=f'member{i}@example.com', password='testpass123', is_active=True
+            )
+            for i in range(3)
+        ]
+        owner = self.users[0]
+        self.grammar = Tag.objects.create(user=owner, name='grammar')
+        self.verbs = Tag.objects.create(user=owner, name='verbs', is_favorite=True)
+        set_object_tags([self.grammar, self.verbs], 'community', 'User', [u.id for u in self.users[:2]], owner)
+        set_object_tags([self.grammar], 'community', 'User', [self.users[2].id], owner)
+
+    def test_get_tags_for_objects(self):
+        with self.assertNumQueries(1):
+            tags = get_tags_for_objects('community', 'User', [u.id for u in self.users])
+        self.assertEqual([list(object_tags) for object_tags in tags.values()],
+                         [[self.verbs, self.grammar], [self.verbs, self.grammar], [self.grammar]])
+        self.assertEqual(get_tags_for_objects('community', 'User', []), {})
+
+        users = prefetch_tags(User.objects.filter(id__in=[u.id for u in self.users]).order_by('id'),
+                              'community', 'User', owner_field='id')
+        self.assertEqual([u._prefetched_tags for u in users], [[self.verbs, self.grammar], [], []])
+
+    def test_serializer_mixin_single_query(self):
+        users = list(User.objects.filter(id__in=[u.id for u in self.users]).order_by('id'))
+        with self.assertNumQueries(1):
+            data = TaggedUserSerializer(users, many=True).data
+        self.assertEqual([[tag['name'] for tag in row['tags']] for row in data],
+                         [['verbs', 'grammar'], ['verbs', 'grammar'], ['grammar']])
+
+        self.assertEqual(len(TaggedUserSerializer(self.users[2]).data['tags']), 1)
+
+
+class SearchIndexTest(TestCase):
+    """
+    Tests for the full-text search index (SQLite fallback)
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='testpass123', is_active=True
+        )
+        self.verbs = Note.objects.create(user=self.user, title='Irregular verbs', content='go, went, gone')
+        self.travel = Note.objects.create(user=self.user, title='Travel', content='Useful verbs at the <airport>')
+
+    def search(self, query):
+        return list(search_queryset(Note.objects.all(), query).order_by('-search_rank', 'id'))
+
+    def test_index_follows_saves(self):
+        # Title matches rank first; the last word matches as a prefix
+        self.assertEqual(self.search('verbs'), [self.verbs, self.travel])
+        self.assertEqual(self.search('useful verb'), [self.travel])
+        self.assertEqual(self.search('?!'), [])
+
+        self.travel.content = 'Airport vocabulary'
+        self.travel.save()
+        self.assertEqual(self.search('verbs'), [self.verbs])
+
+        # Saves that do not touch the text leave the entry alone
+        with self.assertNumQueries(1):
+            self.travel.save(update_fields=['is_pinned'])
+
+        self.verbs.delete()
+        self.assertFalse(SearchEntry.objects.filter(app_name='notebook', model_name='Note', object_id=self.verbs.pk).exists())
+
+    def test_rebuild_and_highlight(self):
+        # Bulk updates bypass the signals
+        Note.objects.filter(pk=self.verbs.pk).update(content='to be, was, been')
+        SearchEntry.objects.filter(object_id=self.travel.pk).delete()
+        SearchEntry.objects.create(app_name='notebook', model_name='Note', object_id=999999, digest='')
+        self.assertEqual(self.search('been'), [])
+
+        counts = rebuild_search_index()
+        self.assertEqual(counts['notebook.Note'], 2)
+        self.assertEqual(self.search('been'), [self.verbs])
+        self.assertEqual(self.search('airport'), [self.travel])
+        self.assertFalse(SearchEntry.objects.filter(object_id=999999).exists())
+
+        notes = highlight_objects(self.search('airport'), 'airport')
+        self.assertEqual(notes[0].search_headline, 'Useful verbs at the &lt;<mark>airport</mark>&gt;')
+
+    def test_related_fields_are_searched(self):
+        # The category name is not indexed (renames do not save the notes)
+        category = NoteCategory.objects.create(user=self.user, name='Grammar')
+        self.travel.category = category
+        self.travel.save()
+
+        notes = list(search_queryset(Note.objects.all(), 'grammar', related_fields=('category__name',)))
+        self.assertEqual(notes, [self.travel])
+        self.assertEqual(notes[0].search_rank, 0.0)
+        self.assertEqual(search_queryset(Note.objects.all(), 'grammar').count(), 0)
+
+    def test_data_migration_indexes_existing_rows(self):
+        SearchEntry.objects.all().delete()
+        migration = import_module('core.migrations.0004_populate_searchentry')
+
+        migration.populate_search_index(django_apps, None)
+
+        self.assertEqual(self.search('verbs'), [self.verbs, self.travel])
+
@@ -0,0 +1,43 @@
+"""
+Recherche plein texte pour les ViewSets (index global de recherche)
+"""
+
+from ..models.search import highlight_objects, search_queryset
+
+
+class FullTextSearchMixin:
+    """
+    Mixin de ViewSet: ``?search=`` passe par l'index de recherche
+
+    Les résultats sont triés par pertinence (puis par l'ordre habituel) et
+    chaque objet listé reçoit un extrait surligné ``search_headline``.
+    À placer avant la classe ViewSet; remplace filters.SearchFilter.
+    """
+
+    search_param = 'search'
+    search_app_name = None
+    search_model_name = None
+    # Champs liés cherchés hors index (icontains), ex. ('category__name',)
+    search_related_fields = ()
+
+    def get_search_query(self):
+        return self.request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        query = self.get_search_query()
+        if not query:
+            return queryset
+        queryset = search_queryset(
+            queryset, query, self.search_app_name, self.search_model_name, self.search_related_fields
+        )
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.order_by('-search_rank', *ordering)
+
+    def get_serializer(self, *args, **kwargs):
+        # Liste (paginée ou non): les extraits sont calculés pour les seuls objets sérialisés
+        query = self.get_search_query()
+        if args and kwargs.get('many') and query:
+            objects = highlight_objects(args[0], query, self.search_app_name, self.search_model_name)
+            args = (objects, *args[1:])
+        return super().get_serializer(*args, **kwargs)
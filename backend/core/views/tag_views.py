@@ -7,8 +7,11 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q, Count
 from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from ..models.tags import Tag, TagRelation, get_tags_for_object, add_tag_to_object, remove_tag_from_object
+from ..models.tags import (
+    Tag, TagRelation, get_tags_for_object, add_tag_to_object, remove_tag_from_object, set_object_tags
+)
 from ..serializers.tag_serializers import (
     TagSerializer, TagListSerializer, TagRelationSerializer,
     TagCreateSerializer, TagUsageSerializer, ObjectTagsSerializer,
@@ -227,20 +230,15 @@ class ObjectTagsViewSet(viewsets.GenericViewSet):
         object_id = serializer.validated_data['object_id']
         tag_ids = serializer.validated_data['tag_ids']
         
+        # Un tag supprimé entre-temps reste une erreur 404, pas un tag ignoré
+        tags = list(Tag.objects.filter(id__in=tag_ids, user=request.user))
+        if len(tags) != len(set(tag_ids)):
+            raise Http404('Tag introuvable')
+        
         try:
             with transaction.atomic():
-                # Supprimer toutes les relations existantes
-                TagRelation.objects.filter(
-                    app_name=app_name,
-                    model_name=model_name,
-                    object_id=object_id,
-                    tag__user=request.user
-                ).delete()
-                
-                # Ajouter les nouvelles relations
-                for tag_id in tag_ids:
-                    tag = get_object_or_404(Tag, id=tag_id, user=request.user)
-                    add_tag_to_object(tag, app_name, model_name, object_id, request.user)
+                # Remplacer les relations existantes (compteurs mis à jour en masse)
+                set_object_tags(tags, app_name, model_name, [object_id], request.user)
                 
                 # Récupérer et retourner les tags mis à jour
                 tags = get_tags_for_object(app_name, model_name, object_id, request.user)
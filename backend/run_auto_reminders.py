@@ -30,7 +30,7 @@ def main():
             minute_str = current_time.strftime('%H:%M')
             
             # Envoyer les rappels quotidiens
-            stats = RevisionReminderService.send_daily_reminders(dry_run=False)
+            stats = RevisionReminderService.send_due_reminders(dry_run=False)
             
             if stats['notifications_sent'] > 0:
                 print(f"🔔 {minute_str} - ✅ {stats['notifications_sent']} notification(s) envoyée(s) !")
@@ -29,7 +29,7 @@ def main():
             print(f"\n⏰ Vérification à {current_time.strftime('%H:%M:%S')}")
             
             # Envoyer les rappels quotidiens
-            stats = RevisionReminderService.send_daily_reminders(dry_run=False)
+            stats = RevisionReminderService.send_due_reminders(dry_run=False)
             
             if stats['notifications_sent'] > 0:
                 print(f"   ✅ {stats['notifications_sent']} notification(s) envoyée(s)")